@@ -1,8 +1,6 @@
 from django.contrib import admin
-from django.core.cache import cache
-
-from core.cache import invalidate_pattern as _invalidate_pattern
 
+from .cache import invalidate_family
 from .models import (
     ProductCategory, Product, ProductImage,
     ServiceCategory, Service, ServiceImage,
@@ -100,12 +98,10 @@ class ProductCategoryAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        cache.delete(f'catalog:product_category:{obj.pk}')
-        _invalidate_pattern('catalog:product_categories:*')
+        invalidate_family(obj.system_id, 'product_category')
 
     def delete_model(self, request, obj):
-        cache.delete(f'catalog:product_category:{obj.pk}')
-        _invalidate_pattern('catalog:product_categories:*')
+        invalidate_family(obj.system_id, 'product_category')
         super().delete_model(request, obj)
 
 
@@ -136,12 +132,10 @@ class ServiceCategoryAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        cache.delete(f'catalog:service_category:{obj.pk}')
-        _invalidate_pattern('catalog:service_categories:*')
+        invalidate_family(obj.system_id, 'service_category')
 
     def delete_model(self, request, obj):
-        cache.delete(f'catalog:service_category:{obj.pk}')
-        _invalidate_pattern('catalog:service_categories:*')
+        invalidate_family(obj.system_id, 'service_category')
         super().delete_model(request, obj)
 
 
@@ -191,16 +185,12 @@ class ProductAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        cache.delete(f'catalog:product:{obj.pk}')
         # Variants are symmetrical, so a change here can also alter a sibling's
         # serialized output - clear every product cache, not just this one's.
-        _invalidate_pattern('catalog:product:*')
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(obj.system_id, 'product')
 
     def delete_model(self, request, obj):
-        cache.delete(f'catalog:product:{obj.pk}')
-        _invalidate_pattern('catalog:product:*')
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(obj.system_id, 'product')
         super().delete_model(request, obj)
 
 
@@ -242,16 +232,12 @@ class ServiceAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        cache.delete(f'catalog:service:{obj.pk}')
         # Variants are symmetrical, so a change here can also alter a sibling's
         # serialized output - clear every service cache, not just this one's.
-        _invalidate_pattern('catalog:service:*')
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(obj.system_id, 'service')
 
     def delete_model(self, request, obj):
-        cache.delete(f'catalog:service:{obj.pk}')
-        _invalidate_pattern('catalog:service:*')
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(obj.system_id, 'service')
         super().delete_model(request, obj)
 
 
@@ -336,12 +322,10 @@ class MenuCategoryAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        cache.delete(f'catalog:menu_category:{obj.pk}')
-        _invalidate_pattern('catalog:menu_categories:*')
+        invalidate_family(obj.system_id, 'menu_category')
 
     def delete_model(self, request, obj):
-        cache.delete(f'catalog:menu_category:{obj.pk}')
-        _invalidate_pattern('catalog:menu_categories:*')
+        invalidate_family(obj.system_id, 'menu_category')
         super().delete_model(request, obj)
 
 
@@ -391,17 +375,12 @@ class MenuItemAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        cache.delete(f'catalog:menu_item:{obj.pk}')
         # Variants are symmetrical, so a change here can also alter a sibling's
         # serialized output - clear every menu-item cache, not just this one's.
-        _invalidate_pattern('catalog:menu_item:*')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(obj.system_id, 'menu_item')
 
     def delete_model(self, request, obj):
-        cache.delete(f'catalog:menu_item:{obj.pk}')
-        _invalidate_pattern(f'catalog:menu_item_ingredients:{obj.pk}:*')
-        _invalidate_pattern('catalog:menu_item:*')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(obj.system_id, 'menu_item')
         super().delete_model(request, obj)
 
 
@@ -458,10 +437,10 @@ class IngredientAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        _invalidate_pattern('catalog:ingredients:*')
+        invalidate_family(obj.system_id, 'ingredient')
 
     def delete_model(self, request, obj):
-        _invalidate_pattern('catalog:ingredients:*')
+        invalidate_family(obj.system_id, 'ingredient')
         super().delete_model(request, obj)
 
 
@@ -483,14 +462,10 @@ class MenuItemIngredientAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        _invalidate_pattern(f'catalog:menu_item_ingredients:{obj.menu_item_id}:*')
-        cache.delete(f'catalog:menu_item:{obj.menu_item_id}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(obj.menu_item.system_id, 'menu_item')
 
     def delete_model(self, request, obj):
-        _invalidate_pattern(f'catalog:menu_item_ingredients:{obj.menu_item_id}:*')
-        cache.delete(f'catalog:menu_item:{obj.menu_item_id}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(obj.menu_item.system_id, 'menu_item')
         super().delete_model(request, obj)
 
 
@@ -0,0 +1,61 @@
+"""Cache keys and invalidation for catalog payloads, shared by views, admin and signals.
+
+Same split as users/cache.py and orders/cache.py: admin.py and signals.py must be
+able to invalidate without importing the view layer.
+
+Every catalog payload is stamped with a **per-(System, family) generation**
+(see the counters in core/cache.py) instead of being swept by pattern. A family
+is one buyable kind or one category/ingredient table, and its generation covers
+everything cached for it: the list endpoints, the by-pk detail endpoints, and
+the per-owner sub-lists (a dish's ingredients and sizes, a category's sizes).
+Invalidating a family is then one INCR on one tenant's counter - a CMS save no
+longer SCANs the keyspace, and no longer evicts every other storefront's warm
+catalog along with its own.
+
+The key *shapes* did not change (``catalog:products:...``, ``catalog:product:<pk>``),
+so the wide ``catalog:*`` sweeps a restore makes still reach them.
+"""
+
+from core.cache import bump_content_version, bump_generation, read_through
+
+CATALOG_CACHE_TTL = 300  # 5 minutes
+
+#: Every family with its own generation. A list of what ``invalidate_catalog``
+#: has to bump, so adding a cached table means adding it here.
+FAMILIES = (
+    "product", "service", "menu_item",
+    "product_category", "service_category", "menu_category",
+    "ingredient",
+)
+
+
+def _namespace(family):
+    return f"catalog:{family}"
+
+
+def cached_payload(key, family, build, system_id=None):
+    """Read ``key`` through the cache, building it with ``build`` on a miss.
+
+    Pass ``system_id`` when the request already names the tenant (the list
+    endpoints), and ``build`` returns the payload. A by-pk read leaves it out
+    and ``build`` returns ``(system_id, payload)`` - or None for a 404 - so the
+    stamp comes from the row it loaded. See ``core.cache.read_through``.
+    """
+    return read_through(key, build, CATALOG_CACHE_TTL, _namespace(family), system_id)
+
+
+def payload_fragment(key, family, build, system_id):
+    """``cached_payload``'s arguments as one ``core.cache.read_many`` fragment."""
+    return key, build, CATALOG_CACHE_TTL, _namespace(family), system_id
+
+
+def invalidate_family(system_id, *families):
+    """Drop every cached payload of ``families`` belonging to one System."""
+    for family in families:
+        bump_generation(_namespace(family), system_id)
+    bump_content_version(system_id)
+
+
+def invalidate_catalog(system_id):
+    invalidate_family(system_id, *FAMILIES)
+
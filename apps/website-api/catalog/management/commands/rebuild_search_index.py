@@ -0,0 +1,42 @@
+"""Rewrite the catalog search entries from the items they index.
+
+The entries follow every item, category, ingredient and recipe-line save (see
+`catalog.signals`) and are rebuilt after a publish or a restore. Anything else
+that writes the catalog without sending signals - a ``bulk_update`` in a shell,
+a raw SQL fix, a ``loaddata`` - leaves them describing the old text; this puts
+them back.
+
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --host elpanbueno.com
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import SearchEntry
+from catalog.search import rebuild_index
+from core.models import System
+
+
+class Command(BaseCommand):
+    help = "Rebuild the catalog search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            help="Only the System with this host (e.g. elpanbueno.com).",
+        )
+
+    def handle(self, *args, **options):
+        system_id = None
+        host = options.get("host")
+        if host:
+            system_id = System.objects.filter(host=host).values_list("pk", flat=True).first()
+            if system_id is None:
+                raise CommandError(f"No System with host {host!r}.")
+
+        rebuild_index(system_id)
+
+        entries = SearchEntry.objects.all()
+        if system_id is not None:
+            entries = entries.filter(system_id=system_id)
+        self.stdout.write(self.style.SUCCESS(f"{entries.count()} search entries written."))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:21
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_document_index(apps, schema_editor):
+    # GIN is PostgreSQL's; everywhere else `document` stays null and unindexed
+    # (see catalog/search.py).
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX catalog_searchentry_document_gin ON catalog_searchentry USING gin (document)'
+        )
+
+
+def drop_document_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS catalog_searchentry_document_gin')
+
+
+def fill_index(apps, schema_editor):
+    from catalog.search import rebuild_index
+
+    rebuild_index(apps=apps, bump=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0044_picture_renditions'),
+        ('core', '0076_picture_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('product', 'Product'), ('service', 'Service'), ('menu_item', 'Menu Item')], max_length=16)),
+                ('object_id', models.PositiveIntegerField()),
+                ('name_terms', models.TextField(blank=True, default='')),
+                ('body_terms', models.TextField(blank=True, default='')),
+                ('document', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('system', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.system')),
+            ],
+            options={
+                'verbose_name': 'Search Entry',
+                'verbose_name_plural': 'Search Entries',
+                'indexes': [models.Index(fields=['system', 'kind'], name='catalog_sea_system__8eb9bc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='catalog_search_entry_unique_item')],
+            },
+        ),
+        migrations.RunPython(create_document_index, drop_document_index),
+        migrations.RunPython(fill_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0045_search_entry'),
+        ('core', '0079_outbound_email_sending'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['system', 'sort_order', '-created', '-id'], name='catalog_menu_item_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['system', 'sort_order', '-created', '-id'], name='catalog_product_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['system', 'sort_order', '-created', '-id'], name='catalog_service_keyset'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from decimal import Decimal
 from functools import reduce
 
 from colorfield.fields import ColorField
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
@@ -12,6 +13,7 @@ from core.models import (
     Buyable,
     Common,
     RegularPicture,
+    RenderedPicture,
     SmallPicture,
     StandardPicture,
     picture,
@@ -216,6 +218,11 @@ class Product(RecommendationSource, Buyable):
         # `sort_order` (from Buyable) is the CMS's manual arrangement; newest-first
         # remains the tiebreak, which is every row's order until one is dragged.
         ordering = ['sort_order', '-created']
+        indexes = [
+            # A keyset page (catalog/pagination.py): one tenant's rows in
+            # cursor order, so page N is a range scan from the cursor.
+            models.Index(fields=['system', 'sort_order', '-created', '-id'], name='catalog_product_keyset'),
+        ]
 
     def __str__(self):
         return self.name or self.slug
@@ -419,6 +426,10 @@ class Service(RecommendationSource, Buyable):
         verbose_name = 'Service'
         verbose_name_plural = 'Services'
         ordering = ['sort_order', '-created']
+        indexes = [
+            # The keyset page's order; see Product.
+            models.Index(fields=['system', 'sort_order', '-created', '-id'], name='catalog_service_keyset'),
+        ]
 
     def __str__(self):
         return self.name or self.slug
@@ -474,7 +485,7 @@ class Service(RecommendationSource, Buyable):
         return low, max(self.booking_party_max or low, low)
 
 
-class ProductImage(StandardPicture):
+class ProductImage(StandardPicture, RenderedPicture):
     """Additional gallery images for a product."""
 
     product = models.ForeignKey(
@@ -493,7 +504,7 @@ class ProductImage(StandardPicture):
         return f"Image for {self.product} (#{self.sort_order})"
 
 
-class ServiceImage(StandardPicture):
+class ServiceImage(StandardPicture, RenderedPicture):
     """Additional gallery images for a service."""
 
     service = models.ForeignKey(
@@ -730,6 +741,10 @@ class MenuItem(RecommendationSource, Buyable):
         verbose_name = 'Menu Item'
         verbose_name_plural = 'Menu Items'
         ordering = ['sort_order', '-created']
+        indexes = [
+            # The keyset page's order; see Product.
+            models.Index(fields=['system', 'sort_order', '-created', '-id'], name='catalog_menu_item_keyset'),
+        ]
 
     def __str__(self):
         return self.name or self.slug
@@ -844,7 +859,7 @@ class MenuItem(RecommendationSource, Buyable):
         return total if total > Decimal('0.00') else Decimal('0.00')
 
 
-class MenuItemImage(StandardPicture):
+class MenuItemImage(StandardPicture, RenderedPicture):
     """Additional gallery images for a menu item."""
 
     menu_item = models.ForeignKey(
@@ -1700,3 +1715,48 @@ def normalize_selection(selection, ingredients):
         normalized.append(record)
     normalized.sort(key=lambda r: r['ingredient'])
     return normalized
+
+
+SEARCH_KIND_CHOICES = [
+    ('product', 'Product'),
+    ('service', 'Service'),
+    ('menu_item', 'Menu Item'),
+]
+
+
+class SearchEntry(models.Model):
+    """One buyable's searchable text, folded into terms once, at write time.
+
+    What the catalog `search=` filter and the type-ahead endpoint read instead
+    of running ``name__icontains`` over the item table - which no index can
+    serve, and which never looked at the English name, the descriptions, the
+    category or a dish's ingredients. ``name_terms`` (the name in both
+    languages) ranks above ``body_terms`` (everything else).
+
+    ``document`` is the same two columns as a weighted ``tsvector``, filled and
+    GIN-indexed on PostgreSQL only; elsewhere it stays null and the terms are
+    searched from an in-process index instead. See ``catalog/search.py``.
+
+    Derived, like ``AvailabilitySummary``: kept current by ``catalog.signals``
+    and rebuilt whole by ``rebuild_search_index``, so it is not backed up.
+    """
+
+    system = models.ForeignKey('core.System', on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=16, choices=SEARCH_KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    name_terms = models.TextField(blank=True, default='')
+    body_terms = models.TextField(blank=True, default='')
+    document = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        verbose_name = 'Search Entry'
+        verbose_name_plural = 'Search Entries'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='catalog_search_entry_unique_item'),
+        ]
+        indexes = [
+            models.Index(fields=['system', 'kind']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.name_terms}"
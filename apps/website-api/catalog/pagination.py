@@ -0,0 +1,107 @@
+"""Keyset pagination and the card projection for the public catalog lists.
+
+The product, service and menu-item lists serialize the whole tenant catalog -
+every gallery image, variant, ingredient and size - in one response. That is
+what the CMS and the detail pages want, and it stays the default. A storefront
+grid only needs a card per item, one screenful at a time, so it can opt in to:
+
+  fields=card    - the compact ``*CardSerializer`` row (id, slug, name, image,
+                   price) with only the prefetches that row needs.
+  limit=<n>      - a page of at most ``n`` rows (capped at ``MAX_PAGE_SIZE``),
+                   answered as ``{"results": [...], "next": <cursor or null>}``.
+  cursor=<token> - the ``next`` of the previous page.
+
+⚠ Keyset, not offset: the cursor is the position of the last row served,
+``(sort_order, created, id)`` - the models' own ``Meta.ordering`` plus the pk as
+a tiebreak - so page N costs the same index range scan as page 1 (each list's
+``(system, sort_order, -created, -id)`` index matches it), and a row
+the CMS inserts while a customer scrolls cannot shift a page boundary and show
+them an item twice. The cursor is opaque to clients; only this module reads it.
+
+Both params are part of the list cache key (``_scoped_list_key`` keys on every
+query param), so each page is cached on its own and invalidated with its family.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+CARD_FIELDS = 'card'
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+KEYSET_ORDERING = ('sort_order', '-created', '-id')
+
+
+class InvalidPage(ValueError):
+    """A ``limit`` or ``cursor`` that cannot be honoured; the message is user-facing."""
+
+
+def wants_card(request):
+    return request.query_params.get('fields') == CARD_FIELDS
+
+
+def page_params(request):
+    """``(limit, position)`` for a paginated read, or None for the legacy full list.
+
+    ``position`` is None on the first page. Raises ``InvalidPage``.
+    """
+    raw_limit = request.query_params.get('limit')
+    token = request.query_params.get('cursor')
+    if raw_limit is None and token is None:
+        return None
+
+    if raw_limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise InvalidPage('limit must be a positive integer.')
+        if limit < 1:
+            raise InvalidPage('limit must be a positive integer.')
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    return limit, (_decode_cursor(token) if token else None)
+
+
+def _encode_cursor(obj):
+    raw = json.dumps([obj.sort_order, obj.created.isoformat(), obj.pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_order, created, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return int(sort_order), datetime.fromisoformat(created), int(pk)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidPage('Invalid cursor.')
+
+
+def keyset_page(qs, limit, position, serialize):
+    """One page of ``qs`` after ``position``, as ``{"results", "next"}``.
+
+    ``serialize`` turns the page's rows into payload; it is handed a list, so
+    the queryset's prefetches run against this page only.
+    """
+    qs = qs.order_by(*KEYSET_ORDERING)
+    if position is not None:
+        sort_order, created, pk = position
+        qs = qs.filter(
+            Q(sort_order__gt=sort_order)
+            | Q(sort_order=sort_order, created__lt=created)
+            | Q(sort_order=sort_order, created=created, id__lt=pk)
+        )
+    # One row past the page says whether there is a next one without a COUNT.
+    rows = list(qs[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'results': serialize(rows),
+        'next': _encode_cursor(rows[-1]) if more else None,
+    }
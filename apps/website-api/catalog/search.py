@@ -0,0 +1,324 @@
+"""Catalog search: a per-item term index, ranked, with prefix matching.
+
+The lists' ``search=`` used to be ``name__icontains``: a scan of the tenant's
+whole item table that no index can serve, blind to the English name, the
+descriptions, the category and a dish's ingredients, and to "cafe" finding
+"Café". Instead every product, service and menu item has one ``SearchEntry``
+row holding its text already **folded** - lowercased, accents stripped, split
+into terms (`fold`) - in two weights: its names, and everything else.
+
+Queries are folded the same way, and every query term matches as a *prefix*
+("capu" finds "capuccino"), all of them required - the type-ahead shape. A
+result ranks by how well its terms matched: a name above a description, a
+whole word above a prefix.
+
+Two backends read the same rows:
+
+* **PostgreSQL** - ``SearchEntry.document``, a weighted ``tsvector`` built from
+  the terms with the ``simple`` configuration (they are already folded, so no
+  stemming or ``unaccent`` is wanted), under a GIN index; matched with a raw
+  ``term:*`` query and ordered by ``ts_rank``.
+* **Anything else** (SQLite in development and tests) - an inverted index of
+  one tenant's entries of one kind, built in this process on first search and
+  kept until the entries change. A sorted term list answers a prefix with a
+  bisect instead of a scan.
+
+Entries are written by ``catalog.signals`` on every item, category, ingredient
+and recipe-line write, and rebuilt whole for a tenant after the bulk paths that
+send no signals (publish, restore) and by ``manage.py rebuild_search_index``.
+Each write moves a per-(tenant, kind) generation, which is what tells the
+in-process index above that it is out of date - on every worker, not only the
+one that wrote.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from django.apps import apps as django_apps
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, When
+
+from core.cache import bump_generation, current_generation
+
+KINDS = ('product', 'service', 'menu_item')
+
+_MODELS = {
+    'product': 'catalog.Product',
+    'service': 'catalog.Service',
+    'menu_item': 'catalog.MenuItem',
+}
+
+#: Shorter terms are dropped, from documents and queries alike: a one-letter
+#: prefix matches most of any catalog.
+MIN_TERM_LENGTH = 2
+
+#: How many ranked ids one search returns. A type-ahead list ordered by rank is
+#: a screenful of results, not the catalog; a keyset page of a search is not
+#: capped (`search_queryset` with ``ranked=False``) - it has a next cursor.
+MAX_RESULTS = 200
+
+NAME_WEIGHT = 4
+BODY_WEIGHT = 1
+
+_TERM = re.compile(r'[a-z0-9]+')
+
+_WRITE_CHUNK = 500
+
+
+def fold(text):
+    """The search terms of ``text``: lowercase, unaccented, at least two characters."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize('NFKD', str(text).lower())
+    bare = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return [term for term in _TERM.findall(bare) if len(term) >= MIN_TERM_LENGTH]
+
+
+def _terms(*texts):
+    # Each term once, in order of first appearance: a frequency means nothing
+    # to either backend's ranking here, and a long description repeats itself.
+    return ' '.join(dict.fromkeys(term for text in texts for term in fold(text)))
+
+
+def _namespace(kind):
+    return f'search:{kind}'
+
+
+def _uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def _document():
+    return (
+        SearchVector('name_terms', weight='A', config='simple')
+        + SearchVector('body_terms', weight='B', config='simple')
+    )
+
+
+# ── Writing entries ──────────────────────────────────────────────────────────
+
+def _entries(apps, kind, **filters):
+    """Unsaved ``SearchEntry`` rows for the items of ``kind`` matching ``filters``.
+
+    Takes an app registry so the migration that creates the table can fill it
+    through the historical models.
+    """
+    Model = apps.get_model(_MODELS[kind])
+    Entry = apps.get_model('catalog', 'SearchEntry')
+    rows = list(Model.objects.filter(**filters).values(
+        'pk', 'system_id', 'name', 'en_name',
+        'short_description', 'en_short_description', 'description', 'en_description',
+        'category__name', 'category__en_name',
+    ))
+    ingredients = {}
+    if kind == 'menu_item' and rows:
+        MenuItemIngredient = apps.get_model('catalog', 'MenuItemIngredient')
+        lines = MenuItemIngredient.objects.filter(
+            menu_item_id__in=[row['pk'] for row in rows],
+        ).values_list('menu_item_id', 'ingredient__name', 'ingredient__en_name', 'group_name', 'group_en_name')
+        for menu_item_id, *names in lines:
+            ingredients.setdefault(menu_item_id, []).extend(names)
+
+    return [
+        Entry(
+            system_id=row['system_id'], kind=kind, object_id=row['pk'],
+            name_terms=_terms(row['name'], row['en_name']),
+            body_terms=_terms(
+                row['short_description'], row['en_short_description'],
+                row['description'], row['en_description'],
+                row['category__name'], row['category__en_name'],
+                *ingredients.get(row['pk'], ()),
+            ),
+        )
+        for row in rows
+    ]
+
+
+def _write(apps, kind, stale, entries, system_ids, bump=True):
+    Entry = apps.get_model('catalog', 'SearchEntry')
+    with transaction.atomic():
+        stale.delete()
+        Entry.objects.bulk_create(entries, batch_size=_WRITE_CHUNK)
+        if _uses_postgres() and entries:
+            Entry.objects.filter(
+                kind=kind, object_id__in=[entry.object_id for entry in entries],
+            ).update(document=_document())
+    if not bump:
+        return
+    for system_id in system_ids:
+        # Now, for this connection's own next search, and again after commit:
+        # another worker searching in between reads the rows being replaced and
+        # would otherwise keep them under the generation that replaced them.
+        bump_generation(_namespace(kind), system_id)
+        transaction.on_commit(lambda system_id=system_id: bump_generation(_namespace(kind), system_id))
+
+
+def index_items(kind, pks, apps=django_apps):
+    """Rewrite the entries of these items (an item that no longer exists loses its own)."""
+    pks = list(pks)
+    Entry = apps.get_model('catalog', 'SearchEntry')
+    for start in range(0, len(pks), _WRITE_CHUNK):
+        chunk = pks[start:start + _WRITE_CHUNK]
+        stale = Entry.objects.filter(kind=kind, object_id__in=chunk)
+        system_ids = set(stale.values_list('system_id', flat=True))
+        entries = _entries(apps, kind, pk__in=chunk)
+        _write(apps, kind, stale, entries, system_ids | {entry.system_id for entry in entries})
+
+
+def rebuild_index(system_id=None, apps=django_apps, bump=True):
+    """Rewrite every entry of one System, or of every System.
+
+    ``bump=False`` leaves the generations alone, for the migration that fills
+    the table before any worker can have searched it (and that should not need
+    the cache to be up).
+    """
+    Entry = apps.get_model('catalog', 'SearchEntry')
+    for kind in KINDS:
+        stale = Entry.objects.filter(kind=kind)
+        filters = {}
+        if system_id is not None:
+            stale = stale.filter(system_id=system_id)
+            filters['system_id'] = system_id
+        system_ids = set(stale.values_list('system_id', flat=True).distinct())
+        entries = _entries(apps, kind, **filters)
+        _write(apps, kind, stale, entries, system_ids | {entry.system_id for entry in entries}, bump)
+
+
+# ── Searching ────────────────────────────────────────────────────────────────
+
+class _InvertedIndex:
+    """One tenant's entries of one kind, as term -> {object_id: weight}."""
+
+    def __init__(self, rows):
+        postings = {}
+        for object_id, name_terms, body_terms in rows:
+            for term in body_terms.split():
+                postings.setdefault(term, {})[object_id] = BODY_WEIGHT
+            for term in name_terms.split():
+                postings.setdefault(term, {})[object_id] = NAME_WEIGHT
+        self.postings = postings
+        self.terms = sorted(postings)
+
+    def _scores(self, prefix):
+        scores = {}
+        at = bisect.bisect_left(self.terms, prefix)
+        while at < len(self.terms) and self.terms[at].startswith(prefix):
+            term = self.terms[at]
+            whole_word = 2 if term == prefix else 1
+            for object_id, weight in self.postings[term].items():
+                scores[object_id] = max(scores.get(object_id, 0), weight * whole_word)
+            at += 1
+        return scores
+
+    def ranked(self, terms):
+        total = None
+        for term in terms:
+            scores = self._scores(term)
+            if total is None:
+                total = scores
+            else:
+                total = {object_id: total[object_id] + score for object_id, score in scores.items() if object_id in total}
+            if not total:
+                return []
+        return sorted(total, key=lambda object_id: (-total[object_id], object_id))
+
+
+#: ``(system_id, kind) -> (generation, _InvertedIndex)``, least recently used first.
+_indexes: OrderedDict = OrderedDict()
+_indexes_lock = threading.Lock()
+_INDEXES_KEPT = 256
+
+
+def _inverted_index(system_id, kind):
+    generation = current_generation(_namespace(kind), system_id)
+    key = (system_id, kind)
+    with _indexes_lock:
+        hit = _indexes.get(key)
+        if hit is not None and hit[0] == generation:
+            _indexes.move_to_end(key)
+            return hit[1]
+
+    from .models import SearchEntry
+
+    index = _InvertedIndex(
+        SearchEntry.objects.filter(system_id=system_id, kind=kind)
+        .values_list('object_id', 'name_terms', 'body_terms')
+    )
+    with _indexes_lock:
+        _indexes[key] = (generation, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > _INDEXES_KEPT:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _tsquery(terms):
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='simple')
+
+
+def ranked_ids(system_id, kind, query):
+    """The ids of ``kind`` matching ``query`` in one System, best first.
+
+    None when the query has no term to search by (empty, or all one-letter),
+    so a caller can tell "matched nothing" from "asked nothing". At most
+    ``MAX_RESULTS`` of them.
+    """
+    terms = fold(query)
+    if not terms:
+        return None
+    if not _uses_postgres():
+        return _inverted_index(system_id, kind).ranked(terms)[:MAX_RESULTS]
+
+    from .models import SearchEntry
+
+    search = _tsquery(terms)
+    return list(
+        SearchEntry.objects.filter(system_id=system_id, kind=kind, document=search)
+        .annotate(rank=SearchRank(F('document'), search))
+        .order_by('-rank', 'object_id')
+        .values_list('object_id', flat=True)[:MAX_RESULTS]
+    )
+
+
+def _matching(system_id, kind, terms):
+    """Every id of ``kind`` matching ``terms``, unordered and uncapped.
+
+    A subquery on PostgreSQL, so the match set never leaves the database.
+    """
+    if not _uses_postgres():
+        return _inverted_index(system_id, kind).ranked(terms)
+
+    from .models import SearchEntry
+
+    return SearchEntry.objects.filter(
+        system_id=system_id, kind=kind, document=_tsquery(terms),
+    ).values('object_id')
+
+
+def search_queryset(qs, system_id, kind, query, *, ranked=True):
+    """``qs`` narrowed to the items matching ``query`` - ordered best first
+    unless ``ranked`` is off (a keyset page keeps its own order).
+
+    Only the ranked list is capped at ``MAX_RESULTS``: a keyset page filters on
+    every match, so a broad search still pages through all of them.
+    """
+    if not ranked:
+        terms = fold(query)
+        if not terms:
+            return qs
+        return qs.filter(pk__in=_matching(system_id, kind, terms))
+
+    ids = ranked_ids(system_id, kind, query)
+    if ids is None:
+        return qs
+    qs = qs.filter(pk__in=ids)
+    if ids:
+        qs = qs.order_by(Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        ))
+    return qs
@@ -7,7 +7,7 @@ from core.models import (
     ASPECT_RATIO_CHOICES, Branch, Brand, ResourcePool, System, CURRENCY_CHOICES,
 )
 from core.image_sizes import REGULAR, SMALL, STANDARD, image_cfg
-from core.serializers import ImageProcessingSerializer, StockCreditWriteMixin
+from core.serializers import ImageProcessingSerializer, ImageSrcsetField, StockCreditWriteMixin
 from .models import (
     ProductCategory, Product, ProductImage,
     ServiceCategory, Service, ServiceImage,
@@ -258,10 +258,11 @@ class ProductCategoryWriteSerializer(StockCreditWriteMixin, serializers.ModelSer
 
 class ProductImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField()
 
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'name', 'fit', 'background_color', 'sort_order']
+        fields = ['id', 'image', 'image_srcset', 'name', 'fit', 'background_color', 'sort_order']
 
     def get_image(self, obj):
         request = self.context.get('request')
@@ -316,20 +317,61 @@ class ProductImageWriteSerializer(StockCreditWriteMixin, serializers.Serializer)
 # Product serializers
 # ---------------------------------------------------------------------------
 
+def _buyable_picture(obj):
+    """The row whose ``image`` a buyable shows: itself, else its first gallery
+    image that has one, else None."""
+    if obj.image:
+        return obj
+    gallery = sorted(obj.images.all(), key=lambda i: i.sort_order)
+    return next((i for i in gallery if i.image), None)
+
+
 def _buyable_image_url(obj, request):
     """Best image URL for a buyable: its own ``image``, else the first gallery
     image, else None. Shared by the full serializers and the shallow sibling-
-    variant ones so a variant thumbnail resolves its image exactly like a card."""
-    image = obj.image
-    if not image:
-        gallery = sorted(obj.images.all(), key=lambda i: i.sort_order)
-        first = next((i for i in gallery if i.image), None)
-        image = first.image if first else None
-    if not image:
+    variant ones so a variant thumbnail resolves its image exactly like a card.
+    ``image_srcset`` follows the same picture (``_buyable_picture``)."""
+    picture = _buyable_picture(obj)
+    if picture is None:
         return None
     if request:
-        return request.build_absolute_uri(image.url)
-    return image.url
+        return request.build_absolute_uri(picture.image.url)
+    return picture.image.url
+
+
+class _BuyableCardSerializer(serializers.ModelSerializer):
+    """The ``fields=card`` row of a public catalog list (see catalog/pagination.py):
+    what a storefront grid tile renders, and nothing it would have to fetch a
+    gallery, variant or ingredient for. ``category_slug`` is here for the tile's
+    link, as on the variant references. Concrete per kind below."""
+
+    image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField(picture=_buyable_picture)
+    category_slug = serializers.SlugRelatedField(source='category', slug_field='slug', read_only=True)
+
+    class Meta:
+        fields = [
+            'id', 'slug', 'name', 'en_name', 'category_slug', 'image', 'image_srcset',
+            'price', 'compare_price', 'currency',
+        ]
+
+    def get_image(self, obj):
+        return _buyable_image_url(obj, self.context.get('request'))
+
+
+class ProductCardSerializer(_BuyableCardSerializer):
+    class Meta(_BuyableCardSerializer.Meta):
+        model = Product
+
+
+class ServiceCardSerializer(_BuyableCardSerializer):
+    class Meta(_BuyableCardSerializer.Meta):
+        model = Service
+
+
+class MenuItemCardSerializer(_BuyableCardSerializer):
+    class Meta(_BuyableCardSerializer.Meta):
+        model = MenuItem
 
 
 class ProductVariantSerializer(serializers.ModelSerializer):
@@ -344,12 +386,13 @@ class ProductVariantSerializer(serializers.ModelSerializer):
     assume its sibling shares the current page's category segment."""
 
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField(picture=_buyable_picture)
     category_slug = serializers.SlugRelatedField(source='category', slug_field='slug', read_only=True)
 
     class Meta:
         model = Product
         fields = [
-            'id', 'slug', 'name', 'en_name', 'category_slug', 'image',
+            'id', 'slug', 'name', 'en_name', 'category_slug', 'image', 'image_srcset',
             'price', 'currency', 'in_stock',
         ]
 
@@ -359,6 +402,7 @@ class ProductVariantSerializer(serializers.ModelSerializer):
 
 class ProductSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField(picture=_buyable_picture)
     images = ProductImageSerializer(many=True, read_only=True)
     variants = ProductVariantSerializer(many=True, read_only=True)
     brand_name = serializers.CharField(source='brand.name', read_only=True, default=None)
@@ -374,7 +418,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'name', 'en_name', 'description', 'en_description',
             'short_description', 'en_short_description',
             'slug', 'sku', 'barcode',
-            'image', 'images', 'variants',
+            'image', 'image_srcset', 'images', 'variants',
             'href', 'video_link', 'fit', 'background_color', 'aspect_ratio',
             'price', 'compare_price', 'cost_price', 'currency',
             # Rewards. Both are the item's **own** values, unresolved: a null
@@ -586,10 +630,11 @@ class ProductWriteSerializer(StockCreditWriteMixin, serializers.Serializer):
 
 class ServiceImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField()
 
     class Meta:
         model = ServiceImage
-        fields = ['id', 'image', 'name', 'fit', 'background_color', 'sort_order']
+        fields = ['id', 'image', 'image_srcset', 'name', 'fit', 'background_color', 'sort_order']
 
     def get_image(self, obj):
         request = self.context.get('request')
@@ -757,12 +802,13 @@ class ServiceVariantSerializer(serializers.ModelSerializer):
     assume its sibling shares the current page's category segment."""
 
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField(picture=_buyable_picture)
     category_slug = serializers.SlugRelatedField(source='category', slug_field='slug', read_only=True)
 
     class Meta:
         model = Service
         fields = [
-            'id', 'slug', 'name', 'en_name', 'category_slug', 'image',
+            'id', 'slug', 'name', 'en_name', 'category_slug', 'image', 'image_srcset',
             'price', 'currency', 'duration', 'modality',
         ]
 
@@ -772,6 +818,7 @@ class ServiceVariantSerializer(serializers.ModelSerializer):
 
 class ServiceSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField()
     images = ServiceImageSerializer(many=True, read_only=True)
     variants = ServiceVariantSerializer(many=True, read_only=True)
     brand_name = serializers.CharField(source='brand.name', read_only=True, default=None)
@@ -800,7 +847,7 @@ class ServiceSerializer(serializers.ModelSerializer):
             'name', 'en_name', 'description', 'en_description',
             'short_description', 'en_short_description',
             'slug', 'sku',
-            'image', 'images', 'variants',
+            'image', 'image_srcset', 'images', 'variants',
             'href', 'video_link', 'fit', 'background_color', 'aspect_ratio',
             'price', 'compare_price', 'cost_price', 'currency',
             # Rewards. Both are the item's **own** values, unresolved: a null
@@ -1697,10 +1744,11 @@ class MenuItemIngredientWriteSerializer(serializers.ModelSerializer):
 
 class MenuItemImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField()
 
     class Meta:
         model = MenuItemImage
-        fields = ['id', 'image', 'name', 'fit', 'background_color', 'sort_order']
+        fields = ['id', 'image', 'image_srcset', 'name', 'fit', 'background_color', 'sort_order']
 
     def get_image(self, obj):
         request = self.context.get('request')
@@ -1863,11 +1911,12 @@ class MenuItemVariantSerializer(serializers.ModelSerializer):
     assume its sibling shares the current page's category segment."""
 
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField(picture=_buyable_picture)
     category_slug = serializers.SlugRelatedField(source='category', slug_field='slug', read_only=True)
 
     class Meta:
         model = MenuItem
-        fields = ['id', 'slug', 'name', 'en_name', 'category_slug', 'image']
+        fields = ['id', 'slug', 'name', 'en_name', 'category_slug', 'image', 'image_srcset']
 
     def get_image(self, obj):
         return _buyable_image_url(obj, self.context.get('request'))
@@ -1879,6 +1928,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
     through the admin-gated recipe endpoint."""
 
     image = serializers.SerializerMethodField()
+    image_srcset = ImageSrcsetField(picture=_buyable_picture)
     images = MenuItemImageSerializer(many=True, read_only=True)
     ingredients = MenuItemIngredientSerializer(many=True, read_only=True)
     variants = MenuItemVariantSerializer(many=True, read_only=True)
@@ -1901,7 +1951,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
             'name', 'en_name', 'description', 'en_description',
             'short_description', 'en_short_description',
             'slug', 'sku',
-            'image', 'images', 'ingredients', 'variants',
+            'image', 'image_srcset', 'images', 'ingredients', 'variants',
             'sizes', 'sizes_enabled',
             'href', 'video_link', 'fit', 'background_color', 'aspect_ratio',
             'price', 'compare_price', 'cost_price', 'currency',
@@ -34,29 +34,32 @@ admin single + bulk delete, the API views, and any cascade uniformly:
    ``product_count``, ``service_count`` and ``menu_item_count``, and that
    payload is cached for a whole hour. The storefront navbar builds its links
    from those numbers, so an item write - creating the tenant's first menu item,
-   or disabling the last one - has to clear it too, or the Menu entry stays
-   missing (or stays after the menu is gone) until the TTL lapses.
+   or disabling the last one - has to recount the stored number
+   (``core.counters``) and clear the payload, or the Menu entry stays missing
+   (or stays after the menu is gone) until the TTL lapses.
+
+6. **Everything an item is found by -> its search entry.** An item's
+   ``SearchEntry`` (``catalog/search.py``) carries its category's names and,
+   for a dish, its ingredients' - so a category, ingredient or recipe-line
+   write re-indexes the items it reaches, not just an item's own.
 """
 
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from core.cache import invalidate_pattern, invalidate_system_payload
+from core.cache import invalidate_pattern
+from core.counters import count_write
 
+from .cache import invalidate_family
 from .models import (
-    CatalogRecommendation, MenuCategory, MenuItem, MenuSize, Product,
-    ProductCategory, Service, ServiceCategory,
+    CatalogRecommendation, Ingredient, MenuCategory, MenuItem, MenuItemIngredient,
+    MenuSize, Product, ProductCategory, Service, ServiceCategory,
 )
+from .search import index_items
 
 
-def _invalidate_family(family):
-    invalidate_pattern(f"catalog:{family}s:*")  # list endpoints (plural prefix)
-    invalidate_pattern(f"catalog:{family}:*")   # detail endpoints (per-pk)
-
-
-def _invalidate_categories(family):
-    invalidate_pattern(f"catalog:{family}_categories:*")  # list (item_count)
-    invalidate_pattern(f"catalog:{family}_category:*")    # detail (item_count)
+def _invalidate_categories(system_id, family):
+    invalidate_family(system_id, f"{family}_category")  # list + detail (item_count)
 
 
 # ── Category -> item caches ──────────────────────────────────────────────────
@@ -64,19 +67,19 @@ def _invalidate_categories(family):
 @receiver(post_save, sender=ProductCategory)
 @receiver(post_delete, sender=ProductCategory)
 def invalidate_products_on_category_change(sender, instance, **kwargs):
-    _invalidate_family("product")
+    invalidate_family(instance.system_id, "product")
 
 
 @receiver(post_save, sender=ServiceCategory)
 @receiver(post_delete, sender=ServiceCategory)
 def invalidate_services_on_category_change(sender, instance, **kwargs):
-    _invalidate_family("service")
+    invalidate_family(instance.system_id, "service")
 
 
 @receiver(post_save, sender=MenuCategory)
 @receiver(post_delete, sender=MenuCategory)
 def invalidate_menu_items_on_category_change(sender, instance, **kwargs):
-    _invalidate_family("menu_item")
+    invalidate_family(instance.system_id, "menu_item")
 
 
 # ── Item -> category caches (item_count) ─────────────────────────────────────
@@ -100,24 +103,24 @@ def _invalidate_carts():
 @receiver(post_save, sender=Product)
 @receiver(post_delete, sender=Product)
 def invalidate_product_categories_on_item_change(sender, instance, **kwargs):
-    _invalidate_categories("product")
-    invalidate_system_payload()
+    _invalidate_categories(instance.system_id, "product")
+    count_write(sender, instance.system_id)
     _invalidate_carts()
 
 
 @receiver(post_save, sender=Service)
 @receiver(post_delete, sender=Service)
 def invalidate_service_categories_on_item_change(sender, instance, **kwargs):
-    _invalidate_categories("service")
-    invalidate_system_payload()
+    _invalidate_categories(instance.system_id, "service")
+    count_write(sender, instance.system_id)
     _invalidate_carts()
 
 
 @receiver(post_save, sender=MenuItem)
 @receiver(post_delete, sender=MenuItem)
 def invalidate_menu_categories_on_item_change(sender, instance, **kwargs):
-    _invalidate_categories("menu")
-    invalidate_system_payload()
+    _invalidate_categories(instance.system_id, "menu")
+    count_write(sender, instance.system_id)
     _invalidate_carts()
 
 
@@ -126,14 +129,13 @@ def invalidate_menu_categories_on_item_change(sender, instance, **kwargs):
 @receiver(post_save, sender=MenuSize)
 @receiver(post_delete, sender=MenuSize)
 def invalidate_menu_on_size_change(sender, instance, **kwargs):
+    # The owners' size sub-lists are stamped with their family's generation, so
+    # the two bumps below drop them along with the payloads they are nested in.
     if instance.category_id:
-        invalidate_pattern(f"catalog:menu_category_sizes:{instance.category_id}:*")
-        _invalidate_categories("menu")
-    if instance.menu_item_id:
-        invalidate_pattern(f"catalog:menu_item_sizes:{instance.menu_item_id}:*")
+        _invalidate_categories(instance.system_id, "menu")
     # Both owners land here: an item-level override changes that dish's payload,
     # and a category-level row changes every dish that has none of its own.
-    _invalidate_family("menu_item")
+    invalidate_family(instance.system_id, "menu_item")
 
 
 # ── Recommendations -> the source's payload, and every cached cart ────────────
@@ -162,16 +164,74 @@ def invalidate_on_recommendation_change(sender, instance, **kwargs):
     staleness a cached cart already carries for a price change - clearing every
     cart on every catalog save would cost far more than the dead card it saves.
     """
+    system_id = instance.system_id
     for family in ('product', 'service', 'menu_item'):
         if getattr(instance, f'{family}_id'):
-            _invalidate_family(family)
+            invalidate_family(system_id, family)
     if instance.product_category_id:
-        _invalidate_family("product")
-        _invalidate_categories("product")
+        invalidate_family(system_id, "product")
+        _invalidate_categories(system_id, "product")
     if instance.service_category_id:
-        _invalidate_family("service")
-        _invalidate_categories("service")
+        invalidate_family(system_id, "service")
+        _invalidate_categories(system_id, "service")
     if instance.menu_category_id:
-        _invalidate_family("menu_item")
-        _invalidate_categories("menu")
+        invalidate_family(system_id, "menu_item")
+        _invalidate_categories(system_id, "menu")
     invalidate_pattern("users:cart:*")
+
+
+# ── Search entries ───────────────────────────────────────────────────────────
+
+_SEARCH_KINDS = {Product: 'product', Service: 'service', MenuItem: 'menu_item'}
+_CATEGORY_ITEMS = {ProductCategory: Product, ServiceCategory: Service, MenuCategory: MenuItem}
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def index_item(sender, instance, **kwargs):
+    # A deleted item has no row to index, which is what drops its entry.
+    index_items(_SEARCH_KINDS[sender], [instance.pk])
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_save, sender=MenuCategory)
+def index_category_items(sender, instance, created, **kwargs):
+    """Re-index the items filed under a category whose names may have changed."""
+    if created:
+        return
+    Item = _CATEGORY_ITEMS[sender]
+    index_items(_SEARCH_KINDS[Item], Item.objects.filter(category=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_delete, sender=MenuCategory)
+def index_uncategorised_items(sender, instance, **kwargs):
+    """Re-index the items a deleted category was carrying the names of.
+
+    They have already been nulled out of it (``SET_NULL``, an UPDATE that sends
+    no signal), so which items it held can no longer be asked; the tenant's
+    uncategorised items are re-indexed instead, a superset of them.
+    """
+    Item = _CATEGORY_ITEMS[sender]
+    items = Item.objects.filter(system_id=instance.system_id, category__isnull=True)
+    index_items(_SEARCH_KINDS[Item], items.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Ingredient)
+def index_ingredient_dishes(sender, instance, created, **kwargs):
+    if created:
+        return
+    dishes = MenuItemIngredient.objects.filter(ingredient=instance).values_list('menu_item_id', flat=True)
+    index_items('menu_item', set(dishes))
+
+
+@receiver(post_save, sender=MenuItemIngredient)
+@receiver(post_delete, sender=MenuItemIngredient)
+def index_recipe_line_dish(sender, instance, **kwargs):
+    index_items('menu_item', [instance.menu_item_id])
@@ -16,6 +16,7 @@ from django.test import TestCase
 
 from decimal import Decimal
 
+from core.cache import generation_key
 from core.models import Branch, Brand, System
 
 from .test_helpers import a_product_category, a_service_category
@@ -110,6 +111,91 @@ class CatalogListTests(TestCase):
                 True, [row["enabled"] for row in client.get(list_url).json()], list_url,
             )
 
+    def test_a_write_invalidates_only_its_own_tenant(self):
+        """Invalidation bumps a per-(System, family) generation instead of
+        sweeping `catalog:products:*`, which used to evict every storefront's
+        warm list on any tenant's save."""
+        other = System.objects.create(site_name="Other", host="other.test")
+        theirs = Product.objects.create(
+            category=a_product_category(other),
+            system=other, name="Theirs", slug="theirs", enabled=True,
+        )
+        their_url = f"/api/catalog/products/?system={other.id}"
+        self.assertEqual(self._names(self.client.get(their_url)), ["Theirs"])
+
+        # Moved underneath the cache, with no signal: only a sweep would show it.
+        Product.objects.filter(pk=theirs.pk).update(name="Renamed")
+
+        product = Product.objects.get(slug="live")
+        res = admin_client(self, self.system).patch(
+            f"/api/catalog/products/{product.id}/",
+            {"name": "Fresh"}, content_type="application/json",
+        )
+        self.assertEqual(res.status_code, 200, res.content)
+
+        self.assertEqual(self._names(self.client.get(self.url)), ["Fresh"])
+        self.assertEqual(self._names(self.client.get(their_url)), ["Theirs"])
+
+        # The id comes off the query string, so the counter it names lapses:
+        # a crawler walking ids cannot grow the cache for good. One that is not
+        # an id at all is not one - the host decides, as without it.
+        self.assertEqual(self.client.get("/api/catalog/products/?system=987654").json(), [])
+        key = cache.make_key(generation_key("catalog:product", 987654))
+        self.assertIsNotNone(cache._expire_info[key])
+        self.assertEqual(self.client.get("/api/catalog/products/?system=x").json(), [])
+
+
+    def test_a_card_page_walk_serves_every_row_exactly_once(self):
+        category = a_product_category(self.system)
+        for n in range(4):
+            Product.objects.create(
+                category=category, system=self.system, name=f"Extra {n}",
+                slug=f"extra-{n}", enabled=True,
+            )
+
+        seen, url = [], f"{self.url}&fields=card&limit=2"
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page["results"]), 2)
+            seen += [row["name"] for row in page["results"]]
+            url = page["next"] and f"{self.url}&fields=card&limit=2&cursor={page['next']}"
+
+        self.assertEqual(sorted(seen), ["Extra 0", "Extra 1", "Extra 2", "Extra 3", "Live"])
+        self.assertNotIn("variants", page["results"][0])
+
+        bad = self.client.get(f"{self.url}&cursor=not-a-cursor")
+        self.assertEqual(bad.status_code, 400)
+
+    def test_a_list_is_cached_rendered_and_sent_as_stored(self):
+        import gzip
+
+        from core.rendered import RenderedJSON
+
+        from .serializers import ProductSerializer
+
+        plain = self.client.get(self.url)
+        expected = ProductSerializer(
+            Product.objects.filter(slug="live"), many=True, context={"request": plain.wsgi_request},
+        ).data
+        self.assertEqual(plain.json(), expected)
+
+        entry = cache.get(f"catalog:products:system={self.system.id}")
+        self.assertIsInstance(entry[3], RenderedJSON)
+        self.assertEqual(plain.content, entry[3].body)
+        self.assertEqual(plain["ETag"], entry[3].etag)
+
+        packed = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(packed["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", packed["Vary"])
+        self.assertEqual(gzip.decompress(packed.content), plain.content)
+        # A strong tag per body, since the bytes differ; either revalidates.
+        self.assertEqual(packed["ETag"], plain["ETag"][:-1] + '-gz"')
+        for etag in (plain["ETag"], packed["ETag"]):
+            revalidated = self.client.get(
+                self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag,
+            )
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated["ETag"], etag)
 
 class MenuItemCategoryTests(TestCase):
     """The tenant's own `MenuCategory` is the *only* sectioning a menu has, and
@@ -129,18 +215,19 @@ class MenuItemCategoryTests(TestCase):
         self.drinks = MenuCategory.objects.create(
             system=self.system, name="Bebidas", slug="k-bebidas",
         )
-        self.dish = MenuItem.objects.create(
-            system=self.system, category=self.dishes, name="Taco",
-            slug="k-taco", price=Decimal("8.00"),
-        )
-        self.drink = MenuItem.objects.create(
-            system=self.system, category=self.drinks, name="Michelada",
-            slug="k-michelada", price=Decimal("6.00"),
-        )
-        MenuItem.objects.create(
-            system=self.system, category=self.dishes, name="Flan",
-            slug="k-flan", price=Decimal("4.00"),
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish = MenuItem.objects.create(
+                system=self.system, category=self.dishes, name="Taco",
+                slug="k-taco", price=Decimal("8.00"),
+            )
+            self.drink = MenuItem.objects.create(
+                system=self.system, category=self.drinks, name="Michelada",
+                slug="k-michelada", price=Decimal("6.00"),
+            )
+            MenuItem.objects.create(
+                system=self.system, category=self.dishes, name="Flan",
+                slug="k-flan", price=Decimal("4.00"),
+            )
         self.url = f"/api/catalog/menu-items/?system={self.system.id}"
 
     def _names(self, response):
@@ -186,6 +273,9 @@ class MenuItemCategoryTests(TestCase):
         it does not own, so every read here happens *before* the write - a cold
         cache passes without the signals and fails in production, which is how a
         menu item write left the navbar without a Menu link for an hour.
+
+        The counts are taken once the write commits (`core.counters`), so each
+        write here runs its on-commit callbacks.
         """
         cache.clear()
         filtered = f"{self.url}&category={self.drinks.id}"
@@ -203,32 +293,37 @@ class MenuItemCategoryTests(TestCase):
         self.assertEqual(payload()["menu_item_count"], 3)
 
         # Nothing but `enabled` moves, so no other write path would notice.
-        self.drink.enabled = False
-        self.drink.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drink.enabled = False
+            self.drink.save()
         self.assertEqual(payload()["menu_item_count"], 2)
 
-        self.drink.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drink.delete()
         self.assertEqual(payload()["menu_item_count"], 2)
 
         # Same class of bug, same fix: these drive the Products/Services links,
         # and `branch_count` decides whether Contact renders at all.
         self.assertEqual(payload()["product_count"], 0)
-        Product.objects.create(
-            category=a_product_category(self.system),
-            system=self.system, name="Mug", slug="inv-mug", price=Decimal("9.00"),
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(
+                category=a_product_category(self.system),
+                system=self.system, name="Mug", slug="inv-mug", price=Decimal("9.00"),
+            )
         self.assertEqual(payload()["product_count"], 1)
 
         self.assertEqual(payload()["service_count"], 0)
-        Service.objects.create(
-            category=a_service_category(self.system),
-            system=self.system, name="Catering", slug="inv-catering",
-            price=Decimal("99.00"),
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(
+                category=a_service_category(self.system),
+                system=self.system, name="Catering", slug="inv-catering",
+                price=Decimal("99.00"),
+            )
         self.assertEqual(payload()["service_count"], 1)
 
         self.assertEqual(payload()["branch_count"], 0)
-        Branch.objects.create(system=self.system, name="Centro")
+        with self.captureOnCommitCallbacks(execute=True):
+            Branch.objects.create(system=self.system, name="Centro")
         self.assertEqual(payload()["branch_count"], 1)
 
 
@@ -1422,3 +1517,78 @@ class StockImageCreditTests(TestCase):
         hammer.refresh_from_db()
         self.assertEqual(hammer.attribution, "")
         self.assertEqual(hammer.attribution_url, "")
+
+
+class CatalogSearchTests(TestCase):
+    """The search index behind the lists' ``search=`` and the type-ahead:
+    folded, prefix-matched, ranked, and kept current by the signals."""
+
+    def setUp(self):
+        cache.clear()
+        self.system = System.objects.create(site_name="Cafeteria", host="search.test")
+        self.drinks = MenuCategory.objects.create(
+            system=self.system, name="Bebidas calientes", slug="search-drinks",
+        )
+        self.cafe = MenuItem.objects.create(
+            system=self.system, category=self.drinks, name="Café de olla",
+            en_name="Pot coffee", slug="search-cafe", price=Decimal("35.00"),
+        )
+        self.chocolate = MenuItem.objects.create(
+            system=self.system, category=self.drinks, name="Chocolate",
+            description="Espumoso, con un toque de café.",
+            slug="search-chocolate", price=Decimal("40.00"),
+        )
+        self.hidden = MenuItem.objects.create(
+            system=self.system, category=self.drinks, name="Café frío",
+            slug="search-hidden", price=Decimal("45.00"), enabled=False,
+        )
+        self.host = {"HTTP_X_WEBSITE_HOST": "search.test"}
+
+    def _names(self, q):
+        response = self.client.get(
+            "/api/catalog/search/", {"q": q, "kinds": "menu_item"}, **self.host,
+        )
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.json()["menu_item"]]
+
+    def test_folded_prefix_matches_rank_names_first_and_follow_writes(self):
+        # Unaccented and cut short, it still finds both; the name match ranks
+        # above the one in a description, and the disabled dish stays out.
+        self.assertEqual(self._names("CAF"), ["Café de olla", "Chocolate"])
+        self.assertEqual(self._names("pot cof"), ["Café de olla"])
+        self.assertEqual(self._names("calientes"), ["Café de olla", "Chocolate"])
+        self.assertEqual(self._names("x"), [])
+
+        cinnamon = Ingredient.objects.create(system=self.system, name="Canela", slug="search-canela")
+        MenuItemIngredient.objects.create(menu_item=self.cafe, ingredient=cinnamon)
+        self.assertEqual(self._names("canela"), ["Café de olla"])
+
+        cinnamon.name = "Piloncillo"
+        cinnamon.save()
+        self.drinks.name = "Calientitos"
+        self.drinks.save()
+        self.assertEqual(self._names("canela"), [])
+        self.assertEqual(self._names("pilon"), ["Café de olla"])
+        self.assertEqual(self._names("calientitos"), ["Café de olla", "Chocolate"])
+
+        # The list's own `search=` reads the same index, best match first.
+        listed = self.client.get(
+            "/api/catalog/menu-items/", {"search": "cafe"}, **self.host,
+        )
+        self.assertEqual(listed.status_code, 200)
+        self.assertEqual([row["name"] for row in listed.json()], ["Café de olla", "Chocolate"])
+
+    def test_a_paged_search_is_not_capped_at_the_ranked_results(self):
+        """Only the ranked list stops at `MAX_RESULTS`; a keyset page of the
+        same search walks every match."""
+        from unittest import mock
+
+        url = "/api/catalog/menu-items/?search=cafe&limit=1"
+        seen, next_url = [], url
+        with mock.patch("catalog.search.MAX_RESULTS", 1):
+            self.assertEqual(len(self._names("cafe")), 1)
+            while next_url:
+                page = self.client.get(next_url, **self.host).json()
+                seen += [row["name"] for row in page["results"]]
+                next_url = page["next"] and f"{url}&cursor={page['next']}"
+        self.assertEqual(sorted(seen), ["Café de olla", "Chocolate"])
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from .views import (
+    CatalogSearchView,
     ProductCategoryDetailView,
     ProductCategoryListCreateView,
     ProductDetailView,
@@ -102,6 +103,9 @@ urlpatterns = [
     # six things and the answer has the same shape for all of them.
     path('catalog/recommendations/', RecommendationListView.as_view(), name='catalog-recommendations'),
 
+    # Type-ahead across products, services and menu items (catalog/search.py).
+    path('catalog/search/', CatalogSearchView.as_view(), name='catalog-search'),
+
     # Menu item recipe (internal, admin only)
     path('catalog/menu-items/<int:pk>/recipe/', MenuItemRecipeView.as_view(), name='menu-item-recipe'),
 ]
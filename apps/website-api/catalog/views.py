@@ -1,24 +1,29 @@
 import logging
 
-from django.core.cache import cache
 from django.db.models import ProtectedError
 
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from core.cache import invalidate_pattern as _invalidate_pattern
 from core.permissions import IsSystemAdmin, show_disabled
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from core.models import System
+from core.rendered import RenderedJSON, json_array, rendered_response
 from core.services.llm import LlmNotConfigured
-from core.tenancy import user_system
+from core.tenancy import host_system, user_system
+from .cache import (
+    cached_payload,
+    invalidate_family,
+)
+from .pagination import InvalidPage, keyset_page, page_params, wants_card
 from .recommendations import (
     CATEGORY_RECOMMENDATION_PREFETCH,
     ITEM_SOURCES,
     OWN_RECOMMENDATION_PREFETCH,
     SOURCE_MODELS,
 )
+from .search import KINDS as SEARCH_KINDS, ranked_ids, search_queryset
 from .services.clone import clone_menu_item, clone_product, clone_service
 from .services.ingredient_usage import (
     affected_menu_item_ids,
@@ -31,8 +36,6 @@ from .services.price_lookup import lookup_price
 
 logger = logging.getLogger(__name__)
 
-CACHE_TTL = 300  # 5 minutes
-
 
 def _list_key(prefix, params):
     """Stable cache key for a list endpoint from its query params."""
@@ -55,12 +58,48 @@ def _scoped_list_key(prefix, request, system_id, disabled_visible):
     return _list_key(prefix, params)
 
 
-def _resolve_system(request):
-    """Return the System matching the request host (via X-Website-Host or Host header)."""
-    host = (
-        request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-    ).split(":")[0]
-    return System.objects.filter(host=host, enabled=True).first()
+def public_list_fragment(family, request, system_id, params):
+    """``(cache_key, build)`` for one public list of `family`, keyed as its view keys it.
+
+    `params` are the list's query params, as the storefront would have sent
+    them to the list endpoint (``{"featured": "true"}``). The key is the one
+    `_scoped_list_key` gives that request, so an entry either side warms is
+    served to the other; `family` is also the generation namespace to read it
+    under (`catalog.cache.cached_payload`).
+    """
+    prefix, payload = _PUBLIC_LISTS[family]
+    key = _list_key(prefix, {**params, 'system': system_id})
+
+    def build():
+        return payload(request, params, system_id)
+
+    return key, build
+
+
+#: Rows fetched (and prefetched) per query while a whole list is rendered.
+LIST_CHUNK = 200
+
+
+def _list_payload(qs, serializer_class, request, page):
+    """Render a public catalog list - whole, or one keyset page of it when the
+    caller asked for one (see catalog/pagination.py) - as `RenderedJSON`.
+
+    A whole list is read in chunks and turned into JSON a row at a time
+    (`core.rendered.json_array`), so neither the model instances nor their
+    serialized dicts are all held at once.
+    """
+    def serialize(rows):
+        return serializer_class(rows, many=True, context={'request': request}).data
+
+    if page is None:
+        serializer = serializer_class(context={'request': request})
+        return RenderedJSON(json_array(qs.iterator(chunk_size=LIST_CHUNK), serializer.to_representation))
+    return RenderedJSON.of(keyset_page(qs, *page, serialize))
+
+
+def _empty_list(page):
+    return [] if page is None else {'results': [], 'next': None}
+
 
 from .models import (
     ProductCategory, Product, ProductImage,
@@ -71,12 +110,14 @@ from .models import (
 from .serializers import (
     ProductCategorySerializer,
     ProductCategoryWriteSerializer,
+    ProductCardSerializer,
     ProductSerializer,
     ProductWriteSerializer,
     ProductImageSerializer,
     ProductImageWriteSerializer,
     ServiceCategorySerializer,
     ServiceCategoryWriteSerializer,
+    ServiceCardSerializer,
     ServiceDetailSerializer,
     ServiceSerializer,
     ServiceWriteSerializer,
@@ -84,6 +125,7 @@ from .serializers import (
     ServiceImageWriteSerializer,
     MenuCategorySerializer,
     MenuCategoryWriteSerializer,
+    MenuItemCardSerializer,
     MenuItemSerializer,
     MenuItemWriteSerializer,
     MenuItemImageSerializer,
@@ -106,6 +148,8 @@ class ProductCategoryListCreateView(APIView):
     POST /api/catalog/product-categories/   - create a product category (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -113,8 +157,10 @@ class ProductCategoryListCreateView(APIView):
 
     def get(self, request):
         system_id = request.query_params.get('system')
-        if not system_id:
-            system = _resolve_system(request)
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
             if system is None:
                 return Response([], status=status.HTTP_200_OK)
             system_id = system.id
@@ -122,29 +168,27 @@ class ProductCategoryListCreateView(APIView):
         disabled_visible = show_disabled(request)
         cache_key = _scoped_list_key('catalog:product_categories', request, system_id, disabled_visible)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        def build():
+            qs = ProductCategory.objects.filter(system_id=system_id)
+            if not disabled_visible:
+                qs = qs.filter(enabled=True)
 
-        qs = ProductCategory.objects.filter(system_id=system_id)
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
+            parent_id = request.query_params.get('parent')
+            if parent_id == 'null':
+                qs = qs.filter(parent__isnull=True)
+            elif parent_id:
+                qs = qs.filter(parent_id=parent_id)
 
-        parent_id = request.query_params.get('parent')
-        if parent_id == 'null':
-            qs = qs.filter(parent__isnull=True)
-        elif parent_id:
-            qs = qs.filter(parent_id=parent_id)
+            return ProductCategorySerializer(qs, many=True, context={'request': request}).data
 
-        data = ProductCategorySerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        data = cached_payload(cache_key, 'product_category', build, system_id)
         return Response(data)
 
     def post(self, request):
         serializer = ProductCategoryWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         category = serializer.save()
-        _invalidate_pattern('catalog:product_categories:*')
+        invalidate_family(category.system_id, 'product_category')
         return Response(ProductCategorySerializer(category, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -155,6 +199,8 @@ class ProductCategoryDetailView(APIView):
     DELETE /api/catalog/product-categories/<pk>/  - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -168,14 +214,17 @@ class ProductCategoryDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f'catalog:product_category:{pk}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        category = self._get_object(pk)
-        if category is None:
+
+        def build():
+            category = self._get_object(pk)
+            if category is None:
+                return None
+            data = ProductCategorySerializer(category, context={'request': request}).data
+            return category.system_id, data
+
+        data = cached_payload(cache_key, 'product_category', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        data = ProductCategorySerializer(category, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -185,8 +234,7 @@ class ProductCategoryDetailView(APIView):
         serializer = ProductCategoryWriteSerializer(category, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         category = serializer.save()
-        cache.delete(f'catalog:product_category:{pk}')
-        _invalidate_pattern('catalog:product_categories:*')
+        invalidate_family(category.system_id, 'product_category')
         return Response(ProductCategorySerializer(category, context={'request': request}).data)
 
     def delete(self, request, pk):
@@ -194,11 +242,51 @@ class ProductCategoryDetailView(APIView):
         if category is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         category.delete()
-        cache.delete(f'catalog:product_category:{pk}')
-        _invalidate_pattern('catalog:product_categories:*')
+        invalidate_family(category.system_id, 'product_category')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def product_list_payload(request, params, system_id, *, disabled_visible=False, card=False, page=None):
+    """The product list for `params`, as `ProductListCreateView` builds it.
+
+    Out of the view so the storefront bundle (`core.views.StorefrontView`) can
+    build a list it found missing exactly as the view would have, under the
+    view's own key - see `public_list_fragment`.
+    """
+    qs = Product.objects.filter(system_id=system_id)
+    if card:
+        qs = qs.select_related('category').prefetch_related('images')
+    else:
+        qs = qs.select_related('brand', 'category', 'system').prefetch_related('images', 'variants', 'variants__images')
+    if not disabled_visible:
+        qs = qs.filter(enabled=True)
+
+    category_id = params.get('category')
+    if category_id:
+        qs = qs.filter(category_id=category_id)
+
+    brand_id = params.get('brand')
+    if brand_id:
+        qs = qs.filter(brand_id=brand_id)
+
+    if params.get('featured') == 'true':
+        qs = qs.filter(is_featured=True)
+
+    if params.get('in_stock') == 'true':
+        qs = qs.filter(in_stock=True)
+
+    slug = params.get('slug')
+    if slug:
+        qs = qs.filter(slug=slug)
+
+    search = params.get('search')
+    if search:
+        qs = search_queryset(qs, system_id, 'product', search, ranked=page is None)
+
+    serializer_class = ProductCardSerializer if card else ProductSerializer
+    return _list_payload(qs, serializer_class, request, page)
+
+
 class ProductListCreateView(APIView):
     """
     GET  /api/catalog/products/   - list products (public).
@@ -210,66 +298,54 @@ class ProductListCreateView(APIView):
       brand     - filter by brand pk
       featured  - 'true' to show only featured products
       in_stock  - 'true' to show only in-stock products
-      search    - text search on name
+      search    - full-text search (catalog/search.py): names, descriptions,
+                  category and ingredients, every word a prefix; ranked
+                  best first unless paginated
       include_disabled - 'true' to also return disabled products (system admins
                   only; ignored for everyone else)
+      fields    - 'card' for the compact grid row
+      limit, cursor - keyset pagination (see catalog/pagination.py)
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
         return [IsSystemAdmin()]
 
     def get(self, request):
+        try:
+            page = page_params(request)
+        except InvalidPage as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        card = wants_card(request)
+
         system_id = request.query_params.get('system')
-        if not system_id:
-            system = _resolve_system(request)
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
             if system is None:
-                return Response([], status=status.HTTP_200_OK)
+                return Response(_empty_list(page), status=status.HTTP_200_OK)
             system_id = system.id
 
         disabled_visible = show_disabled(request)
         cache_key = _scoped_list_key('catalog:products', request, system_id, disabled_visible)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-
-        qs = Product.objects.filter(system_id=system_id).select_related('brand', 'category', 'system').prefetch_related('images', 'variants', 'variants__images')
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-
-        category_id = request.query_params.get('category')
-        if category_id:
-            qs = qs.filter(category_id=category_id)
-
-        brand_id = request.query_params.get('brand')
-        if brand_id:
-            qs = qs.filter(brand_id=brand_id)
-
-        if request.query_params.get('featured') == 'true':
-            qs = qs.filter(is_featured=True)
-
-        if request.query_params.get('in_stock') == 'true':
-            qs = qs.filter(in_stock=True)
-
-        slug = request.query_params.get('slug')
-        if slug:
-            qs = qs.filter(slug=slug)
-
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(name__icontains=search)
+        def build():
+            return product_list_payload(
+                request, request.query_params, system_id,
+                disabled_visible=disabled_visible, card=card, page=page,
+            )
 
-        data = ProductSerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
-        return Response(data)
+        return rendered_response(request, cached_payload(cache_key, 'product', build, system_id))
 
     def post(self, request):
         serializer = ProductWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         product = serializer.create(serializer.validated_data)
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(product.system_id, 'product')
         return Response(ProductSerializer(product, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -280,6 +356,8 @@ class ProductDetailView(APIView):
     DELETE /api/catalog/products/<pk>/  - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -293,14 +371,17 @@ class ProductDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f'catalog:product:{pk}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        product = self._get_object(pk)
-        if product is None:
+
+        def build():
+            product = self._get_object(pk)
+            if product is None:
+                return None
+            data = ProductSerializer(product, context={'request': request}).data
+            return product.system_id, data
+
+        data = cached_payload(cache_key, 'product', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        data = ProductSerializer(product, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -310,12 +391,10 @@ class ProductDetailView(APIView):
         serializer = ProductWriteSerializer(product, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         product = serializer.update(product, serializer.validated_data)
-        cache.delete(f'catalog:product:{pk}')
         # Variants are symmetrical, so editing this product's variant list also
         # changes what its siblings serialize - clear every product detail key,
         # not just this one's.
-        _invalidate_pattern('catalog:product:*')
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(product.system_id, 'product')
         return Response(ProductSerializer(product, context={'request': request}).data)
 
     def delete(self, request, pk):
@@ -323,10 +402,8 @@ class ProductDetailView(APIView):
         if product is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         product.delete()
-        cache.delete(f'catalog:product:{pk}')
         # Deleting a product also drops it from its siblings' variant lists.
-        _invalidate_pattern('catalog:product:*')
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(product.system_id, 'product')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -361,8 +438,7 @@ class ProductImageListCreateView(APIView):
         serializer = ProductImageWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         image = serializer.save(product)
-        cache.delete(f'catalog:product:{pk}')
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(product.system_id, 'product')
         return Response(ProductImageSerializer(image, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -376,7 +452,7 @@ class ProductImageDetailView(APIView):
 
     def _get_image(self, pk, img_pk):
         try:
-            return ProductImage.objects.get(pk=img_pk, product_id=pk)
+            return ProductImage.objects.select_related('product').get(pk=img_pk, product_id=pk)
         except ProductImage.DoesNotExist:
             return None
 
@@ -391,8 +467,7 @@ class ProductImageDetailView(APIView):
         if sort_order is not None:
             image.sort_order = sort_order
         image.save(update_fields=[f for f in ['name', 'sort_order'] if f in request.data])
-        cache.delete(f'catalog:product:{pk}')
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(image.product.system_id, 'product')
         return Response(ProductImageSerializer(image, context={'request': request}).data)
 
     def delete(self, request, pk, img_pk):
@@ -400,8 +475,7 @@ class ProductImageDetailView(APIView):
         if image is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         image.delete()
-        cache.delete(f'catalog:product:{pk}')
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(image.product.system_id, 'product')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -411,6 +485,8 @@ class ServiceCategoryListCreateView(APIView):
     POST /api/catalog/service-categories/   - create a service category (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -418,8 +494,10 @@ class ServiceCategoryListCreateView(APIView):
 
     def get(self, request):
         system_id = request.query_params.get('system')
-        if not system_id:
-            system = _resolve_system(request)
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
             if system is None:
                 return Response([], status=status.HTTP_200_OK)
             system_id = system.id
@@ -427,29 +505,27 @@ class ServiceCategoryListCreateView(APIView):
         disabled_visible = show_disabled(request)
         cache_key = _scoped_list_key('catalog:service_categories', request, system_id, disabled_visible)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        def build():
+            qs = ServiceCategory.objects.filter(system_id=system_id)
+            if not disabled_visible:
+                qs = qs.filter(enabled=True)
 
-        qs = ServiceCategory.objects.filter(system_id=system_id)
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
+            parent_id = request.query_params.get('parent')
+            if parent_id == 'null':
+                qs = qs.filter(parent__isnull=True)
+            elif parent_id:
+                qs = qs.filter(parent_id=parent_id)
 
-        parent_id = request.query_params.get('parent')
-        if parent_id == 'null':
-            qs = qs.filter(parent__isnull=True)
-        elif parent_id:
-            qs = qs.filter(parent_id=parent_id)
+            return ServiceCategorySerializer(qs, many=True, context={'request': request}).data
 
-        data = ServiceCategorySerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        data = cached_payload(cache_key, 'service_category', build, system_id)
         return Response(data)
 
     def post(self, request):
         serializer = ServiceCategoryWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         category = serializer.save()
-        _invalidate_pattern('catalog:service_categories:*')
+        invalidate_family(category.system_id, 'service_category')
         return Response(ServiceCategorySerializer(category, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -460,6 +536,8 @@ class ServiceCategoryDetailView(APIView):
     DELETE /api/catalog/service-categories/<pk>/  - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -473,14 +551,17 @@ class ServiceCategoryDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f'catalog:service_category:{pk}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        category = self._get_object(pk)
-        if category is None:
+
+        def build():
+            category = self._get_object(pk)
+            if category is None:
+                return None
+            data = ServiceCategorySerializer(category, context={'request': request}).data
+            return category.system_id, data
+
+        data = cached_payload(cache_key, 'service_category', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        data = ServiceCategorySerializer(category, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -490,8 +571,7 @@ class ServiceCategoryDetailView(APIView):
         serializer = ServiceCategoryWriteSerializer(category, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         category = serializer.save()
-        cache.delete(f'catalog:service_category:{pk}')
-        _invalidate_pattern('catalog:service_categories:*')
+        invalidate_family(category.system_id, 'service_category')
         return Response(ServiceCategorySerializer(category, context={'request': request}).data)
 
     def delete(self, request, pk):
@@ -499,11 +579,63 @@ class ServiceCategoryDetailView(APIView):
         if category is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         category.delete()
-        cache.delete(f'catalog:service_category:{pk}')
-        _invalidate_pattern('catalog:service_categories:*')
+        invalidate_family(category.system_id, 'service_category')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def service_list_payload(request, params, system_id, *, disabled_visible=False, card=False, page=None):
+    """The service list for `params`, as `ServiceListCreateView` builds it.
+
+    See `product_list_payload`.
+    """
+    qs = Service.objects.filter(system_id=system_id)
+    if card:
+        qs = qs.select_related('category').prefetch_related('images')
+    else:
+        qs = qs.select_related('brand', 'category', 'system').prefetch_related('images', 'variants', 'variants__images')
+    if not disabled_visible:
+        qs = qs.filter(enabled=True)
+
+    category_id = params.get('category')
+    if category_id:
+        qs = qs.filter(category_id=category_id)
+
+    brand_id = params.get('brand')
+    if brand_id:
+        qs = qs.filter(brand_id=brand_id)
+
+    if params.get('featured') == 'true':
+        qs = qs.filter(is_featured=True)
+
+    modality = params.get('modality')
+    if modality:
+        qs = qs.filter(modality=modality)
+
+    # ⚠ A `slug` filter is the storefront's *detail* read, not a list: it is
+    # what `getService(slug)` in the website's `lib/catalog.ts` calls, and it
+    # matches at most one row. So it gets the detail serializer - the party
+    # bounds and `booking_party_limit` live only there, and served with the
+    # list serializer the booking page's counter reads `undefined` bounds,
+    # never renders, and prices a party of `NaN`. The N+1 the split exists to
+    # avoid needs a grid; one row can afford the walk over pools and
+    # resources, which is why the prefetch rides along with it.
+    slug = params.get('slug')
+    if slug:
+        qs = qs.filter(slug=slug)
+        if not card:
+            qs = qs.prefetch_related('booking_pools__resources')
+
+    search = params.get('search')
+    if search:
+        qs = search_queryset(qs, system_id, 'service', search, ranked=page is None)
+
+    if card:
+        serializer_class = ServiceCardSerializer
+    else:
+        serializer_class = ServiceDetailSerializer if slug else ServiceSerializer
+    return _list_payload(qs, serializer_class, request, page)
+
+
 class ServiceListCreateView(APIView):
     """
     GET  /api/catalog/services/   - list services (public).
@@ -515,76 +647,54 @@ class ServiceListCreateView(APIView):
       brand     - filter by brand pk
       featured  - 'true' to show only featured services
       modality  - filter by modality (online/in_person/hybrid)
-      search    - text search on name
+      search    - full-text search (catalog/search.py): names, descriptions,
+                  category and ingredients, every word a prefix; ranked
+                  best first unless paginated
       include_disabled - 'true' to also return disabled services (system admins
                   only; ignored for everyone else)
+      fields    - 'card' for the compact grid row
+      limit, cursor - keyset pagination (see catalog/pagination.py)
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
         return [IsSystemAdmin()]
 
     def get(self, request):
+        try:
+            page = page_params(request)
+        except InvalidPage as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        card = wants_card(request)
+
         system_id = request.query_params.get('system')
-        if not system_id:
-            system = _resolve_system(request)
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
             if system is None:
-                return Response([], status=status.HTTP_200_OK)
+                return Response(_empty_list(page), status=status.HTTP_200_OK)
             system_id = system.id
 
         disabled_visible = show_disabled(request)
         cache_key = _scoped_list_key('catalog:services', request, system_id, disabled_visible)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-
-        qs = Service.objects.filter(system_id=system_id).select_related('brand', 'category', 'system').prefetch_related('images', 'variants', 'variants__images')
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-
-        category_id = request.query_params.get('category')
-        if category_id:
-            qs = qs.filter(category_id=category_id)
-
-        brand_id = request.query_params.get('brand')
-        if brand_id:
-            qs = qs.filter(brand_id=brand_id)
-
-        if request.query_params.get('featured') == 'true':
-            qs = qs.filter(is_featured=True)
-
-        modality = request.query_params.get('modality')
-        if modality:
-            qs = qs.filter(modality=modality)
-
-        # ⚠ A `slug` filter is the storefront's *detail* read, not a list: it is
-        # what `getService(slug)` in the website's `lib/catalog.ts` calls, and it
-        # matches at most one row. So it gets the detail serializer - the party
-        # bounds and `booking_party_limit` live only there, and served with the
-        # list serializer the booking page's counter reads `undefined` bounds,
-        # never renders, and prices a party of `NaN`. The N+1 the split exists to
-        # avoid needs a grid; one row can afford the walk over pools and
-        # resources, which is why the prefetch rides along with it.
-        slug = request.query_params.get('slug')
-        if slug:
-            qs = qs.filter(slug=slug).prefetch_related('booking_pools__resources')
-
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(name__icontains=search)
+        def build():
+            return service_list_payload(
+                request, request.query_params, system_id,
+                disabled_visible=disabled_visible, card=card, page=page,
+            )
 
-        serializer_class = ServiceDetailSerializer if slug else ServiceSerializer
-        data = serializer_class(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
-        return Response(data)
+        return rendered_response(request, cached_payload(cache_key, 'service', build, system_id))
 
     def post(self, request):
         serializer = ServiceWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         service = serializer.create(serializer.validated_data)
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(service.system_id, 'service')
         return Response(ServiceSerializer(service, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -595,6 +705,8 @@ class ServiceDetailView(APIView):
     DELETE /api/catalog/services/<pk>/  - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -610,16 +722,19 @@ class ServiceDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f'catalog:service:{pk}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        service = self._get_object(pk)
-        if service is None:
+
+        def build():
+            service = self._get_object(pk)
+            if service is None:
+                return None
+            # The detail serializer, not the list one: this is the single-row screen
+            # that can afford `booking_party_limit`'s walk over pools and resources.
+            data = ServiceDetailSerializer(service, context={'request': request}).data
+            return service.system_id, data
+
+        data = cached_payload(cache_key, 'service', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        # The detail serializer, not the list one: this is the single-row screen
-        # that can afford `booking_party_limit`'s walk over pools and resources.
-        data = ServiceDetailSerializer(service, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -629,12 +744,10 @@ class ServiceDetailView(APIView):
         serializer = ServiceWriteSerializer(service, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         service = serializer.update(service, serializer.validated_data)
-        cache.delete(f'catalog:service:{pk}')
         # Variants are symmetrical, so editing this service's variant list also
         # changes what its siblings serialize - clear every service detail key,
         # not just this one's.
-        _invalidate_pattern('catalog:service:*')
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(service.system_id, 'service')
         # The CMS editor reloads from this response, so it has to carry the same
         # booking fields the GET does - the party bounds and the pool ids.
         return Response(ServiceDetailSerializer(service, context={'request': request}).data)
@@ -644,10 +757,8 @@ class ServiceDetailView(APIView):
         if service is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         service.delete()
-        cache.delete(f'catalog:service:{pk}')
         # Deleting a service also drops it from its siblings' variant lists.
-        _invalidate_pattern('catalog:service:*')
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(service.system_id, 'service')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -682,8 +793,7 @@ class ServiceImageListCreateView(APIView):
         serializer = ServiceImageWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         image = serializer.save(service)
-        cache.delete(f'catalog:service:{pk}')
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(service.system_id, 'service')
         return Response(ServiceImageSerializer(image, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -697,7 +807,7 @@ class ServiceImageDetailView(APIView):
 
     def _get_image(self, pk, img_pk):
         try:
-            return ServiceImage.objects.get(pk=img_pk, service_id=pk)
+            return ServiceImage.objects.select_related('service').get(pk=img_pk, service_id=pk)
         except ServiceImage.DoesNotExist:
             return None
 
@@ -712,8 +822,7 @@ class ServiceImageDetailView(APIView):
         if sort_order is not None:
             image.sort_order = sort_order
         image.save(update_fields=[f for f in ['name', 'sort_order'] if f in request.data])
-        cache.delete(f'catalog:service:{pk}')
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(image.service.system_id, 'service')
         return Response(ServiceImageSerializer(image, context={'request': request}).data)
 
     def delete(self, request, pk, img_pk):
@@ -721,8 +830,7 @@ class ServiceImageDetailView(APIView):
         if image is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         image.delete()
-        cache.delete(f'catalog:service:{pk}')
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(image.service.system_id, 'service')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -736,6 +844,8 @@ class MenuCategoryListCreateView(APIView):
     POST /api/catalog/menu-categories/   - create a menu category (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -743,8 +853,10 @@ class MenuCategoryListCreateView(APIView):
 
     def get(self, request):
         system_id = request.query_params.get('system')
-        if not system_id:
-            system = _resolve_system(request)
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
             if system is None:
                 return Response([], status=status.HTTP_200_OK)
             system_id = system.id
@@ -752,29 +864,27 @@ class MenuCategoryListCreateView(APIView):
         disabled_visible = show_disabled(request)
         cache_key = _scoped_list_key('catalog:menu_categories', request, system_id, disabled_visible)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        def build():
+            qs = MenuCategory.objects.filter(system_id=system_id)
+            if not disabled_visible:
+                qs = qs.filter(enabled=True)
 
-        qs = MenuCategory.objects.filter(system_id=system_id)
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
+            parent_id = request.query_params.get('parent')
+            if parent_id == 'null':
+                qs = qs.filter(parent__isnull=True)
+            elif parent_id:
+                qs = qs.filter(parent_id=parent_id)
 
-        parent_id = request.query_params.get('parent')
-        if parent_id == 'null':
-            qs = qs.filter(parent__isnull=True)
-        elif parent_id:
-            qs = qs.filter(parent_id=parent_id)
+            return MenuCategorySerializer(qs, many=True, context={'request': request}).data
 
-        data = MenuCategorySerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        data = cached_payload(cache_key, 'menu_category', build, system_id)
         return Response(data)
 
     def post(self, request):
         serializer = MenuCategoryWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         category = serializer.save()
-        _invalidate_pattern('catalog:menu_categories:*')
+        invalidate_family(category.system_id, 'menu_category')
         return Response(MenuCategorySerializer(category, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -785,6 +895,8 @@ class MenuCategoryDetailView(APIView):
     DELETE /api/catalog/menu-categories/<pk>/  - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -798,14 +910,17 @@ class MenuCategoryDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f'catalog:menu_category:{pk}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        category = self._get_object(pk)
-        if category is None:
+
+        def build():
+            category = self._get_object(pk)
+            if category is None:
+                return None
+            data = MenuCategorySerializer(category, context={'request': request}).data
+            return category.system_id, data
+
+        data = cached_payload(cache_key, 'menu_category', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        data = MenuCategorySerializer(category, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -815,8 +930,7 @@ class MenuCategoryDetailView(APIView):
         serializer = MenuCategoryWriteSerializer(category, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         category = serializer.save()
-        cache.delete(f'catalog:menu_category:{pk}')
-        _invalidate_pattern('catalog:menu_categories:*')
+        invalidate_family(category.system_id, 'menu_category')
         return Response(MenuCategorySerializer(category, context={'request': request}).data)
 
     def delete(self, request, pk):
@@ -824,8 +938,7 @@ class MenuCategoryDetailView(APIView):
         if category is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         category.delete()
-        cache.delete(f'catalog:menu_category:{pk}')
-        _invalidate_pattern('catalog:menu_categories:*')
+        invalidate_family(category.system_id, 'menu_category')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -839,6 +952,8 @@ class IngredientListCreateView(APIView):
     POST /api/catalog/ingredients/   - create an ingredient (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -846,8 +961,10 @@ class IngredientListCreateView(APIView):
 
     def get(self, request):
         system_id = request.query_params.get('system')
-        if not system_id:
-            system = _resolve_system(request)
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
             if system is None:
                 return Response([], status=status.HTTP_200_OK)
             system_id = system.id
@@ -855,27 +972,25 @@ class IngredientListCreateView(APIView):
         disabled_visible = show_disabled(request)
         cache_key = _scoped_list_key('catalog:ingredients', request, system_id, disabled_visible)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        def build():
+            qs = Ingredient.objects.filter(system_id=system_id)
+            if not disabled_visible:
+                qs = qs.filter(enabled=True)
 
-        qs = Ingredient.objects.filter(system_id=system_id)
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
+            search = request.query_params.get('search')
+            if search:
+                qs = qs.filter(name__icontains=search)
 
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(name__icontains=search)
+            return IngredientSerializer(qs, many=True, context={'request': request}).data
 
-        data = IngredientSerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        data = cached_payload(cache_key, 'ingredient', build, system_id)
         return Response(data)
 
     def post(self, request):
         serializer = IngredientWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         ingredient = serializer.save()
-        _invalidate_pattern('catalog:ingredients:*')
+        invalidate_family(ingredient.system_id, 'ingredient')
         return Response(IngredientSerializer(ingredient, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -886,6 +1001,8 @@ class IngredientDetailView(APIView):
     DELETE /api/catalog/ingredients/<pk>/  - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -899,14 +1016,17 @@ class IngredientDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f'catalog:ingredient:{pk}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        ingredient = self._get_object(pk)
-        if ingredient is None:
+
+        def build():
+            ingredient = self._get_object(pk)
+            if ingredient is None:
+                return None
+            data = IngredientSerializer(ingredient, context={'request': request}).data
+            return ingredient.system_id, data
+
+        data = cached_payload(cache_key, 'ingredient', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        data = IngredientSerializer(ingredient, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -916,11 +1036,10 @@ class IngredientDetailView(APIView):
         serializer = IngredientWriteSerializer(ingredient, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         ingredient = serializer.save()
-        cache.delete(f'catalog:ingredient:{pk}')
-        _invalidate_pattern('catalog:ingredients:*')
         # A menu item embeds its ingredients' name/nutrition, so an edit here must
-        # invalidate the menu caches that referenced this ingredient.
-        _invalidate_pattern('catalog:menu_item*')
+        # invalidate the menu caches that referenced this ingredient - the dish
+        # family's generation also covers each dish's ingredient sub-list.
+        invalidate_family(ingredient.system_id, 'ingredient', 'menu_item')
         return Response(IngredientSerializer(ingredient, context={'request': request}).data)
 
     def delete(self, request, pk):
@@ -964,13 +1083,9 @@ class IngredientDetailView(APIView):
                 status=status.HTTP_409_CONFLICT,
             )
 
-        cache.delete(f'catalog:ingredient:{pk}')
-        _invalidate_pattern('catalog:ingredients:*')
-        for menu_item_id in menu_item_ids:
-            _invalidate_pattern(f'catalog:menu_item_ingredients:{menu_item_id}:*')
-            cache.delete(f'catalog:menu_item:{menu_item_id}')
+        invalidate_family(ingredient.system_id, 'ingredient')
         if menu_item_ids:
-            _invalidate_pattern('catalog:menu_items:*')
+            invalidate_family(ingredient.system_id, 'menu_item')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1073,6 +1188,61 @@ class IngredientPriceLookupView(APIView):
 # Menu item views
 # ---------------------------------------------------------------------------
 
+def menu_item_list_payload(request, params, system_id, *, disabled_visible=False, card=False, page=None):
+    """The menu item list for `params`, as `MenuItemListCreateView` builds it.
+
+    See `product_list_payload`.
+    """
+    qs = MenuItem.objects.filter(system_id=system_id)
+    if card:
+        qs = qs.select_related('category').prefetch_related('images')
+    else:
+        qs = qs.select_related('brand', 'category', 'system').prefetch_related('images', 'ingredients__ingredient', 'ingredients__options__ingredient', 'own_sizes', 'category__sizes', 'variants', 'variants__images')
+    if not disabled_visible:
+        qs = qs.filter(enabled=True)
+
+    category_id = params.get('category')
+    if category_id:
+        qs = qs.filter(category_id=category_id)
+
+    brand_id = params.get('brand')
+    if brand_id:
+        qs = qs.filter(brand_id=brand_id)
+
+    if params.get('featured') == 'true':
+        qs = qs.filter(is_featured=True)
+
+    if params.get('available') == 'true':
+        qs = qs.filter(is_available=True)
+
+    dietary = params.get('dietary')
+    if dietary == 'vegetarian':
+        qs = qs.filter(is_vegetarian=True)
+    elif dietary == 'vegan':
+        qs = qs.filter(is_vegan=True)
+    elif dietary == 'gluten_free':
+        qs = qs.filter(is_gluten_free=True)
+
+    slug = params.get('slug')
+    if slug:
+        qs = qs.filter(slug=slug)
+
+    search = params.get('search')
+    if search:
+        qs = search_queryset(qs, system_id, 'menu_item', search, ranked=page is None)
+
+    serializer_class = MenuItemCardSerializer if card else MenuItemSerializer
+    return _list_payload(qs, serializer_class, request, page)
+
+
+# The lists `public_list_fragment` can build, per family.
+_PUBLIC_LISTS = {
+    'product': ('catalog:products', product_list_payload),
+    'service': ('catalog:services', service_list_payload),
+    'menu_item': ('catalog:menu_items', menu_item_list_payload),
+}
+
+
 class MenuItemListCreateView(APIView):
     """
     GET  /api/catalog/menu-items/   - list menu items (public).
@@ -1085,73 +1255,53 @@ class MenuItemListCreateView(APIView):
       featured  - 'true' to show only featured items
       available - 'true' to show only orderable items
       dietary   - one of 'vegetarian' | 'vegan' | 'gluten_free'
-      search    - text search on name
+      search    - full-text search (catalog/search.py): names, descriptions,
+                  category and ingredients, every word a prefix; ranked
+                  best first unless paginated
       include_disabled - 'true' to also return disabled items (system admins only)
+      fields    - 'card' for the compact grid row
+      limit, cursor - keyset pagination (see catalog/pagination.py)
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
         return [IsSystemAdmin()]
 
     def get(self, request):
+        try:
+            page = page_params(request)
+        except InvalidPage as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        card = wants_card(request)
+
         system_id = request.query_params.get('system')
-        if not system_id:
-            system = _resolve_system(request)
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
             if system is None:
-                return Response([], status=status.HTTP_200_OK)
+                return Response(_empty_list(page), status=status.HTTP_200_OK)
             system_id = system.id
 
         disabled_visible = show_disabled(request)
         cache_key = _scoped_list_key('catalog:menu_items', request, system_id, disabled_visible)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-
-        qs = MenuItem.objects.filter(system_id=system_id).select_related('brand', 'category', 'system').prefetch_related('images', 'ingredients__ingredient', 'ingredients__options__ingredient', 'own_sizes', 'category__sizes', 'variants', 'variants__images')
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-
-        category_id = request.query_params.get('category')
-        if category_id:
-            qs = qs.filter(category_id=category_id)
-
-        brand_id = request.query_params.get('brand')
-        if brand_id:
-            qs = qs.filter(brand_id=brand_id)
-
-        if request.query_params.get('featured') == 'true':
-            qs = qs.filter(is_featured=True)
-
-        if request.query_params.get('available') == 'true':
-            qs = qs.filter(is_available=True)
-
-        dietary = request.query_params.get('dietary')
-        if dietary == 'vegetarian':
-            qs = qs.filter(is_vegetarian=True)
-        elif dietary == 'vegan':
-            qs = qs.filter(is_vegan=True)
-        elif dietary == 'gluten_free':
-            qs = qs.filter(is_gluten_free=True)
-
-        slug = request.query_params.get('slug')
-        if slug:
-            qs = qs.filter(slug=slug)
-
-        search = request.query_params.get('search')
-        if search:
-            qs = qs.filter(name__icontains=search)
+        def build():
+            return menu_item_list_payload(
+                request, request.query_params, system_id,
+                disabled_visible=disabled_visible, card=card, page=page,
+            )
 
-        data = MenuItemSerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
-        return Response(data)
+        return rendered_response(request, cached_payload(cache_key, 'menu_item', build, system_id))
 
     def post(self, request):
         serializer = MenuItemWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         menu_item = serializer.create(serializer.validated_data)
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(menu_item.system_id, 'menu_item')
         return Response(MenuItemSerializer(menu_item, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -1162,6 +1312,8 @@ class MenuItemDetailView(APIView):
     DELETE /api/catalog/menu-items/<pk>/  - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -1175,14 +1327,17 @@ class MenuItemDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f'catalog:menu_item:{pk}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        menu_item = self._get_object(pk)
-        if menu_item is None:
+
+        def build():
+            menu_item = self._get_object(pk)
+            if menu_item is None:
+                return None
+            data = MenuItemSerializer(menu_item, context={'request': request}).data
+            return menu_item.system_id, data
+
+        data = cached_payload(cache_key, 'menu_item', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        data = MenuItemSerializer(menu_item, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -1192,12 +1347,10 @@ class MenuItemDetailView(APIView):
         serializer = MenuItemWriteSerializer(menu_item, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         menu_item = serializer.update(menu_item, serializer.validated_data)
-        cache.delete(f'catalog:menu_item:{pk}')
         # Variants are symmetrical, so editing this item's variant list also
         # changes what its siblings serialize - clear every menu-item detail key,
         # not just this one's.
-        _invalidate_pattern('catalog:menu_item:*')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(menu_item.system_id, 'menu_item')
         return Response(MenuItemSerializer(menu_item, context={'request': request}).data)
 
     def delete(self, request, pk):
@@ -1205,12 +1358,8 @@ class MenuItemDetailView(APIView):
         if menu_item is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         menu_item.delete()
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern(f'catalog:menu_item_ingredients:{pk}:*')
-        cache.delete(f'catalog:menu_item_recipe:{pk}')
         # Deleting an item also drops it from its siblings' variant lists.
-        _invalidate_pattern('catalog:menu_item:*')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(menu_item.system_id, 'menu_item')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1245,8 +1394,7 @@ class MenuItemImageListCreateView(APIView):
         serializer = MenuItemImageWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         image = serializer.save(menu_item)
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(menu_item.system_id, 'menu_item')
         return Response(MenuItemImageSerializer(image, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -1260,7 +1408,7 @@ class MenuItemImageDetailView(APIView):
 
     def _get_image(self, pk, img_pk):
         try:
-            return MenuItemImage.objects.get(pk=img_pk, menu_item_id=pk)
+            return MenuItemImage.objects.select_related('menu_item').get(pk=img_pk, menu_item_id=pk)
         except MenuItemImage.DoesNotExist:
             return None
 
@@ -1273,8 +1421,7 @@ class MenuItemImageDetailView(APIView):
         if 'sort_order' in request.data:
             image.sort_order = request.data['sort_order']
         image.save(update_fields=[f for f in ['name', 'sort_order'] if f in request.data])
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(image.menu_item.system_id, 'menu_item')
         return Response(MenuItemImageSerializer(image, context={'request': request}).data)
 
     def delete(self, request, pk, img_pk):
@@ -1282,8 +1429,7 @@ class MenuItemImageDetailView(APIView):
         if image is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         image.delete()
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(image.menu_item.system_id, 'menu_item')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1297,6 +1443,8 @@ class MenuItemIngredientListCreateView(APIView):
     POST /api/catalog/menu-items/<pk>/ingredients/  - create an ingredient (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [AllowAny()]
@@ -1315,16 +1463,19 @@ class MenuItemIngredientListCreateView(APIView):
         # to the public.
         disabled_visible = show_disabled(request)
         cache_key = f'catalog:menu_item_ingredients:{pk}:{int(disabled_visible)}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        menu_item = self._get_item(pk)
-        if menu_item is None:
+
+        def build():
+            menu_item = self._get_item(pk)
+            if menu_item is None:
+                return None
+            qs = menu_item.ingredients.all() if disabled_visible else menu_item.ingredients.filter(enabled=True)
+            qs = qs.prefetch_related('options__ingredient')
+            data = MenuItemIngredientSerializer(qs, many=True, context={'request': request}).data
+            return menu_item.system_id, data
+
+        data = cached_payload(cache_key, 'menu_item', build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        qs = menu_item.ingredients.all() if disabled_visible else menu_item.ingredients.filter(enabled=True)
-        qs = qs.prefetch_related('options__ingredient')
-        data = MenuItemIngredientSerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def post(self, request, pk):
@@ -1334,9 +1485,7 @@ class MenuItemIngredientListCreateView(APIView):
         serializer = MenuItemIngredientWriteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         ingredient = serializer.create(serializer.validated_data, menu_item=menu_item)
-        _invalidate_pattern(f'catalog:menu_item_ingredients:{pk}:*')
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(menu_item.system_id, 'menu_item')
         return Response(MenuItemIngredientSerializer(ingredient, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -1354,7 +1503,7 @@ class MenuItemIngredientDetailView(APIView):
 
     def _get_object(self, pk, ing_pk):
         try:
-            return MenuItemIngredient.objects.get(pk=ing_pk, menu_item_id=pk)
+            return MenuItemIngredient.objects.select_related('menu_item').get(pk=ing_pk, menu_item_id=pk)
         except MenuItemIngredient.DoesNotExist:
             return None
 
@@ -1371,9 +1520,7 @@ class MenuItemIngredientDetailView(APIView):
         serializer = MenuItemIngredientWriteSerializer(ingredient, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         ingredient = serializer.update(ingredient, serializer.validated_data)
-        _invalidate_pattern(f'catalog:menu_item_ingredients:{pk}:*')
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(ingredient.menu_item.system_id, 'menu_item')
         return Response(MenuItemIngredientSerializer(ingredient, context={'request': request}).data)
 
     def delete(self, request, pk, ing_pk):
@@ -1381,9 +1528,7 @@ class MenuItemIngredientDetailView(APIView):
         if ingredient is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
         ingredient.delete()
-        _invalidate_pattern(f'catalog:menu_item_ingredients:{pk}:*')
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(ingredient.menu_item.system_id, 'menu_item')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1405,9 +1550,14 @@ class MenuItemIngredientDetailView(APIView):
 class _BaseMenuSizeListCreateView(APIView):
     """GET lists an owner's sizes (public); POST creates one (admin only)."""
 
+    conditional_get = True
+
     owner_model = None
     owner_field = None
     cache_prefix = None
+    # The generation the sub-list is stamped under - its owner's family, so the
+    # same bump that drops the owner's payload drops its sizes too.
+    cache_family = None
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -1423,17 +1573,20 @@ class _BaseMenuSizeListCreateView(APIView):
         # response is never replayed to the public.
         disabled_visible = show_disabled(request)
         cache_key = f'{self.cache_prefix}:{pk}:{int(disabled_visible)}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        owner = self._get_owner(pk)
-        if owner is None:
+
+        def build():
+            owner = self._get_owner(pk)
+            if owner is None:
+                return None
+            qs = MenuSize.objects.filter(**{self.owner_field: owner})
+            if not disabled_visible:
+                qs = qs.filter(enabled=True)
+            data = MenuSizeSerializer(qs, many=True, context={'request': request}).data
+            return owner.system_id, data
+
+        data = cached_payload(cache_key, self.cache_family, build)
+        if data is None:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        qs = MenuSize.objects.filter(**{self.owner_field: owner})
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-        data = MenuSizeSerializer(qs, many=True, context={'request': request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def post(self, request, pk):
@@ -1497,6 +1650,7 @@ class MenuCategorySizeListCreateView(_BaseMenuSizeListCreateView):
     owner_model = MenuCategory
     owner_field = 'category'
     cache_prefix = 'catalog:menu_category_sizes'
+    cache_family = 'menu_category'
 
 
 class MenuCategorySizeDetailView(_BaseMenuSizeDetailView):
@@ -1522,6 +1676,7 @@ class MenuItemSizeListCreateView(_BaseMenuSizeListCreateView):
     owner_model = MenuItem
     owner_field = 'menu_item'
     cache_prefix = 'catalog:menu_item_sizes'
+    cache_family = 'menu_item'
 
 
 class MenuItemSizeDetailView(_BaseMenuSizeDetailView):
@@ -1567,8 +1722,7 @@ class MenuItemRecipeView(APIView):
         serializer = MenuItemRecipeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save(menu_item)
-        cache.delete(f'catalog:menu_item:{pk}')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(menu_item.system_id, 'menu_item')
         menu_item = self._get_item(pk)
         return Response(MenuItemRecipeSerializer(menu_item, context={'request': request}).data)
 
@@ -1634,7 +1788,7 @@ class ProductCloneView(_BaseCloneView):
     read_serializer = ProductSerializer
 
     def _invalidate(self, clone):
-        _invalidate_pattern('catalog:products:*')
+        invalidate_family(clone.system_id, 'product')
 
 
 class ServiceCloneView(_BaseCloneView):
@@ -1645,7 +1799,7 @@ class ServiceCloneView(_BaseCloneView):
     read_serializer = ServiceSerializer
 
     def _invalidate(self, clone):
-        _invalidate_pattern('catalog:services:*')
+        invalidate_family(clone.system_id, 'service')
 
 
 class MenuItemCloneView(_BaseCloneView):
@@ -1659,8 +1813,7 @@ class MenuItemCloneView(_BaseCloneView):
         # The clone joins the original's sibling family, and `variants` is
         # symmetrical - so every menu-item detail payload can change, not just
         # the two rows involved.
-        _invalidate_pattern('catalog:menu_item:*')
-        _invalidate_pattern('catalog:menu_items:*')
+        invalidate_family(clone.system_id, 'menu_item')
 
 
 class RecommendationListView(APIView):
@@ -1734,3 +1887,80 @@ class RecommendationListView(APIView):
             else category_recommendation_refs(source, request)
         )
         return Response(refs)
+
+
+
+# kind -> (model, card serializer), for the type-ahead's rows.
+_SEARCH_CARDS = {
+    'product': (Product, ProductCardSerializer),
+    'service': (Service, ServiceCardSerializer),
+    'menu_item': (MenuItem, MenuItemCardSerializer),
+}
+
+SEARCH_SUGGESTIONS = 5
+MAX_SEARCH_SUGGESTIONS = 20
+
+
+class CatalogSearchView(APIView):
+    """
+    GET /api/catalog/search/?q=<text>   - type-ahead across the catalog (public).
+
+    Query params:
+      q      - what has been typed so far; every word matches as a prefix
+      kinds  - comma-separated subset of product, service, menu_item (all three
+               by default)
+      limit  - suggestions per kind (default 5, at most 20)
+      system - filter by system pk (else the request host's System)
+
+    Answers ``{"product": [...], "service": [...], "menu_item": [...]}``, each
+    a ranked list of card rows (``fields=card``'s shape), enabled items only.
+    See catalog/search.py for what is matched and how it is ranked.
+
+    Uncached: every keystroke is a different key, and one search is an index
+    lookup plus a few small queries per kind - less than a cache write would cost.
+    """
+
+    permission_classes = [AllowAny]
+    # Three kinds, three queries each: the enabled ids, the rows, their images.
+    request_budget = {'queries': 10, 'ms': 250}
+
+    def get(self, request):
+        kinds = [
+            kind for kind in (request.query_params.get('kinds') or ','.join(SEARCH_KINDS)).split(',')
+            if kind in _SEARCH_CARDS
+        ]
+        try:
+            limit = int(request.query_params.get('limit') or SEARCH_SUGGESTIONS)
+        except ValueError:
+            limit = SEARCH_SUGGESTIONS
+        limit = max(1, min(limit, MAX_SEARCH_SUGGESTIONS))
+
+        system_id = request.query_params.get('system')
+        if system_id and system_id.isdigit():
+            system_id = int(system_id)
+        else:
+            system = host_system(request)
+            if system is None:
+                return Response({kind: [] for kind in kinds})
+            system_id = system.id
+
+        query = request.query_params.get('q') or ''
+        results = {}
+        for kind in kinds:
+            model, serializer_class = _SEARCH_CARDS[kind]
+            ids = ranked_ids(system_id, kind, query)
+            if not ids:
+                results[kind] = []
+                continue
+            # The index holds disabled items too (the CMS lists search them), so
+            # the best `limit` are picked among the enabled ones.
+            enabled = set(model.objects.filter(pk__in=ids, enabled=True).values_list('pk', flat=True))
+            ids = [pk for pk in ids if pk in enabled][:limit]
+            rows = {
+                row.pk: row for row in
+                model.objects.filter(pk__in=ids).select_related('category').prefetch_related('images')
+            }
+            results[kind] = serializer_class(
+                [rows[pk] for pk in ids], many=True, context={'request': request},
+            ).data
+        return Response(results)
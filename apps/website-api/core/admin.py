@@ -14,8 +14,10 @@ from .models import (
     Event,
     EventImage,
     HomepageFlyer,
+    OutboundEmail,
     ResourcePool,
     SiteBackup,
+    SiteJob,
     SocialPost,
     SuccessStory,
     SuccessStoryImage,
@@ -645,3 +647,46 @@ class SiteBackupAdmin(admin.ModelAdmin):
 
     def has_add_permission(self, request):
         return False
+
+
+@admin.register(SiteJob)
+class SiteJobAdmin(admin.ModelAdmin):
+    """The backup/restore queue, read-only.
+
+    Every field is the worker's to write (see `core.jobs`); the one thing worth
+    doing here by hand is deleting a stuck row, which takes its parked upload
+    with it.
+    """
+
+    list_display = ("kind", "system", "status", "created_by", "created", "finished_at")
+    list_filter = ("kind", "status", "system")
+    readonly_fields = (
+        "system", "kind", "status", "params", "upload", "backup",
+        "progress", "result", "error", "cancel_requested",
+        "started_at", "finished_at", "created_by", "created", "modified", "version",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """The transactional email queue, read-only (see `core.outbox`).
+
+    Where to look when a customer says the confirmation never came: a `failed`
+    row carries the relay's last answer. The pickled message itself is left
+    off - it is bytes, and everything worth reading is copied beside it.
+    """
+
+    list_display = ("label", "system", "subject", "status", "attempts", "created", "sent_at")
+    list_filter = ("status", "label", "system")
+    search_fields = ("subject",)
+    exclude = ("message",)
+    readonly_fields = (
+        "system", "label", "subject", "recipients", "status", "attempts",
+        "next_attempt_at", "sent_at", "error", "created", "modified",
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -7,3 +7,6 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals  # noqa: F401
+        from core.metrics import install_serializer_timing
+
+        install_serializer_timing()
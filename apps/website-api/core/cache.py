@@ -1,5 +1,9 @@
 """Cache helpers shared by every views.py / admin.py in this project."""
 
+import contextvars
+import random
+import time
+from contextlib import contextmanager
 from fnmatch import fnmatchcase
 
 from django.core.cache import cache
@@ -13,6 +17,12 @@ def invalidate_pattern(pattern):
     Skipping invalidation on LocMemCache (as this used to) leaves list endpoints
     serving pre-write data until the TTL lapses - an admin toggling a record and
     reloading sees the old value and reads it as a lost write.
+
+    ⚠ A sweep does not move any content version (see ``bump_content_version``).
+    Most of them ride along with a model write whose receiver already moved its
+    tenant's, and the rest clear keys nothing public is answered 304 from - a
+    cart, the contact inbox. A caller that sweeps on behalf of a tenant without
+    such a write bumps that tenant's version itself.
     """
     try:
         cache.delete_pattern(pattern)
@@ -31,8 +41,8 @@ def invalidate_pattern(pattern):
         getattr(cache, "_expire_info", {}).pop(key, None)
 
 
-def invalidate_system_payload():
-    """Drop every cached ``GET /api/system/`` response.
+def invalidate_system_payload(system_id=None):
+    """Drop the cached ``GET /api/system/`` response of one System, or of all.
 
     That payload is not just the System row: it also carries derived counts of
     *other* models - ``product_count``, ``service_count``, ``menu_item_count``
@@ -46,6 +56,301 @@ def invalidate_system_payload():
     keeps its old links for up to an hour after an admin adds the tenant's first
     menu item or disables the last one. Both key shapes are cleared - ``host:``
     is what the public site reads, ``pk:`` what the CMS does.
+
+    Given the System a write belongs to, only its own two keys go - a pk lookup
+    for the host instead of two SCANs, and no other tenant's navbar goes cold.
+    Without one (a write whose tenant cannot be resolved) every System's
+    payload is swept, as before.
+    """
+    if system_id is None:
+        # No tenant to name, so every remembered ETag is revalidated instead.
+        bump_generation(CONTENT_NAMESPACE, CONTENT_EPOCH)
+        invalidate_pattern("system:host:*")
+        invalidate_pattern("system:pk:*")
+        return
+
+    from core.models import System
+
+    bump_content_version(system_id)
+    cache.delete(f"system:pk:{system_id}")
+    host = System.objects.filter(pk=system_id).values_list("host", flat=True).first()
+    if host:
+        cache.delete(f"system:host:{host}")
+    else:
+        # The System itself is going (this is a cascade from its delete), and
+        # its host can no longer be read - sweep, or the site keeps serving.
+        invalidate_pattern("system:host:*")
+
+
+# ── Per-tenant generation counters ───────────────────────────────────────────
+#
+# A pattern sweep is O(keyspace): on Redis it is a SCAN over every tenant's keys,
+# and it evicts every other tenant's warm entries along with the one that
+# changed. A generation counter turns the same invalidation into one INCR on a
+# key scoped to (namespace, system): every entry is stored stamped with the
+# generation it was built under, and a read whose stamp no longer matches is a
+# miss. The superseded entries are never deleted - they fall out by TTL.
+
+
+#: How long an untouched counter is kept. The id in a counter's key can come
+#: off a public query string (``?system=``), so none may live forever: a
+#: crawler walking ids would otherwise grow the keyspace without bound. A
+#: counter that lapses only reseeds, which invalidates - once a day per tenant
+#: is a cold read, not a wrong one.
+GENERATION_TTL = 24 * 3600
+
+
+def generation_key(namespace, system_id):
+    return f"gen:{namespace}:{system_id}"
+
+
+def _fresh_generation():
+    # Seeded from the clock rather than from 1, so a counter that was evicted (or
+    # swept by a restore) can never come back at a value an old entry still
+    # carries - a stale stamp would otherwise match again.
+    return time.time_ns() // 1_000_000
+
+
+def current_generation(namespace, system_id, timeout=GENERATION_TTL):
+    """The generation entries of ``namespace`` for this System are stamped with.
+
+    ``add`` rather than ``set`` on a missing counter, so two workers seeding it at
+    once agree on the value that won instead of each stamping their own.
+
+    Counters last ``GENERATION_TTL``; pass a shorter ``timeout`` for a scope
+    that stops being read sooner (a calendar day in the past). An expired
+    counter only reseeds, which invalidates, so letting one lapse is always
+    safe.
+    """
+    key = generation_key(namespace, system_id)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _fresh_generation(), timeout)
+        value = cache.get(key)
+    return value
+
+
+def bump_generation(namespace, system_id, timeout=GENERATION_TTL):
+    """Invalidate every entry of ``namespace`` for one System, in O(1).
+
+    ``incr`` is atomic on Redis; it raises when the key is unset, and a fresh
+    seed is just as good as an increment there - nothing can be stamped with it.
     """
-    invalidate_pattern("system:host:*")
-    invalidate_pattern("system:pk:*")
+    key = generation_key(namespace, system_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_generation(), timeout)
+
+
+# ── Per-tenant content versions ──────────────────────────────────────────────
+#
+# One more generation per System, covering *everything* public it serves: moved
+# by every write to its storefront content (`core.signals`), by a catalog family
+# being invalidated and by its System payload being dropped. Nothing is stamped
+# with it; it is what `core.conditional` compares to decide that an ETag it
+# handed out is still good without running the view. A write whose tenant
+# cannot be resolved at all moves the epoch instead - one counter every
+# remembered ETag is checked against too - which is rare enough to be cheap.
+
+CONTENT_NAMESPACE = "content"
+CONTENT_EPOCH = "all"
+
+
+def bump_content_version(system_id):
+    """Mark everything this System serves as possibly changed."""
+    if system_id is not None:
+        bump_generation(CONTENT_NAMESPACE, system_id)
+
+
+# ── Read-through with stampede protection ───────────────────────────────────
+#
+# The plain get / rebuild / set pattern lets every request that lands between an
+# expiry (or an invalidation) and the first rebuild run the same prefetch-heavy
+# queries at once - on a busy menu page that is dozens of identical rebuilds.
+# `read_through` lets exactly one worker rebuild a key:
+#
+# * an entry past its *soft* expiry is still served, stale, to everyone except
+#   the one request that wins the rebuild lock and refreshes it;
+# * a missing or superseded entry is rebuilt by the lock holder, and the other
+#   requests wait briefly for its result instead of rebuilding alongside it;
+# * the *hard* TTL the backend evicts on is jittered, so keys written together
+#   (a warm-up, a deploy) do not all expire in the same second.
+#
+# Entries are ``(system_id, generation, fresh_until, data)``. The first two are
+# the stamp of the generation counters above and are None for an unversioned
+# key; anything else found under a key (an entry written before this shape
+# existed) reads as a miss.
+#
+# Inside `recording_reads()` every entry served is noted as ``(system_id,
+# fresh_until)``: `core.conditional` learns from it whose content a response
+# was and how long it can vouch for it.
+
+#: How long past its nominal TTL an entry may still be served stale, as a
+#: fraction of that TTL.
+STALE_GRACE = 0.5
+
+#: +/- spread applied to every TTL, as a fraction.
+TTL_JITTER = 0.1
+
+#: Upper bound on one rebuild. The lock expires on its own after this, so a
+#: worker that dies mid-rebuild cannot wedge the key.
+REBUILD_LOCK_TIMEOUT = 10
+
+#: How long a request waits for another worker's rebuild before giving up and
+#: building the payload itself, and how often it looks.
+REBUILD_WAIT = 1.0
+REBUILD_POLL = 0.05
+
+
+_reads: contextvars.ContextVar = contextvars.ContextVar("cache_reads", default=None)
+
+
+@contextmanager
+def recording_reads():
+    """Collect the ``(system_id, fresh_until)`` of every entry served inside."""
+    reads = []
+    token = _reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _reads.reset(token)
+
+
+def _served(entry):
+    reads = _reads.get()
+    if reads is not None:
+        reads.append((entry[0], entry[2]))
+    return entry[3]
+
+
+def _jittered(seconds):
+    return max(1, round(seconds * random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER)))
+
+
+def _read_entry(key, namespace, system_id):
+    """The valid entry under ``key``, or None if absent, malformed or superseded."""
+    if namespace is not None and system_id is not None:
+        gen_key = generation_key(namespace, system_id)
+        found = cache.get_many([key, gen_key])
+        entry, generation = found.get(key), found.get(gen_key)
+    else:
+        entry, generation = cache.get(key), None
+    if not (isinstance(entry, tuple) and len(entry) == 4):
+        return None
+    if namespace is not None:
+        if generation is None:
+            generation = cache.get(generation_key(namespace, entry[0]))
+        if generation is None or entry[1] != generation:
+            return None
+    return entry
+
+
+def _rebuild(key, build, timeout, namespace, system_id):
+    generation = None
+    if namespace is None:
+        data = build()
+    elif system_id is not None:
+        # Read before building: a write landing mid-build then bumps past the
+        # stamp, and the payload it made stale is never served as current.
+        generation = current_generation(namespace, system_id)
+        data = build()
+    else:
+        built = build()
+        if built is None:
+            return None
+        system_id, data = built
+        generation = current_generation(namespace, system_id)
+    if data is None:
+        return None
+    entry = (system_id, generation, time.time() + _jittered(timeout), data)
+    cache.set(key, entry, _jittered(timeout * (1 + STALE_GRACE)))
+    return entry
+
+
+def _rebuilt(key, build, timeout, namespace, system_id):
+    entry = _rebuild(key, build, timeout, namespace, system_id)
+    return None if entry is None else _served(entry)
+
+
+def read_through(key, build, timeout, namespace=None, system_id=None):
+    """Return the payload cached under ``key``, calling ``build`` to make it.
+
+    ``build()`` returns the payload, or None for "nothing to cache" (a 404),
+    which is passed back as None. ``timeout`` is how long a payload counts as
+    fresh; it is then served stale for up to ``STALE_GRACE`` of that again while
+    one worker refreshes it.
+
+    With a ``namespace`` the entry is stamped with a generation counter (see
+    ``bump_generation``). A request that already names its tenant passes
+    ``system_id``; one that does not (a detail endpoint keyed by pk) has
+    ``build`` return ``(system_id, payload)`` instead, so the stamp can be taken
+    from the row it loaded.
+    """
+    entry = _read_entry(key, namespace, system_id)
+    lock_key = f"lock:{key}"
+
+    if entry is not None:
+        if entry[2] > time.time():
+            return _served(entry)
+        # Stale: whoever takes the lock refreshes, everyone else is served the
+        # old payload without waiting.
+        if not cache.add(lock_key, 1, REBUILD_LOCK_TIMEOUT):
+            return _served(entry)
+        try:
+            return _rebuilt(key, build, timeout, namespace, system_id)
+        finally:
+            cache.delete(lock_key)
+
+    locked = cache.add(lock_key, 1, REBUILD_LOCK_TIMEOUT)
+    if locked is False:
+        # Another worker is already building this key - wait for its result
+        # rather than run the same queries alongside it. ``add`` answers None
+        # rather than False when the cache is unreachable; there is nothing to
+        # wait for then.
+        deadline = time.monotonic() + REBUILD_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(REBUILD_POLL)
+            entry = _read_entry(key, namespace, system_id)
+            if entry is not None:
+                return _served(entry)
+    try:
+        return _rebuilt(key, build, timeout, namespace, system_id)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+def read_many(fragments):
+    """``read_through`` for several keys at once, in one cache round trip.
+
+    ``fragments`` maps a name to the ``(key, build, timeout, namespace,
+    system_id)`` its own ``read_through`` call would take - ``system_id``
+    required whenever there is a ``namespace``. Every entry and every
+    generation counter they need is fetched with a single ``get_many``; a
+    fragment found fresh and current is served from that, and only the rest go
+    through ``read_through`` one by one, which rebuilds (or serves stale) under
+    the same lock rules as a lone read.
+
+    Returns ``{name: payload}``, None for a fragment whose ``build`` found
+    nothing.
+    """
+    keys = {key for key, _, _, _, _ in fragments.values()}
+    keys.update(
+        generation_key(namespace, system_id)
+        for _, _, _, namespace, system_id in fragments.values()
+        if namespace is not None
+    )
+    found = cache.get_many(list(keys))
+    now = time.time()
+
+    result = {}
+    for name, (key, build, timeout, namespace, system_id) in fragments.items():
+        entry = found.get(key)
+        if isinstance(entry, tuple) and len(entry) == 4 and entry[2] > now and (
+            namespace is None or entry[1] == found.get(generation_key(namespace, system_id))
+        ):
+            result[name] = _served(entry)
+        else:
+            result[name] = read_through(key, build, timeout, namespace, system_id)
+    return result
@@ -0,0 +1,152 @@
+"""Conditional GET for the public payloads: strong ETags, and 304s that skip the view.
+
+The storefront polls. Every poll of an unchanged catalog used to be answered
+with the whole JSON body again - read out of the cache, unpickled, rendered and
+sent - so "nothing changed" cost as much as the first load. A view that sets
+
+    class ProductListCreateView(APIView):
+        conditional_get = True
+
+is answered conditionally by `ConditionalGetMiddleware`, in two steps:
+
+* **After the view.** A 200 is given a strong ETag, the SHA-1 of its rendered
+  body (or keeps the one `core.rendered` gave it, the same hash taken when the
+  payload was cached, ``-gz`` marked on a gzipped body), and a request whose
+  `If-None-Match` already names it
+  gets a 304 with no body. The tag is the content itself, so it is right for every payload,
+  including ones that change with the clock (the event sliders) and the ones
+  no counter covers; what this step saves is the transfer, not the work.
+* **Before the view.** The tag is also remembered for the URL - the plain
+  one, standing for both encodings of the same payload - with who the
+  payload belonged to and the per-tenant content version and epoch of
+  `core.cache` at the time. The next request naming that tag is answered 304
+  right there when both counters still read the same: two small cache reads,
+  no query, no view, no payload unpickled. The memory lasts only as long as
+  the cache entries the response was read from stay fresh (`recording_reads`),
+  so a payload that is rebuilt on its TTL is always looked at again.
+
+Whose content a response was is read off the entries it was built from; a
+payload cached without a tenant stamp (the core lists) falls back to the
+memory already kept for the URL, the ``system`` param, then to the System the
+host names (`core.tenancy.host_system`).
+
+⚠ Never for ``include_disabled`` requests. The URL is the same for the admin
+and the public, and a tag remembered from the public variant would otherwise
+answer an admin's revalidation with "unchanged".
+
+⚠ The tenant's counter is read after the view, so a write that lands while it
+runs is paired with the payload from before it - and believed for at most the
+freshness left on that payload, the same window its own cache entry has.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from .cache import CONTENT_EPOCH, CONTENT_NAMESPACE, current_generation, generation_key, recording_reads
+from .rendered import gzip_etag, identity_etag
+from .tenancy import host_system, request_host
+
+
+def _memory_key(request):
+    digest = hashlib.sha1(f"{request_host(request)}|{request.get_full_path()}".encode()).hexdigest()
+    return f"etag:{digest}"
+
+
+def _conditional(view_func):
+    view = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None) or view_func
+    return getattr(view, "conditional_get", False)
+
+
+def _tenant(request, reads, memory):
+    for system_id, _ in reads:
+        if system_id is not None:
+            return system_id
+    if memory is not None:
+        # The same host and URL as last time, so the same tenant.
+        return memory[1]
+    param = request.GET.get("system")
+    if param:
+        return int(param) if param.isdigit() else None
+    system = host_system(request)
+    return system.pk if system is not None else None
+
+
+def _named(request, plain):
+    """Which tag of the payload tagged ``plain`` `If-None-Match` names, if any.
+
+    Either body's tag: the plain and the gzipped one are the same payload.
+    """
+    sent = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    return next((tag for tag in (plain, gzip_etag(plain)) if tag in sent), None)
+
+
+class ConditionalGetMiddleware:
+    """ETags and 304s for views that set ``conditional_get`` (module docstring)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with recording_reads() as reads:
+            response = self.get_response(request)
+        if not getattr(request, "_conditional_get", False):
+            return response
+        if response.status_code != 200 or response.streaming:
+            return response
+
+        # A pre-rendered payload (`core.rendered`) arrives tagged already - and
+        # possibly gzipped, which is not what the tag is the hash of.
+        etag = response.get("ETag") or '"%s"' % hashlib.sha1(response.content).hexdigest()
+        plain = identity_etag(etag)
+        self._remember(request, plain, reads)
+        matched = _named(request, plain)
+        if matched is not None:
+            return self._not_modified(matched)
+        response["ETag"] = etag
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != "GET" or "include_disabled" in request.GET or not _conditional(view_func):
+            return None
+        request._conditional_get = True
+        memory_key, epoch_key = _memory_key(request), generation_key(CONTENT_NAMESPACE, CONTENT_EPOCH)
+        found = cache.get_many([memory_key, epoch_key])
+        # Taken before the view, like a generation stamp: a sweep landing while
+        # it runs leaves the epoch past the one remembered with its response.
+        request._content_epoch = found.get(epoch_key) or current_generation(CONTENT_NAMESPACE, CONTENT_EPOCH)
+
+        memory = request._etag_memory = found.get(memory_key)
+        if memory is None:
+            return None
+        plain, system_id, version, epoch = memory
+        etag = _named(request, plain)
+        if etag is None:
+            return None
+        if epoch != request._content_epoch or cache.get(generation_key(CONTENT_NAMESPACE, system_id)) != version:
+            return None
+        return self._not_modified(etag)
+
+    def _remember(self, request, etag, reads):
+        # As long as the entries it was read from are fresh, and not at all
+        # for a response that read none (nothing would ever expire the memory)
+        # or was served stale.
+        if not reads:
+            return
+        ttl = int(min(fresh_until for _, fresh_until in reads) - time.time())
+        if ttl < 1:
+            return
+        system_id = _tenant(request, reads, request._etag_memory)
+        if system_id is None:
+            return
+        version = current_generation(CONTENT_NAMESPACE, system_id)
+        cache.set(_memory_key(request), (etag, system_id, version, request._content_epoch), ttl)
+
+    @staticmethod
+    def _not_modified(etag):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
@@ -0,0 +1,121 @@
+"""counters - the System payload's derived counts, kept in `SystemCounters`.
+
+`SystemSerializer` reports five "how many enabled" counts and a stock-image
+total. Counting them at render meant a score of COUNT queries every time the
+payload was rebuilt, and it is dropped by every catalog write. They are kept in
+one row per System instead:
+
+* **On write.** The receivers that already drop the System payload for an
+  item, branch, event or picture write (`core.signals`, `catalog.signals`) call
+  `count_write` first. Once the transaction commits, it recounts only what
+  rows of that model feed - the model's own count and its stock-image share,
+  one or two COUNTs - stores it, and then drops the payload, so the rebuild
+  after it reads the new numbers. Not before the commit: a count taken inside
+  the writer's transaction cannot see a concurrent writer's row, and storing
+  it there would hold the tenant's one counters row locked until the caller
+  commits, queueing every other catalog write of the tenant behind it. After
+  the commit, the last writer's count sees every committed row.
+* **On read.** `counters_for` is one SELECT. A new System is given its row,
+  all zeros, as it is created; one from before this existed is counted in full
+  on its first read and the row created then.
+* **In bulk.** A publish or a restore writes without signals and calls
+  `recount` afterwards; `manage.py reconcile_counters` checks every tenant's
+  row against a fresh count and rewrites what drifted.
+
+⚠ A write whose System has no row stores nothing: the row is made whole by
+the first read. That is also what keeps a cascade from a System's own delete
+from re-creating the row it has just removed.
+"""
+
+from django.apps import apps
+from django.db import transaction
+
+from .cache import invalidate_system_payload
+from .models import SystemCounters
+from .stock_images import attributed_specs, stock_image_shares, system_stock_images
+
+#: Model label -> the count it feeds. Every one counts enabled rows of the
+#: tenant: what the storefront can link to.
+COUNTS = {
+    "catalog.product": "product_count",
+    "catalog.service": "service_count",
+    "catalog.menuitem": "menu_item_count",
+    "core.branch": "branch_count",
+    "core.event": "event_count",
+}
+
+
+def _counts(system_id, labels):
+    return {
+        COUNTS[label]: apps.get_model(label).objects.filter(system_id=system_id, enabled=True).count()
+        for label in labels
+    }
+
+
+def _specs(label):
+    return [spec for spec in attributed_specs() if spec.model._meta.label_lower == label]
+
+
+def _store(system_id, label):
+    counts = _counts(system_id, [label] if label in COUNTS else [])
+    specs = _specs(label)
+    if not counts and not specs:
+        return
+    shares = stock_image_shares(system_id, specs)
+    with transaction.atomic():
+        row = SystemCounters.objects.select_for_update().filter(system_id=system_id).first()
+        if row is None:
+            return
+        for field, value in counts.items():
+            setattr(row, field, value)
+        # Read-modify-write under the row lock: two models' shares written at
+        # once must not each put back the other's old value.
+        row.stock_images = {**row.stock_images, **shares}
+        row.save()
+
+
+def count_write(model, system_id):
+    """Once committed, recount what rows of `model` contribute to this System
+    and drop its payload."""
+    if system_id is None:
+        invalidate_system_payload(None)
+        return
+    label = model._meta.label_lower
+
+    def refresh():
+        _store(system_id, label)
+        invalidate_system_payload(system_id)
+
+    # Under autocommit this runs at once.
+    transaction.on_commit(refresh)
+
+
+def fresh_counts(system_id) -> dict:
+    """Every stored field of one System's counters, counted now (not stored)."""
+    return {**_counts(system_id, COUNTS), "stock_images": stock_image_shares(system_id)}
+
+
+def recount(system_id) -> SystemCounters:
+    """Count everything for one System afresh and store it."""
+    row, _ = SystemCounters.objects.update_or_create(system_id=system_id, defaults=fresh_counts(system_id))
+    return row
+
+
+def counters_for(system) -> SystemCounters:
+    """The stored counts of `system`, counted once first if it has none.
+
+    Kept on the instance, so a serializer asking for each count in turn reads
+    the row once.
+    """
+    row = getattr(system, "_counters_row", None)
+    if row is None:
+        row = SystemCounters.objects.filter(system=system).first()
+        if row is None:
+            row = recount(system.pk)
+        system._counters_row = row
+    return row
+
+
+def stock_image_total(system) -> int:
+    """`System.stock_image_count`: its own hero/about pair plus the stored shares."""
+    return system_stock_images(system) + sum(counters_for(system).stock_images.values())
@@ -0,0 +1,372 @@
+"""
+jobs - background execution of site backups and restores.
+
+A backup zips a tenant's whole database and media volume; a restore unpacks one
+back. Run inside the request that asked for them, either held a gunicorn worker
+(2 per pod) for minutes and raced the 600s timeout on exactly the tenants with
+the most to lose. The request now validates, writes a `SiteJob` row and answers
+202; `manage.py run_site_jobs` claims queued rows and runs them.
+
+The database is the queue. A claim is `SELECT ... FOR UPDATE SKIP LOCKED` on the
+oldest queued row, so any number of workers (one per pod) can poll the same
+table without handing a job out twice, and there is no broker to deploy or
+lose jobs in.
+
+Progress is reported per section - `{"products": {"done": 120, "total": 480}}` -
+through the `progress` hook of `core.backup`. It is flushed to the **cache**, not
+the row, at most once a second: a restore runs inside a single transaction, so
+anything it wrote to its own row would stay invisible until it had finished.
+The same flush is when the worker looks for a cancel request; raising out of the
+hook unwinds a backup (the temp zip is removed) or rolls a restore back whole.
+
+A running job holds a **lease** on its row (`SiteJob.lease_until`), taken when
+it is claimed and renewed every few minutes by a heartbeat thread for as long as
+`run_job` is working - from a connection of its own, since a restore's single
+transaction would hide anything written from the job's. A job whose worker died
+(pod evicted mid-restore) stops renewing it; `fail_stale_jobs` marks those
+failed once the lease has run out, so the CMS stops showing a spinner forever,
+while a restore that legitimately runs for hours is left alone.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.files import File
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .backup import (
+    MODE_REPLACE,
+    SECTION_IMAGES,
+    BackupError,
+    restore_archive,
+    write_archive,
+)
+from .models import SiteBackup, SiteJob
+
+logger = logging.getLogger(__name__)
+
+# How often a running job publishes its counters and checks for a cancel.
+PROGRESS_FLUSH_SECONDS = 1.0
+# Outlives any job; the key is deleted when the job finishes anyway.
+PROGRESS_CACHE_TTL = 60 * 60 * 24
+
+# How long a running job's row is held past its last heartbeat, and how often
+# the heartbeat renews it: three chances before a live worker's lease runs out.
+LEASE = timedelta(minutes=15)
+HEARTBEAT_SECONDS = LEASE.total_seconds() / 3
+
+
+class JobCancelled(Exception):
+    """Raised out of the progress hook when the operator cancelled the job."""
+
+
+def backups_key(system_id):
+    return f"core:backups:system:{system_id}"
+
+
+def progress_key(job_id):
+    return f"core:job:{job_id}:progress"
+
+
+def live_progress(job: SiteJob) -> dict:
+    """The freshest per-section counters for `job`.
+
+    The cache while it runs (see the module docstring), the row once it has
+    finished - and the row as a fallback, since a cache outage must only cost
+    the progress bar its motion, never the job.
+    """
+    if job.status == SiteJob.STATUS_RUNNING:
+        return cache.get(progress_key(job.pk)) or job.progress
+    return job.progress
+
+
+class _Reporter:
+    """The `progress` callable handed to `core.backup` for one job."""
+
+    def __init__(self, job: SiteJob):
+        self.job_id = job.pk
+        self.sections: dict[str, dict] = {}
+        self._flushed_at = None
+
+    def __call__(self, section, done, total):
+        self.sections[section] = {"done": done, "total": total}
+        now = time.monotonic()
+        if self._flushed_at is not None and now - self._flushed_at < PROGRESS_FLUSH_SECONDS:
+            return
+        self._flushed_at = now
+        cache.set(progress_key(self.job_id), self.sections, PROGRESS_CACHE_TTL)
+        if SiteJob.objects.filter(pk=self.job_id, cancel_requested=True).exists():
+            raise JobCancelled
+
+
+# --------------------------------------------------------------------------- #
+# Queueing (request side)
+# --------------------------------------------------------------------------- #
+
+def _claimed(start: bool) -> dict:
+    """Row state for a job the caller will run itself (`start=True`).
+
+    Written already `running`, so no worker can claim it in the moment between
+    the INSERT and the caller's `run_job`.
+    """
+    if not start:
+        return {}
+    now = timezone.now()
+    return {"status": SiteJob.STATUS_RUNNING, "started_at": now, "lease_until": now + LEASE}
+
+
+def enqueue_backup(system, *, name: str, sections, user=None, start: bool = False) -> SiteJob:
+    """Queue a backup. `sections` must already be normalized."""
+    return SiteJob.objects.create(
+        system=system,
+        kind=SiteJob.KIND_BACKUP,
+        params={"name": name, "sections": list(sections)},
+        created_by=user,
+        **_claimed(start),
+    )
+
+
+def enqueue_restore(system, *, sections, mode: str, path: str | None = None,
+                    backup: SiteBackup | None = None, user=None, start: bool = False) -> SiteJob:
+    """Queue a restore of either an uploaded archive at `path` or `backup`.
+
+    An upload is copied into storage under the job: the worker may be in
+    another pod, so the request's temp file is no use to it.
+    """
+    job = SiteJob(
+        system=system,
+        kind=SiteJob.KIND_RESTORE,
+        params={"sections": list(sections), "mode": mode},
+        backup=backup,
+        created_by=user,
+        **_claimed(start),
+    )
+    if path is not None:
+        with open(path, "rb") as fh:
+            job.upload.save("restore.zip", File(fh), save=False)
+    job.save()
+    return job
+
+
+def cancel_job(job: SiteJob) -> SiteJob:
+    """Cancel `job`: at once if it is still queued, at its next check if running.
+
+    Both are conditional UPDATEs, so a job a worker claims between the read and
+    the write is flagged rather than marked cancelled under the worker's feet.
+    """
+    now = timezone.now()
+    dropped = SiteJob.objects.filter(pk=job.pk, status=SiteJob.STATUS_QUEUED).update(
+        status=SiteJob.STATUS_CANCELLED, cancel_requested=True, finished_at=now, modified=now,
+    )
+    if not dropped:
+        SiteJob.objects.filter(pk=job.pk, status=SiteJob.STATUS_RUNNING).update(
+            cancel_requested=True, modified=now,
+        )
+    job.refresh_from_db()
+    if dropped and job.upload:
+        job.upload.delete(save=True)
+    return job
+
+
+# --------------------------------------------------------------------------- #
+# Running (worker side)
+# --------------------------------------------------------------------------- #
+
+def claim_next() -> SiteJob | None:
+    """Mark the oldest queued job running and return it, or None if idle."""
+    with transaction.atomic():
+        job = (
+            SiteJob.objects.select_for_update(skip_locked=True)
+            .filter(status=SiteJob.STATUS_QUEUED)
+            .order_by("created", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = SiteJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.lease_until = job.started_at + LEASE
+        job.save(update_fields=["status", "started_at", "lease_until", "modified"])
+    return job
+
+
+def fail_stale_jobs() -> int:
+    """Fail `running` jobs whose lease has run out; returns how many.
+
+    A row from before leases existed has none, and is judged by its start.
+    """
+    now = timezone.now()
+    expired = Q(lease_until__lt=now) | Q(lease_until__isnull=True, started_at__lt=now - LEASE)
+    return SiteJob.objects.filter(expired, status=SiteJob.STATUS_RUNNING).update(
+        status=SiteJob.STATUS_FAILED,
+        error="The job stopped before finishing. Nothing was changed; run it again.",
+        finished_at=now,
+        modified=now,
+    )
+
+
+class _Heartbeat(threading.Thread):
+    """Renews one running job's lease until stopped.
+
+    A thread, so the renewal goes out on a connection of its own: a restore
+    holds one transaction open for its whole run, and a write to the job's row
+    from inside it would stay invisible to `fail_stale_jobs` - and lock the row
+    the cancel endpoint has to update.
+    """
+
+    def __init__(self, job_id):
+        super().__init__(name=f"site-job-{job_id}-heartbeat", daemon=True)
+        self.job_id = job_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(HEARTBEAT_SECONDS):
+                try:
+                    SiteJob.objects.filter(pk=self.job_id, status=SiteJob.STATUS_RUNNING).update(
+                        lease_until=timezone.now() + LEASE,
+                    )
+                except DatabaseError:
+                    # The next beat tries again; the lease allows for two misses.
+                    logger.warning("could not renew the lease of job %s", self.job_id, exc_info=True)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job: SiteJob) -> SiteJob:
+    """Run one claimed job to a finished status. Never raises.
+
+    `job.unexpected` (not a column) tells a failure the operator caused - a
+    foreign archive, an unknown section - from one they did not, for the
+    synchronous endpoints that still answer with a status code.
+    """
+    reporter = _Reporter(job)
+    job.unexpected = False
+    heartbeat = _Heartbeat(job.pk)
+    heartbeat.start()
+    try:
+        if job.kind == SiteJob.KIND_BACKUP:
+            job.result = _run_backup(job, reporter)
+        else:
+            job.result = _run_restore(job, reporter)
+        job.status = SiteJob.STATUS_SUCCEEDED
+    except JobCancelled:
+        job.status = SiteJob.STATUS_CANCELLED
+    except (BackupError, ValueError) as exc:
+        job.status = SiteJob.STATUS_FAILED
+        job.error = str(exc)
+    except Exception:
+        # A restore is atomic, so the site is untouched - but the operator must
+        # not be shown a stack trace, and the detail belongs in the log.
+        logger.exception("%s job %s failed for system %s", job.kind, job.pk, job.system_id)
+        job.status = SiteJob.STATUS_FAILED
+        job.unexpected = True
+        job.error = (
+            "The restore failed and nothing was changed."
+            if job.kind == SiteJob.KIND_RESTORE
+            else "The backup failed."
+        )
+    finally:
+        heartbeat.stop()
+    job.progress = reporter.sections
+    job.finished_at = timezone.now()
+    job.lease_until = None
+    job.save(update_fields=[
+        "status", "result", "error", "progress", "backup", "lease_until", "finished_at", "modified",
+    ])
+    cache.delete(progress_key(job.pk))
+    return job
+
+
+def _run_backup(job: SiteJob, reporter: _Reporter) -> dict:
+    system = job.system
+    sections = job.params["sections"]
+    name = job.params["name"]
+    path, manifest = write_archive(
+        system, sections, include_images=SECTION_IMAGES in sections, progress=reporter,
+    )
+    try:
+        # Last look before the row exists: a cancel that lands while the zip is
+        # being uploaded would otherwise leave a restore point nobody wanted.
+        if SiteJob.objects.filter(pk=job.pk, cancel_requested=True).exists():
+            raise JobCancelled
+        backup = SiteBackup(
+            system=system,
+            name=name,
+            sections=manifest["sections"],
+            include_images=manifest["include_images"],
+            size_bytes=os.path.getsize(path),
+            media_files=manifest["media_files"],
+            record_counts=manifest["counts"],
+            created_by=job.created_by,
+        )
+        with open(path, "rb") as fh:
+            backup.file.save(f"{slugify(name) or 'backup'}.zip", File(fh), save=False)
+        backup.save()
+    finally:
+        # The archive now lives in storage; the working copy must not linger
+        # in /tmp, where a few full-catalog backups would fill the disk.
+        os.unlink(path)
+
+    job.backup = backup
+    cache.delete(backups_key(system.pk))
+    return {"backup_id": backup.pk}
+
+
+def _run_restore(job: SiteJob, reporter: _Reporter) -> dict:
+    # Imported here: the view layer imports this module to enqueue.
+    from .views import invalidate_after_restore
+
+    system = job.system
+    if job.upload:
+        source = job.upload
+    elif job.backup is not None and job.backup.file:
+        source = job.backup.file
+    else:
+        raise BackupError("The restore point no longer exists.")
+
+    path = _local_copy(source)
+    try:
+        result = restore_archive(
+            system, path, job.params["sections"],
+            mode=job.params.get("mode") or MODE_REPLACE, progress=reporter,
+        )
+    finally:
+        os.unlink(path)
+        if job.upload:
+            # A whole tenant's data, parked only so this worker could read it.
+            job.upload.delete(save=False)
+            SiteJob.objects.filter(pk=job.pk).update(upload="")
+
+    invalidate_after_restore(system)
+    return result
+
+
+def _local_copy(field_file) -> str:
+    """Copy a stored archive to a local temp file and return its path.
+
+    `zipfile` needs a seekable file, and on R2 a FieldFile has no `.path`.
+    """
+    handle = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+    try:
+        with field_file.open("rb") as src:
+            shutil.copyfileobj(src, handle, 1024 * 1024)
+    except BaseException:
+        handle.close()
+        os.unlink(handle.name)
+        raise
+    handle.close()
+    return handle.name
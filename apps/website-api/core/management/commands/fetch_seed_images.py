@@ -27,6 +27,14 @@ answer a Spanish query with a much thinner, more literal result set - so a
 Spanish-language site still gets its photos searched in English. The credit
 stored alongside is language-neutral.
 
+Searches and downloads run on a small thread pool (`--workers`), through the
+bank client's shared connection pool and per-bank rate limits. Concurrency does
+not change which photo a record gets: every query for a bank is asked first,
+then the answers are handed out in brief order, each record taking the first
+hit no earlier record took - what one search after another would have chosen.
+What each bank answered is kept in `<assets-dir>/fetched/search-cache.json`, so
+re-running a brief after editing a few queries asks only those again.
+
 Two files are written per brief, both under `<assets-dir>/fetched/<host>/`:
 
   * the images themselves, named after the record's slug; and
@@ -42,6 +50,7 @@ from __future__ import annotations
 
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from django.conf import settings
@@ -51,13 +60,19 @@ from django.utils.text import slugify
 from core.services.image_banks import (
     PEXELS,
     PIXABAY,
+    SearchCache,
+    bank_hits,
     configured_banks,
     download,
-    search_photo,
 )
 
 FETCHED_DIRNAME = "fetched"
 CREDITS_NAME = "credits.json"
+SEARCH_CACHE_NAME = "search-cache.json"
+
+# Searches and downloads in flight at once. The banks' own limits, not this,
+# bound the search rate; this bounds the sockets and the memory.
+DEFAULT_WORKERS = 4
 
 # The two System images that are ever a photograph; the logos are the customer's
 # own mark. Mirrors `core.stock_images.SYSTEM_ATTRIBUTION_FIELDS`.
@@ -104,6 +119,17 @@ class Command(BaseCommand):
             action="store_true",
             help="Refetch records that already point at an image.",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f"Searches and downloads run at once (default: {DEFAULT_WORKERS}).",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ask the banks again instead of reusing answers from earlier runs.",
+        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
@@ -135,6 +161,9 @@ class Command(BaseCommand):
 
         banks = [opts["bank"]] if opts["bank"] else configured_banks()
         dry_run = opts["dry_run"]
+        workers = opts.get("workers") or DEFAULT_WORKERS
+        if workers < 1:
+            raise CommandError("--workers must be at least 1.")
         if not banks and not dry_run:
             raise CommandError(
                 "No image bank is configured. Set PEXELS_API_KEY (and/or "
@@ -159,15 +188,33 @@ class Command(BaseCommand):
         out_dir.mkdir(parents=True, exist_ok=True)
         credits = self._load_credits(out_dir)
 
-        spent: set[str] = set()
+        cache = (
+            None
+            if opts.get("no_cache")
+            else SearchCache(assets_dir / FETCHED_DIRNAME / SEARCH_CACHE_NAME)
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                photos = self._choose(plans, banks, cache, pool)
+            finally:
+                if cache is not None:
+                    cache.save()
+
+            def fetch(job):
+                plan, photo = job
+                try:
+                    download(photo, out_dir / f"{plan.stem}.jpg")
+                except Exception as exc:  # noqa: BLE001 - a bad download must not stop the run
+                    return exc
+                return None
+
+            jobs = [(plan, photo) for plan, photo in zip(plans, photos) if photo is not None]
+            failures = dict(zip((plan.stem for plan, _ in jobs), pool.map(fetch, jobs)))
+
+        # Reported, and written back, in brief order whatever order the
+        # downloads finished in.
         fetched = missed = 0
-        for plan in plans:
-            photo = search_photo(
-                plan.query,
-                orientation=plan.orientation,
-                exclude=spent,
-                banks=banks,
-            )
+        for plan, photo in zip(plans, photos):
             if photo is None:
                 self.stderr.write(
                     self.style.WARNING(
@@ -177,19 +224,15 @@ class Command(BaseCommand):
                 )
                 missed += 1
                 continue
-            spent.add(photo.key)
-
-            name = f"{plan.stem}.jpg"
-            try:
-                download(photo, out_dir / name)
-            except Exception as exc:  # noqa: BLE001 - a bad download must not stop the run
+            exc = failures[plan.stem]
+            if exc is not None:
                 self.stderr.write(
                     self.style.WARNING(f"  download failed for {plan.label}: {exc}")
                 )
                 missed += 1
                 continue
 
-            rel = f"{FETCHED_DIRNAME}/{host}/{name}"
+            rel = f"{FETCHED_DIRNAME}/{host}/{plan.stem}.jpg"
             plan.setter(rel)
             credits[rel] = {
                 "attribution": photo.attribution,
@@ -221,6 +264,51 @@ class Command(BaseCommand):
             f"{brief_path} --reset"
         )
 
+    # ------------------------------------------------------------------ #
+    # Searching - one photo per plan, no photo twice
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _choose(plans: list, banks: list, cache, pool) -> list:
+        """The photo for each plan (None where no bank had one), in plan order.
+
+        Bank by bank in preference order: every distinct query still unanswered
+        is asked at once, then each plan takes its first hit not already
+        spent. Plans left without one move on to the next bank. A photo's key
+        names its bank, so a later bank's picks never collide with an earlier
+        one's - the result is the one a plan-by-plan search would reach.
+        """
+        photos = [None] * len(plans)
+        spent: set[str] = set()
+        pending = list(range(len(plans)))
+        for bank in banks:
+            if not pending:
+                break
+            asks = list(dict.fromkeys((plans[i].query, plans[i].orientation) for i in pending))
+            answers = dict(
+                zip(
+                    asks,
+                    pool.map(
+                        lambda ask: bank_hits(bank, ask[0], orientation=ask[1], cache=cache),
+                        asks,
+                    ),
+                )
+            )
+            left = []
+            for i in pending:
+                plan = plans[i]
+                photo = next(
+                    (hit for hit in answers[(plan.query, plan.orientation)] if hit.key not in spent),
+                    None,
+                )
+                if photo is None:
+                    left.append(i)
+                    continue
+                spent.add(photo.key)
+                photos[i] = photo
+            pending = left
+        return photos
+
     # ------------------------------------------------------------------ #
     # Planning - walk the brief and decide one query per image
     # ------------------------------------------------------------------ #
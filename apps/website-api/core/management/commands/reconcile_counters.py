@@ -0,0 +1,78 @@
+"""Check every System's stored counts against a fresh count.
+
+`SystemCounters` (see `core.counters`) is recounted by the receivers on every
+item, branch, event and picture write, and in full after a publish or a
+restore. A write that sends no signal - a `bulk_update` or `.update()` in a
+shell, a raw SQL fix, two writers racing past each other - leaves it off until
+the next write to the same model; the navbar then links to a menu that is
+gone, or the footer credits a bank whose last photo was replaced. This finds
+those rows, reports them, and with `--fix` rewrites them and drops the cached
+System payload that carried them.
+
+Read-only by default. Scope it to one tenant with `--host`. Meant to run
+periodically with `--fix` (a nightly CronJob running the API image).
+
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --host elpanbueno.com --fix
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import invalidate_system_payload
+from core.counters import fresh_counts, recount
+from core.models import System, SystemCounters
+
+
+class Command(BaseCommand):
+    help = "Verify the stored System counts against a fresh count."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            help="Only the System with this host (e.g. elpanbueno.com).",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Rewrite every drifted row from a fresh count.",
+        )
+
+    def handle(self, *args, **options):
+        rows = SystemCounters.objects.order_by("pk")
+
+        host = options.get("host")
+        if host:
+            system = System.objects.filter(host=host).first()
+            if system is None:
+                raise CommandError(f"No System with host {host!r}.")
+            rows = rows.filter(system=system)
+
+        fix = options["fix"]
+        checked = drifted = 0
+
+        for row in rows.iterator():
+            checked += 1
+            expected = fresh_counts(row.system_id)
+            wrong = {
+                field: (getattr(row, field), value)
+                for field, value in expected.items()
+                if getattr(row, field) != value
+            }
+            if not wrong:
+                continue
+            drifted += 1
+            self.stderr.write(self.style.WARNING(
+                f"system {row.system_id}: "
+                + ", ".join(f"{field} says {stored}, count says {value}" for field, (stored, value) in wrong.items())
+            ))
+            if fix:
+                recount(row.system_id)
+                invalidate_system_payload(row.system_id)
+
+        self.stdout.write(f"checked {checked} System(s)")
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("every stored count matches"))
+        elif fix:
+            self.stdout.write(self.style.SUCCESS(f"rewrote {drifted} drifted row(s)"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{drifted} row(s) drifted - re-run with --fix"))
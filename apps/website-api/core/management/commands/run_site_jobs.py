@@ -0,0 +1,110 @@
+"""Run queued backup and restore jobs (`core.models.SiteJob`), and render pictures.
+
+The worker half of `core.jobs`: claim the oldest queued job, run it, repeat;
+sleep when the queue is empty. Runs as its own container beside gunicorn in
+every API pod (see helm/templates/deployment.yaml) - the claim skips rows
+another worker holds, so one per pod is safe and a second pod is spare
+capacity, not a double run.
+
+SIGTERM is honoured between jobs, not during one: a pod being replaced lets the
+job in hand finish (a restore is one transaction, so being killed part-way only
+costs time, never data), and `fail_stale_jobs` reclaims the row of a worker that
+was killed anyway.
+
+An idle worker renders responsive picture sets (`core.renditions`) in batches,
+when an upload asked for it or every `SWEEP_SECONDS` otherwise, and goes back to
+the queue between batches - a catalog backfill never holds a backup up for more
+than one batch. The same pass writes the QR codes of orders placed since the
+last one (`orders.services.qr.render_pending`), which checkout no longer waits
+on.
+
+    python manage.py run_site_jobs
+    python manage.py run_site_jobs --once     # drain the queue (and pending renders) and exit
+"""
+
+import signal
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core import renditions
+from core.jobs import claim_next, fail_stale_jobs, run_job
+from orders.services import qr
+
+
+class Command(BaseCommand):
+    help = "Run queued site backup and restore jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run every queued job, then exit instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=2.0,
+            help="Seconds between looks at an empty queue (default 2).",
+        )
+
+    def handle(self, *args, **options):
+        poll = options["poll"]
+        if poll <= 0:
+            raise CommandError("--poll must be positive.")
+
+        self._stopping = False
+        self._swept_at = None
+        signal.signal(signal.SIGTERM, self._stop)
+
+        while not self._stopping:
+            # Between jobs only: a long-lived process otherwise keeps a
+            # connection the database has long since dropped.
+            close_old_connections()
+            stale = fail_stale_jobs()
+            if stale:
+                self.stderr.write(self.style.WARNING(f"failed {stale} job(s) abandoned by a dead worker"))
+
+            job = claim_next()
+            if job is None:
+                if self._render(force=options["once"]):
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(poll)
+                continue
+
+            self.stdout.write(f"{job.kind} #{job.pk} for system {job.system_id}: running")
+            job = run_job(job)
+            style = self.style.SUCCESS if job.status == job.STATUS_SUCCEEDED else self.style.WARNING
+            self.stdout.write(style(f"{job.kind} #{job.pk}: {job.status}"))
+
+    def _render(self, force=False) -> int:
+        """One batch of stale pictures and order codes, if any are due; returns how many."""
+        due = (
+            force
+            or self._swept_at is None
+            or time.monotonic() - self._swept_at >= renditions.SWEEP_SECONDS
+            or cache.get(renditions.DIRTY_KEY)
+        )
+        if not due:
+            return 0
+        # Cleared before the pass, so an upload landing during it re-arms it.
+        cache.delete(renditions.DIRTY_KEY)
+        done = renditions.render_pending()
+        codes = qr.render_pending()
+        if done >= renditions.BATCH or codes >= qr.BATCH:
+            # More may be waiting; come straight back after the queue.
+            renditions.request_render()
+        else:
+            self._swept_at = time.monotonic()
+        if done:
+            self.stdout.write(f"rendered {done} picture(s)")
+        if codes:
+            self.stdout.write(f"wrote {codes} order QR code(s)")
+        return done + codes
+
+    def _stop(self, signum, frame):
+        self._stopping = True
@@ -0,0 +1,63 @@
+"""Send the transactional email queue (`core.models.OutboundEmail`).
+
+The worker half of `core.outbox`: claim a batch of due messages, send it over
+one SMTP connection, repeat; sleep when nothing is due. Runs as its own
+container beside gunicorn (see helm/templates/deployment.yaml) rather than
+inside `run_site_jobs`, whose loop can be busy with one restore for an hour -
+a verification email cannot wait behind that. The claim skips rows another
+worker holds, so one per pod is safe.
+
+SIGTERM is honoured between batches: the batch in hand is sent and recorded,
+so a message is never both delivered and left queued to be sent again.
+
+    python manage.py send_queued_email
+    python manage.py send_queued_email --once     # send everything due, then exit
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.outbox import BATCH, send_due
+
+
+class Command(BaseCommand):
+    help = "Send queued transactional email."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send every message that is due, then exit instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=2.0,
+            help="Seconds between looks at an empty queue (default 2).",
+        )
+
+    def handle(self, *args, **options):
+        poll = options["poll"]
+        if poll <= 0:
+            raise CommandError("--poll must be positive.")
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+
+        while not self._stopping:
+            close_old_connections()
+            claimed = send_due()
+            if claimed:
+                self.stdout.write(f"sent a batch of {claimed} message(s)")
+            if claimed >= BATCH:
+                # A full batch: more are probably due already.
+                continue
+            if options["once"]:
+                break
+            time.sleep(poll)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
@@ -0,0 +1,270 @@
+"""Per-request cost accounting: queries, database time, cache hits, serializer time.
+
+gunicorn's access log (see gunicorn.conf.py) says *that* a request was slow. It
+cannot say why - whether the view ran 40 queries, waited on one slow one, missed
+every cache key it read, or spent its time turning rows into JSON. This module
+answers that for every request, from `RequestMetricsMiddleware`:
+
+* **Server-Timing header** - `db;dur=12.4;desc="9 queries", cache;desc="3 hit /
+  1 miss", ser;dur=8.1, app;dur=31.0`. Browsers show it in the network panel's
+  Timing tab, so a slow storefront page can be attributed from devtools without
+  a shell on the pod. ⚠ Only with `REQUEST_METRICS_HEADER` (on with DEBUG): the
+  numbers describe the backend to whoever asks, so production keeps them to
+  the log line.
+* **One structured log line** per request on the `core.metrics` logger, a JSON
+  object with the same numbers plus the view's dotted path - the thing to grep
+  for when the question is "which view" rather than "which URL".
+* **Budgets.** A view may declare what it is allowed to cost:
+
+      class ProductListView(APIView):
+          request_budget = {"queries": 6, "ms": 250}
+
+  Going over is logged as a warning in production. Under test
+  (`REQUEST_BUDGETS_ENFORCE`, set by `website_api.test_runner`) a query budget
+  overrun raises `BudgetExceeded` out of the test client, so a change that
+  reintroduces an N+1 fails the suite of whichever test happens to render that
+  view. ⚠ The `ms` budget is never
+  enforced, only logged: wall-clock time on a shared CI runner is noise, and a
+  test that fails when the machine is busy gets deleted, not fixed.
+
+How each number is collected:
+
+* Queries and their time: a `connection.execute_wrapper` around the view, on
+  every configured database.
+* Cache hits and misses: the cache backends below, which are the stock ones with
+  `get` / `get_many` counting into the current request. Only reads are counted;
+  a write neither hits nor misses.
+* Serializer time: DRF's `to_representation`, timed at the outermost call only
+  (nested serializers are inside it already). Installed from `CoreConfig.ready`.
+
+Everything is kept in a context variable, so gthread's threads (and anything
+running outside a request - the job worker, a management command) never see
+another request's counters, and code outside a request pays one lookup.
+"""
+
+import contextvars
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache as _LocMemCache
+from django.db import connections
+from django_redis.cache import RedisCache as _RedisCache
+
+logger = logging.getLogger(__name__)
+
+# The probes run every 10s per pod; logged, they bury the traffic this exists
+# to explain (gunicorn.conf.py drops them from the access log for the same reason).
+_QUIET_PATHS = ("/healthz/", "/readyz/")
+
+_MISSING = object()
+
+
+class BudgetExceeded(AssertionError):
+    """A view ran more queries than its `request_budget` allows (tests only)."""
+
+
+class RequestMetrics:
+    """What one request has cost so far."""
+
+    __slots__ = (
+        "started", "db_queries", "db_seconds", "cache_hits", "cache_misses",
+        "serializer_seconds", "_serializer_depth", "_in_get_many",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_seconds = 0.0
+        self._serializer_depth = 0
+        self._in_get_many = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # `execute_wrapper` signature: time the query, however it ends.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+    def as_dict(self, elapsed):
+        return {
+            "ms": round(elapsed * 1000, 1),
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_seconds * 1000, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "serializer_ms": round(self.serializer_seconds * 1000, 1),
+        }
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> RequestMetrics | None:
+    """The running request's metrics, or None outside a request."""
+    return _current.get()
+
+
+# --------------------------------------------------------------------------- #
+# Cache backends
+# --------------------------------------------------------------------------- #
+
+class _CountingCacheMixin:
+    """Counts `get` / `get_many` reads into the current request.
+
+    `BaseCache.get_many` (LocMem's) is a loop over `get`, so a `get_many`
+    counts itself and silences the `get`s it makes; django-redis's is one
+    MGET and never calls `get` at all.
+    """
+
+    def get(self, key, default=None, *args, **kwargs):
+        value = super().get(key, _MISSING, *args, **kwargs)
+        metrics = _current.get()
+        if metrics is not None and not metrics._in_get_many:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None or metrics._in_get_many:
+            return super().get_many(keys, *args, **kwargs)
+        keys = list(keys)
+        metrics._in_get_many = True
+        try:
+            found = super().get_many(keys, *args, **kwargs)
+        finally:
+            metrics._in_get_many = False
+        metrics.cache_hits += len(found)
+        metrics.cache_misses += len(set(keys)) - len(found)
+        return found
+
+
+class LocMemCache(_CountingCacheMixin, _LocMemCache):
+    """Django's local-memory cache, counted. Development and tests."""
+
+
+class RedisCache(_CountingCacheMixin, _RedisCache):
+    """django-redis' cache, counted. Production."""
+
+
+# --------------------------------------------------------------------------- #
+# Serializer timing
+# --------------------------------------------------------------------------- #
+
+def _timed(to_representation):
+    def wrapper(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return to_representation(self, *args, **kwargs)
+        outermost = metrics._serializer_depth == 0
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return to_representation(self, *args, **kwargs)
+        finally:
+            metrics._serializer_depth -= 1
+            if outermost:
+                metrics.serializer_seconds += time.perf_counter() - started
+
+    wrapper.__wrapped__ = to_representation
+    wrapper._request_metrics = True
+    return wrapper
+
+
+def install_serializer_timing():
+    """Time DRF serialization per request. Idempotent; see the module docstring."""
+    from rest_framework import serializers
+
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        method = cls.__dict__["to_representation"]
+        if not getattr(method, "_request_metrics", False):
+            cls.to_representation = _timed(method)
+
+
+# --------------------------------------------------------------------------- #
+# Middleware
+# --------------------------------------------------------------------------- #
+
+def _view_path(request):
+    match = getattr(request, "resolver_match", None)
+    return match._func_path if match is not None else None
+
+
+def _view_budget(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    view = getattr(match.func, "view_class", None) or getattr(match.func, "cls", None) or match.func
+    return getattr(view, "request_budget", None)
+
+
+def server_timing(values) -> str:
+    """The `Server-Timing` value for one request's `RequestMetrics.as_dict`."""
+    return ", ".join([
+        f'db;dur={values["db_ms"]};desc="{values["db_queries"]} queries"',
+        f'cache;desc="{values["cache_hits"]} hit / {values["cache_misses"]} miss"',
+        f'ser;dur={values["serializer_ms"]}',
+        f'app;dur={values["ms"]}',
+    ])
+
+
+class RequestMetricsMiddleware:
+    """Collect `RequestMetrics` for a request, then report and police them.
+
+    Placed first in `MIDDLEWARE`, so the numbers cover every other middleware
+    too - the session and auth lookups are part of what a request costs.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        values = metrics.as_dict(time.perf_counter() - metrics.started)
+        view = _view_path(request)
+
+        if getattr(settings, "REQUEST_METRICS_HEADER", False):
+            response["Server-Timing"] = server_timing(values)
+        if request.path not in _QUIET_PATHS:
+            logger.info(json.dumps({
+                "view": view, "method": request.method, "path": request.path,
+                "status": response.status_code, **values,
+            }))
+
+        budget = _view_budget(request)
+        if budget:
+            self._police(view, budget, values)
+        return response
+
+    def _police(self, view, budget, values):
+        over = []
+        too_many = "queries" in budget and values["db_queries"] > budget["queries"]
+        if too_many:
+            over.append(f'{values["db_queries"]} queries (budget {budget["queries"]})')
+        if "ms" in budget and values["ms"] > budget["ms"]:
+            over.append(f'{values["ms"]} ms (budget {budget["ms"]})')
+        if not over:
+            return
+        message = f"{view} over budget: {', '.join(over)}"
+        logger.warning(message)
+        if too_many and getattr(settings, "REQUEST_BUDGETS_ENFORCE", False):
+            raise BudgetExceeded(message)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-18 09:11
+
+import core.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0074_companyhighlight_aspect_ratio_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enabled', models.BooleanField(default=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('kind', models.CharField(choices=[('backup', 'Backup'), ('restore', 'Restore')], max_length=16)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='queued', max_length=16)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('upload', models.FileField(blank=True, max_length=255, upload_to=core.models.backup_upload_path)),
+                ('progress', models.JSONField(blank=True, default=dict)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('backup', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='core.sitebackup')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='site_jobs', to=settings.AUTH_USER_MODEL)),
+                ('system', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='site_jobs', to='core.system')),
+            ],
+            options={
+                'verbose_name': 'Site Job',
+                'verbose_name_plural': 'Site Jobs',
+                'ordering': ['-created'],
+                'indexes': [models.Index(fields=['status', 'created'], name='site_job_claim')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0077_outbound_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemCounters',
+            fields=[
+                ('system', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='core.system')),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('service_count', models.PositiveIntegerField(default=0)),
+                ('menu_item_count', models.PositiveIntegerField(default=0)),
+                ('branch_count', models.PositiveIntegerField(default=0)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('stock_images', models.JSONField(blank=True, default=dict)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'System Counters',
+                'verbose_name_plural': 'System Counters',
+            },
+        ),
+    ]
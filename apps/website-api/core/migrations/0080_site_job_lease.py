@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0079_outbound_email_sending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitejob',
+            name='lease_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
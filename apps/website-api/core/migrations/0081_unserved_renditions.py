@@ -0,0 +1,66 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:09
+
+import logging
+
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+UNSERVED = ('companyhighlight', 'companyhighlightitem', 'event', 'eventimage', 'homepageflyer', 'successstory', 'successstoryimage')
+
+
+def delete_rendered_files(apps, schema_editor):
+    """Delete the sets rendered for these tables before the column goes.
+
+    Nothing renders them any more (`core.renditions.SERVED`), and once the
+    column is dropped nothing would know the files were there.
+    """
+    for name in UNSERVED:
+        model = apps.get_model('core', name)
+        storage = model._meta.get_field('image').storage
+        for data in model.objects.exclude(renditions={}).values_list('renditions', flat=True).iterator():
+            for files in (data.get('files') or {}).values():
+                for path in files.values():
+                    try:
+                        storage.delete(path)
+                    except OSError as exc:
+                        logger.warning('could not delete rendition %s (%s)', path, exc)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0080_site_job_lease'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_rendered_files, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='companyhighlight',
+            name='renditions',
+        ),
+        migrations.RemoveField(
+            model_name='companyhighlightitem',
+            name='renditions',
+        ),
+        migrations.RemoveField(
+            model_name='event',
+            name='renditions',
+        ),
+        migrations.RemoveField(
+            model_name='eventimage',
+            name='renditions',
+        ),
+        migrations.RemoveField(
+            model_name='homepageflyer',
+            name='renditions',
+        ),
+        migrations.RemoveField(
+            model_name='successstory',
+            name='renditions',
+        ),
+        migrations.RemoveField(
+            model_name='successstoryimage',
+            name='renditions',
+        ),
+    ]
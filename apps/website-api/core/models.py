@@ -257,7 +257,6 @@ def picture_mixin(max_width: int, quality: int = 85):
             quality=quality, # type: ignore
             upload_to=picture,
         )
-
         class Meta:
             abstract = True
 
@@ -276,6 +275,23 @@ RegularPicture = picture_mixin(sizes.REGULAR)            # stories, highlights,
 LargePicture = picture_mixin(sizes.LARGE, quality=90)    # hero images, full-bleed
 
 
+class RenderedPicture(models.Model):
+    """A picture whose responsive set is rendered (`core.renditions.SERVED`).
+
+    Mixed into the picture models a read serializer hands ``image_srcset`` out
+    for, and only those: a column on every picture table would be a set nobody
+    renders.
+    """
+
+    # The responsive set rendered from `image` by the background worker -
+    # widths, WebP/AVIF - and the `image` name it was rendered from, which is
+    # how a stale set is told apart. Written only by `core.renditions`.
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
 class Brand(Common):
     name = models.CharField(max_length=255, null=False, blank=False)
     slug = models.SlugField(max_length=255, unique=True)
@@ -301,7 +317,7 @@ class Brand(Common):
         return self.name
 
 
-class Buyable(StandardPicture):
+class Buyable(StandardPicture, RenderedPicture):
     """
     Abstract base for all buyable items (products, services, meals, houses, cars).
 
@@ -2206,3 +2222,212 @@ class SiteBackup(Common):
     def total_records(self) -> int:
         counts = self.record_counts or {}
         return sum(v for v in counts.values() if isinstance(v, int))
+
+
+class SiteJob(Common):
+    """One backup or restore, queued by the CMS and run by `run_site_jobs`.
+
+    Both used to run inside the request that asked for them, which held a
+    gunicorn worker for as long as it took to zip or unpack a whole media volume
+    - minutes for a photo-heavy tenant, against a 600s timeout. The request now
+    writes this row and returns; a worker process claims it, runs it, and writes
+    the outcome back. The row is the queue: no broker, nothing to deploy beyond
+    the worker container.
+
+    `progress` is the last per-section snapshot the worker flushed (see
+    `core.jobs`); while the job runs the live one is in the cache, because a
+    restore runs inside one transaction and nothing it writes to this row would
+    be visible before it commits.
+    """
+
+    KIND_BACKUP = "backup"
+    KIND_RESTORE = "restore"
+    KIND_CHOICES = [
+        (KIND_BACKUP, "Backup"),
+        (KIND_RESTORE, "Restore"),
+    ]
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+        (STATUS_CANCELLED, "Cancelled"),
+    ]
+    FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+    system = models.ForeignKey(
+        "core.System",
+        on_delete=models.CASCADE,
+        related_name="site_jobs",
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+
+    # What the request asked for: backup {name, sections}; restore
+    # {sections, mode}. Validated before the row is written.
+    params = models.JSONField(default=dict, blank=True)
+    # A restore's uploaded archive, parked in storage until the worker applies
+    # it and then deleted. Same path and same secrecy as a backup archive.
+    upload = models.FileField(upload_to=backup_upload_path, max_length=255, blank=True)
+    # The restore point a restore reads, or the one a backup produced.
+    backup = models.ForeignKey(
+        SiteBackup,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="jobs",
+    )
+
+    # {"<section>": {"done": n, "total": m}}
+    progress = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    # Operator-facing; the traceback goes to the log, never here.
+    error = models.TextField(blank=True, default="")
+    # Set by the cancel endpoint on a running job; the worker polls it between
+    # rows and abandons the job at the next check.
+    cancel_requested = models.BooleanField(default=False)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    # While running: renewed by the worker's heartbeat (`core.jobs`); a job
+    # whose lease has run out has lost its worker.
+    lease_until = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        "auth.User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="site_jobs",
+    )
+
+    class Meta:
+        verbose_name = "Site Job"
+        verbose_name_plural = "Site Jobs"
+        ordering = ["-created"]
+        indexes = [
+            # The worker's claim: the oldest queued job.
+            models.Index(fields=["status", "created"], name="site_job_claim"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in self.FINISHED_STATUSES
+
+
+class OutboundEmail(Common):
+    """One transactional email, queued by the request and sent by `send_queued_email`.
+
+    Order confirmations, contact notifications and account emails used to be
+    sent inside the request that caused them: a fresh SMTP connection per
+    message, and the whole round trip - seconds on a slow relay, up to
+    `EMAIL_TIMEOUT` on a stalled one - spent holding the checkout, the signup
+    or the Stripe webhook Stripe is timing. The request now writes this row
+    (in its own transaction, so an order that rolls back takes its
+    confirmation with it) and a worker sends the queue in batches over one
+    connection. See `core.outbox`.
+
+    `message` is the pickled `EmailMessage`, attachments and all: the worker
+    sends exactly what the request built. `subject` and `recipients` are copies
+    for the admin list and the log, never read back to send.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    # The tenant the email is on behalf of, when there is one. SET_NULL: the
+    # log of what went out outlives a deleted site.
+    system = models.ForeignKey(
+        "core.System",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="outbound_emails",
+    )
+    # What kind of email this is ("order:confirmation", "users:verification"),
+    # for the log lines and for an operator filtering the admin list.
+    label = models.CharField(max_length=64)
+    subject = models.CharField(max_length=255, blank=True, default="")
+    recipients = models.JSONField(default=list, blank=True)
+    message = models.BinaryField()
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When the worker may next try it: now for a new email, later after each
+    # failed attempt (`core.outbox.RETRY_BASE`, doubling). While `sending`, the
+    # end of the claiming worker's lease (`core.outbox.LEASE`).
+    next_attempt_at = models.DateTimeField(default=django_tz.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # The last SMTP error, for the operator; cleared again once it is sent.
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+        ordering = ["-created"]
+        indexes = [
+            # The worker's claim: queued rows that are due, and sending rows
+            # whose lease ran out, oldest first.
+            models.Index(fields=["status", "next_attempt_at"], name="outbound_email_claim"),
+        ]
+
+    def __str__(self):
+        return f"{self.label} #{self.pk} ({self.status})"
+
+
+class SystemCounters(models.Model):
+    """The counts `SystemSerializer` reports, stored instead of counted.
+
+    The System payload carries how many enabled products, services, dishes,
+    branches and events a tenant has (the navbar's links are built from them)
+    and how many stock-bank images it still shows (the footer credit). Each
+    was a COUNT - the stock images one per picture model, a score of queries -
+    and every catalog write drops that payload, so they were run again on the
+    next page view after any CMS save. This row is kept current by the same
+    receivers that drop the payload (`core.counters`), and the payload is
+    rebuilt from one read of it.
+
+    `stock_images` is ``{model label: attributed rows}``: kept per model so
+    that a write to one recounts that model's share alone. The System's own
+    hero/about pair is read off the System row and is not stored here.
+
+    Counts that drift (a bulk write that sends no signal) are put back by
+    `manage.py reconcile_counters`.
+    """
+
+    system = models.OneToOneField(
+        "core.System",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="counters",
+    )
+    product_count = models.PositiveIntegerField(default=0)
+    service_count = models.PositiveIntegerField(default=0)
+    menu_item_count = models.PositiveIntegerField(default=0)
+    branch_count = models.PositiveIntegerField(default=0)
+    event_count = models.PositiveIntegerField(default=0)
+    stock_images = models.JSONField(default=dict, blank=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "System Counters"
+        verbose_name_plural = "System Counters"
+
+    def __str__(self):
+        return f"counters of system {self.system_id}"
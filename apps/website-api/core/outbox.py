@@ -0,0 +1,232 @@
+"""
+outbox - transactional email, queued by the request and sent by a worker.
+
+The request builds the message exactly as before and hands it to `enqueue`,
+which writes an `OutboundEmail` row and returns. `manage.py send_queued_email`
+claims due rows in batches and sends each batch over **one** SMTP connection -
+a login and a TLS handshake per batch, not per message.
+
+The database is the queue, as it is for `core.jobs`: a claim is
+`SELECT ... FOR UPDATE SKIP LOCKED`, so a worker in every pod drains the same
+table without sending a message twice, and the row is written in the caller's
+transaction - a checkout that rolls back never leaves a confirmation behind,
+and one that commits cannot lose its email to a crash between the two.
+
+The claim is its own short transaction: it marks the batch `sending` under a
+`LEASE` and commits. Building the messages, the SMTP session and the sends all
+happen after it, holding no row lock and no open transaction - a stalled relay
+must not pin a database connection, nor keep the locks a builder takes (an
+order confirmation's) from checkout. Outcomes are written once the batch is
+done. A worker that dies mid-batch leaves its rows `sending`; they are claimed
+again when the lease runs out, so a message the relay had already taken may go
+out twice - never not at all.
+
+A message the relay refuses is tried again later, `RETRY_BASE` after the first
+failure and doubling from there; after `MAX_ATTEMPTS` it is marked failed and
+logged, and stays in the table for an operator to read. A connection that
+cannot be opened at all costs the whole batch one attempt.
+
+A message can also be queued **unbuilt**: a `Deferred` names a function and
+its arguments, and the worker calls it to build the message just before the
+batch is sent. That is for an email whose making costs more than its sending -
+an order confirmation renders the order's QR code and the tenant's badges and
+writes the former to storage - so the request that queues it pays for neither.
+A build that raises is retried like a refused send.
+
+With `EMAIL_OUTBOX_SEND_INLINE` on (tests, and a development machine without a
+worker running) `enqueue` sends the row it wrote at once, through the same
+code the worker uses - so the test suite still sees `mail.outbox` fill, and
+still exercises the path production takes.
+"""
+
+import logging
+import pickle
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+#: Messages claimed, and sent over one connection, per batch.
+BATCH = 50
+
+#: How long a claimed batch is the claiming worker's. Well past a whole batch
+#: at `EMAIL_TIMEOUT` a message; a batch still `sending` after it has lost its
+#: worker.
+LEASE = timedelta(minutes=15)
+
+#: The first retry is this long after a failure; each later one twice the last.
+RETRY_BASE = timedelta(minutes=1)
+
+#: Attempts before a message is given up on - the last one about half an hour
+#: after the first, long enough to ride out a relay restart.
+MAX_ATTEMPTS = 6
+
+
+class Deferred:
+    """A message the worker builds: `builder` (a dotted path) called with `args`.
+
+    The builder returns the `EmailMessage` to send. Its arguments are pickled
+    into the row, so they should be ids and plain values, not model instances -
+    the worker reads the rows fresh. `to` and `subject` are what the row shows
+    until it is built.
+    """
+
+    def __init__(self, builder: str, *args, to, subject: str = ""):
+        self.builder = builder
+        self.args = args
+        self.to = list(to)
+        self.subject = subject
+
+    def recipients(self):
+        return self.to
+
+    def build(self):
+        return import_string(self.builder)(*self.args)
+
+
+def enqueue(message, *, label: str, system=None) -> OutboundEmail:
+    """Queue `message` (any `EmailMessage`, or a `Deferred`) to be sent by the worker."""
+    if not isinstance(message, Deferred):
+        # A connection is a socket; it has no business in the pickle.
+        message.connection = None
+    row = OutboundEmail.objects.create(
+        system=system,
+        label=label,
+        subject=str(message.subject or "")[:255],
+        recipients=message.recipients(),
+        message=pickle.dumps(message),
+    )
+    if getattr(settings, "EMAIL_OUTBOX_SEND_INLINE", False):
+        _send([row])
+    return row
+
+
+def send_due(limit: int = BATCH) -> int:
+    """Send one batch of due messages; returns how many were claimed."""
+    rows = claim(limit)
+    if rows:
+        _send(rows)
+    return len(rows)
+
+
+def claim(limit: int = BATCH) -> list[OutboundEmail]:
+    """Mark up to `limit` due messages `sending` under a lease, and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=OutboundEmail.STATUS_QUEUED) | Q(status=OutboundEmail.STATUS_SENDING),
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "pk")[:limit]
+        )
+        for row in rows:
+            row.status = OutboundEmail.STATUS_SENDING
+            row.next_attempt_at = now + LEASE
+            row.modified = now
+        OutboundEmail.objects.bulk_update(rows, ["status", "next_attempt_at", "modified"])
+    return rows
+
+
+def _send(rows):
+    # Everything is built before the connection opens: a slow build must not
+    # leave an idle SMTP session for the relay to drop.
+    ready = []
+    for row in rows:
+        message = _message(row)
+        if message is not None:
+            ready.append((row, message))
+
+    connection = get_connection()
+    opened = _open(connection, [row for row, _ in ready])
+    try:
+        for at, (row, message) in enumerate(ready):
+            if not opened:
+                break
+            try:
+                connection.send_messages([message])
+            except Exception as exc:
+                _retry(row, exc)
+                # The connection may be what failed; the rest get a fresh one.
+                connection.close()
+                opened = _open(connection, [later for later, _ in ready[at + 1:]])
+                continue
+            row.status = OutboundEmail.STATUS_SENT
+            row.sent_at = timezone.now()
+            row.error = ""
+    finally:
+        connection.close()
+
+    now = timezone.now()
+    for row in rows:
+        if row.status == OutboundEmail.STATUS_SENDING:
+            # Neither sent nor given up on: back in the queue for its retry.
+            row.status = OutboundEmail.STATUS_QUEUED
+        # `bulk_update` skips `auto_now`.
+        row.modified = now
+    OutboundEmail.objects.bulk_update(
+        rows, ["subject", "status", "attempts", "next_attempt_at", "sent_at", "error", "modified"],
+    )
+
+
+def _message(row):
+    """The message `row` holds, built if it was deferred; None if it cannot be had now."""
+    try:
+        message = pickle.loads(row.message)
+    except Exception as exc:
+        # Not something a retry fixes (a class that no longer exists).
+        _give_up(row, exc)
+        return None
+    if isinstance(message, Deferred):
+        # Inline, inside the caller's transaction, a savepoint: a build whose
+        # query failed would otherwise take that transaction down with it. The
+        # worker builds in autocommit, so whatever a builder writes (an order's
+        # QR code) holds its row lock for that statement alone.
+        guard = transaction.atomic() if transaction.get_connection().in_atomic_block else nullcontext()
+        try:
+            with guard:
+                message = message.build()
+        except Exception as exc:
+            logger.warning("Could not build %s email #%s", row.label, row.pk, exc_info=True)
+            _retry(row, exc)
+            return None
+        row.subject = str(message.subject or "")[:255]
+    return message
+
+
+def _open(connection, rows) -> bool:
+    """Open `connection`; on failure every row in `rows` spends an attempt."""
+    if not rows:
+        return False
+    try:
+        connection.open()
+    except Exception as exc:
+        for row in rows:
+            _retry(row, exc)
+        return False
+    return True
+
+
+def _retry(row, exc):
+    row.attempts += 1
+    if row.attempts >= MAX_ATTEMPTS:
+        _give_up(row, exc)
+        return
+    row.error = str(exc) or exc.__class__.__name__
+    row.next_attempt_at = timezone.now() + RETRY_BASE * 2 ** (row.attempts - 1)
+
+
+def _give_up(row, exc):
+    logger.error("Gave up on %s email #%s to %s: %s", row.label, row.pk, row.recipients, exc)
+    row.status = OutboundEmail.STATUS_FAILED
+    row.error = str(exc) or exc.__class__.__name__
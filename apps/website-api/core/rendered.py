@@ -0,0 +1,155 @@
+"""Payloads cached as the bytes they are sent as.
+
+A cached catalog list used to be the serializer's output - a list of a few
+hundred dicts - pickled into Redis. Every hit then unpickled that whole object
+graph and had DRF render it back to JSON, so a warm read still paid for two
+passes over every row. `RenderedJSON` is the payload rendered once, when it is
+built: the JSON bytes, the same bytes gzipped, and the ETag of the former
+(the gzipped body is sent under that tag with ``-gz`` added).
+A hit unpickles three byte strings and `rendered_response` sends one of them
+as the body - no renderer, no content negotiation, no hash.
+
+Building one does not hold the serialized list either. `json_array` turns rows
+into JSON one at a time, and `RenderedJSON` takes the chunks as they come,
+hashing and compressing each on its way in, so a miss keeps the bytes but never
+the list of dicts they came from.
+
+⚠ Only JSON, only for ``GET``: the browsable API is not offered for a rendered
+payload, and DRF's format suffixes do not reach it.
+
+A cache entry written before this existed holds the plain serializer output;
+`rendered_response` still answers that the old way until it expires.
+"""
+
+import hashlib
+import re
+import zlib
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+#: zlib's default. Higher levels cost several times the CPU on a rebuild for a
+#: few percent off the body.
+GZIP_LEVEL = 6
+
+# The same test Django's GZipMiddleware makes.
+_ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+_renderer = JSONRenderer()
+
+# Inside the quotes of the gzipped body's tag. A strong ETag names exact bytes,
+# and the two bodies of one payload are different bytes.
+_GZIP_ETAG_SUFFIX = '-gz"'
+
+
+def gzip_etag(etag):
+    """The tag of the gzipped body of the payload whose JSON is tagged ``etag``."""
+    return etag[:-1] + _GZIP_ETAG_SUFFIX
+
+
+def identity_etag(etag):
+    """``etag`` with the gzip suffix taken off, if it carries one."""
+    if etag.endswith(_GZIP_ETAG_SUFFIX):
+        return etag[: -len(_GZIP_ETAG_SUFFIX)] + '"'
+    return etag
+
+
+def encode(data):
+    """``data`` as the bytes DRF's `JSONRenderer` would have sent."""
+    if data is None:
+        # The renderer's "no content" - an empty body, not a JSON value.
+        return b"null"
+    return _renderer.render(data)
+
+
+def json_array(rows, represent):
+    """The chunks of a JSON array of ``represent(row)`` for each row, one row at a time."""
+    yield b"["
+    separator = b""
+    for row in rows:
+        yield separator + encode(represent(row))
+        separator = b","
+    yield b"]"
+
+
+def json_object(members):
+    """The chunks of a JSON object, each value a `RenderedJSON` or plain data."""
+    yield b"{"
+    separator = b""
+    for name, value in members.items():
+        body = value.body if isinstance(value, RenderedJSON) else encode(value)
+        yield separator + encode(name) + b":" + body
+        separator = b","
+    yield b"}"
+
+
+def _gzip():
+    # wbits 31: a gzip header and trailer around the deflate stream, which is
+    # what `Content-Encoding: gzip` means.
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+class RenderedJSON:
+    """A JSON payload rendered once: its body, that body gzipped, and its ETag.
+
+    Built from the chunks of its body (`json_array`, `json_object`). With
+    ``compress`` off the gzipped body is made the first time a client asks for
+    it - for a payload assembled per request, which most clients never want
+    uncompressed but which is not worth compressing for one that does.
+    """
+
+    __slots__ = ("body", "gzipped", "etag")
+
+    def __init__(self, chunks, compress=True):
+        digest = hashlib.sha1()
+        packer = _gzip() if compress else None
+        parts, packed = [], []
+        for chunk in chunks:
+            parts.append(chunk)
+            digest.update(chunk)
+            if packer is not None:
+                packed.append(packer.compress(chunk))
+        self.body = b"".join(parts)
+        self.gzipped = b"".join(packed) + packer.flush() if packer is not None else None
+        self.etag = '"%s"' % digest.hexdigest()
+
+    @classmethod
+    def of(cls, data):
+        """Rendered from data already serialized whole (a keyset page)."""
+        return cls([encode(data)])
+
+    def __getstate__(self):
+        return self.body, self.gzipped, self.etag
+
+    def __setstate__(self, state):
+        self.body, self.gzipped, self.etag = state
+
+    def gzip(self):
+        if self.gzipped is None:
+            packer = _gzip()
+            self.gzipped = packer.compress(self.body) + packer.flush()
+        return self.gzipped
+
+
+def rendered_response(request, payload):
+    """A 200 carrying ``payload``, gzipped when the client accepts it.
+
+    The ETag is the hash of the uncompressed body, with ``-gz`` added inside
+    the quotes when the gzipped body is sent (`gzip_etag`): a strong tag must
+    change when the bytes do. `core.conditional` remembers the plain tag and
+    matches either form. ``Vary: Accept-Encoding`` keeps caches from handing
+    either body to a client that asked for the other.
+    """
+    if not isinstance(payload, RenderedJSON):
+        return Response(payload)
+    if _ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+        response = HttpResponse(payload.gzip(), content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+        response["ETag"] = gzip_etag(payload.etag)
+    else:
+        response = HttpResponse(payload.body, content_type="application/json")
+        response["ETag"] = payload.etag
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
@@ -0,0 +1,255 @@
+"""
+renditions - responsive widths and modern formats of every stored picture.
+
+An upload is stored once, at its tier (``core.image_sizes``), by
+``ImageProcessingSerializer``. That one file used to be all a page could ask
+for, so a storefront card drew a 256 px tile from a 900-1200 px JPEG. This
+module renders each picture into the smaller tier widths it can fill
+(``WIDTHS``), as WebP - and as AVIF where the installed Pillow can encode it -
+and the read serializers hand the set to the browser as ``srcset`` data
+(``image_srcset``), which picks the smallest file that covers the slot. Only the
+catalog's pictures are rendered (``SERVED``): theirs are the payloads that
+carry the field.
+
+Rendering happens in the background worker (``run_site_jobs``), never in the
+request: a CMS save does the one resize it always did and returns. What tells
+the worker a picture needs rendering is the picture itself - ``renditions``
+records the ``image`` name it was rendered from, so a row whose ``image`` has
+moved on (a new upload, a restore, a seed) is stale by definition, whichever
+code path wrote it. Nothing has to remember to enqueue anything; an upload only
+nudges the worker to look now rather than on its next sweep.
+
+A stale set is never served: ``srcset`` returns None until the worker catches
+up, and the storefront falls back to the plain ``image`` URL. The rendition
+write is an UPDATE conditional on ``image`` being unchanged, so a render that
+raced a second upload is dropped rather than attached to the wrong photo, and
+it sends no signals - cached payloads pick the srcset up when they expire.
+
+A set's files go with the photo they were rendered from: replaced by the next
+render, and deleted by ``core.signals`` when the row is deleted or its image
+is cleared or replaced (`forget`, `forget_stale`).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+from PIL import Image, ImageOps
+
+from .image_sizes import MEDIUM, REGULAR, SMALL, STANDARD
+
+logger = logging.getLogger(__name__)
+
+# The tier widths a picture is rendered at, below its own width. Its own width
+# is always rendered too, so the largest candidate is never the original JPEG.
+WIDTHS = (SMALL, MEDIUM, STANDARD, REGULAR)
+
+# Preferred first; the serializer emits them in this order for <picture>.
+FORMATS = {
+    "avif": ("AVIF", {"quality": 55}),
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+}
+
+# An upload sets this so the worker does not wait for its next full sweep.
+DIRTY_KEY = "core:renditions:dirty"
+# How often an idle worker re-checks every picture table regardless - the net
+# for writers that never call `request_render` (seeds, restores, the admin).
+SWEEP_SECONDS = 300
+# Pictures rendered per worker pass, so a backfill of a whole catalog cannot
+# starve a backup queued behind it.
+BATCH = 25
+
+# The picture tables a read serializer hands ``image_srcset`` out for, and the
+# ones that carry the `renditions` column (`core.models.RenderedPicture`): a set
+# no payload serves is storage and encoder time spent for nothing. A table whose
+# serializer gains the field is added here and given the mixin.
+SERVED = (
+    "catalog.Product", "catalog.ProductImage",
+    "catalog.Service", "catalog.ServiceImage",
+    "catalog.MenuItem", "catalog.MenuItemImage",
+)
+
+
+def available_formats() -> dict:
+    """`FORMATS` narrowed to what this Pillow can encode.
+
+    AVIF needs Pillow 11.3+ (or the avif plugin); a build without it renders
+    WebP alone rather than failing every picture.
+    """
+    Image.init()
+    return {key: spec for key, spec in FORMATS.items() if spec[0] in Image.SAVE}
+
+
+def picture_models():
+    """The models whose pictures are rendered: `SERVED`, in that order."""
+    return [apps.get_model(label) for label in SERVED]
+
+
+def current(instance) -> dict | None:
+    """The instance's renditions, or None when they are not of its `image`."""
+    image = getattr(instance, "image", None)
+    data = getattr(instance, "renditions", None) or {}
+    if not image or data.get("source") != image.name or not data.get("files"):
+        return None
+    return data
+
+
+def srcset(instance, request=None) -> dict | None:
+    """``{"<format>": "<url> 256w, <url> 512w", ...}`` for the current set.
+
+    URLs are built like DRF's ImageField builds the `image` one: absolute when
+    there is a request, as stored otherwise.
+    """
+    data = current(instance)
+    if data is None:
+        return None
+    storage = instance.image.storage
+    out = {}
+    for key in FORMATS:
+        files = data["files"].get(key)
+        if not files:
+            continue
+        parts = []
+        for width, name in sorted(files.items(), key=lambda item: int(item[0])):
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            parts.append(f"{url} {width}w")
+        out[key] = ", ".join(parts)
+    return out or None
+
+
+def request_render():
+    """Tell the worker a picture was just written; see the module docstring."""
+    cache.set(DIRTY_KEY, 1, SWEEP_SECONDS)
+
+
+def _stale(model):
+    return (
+        model._default_manager.exclude(image="").exclude(image__isnull=True)
+        .alias(rendered_from=KT("renditions__source"))
+        .filter(Q(rendered_from__isnull=True) | ~Q(rendered_from=F("image")))
+    )
+
+
+def render_pending(limit: int = BATCH) -> int:
+    """Render up to `limit` stale pictures; returns how many were written."""
+    done = 0
+    for model in picture_models():
+        for instance in _stale(model).order_by("pk")[: limit - done]:
+            render(instance)
+            done += 1
+        if done >= limit:
+            break
+    return done
+
+
+def render(instance) -> dict:
+    """Render and attach one picture's set. Returns what was recorded.
+
+    A picture that cannot be read is recorded with its `error` and no files, so
+    it stops being stale - one corrupt upload must not be retried on every pass.
+    """
+    field = instance.image
+    source = field.name
+    previous = instance.renditions or {}
+    try:
+        with field.storage.open(source, "rb") as fh:
+            img = Image.open(BytesIO(fh.read()))
+            img.load()
+        img = ImageOps.exif_transpose(img)
+        data = {
+            "source": source,
+            "width": img.width,
+            "height": img.height,
+            "files": _write_set(field.storage, source, img),
+        }
+    except (OSError, ValueError) as exc:
+        logger.warning("renditions: %s #%s (%s) not rendered: %s",
+                       instance._meta.label, instance.pk, source, exc)
+        data = {"source": source, "error": str(exc)[:200], "files": {}}
+
+    written = type(instance)._default_manager.filter(pk=instance.pk, image=source).update(renditions=data)
+    if written:
+        # The set it replaces belonged to a photo this row no longer shows.
+        _delete_set(field.storage, previous, keep=data)
+        instance.renditions = data
+    else:
+        # The image changed while this one rendered; the new one is stale too
+        # and gets its own pass.
+        _delete_set(field.storage, data)
+    return data
+
+
+def forget(instance):
+    """Delete the set of a row that is gone (``post_delete``).
+
+    Nothing renders a deleted row again, so no later pass would replace - and
+    so remove - its files.
+    """
+    data = instance.renditions or {}
+    if data.get("files"):
+        _delete_set(instance.image.storage, data)
+
+
+def forget_stale(instance):
+    """Delete the set a saved row no longer shows, its `image` having moved on.
+
+    The worker replaces it when it renders the new image, but an image cleared
+    outright is never rendered again. Detached first, conditional on the set
+    still being the one recorded, so a render of the new image that landed in
+    between is left alone.
+    """
+    data = instance.renditions or {}
+    if not data.get("files") or current(instance) is not None:
+        return
+    detached = type(instance)._default_manager.filter(
+        pk=instance.pk, renditions__source=data.get("source"),
+    ).update(renditions={})
+    if detached:
+        _delete_set(instance.image.storage, data)
+        instance.renditions = {}
+
+
+def _write_set(storage, source, img) -> dict:
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or img.mode == "P" else "RGB")
+    widths = sorted({w for w in WIDTHS if w < img.width} | {img.width})
+    base = os.path.splitext(source)[0]
+    files: dict[str, dict[str, str]] = {}
+    for key, (fmt, options) in available_formats().items():
+        files[key] = {}
+        for width in widths:
+            if width == img.width:
+                frame = img
+            else:
+                frame = img.resize((width, max(1, round(img.height * width / img.width))),
+                                   Image.Resampling.LANCZOS)
+            out = BytesIO()
+            frame.save(out, format=fmt, **options)
+            # Beside the original, so it lands in the same tenant's bucket (the
+            # path is the routing key; see core/tenant_paths.py).
+            name = storage.save(f"{base}.w{width}.{key}", ContentFile(out.getvalue()))
+            files[key][str(width)] = name
+    return files
+
+
+def _delete_set(storage, data, keep=None):
+    kept = {
+        name for files in ((keep or {}).get("files") or {}).values() for name in files.values()
+    }
+    for files in (data.get("files") or {}).values():
+        for name in files.values():
+            if name in kept:
+                continue
+            try:
+                storage.delete(name)
+            except OSError as exc:
+                logger.warning("renditions: could not delete %s (%s)", name, exc)
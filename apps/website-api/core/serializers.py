@@ -8,8 +8,10 @@ from django.db import transaction
 from PIL import Image, ImageOps
 from rest_framework import serializers
 
-from . import image_sizes
+from . import image_sizes, renditions
 from .image_sizes import REGULAR, SMALL, MEDIUM, STANDARD, image_cfg
+from .counters import counters_for, stock_image_total
+from .jobs import live_progress
 from .models import (
     ASPECT_RATIO_CHOICES,
     DIVIDER_CHOICES,
@@ -26,6 +28,7 @@ from .models import (
     HomepageFlyer,
     ResourcePool,
     SiteBackup,
+    SiteJob,
     SocialPost,
     SuccessStory,
     SuccessStoryImage,
@@ -173,6 +176,35 @@ class ImageProcessingSerializer(serializers.Serializer):
         name = f"{base}.{_EXTENSIONS.get(fmt, 'jpg')}"
         image_field.save(name, ContentFile(output.read()), save=False)
         _apply_attribution(image_field, credit)
+        # The widths and WebP/AVIF copies are the worker's job, not this
+        # request's; see core/renditions.py.
+        renditions.request_render()
+
+
+class ImageSrcsetField(serializers.Field):
+    """Read-only ``image_srcset``: the picture's responsive set, or None.
+
+    ``{"avif": "<url> 256w, ...", "webp": "<url> 256w, ..."}`` - one ``srcset``
+    string per format, best first, for a ``<picture>`` whose ``<img>`` keeps
+    the plain ``image`` URL as its fallback. None until the background worker
+    has rendered the current ``image`` (see ``core.renditions``).
+
+    ``picture`` maps the serialized object to the row that owns the image, for
+    payloads whose ``image`` is borrowed (a buyable falling back to its first
+    gallery photo).
+    """
+
+    def __init__(self, picture=None, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.picture = picture
+
+    def to_representation(self, instance):
+        picture = self.picture(instance) if self.picture else instance
+        if picture is None:
+            return None
+        return renditions.srcset(picture, self.context.get("request"))
 
 
 def _apply_attribution(image_field, credit=None) -> None:
@@ -221,9 +253,9 @@ def _apply_attribution(image_field, credit=None) -> None:
     #
     # The cached System payload (which carries `stock_image_count`) is left to
     # the caller's own `instance.save(update_fields=["image"])` a line later -
-    # that fires post_save, which the receivers in `core/signals.py` are
-    # listening for. This UPDATE deliberately does not, since two invalidations
-    # per upload buy nothing.
+    # that fires post_save, on which the receivers in `core/signals.py` recount
+    # the stored share and drop the payload. This UPDATE deliberately does not,
+    # since two recounts per upload buy nothing.
     type(instance)._default_manager.filter(pk=instance.pk).update(
         **{base: text, url: href}
     )
@@ -1208,22 +1240,22 @@ class SystemSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         return request.build_absolute_uri(path) if request else path
 
+    # The counts are stored, not counted (`core.counters`): the whole set is one
+    # read of the tenant's `SystemCounters` row, kept current on write.
+
     def get_product_count(self, obj):
-        from catalog.models import Product
-        return Product.objects.filter(system=obj, enabled=True).count()
+        return counters_for(obj).product_count
 
     def get_service_count(self, obj):
-        from catalog.models import Service
-        return Service.objects.filter(system=obj, enabled=True).count()
+        return counters_for(obj).service_count
 
     def get_menu_item_count(self, obj):
-        from catalog.models import MenuItem
-        return MenuItem.objects.filter(system=obj, enabled=True).count()
+        return counters_for(obj).menu_item_count
 
     def get_branch_count(self, obj):
         # Drives whether the public Contact link appears (a Contact page is worth
         # showing once a tenant has a physical location or a contact email).
-        return obj.branches.filter(enabled=True).count()
+        return counters_for(obj).branch_count
 
     def get_event_count(self, obj):
         """Enabled events, **past ones included** - it decides whether the site
@@ -1235,17 +1267,11 @@ class SystemSerializer(serializers.ModelSerializer):
         this payload's correctness depend on the clock, which an hour-long cache
         cannot express. The landing slider does its own upcoming/past split.
         """
-        return obj.events.filter(enabled=True).count()
+        return counters_for(obj).event_count
 
     def get_stock_image_count(self, obj):
-        """Images still credited to a stock bank - see `core/stock_images.py`.
-
-        It runs one COUNT per picture model, which is only affordable because
-        this payload is cached for an hour and invalidated on write like every
-        other derived count here.
-        """
-        from core.stock_images import stock_image_count
-        return stock_image_count(obj)
+        """Images still credited to a stock bank - see `core/stock_images.py`."""
+        return stock_image_total(obj)
 
 
 _TEXT_FIELDS = [
@@ -2325,3 +2351,26 @@ class SiteBackupSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         path = f"/api/backups/{obj.pk}/download/"
         return request.build_absolute_uri(path) if request else path
+
+
+class SiteJobSerializer(serializers.ModelSerializer):
+    """Status of one queued backup or restore, as the CMS polls or streams it.
+
+    `progress` is the live snapshot while the job runs (see `core.jobs`).
+    `upload` is never exposed, for the same reason `SiteBackupSerializer` hides
+    `file`.
+    """
+
+    progress = serializers.SerializerMethodField()
+    backup_id = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = SiteJob
+        fields = [
+            "id", "kind", "status", "params", "progress", "result", "error",
+            "cancel_requested", "backup_id", "created", "started_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        return live_progress(obj)
@@ -15,6 +15,7 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 
 from core.media import absolute_media_url
+from core.outbox import enqueue
 from core.services.email_badges import attach_badges, badge_context
 
 
@@ -79,9 +80,11 @@ def _admin_emails(system):
 def send_contact_message_notification(message):
     """Email every admin of `message.system` that a new contact message arrived.
 
-    Best-effort: the caller has already saved the message, so a mail failure only
-    means no email went out - the message is still in the inbox. Returns the
-    number of recipients the email was sent to (0 if there were none)."""
+    Queued (`core.outbox`) rather than sent: the customer submitting the form
+    does not wait on the admins' mail server. Best-effort: the caller has
+    already saved the message, so a mail failure only means no email went out
+    - the message is still in the inbox. Returns the number of recipients the
+    email was queued for (0 if there were none)."""
     system = message.system
     recipients = _admin_emails(system)
     if not recipients:
@@ -131,7 +134,7 @@ def send_contact_message_notification(message):
     )
     email.attach_alternative(html_body, "text/html")
     attach_badges(email, system)
-    email.send(fail_silently=False)
+    enqueue(email, label="contact:notification", system=system)
     return len(recipients)
 
 
@@ -142,7 +145,8 @@ def send_contact_message_reply(message, body, subject=None):
     customer** (`message.email`), branded as the tenant, and sets `reply_to` to the
     tenant's admins so the customer's reply lands back in the inbox rather than the
     platform mailbox. Raises on a mail failure so the caller never records a reply
-    that did not actually go out."""
+    that did not actually go out - which is why this one is sent inline, not
+    through the outbox: the admin pressing "send" is told whether it went."""
     system = message.system
     brand = _tenant_brand(system)
     admin_recipients = _admin_emails(system)
@@ -27,6 +27,9 @@ a hole where the branding is.
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from collections import OrderedDict
 from email.mime.image import MIMEImage
 from io import BytesIO
 
@@ -71,6 +74,16 @@ _SUPERSAMPLE = 4
 # week-long TTL only ever expires an entry nothing is asking for any more.
 _CACHE_TTL = 60 * 60 * 24 * 7
 
+#: ``(field name, diameter) -> (png, kept until)`` in this process, least
+#: recently used first, in front of the shared cache. The worker building a
+#: run of one tenant's order emails then reads each badge from the cache once,
+#: not once per email. Kept briefly: a storage that overwrites a re-uploaded
+#: file under its old name would otherwise pin the old mark until a restart.
+_memo: OrderedDict = OrderedDict()
+_memo_lock = threading.Lock()
+_MEMO_KEPT = 128
+_MEMO_SECONDS = 600
+
 
 def _render(field, diameter):
     """The finished badge as PNG bytes: white disc, mark centred, clear corners.
@@ -128,18 +141,28 @@ def _badge(system, field_name, size):
         return None
 
     diameter = size * _SCALE
+    memo_key = (field.name, diameter)
+    with _memo_lock:
+        hit = _memo.get(memo_key)
+        if hit is not None and hit[1] > time.monotonic():
+            _memo.move_to_end(memo_key)
+            return hit[0]
+
     key = f"email-badge:{field.name}:{diameter}"
     png = cache.get(key)
-    if png is not None:
-        return png
-
-    try:
-        png = _render(field, diameter)
-    except Exception:
-        logger.exception("Could not build the email badge for %s", field_name)
-        return None
-
-    cache.set(key, png, _CACHE_TTL)
+    if png is None:
+        try:
+            png = _render(field, diameter)
+        except Exception:
+            logger.exception("Could not build the email badge for %s", field_name)
+            return None
+        cache.set(key, png, _CACHE_TTL)
+
+    with _memo_lock:
+        _memo[memo_key] = (png, time.monotonic() + _MEMO_SECONDS)
+        _memo.move_to_end(memo_key)
+        while len(_memo) > _MEMO_KEPT:
+            _memo.popitem(last=False)
     return png
 
 
@@ -28,15 +28,32 @@ separate quota, so a rate-limited run degrades instead of failing.
 prominent link to Pexels and the photographer's name where possible. Downloading
 the same photo by hand would owe nothing; pulling it through the API does. That
 is why every `Photo` carries a credit and why `BasePicture.attribution` exists.
+
+Every request goes through one pooled `requests.Session` (`_session`), so a run
+of searches and downloads reuses its TLS connections instead of opening one per
+call, and safely from several threads - `fetch_seed_images` fans out. Each bank
+API call also passes that bank's `_Throttle`: Pixabay allows 100 calls a minute
+and is paced to it; both banks' rate-limit headers, and a 429, park the bank
+until its window resets, and a parked bank fails fast (`ImageBankError`) so the
+caller falls through to the next one instead of waiting out an hour. Downloads
+come off the banks' CDNs, which are not metered, and are not throttled.
+
+`SearchCache` keeps a search's hits on disk, so a re-run of the seed fetcher
+does not spend quota on queries it has already asked.
 """
 
 from __future__ import annotations
 
+import json
 import logging
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +71,14 @@ _PER_PAGE = 30
 # from pulling an 8MP original and a lot of transfer to lose.
 _PEXELS_SIZE = "large"
 
+# Connections kept per host in the shared session: a few more than the seed
+# fetcher's default worker count, so no thread waits on the pool itself.
+_POOL_SIZE = 8
+
+# A bank that said "no more" without saying for how long is left alone this
+# many seconds.
+_DEFAULT_BACKOFF = 60
+
 # Pexels and Pixabay spell the same three orientations differently.
 _ORIENTATION = {
     PEXELS: {"landscape": "landscape", "portrait": "portrait", "square": "square"},
@@ -87,6 +112,97 @@ class ImageBankError(RuntimeError):
     """A bank refused, timed out, or is not configured."""
 
 
+# --------------------------------------------------------------------------- #
+# Transport: one pooled session, one throttle per bank
+# --------------------------------------------------------------------------- #
+
+_session_lock = threading.Lock()
+_shared_session: requests.Session | None = None
+
+
+def _session() -> requests.Session:
+    global _shared_session
+    with _session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _shared_session = session
+        return _shared_session
+
+
+class _Throttle:
+    """One bank's API budget, shared by every thread calling it.
+
+    `interval` spaces calls out to the bank's per-minute limit; the bank's own
+    headers say when the budget is spent, and until the reset they name the
+    bank is skipped outright. `reset_is_epoch`: Pexels sends the reset as a
+    UNIX time, Pixabay as seconds from now.
+    """
+
+    def __init__(self, bank: str, interval: float, reset_is_epoch: bool):
+        self.bank = bank
+        self.interval = interval
+        self.reset_is_epoch = reset_is_epoch
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._parked_until = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._parked_until:
+                raise ImageBankError(
+                    f"{self.bank} is rate-limited for another {self._parked_until - now:.0f}s"
+                )
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def observe(self, resp: requests.Response):
+        """Park the bank if `resp` says its budget is spent."""
+        headers = resp.headers
+        if resp.status_code == 429:
+            wait = _seconds(headers.get("Retry-After"))
+        elif headers.get("X-Ratelimit-Remaining", headers.get("X-RateLimit-Remaining")) == "0":
+            wait = _seconds(headers.get("X-Ratelimit-Reset", headers.get("X-RateLimit-Reset")))
+            if wait is not None and self.reset_is_epoch:
+                wait -= time.time()
+        else:
+            return
+        wait = _DEFAULT_BACKOFF if wait is None or wait <= 0 else wait
+        with self._lock:
+            self._parked_until = max(self._parked_until, time.monotonic() + wait)
+        logger.warning("image_banks: %s rate limit reached; skipping it for %.0fs", self.bank, wait)
+
+
+def _seconds(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Pexels meters by the hour (200 by default) and is left unpaced: a seed's few
+# dozen searches fit, and its headers park it when they would not. Pixabay
+# allows 100 calls a minute.
+_THROTTLES = {
+    PEXELS: _Throttle(PEXELS, interval=0.0, reset_is_epoch=True),
+    PIXABAY: _Throttle(PIXABAY, interval=0.6, reset_is_epoch=False),
+}
+
+
+def _api_get(bank: str, url: str, **kwargs) -> requests.Response:
+    """A GET against `bank`'s API, paced and metered by its throttle."""
+    throttle = _THROTTLES[bank]
+    throttle.acquire()
+    resp = _session().get(url, timeout=_SEARCH_TIMEOUT, **kwargs)
+    throttle.observe(resp)
+    return resp
+
+
 # --------------------------------------------------------------------------- #
 # Pexels
 # --------------------------------------------------------------------------- #
@@ -122,11 +238,11 @@ def _search_pexels(query: str, orientation: str | None) -> list[Photo]:
     params: dict = {"query": query, "per_page": _PER_PAGE}
     if orientation:
         params["orientation"] = _ORIENTATION[PEXELS].get(orientation, orientation)
-    resp = requests.get(
+    resp = _api_get(
+        PEXELS,
         "https://api.pexels.com/v1/search",
         params=params,
         headers={"Authorization": settings.PEXELS_API_KEY},
-        timeout=_SEARCH_TIMEOUT,
     )
     resp.raise_for_status()
     photos = [_pexels_photo(hit) for hit in resp.json().get("photos") or []]
@@ -136,10 +252,10 @@ def _search_pexels(query: str, orientation: str | None) -> list[Photo]:
 def _get_pexels(bank_id: str) -> Photo | None:
     if not settings.PEXELS_API_KEY:
         raise ImageBankError("PEXELS_API_KEY is not set")
-    resp = requests.get(
+    resp = _api_get(
+        PEXELS,
         f"https://api.pexels.com/v1/photos/{bank_id}",
         headers={"Authorization": settings.PEXELS_API_KEY},
-        timeout=_SEARCH_TIMEOUT,
     )
     if resp.status_code == 404:
         return None
@@ -183,9 +299,7 @@ def _search_pixabay(query: str, orientation: str | None) -> list[Photo]:
     }
     if orientation:
         params["orientation"] = _ORIENTATION[PIXABAY].get(orientation, "all")
-    resp = requests.get(
-        "https://pixabay.com/api/", params=params, timeout=_SEARCH_TIMEOUT
-    )
+    resp = _api_get(PIXABAY, "https://pixabay.com/api/", params=params)
     resp.raise_for_status()
     photos = [_pixabay_photo(hit) for hit in resp.json().get("hits") or []]
     return [photo for photo in photos if photo]
@@ -194,10 +308,10 @@ def _search_pixabay(query: str, orientation: str | None) -> list[Photo]:
 def _get_pixabay(bank_id: str) -> Photo | None:
     if not settings.PIXABAY_API_KEY:
         raise ImageBankError("PIXABAY_API_KEY is not set")
-    resp = requests.get(
+    resp = _api_get(
+        PIXABAY,
         "https://pixabay.com/api/",
         params={"key": settings.PIXABAY_API_KEY, "id": bank_id},
-        timeout=_SEARCH_TIMEOUT,
     )
     # Pixabay answers an id it does not have with a 400, where Pexels 404s. Both
     # mean the same thing here - the photo is gone - and the caller has a clearer
@@ -227,12 +341,94 @@ def configured_banks() -> list[str]:
     ]
 
 
+class SearchCache:
+    """What each bank answered for a query, kept in a JSON file across runs.
+
+    Keyed by bank, query and orientation. An empty answer is kept too - asking
+    again would spend quota to learn the same nothing - but a failure is not,
+    so the next run asks again. Entries older than `max_age` are asked again:
+    the banks' catalogues grow, and their download URLs do not live forever.
+    Safe to share between threads; nothing reaches the file until `save`.
+    """
+
+    def __init__(self, path, *, max_age: float = 30 * 24 * 3600):
+        self.path = Path(path)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        try:
+            self._entries = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as exc:
+            logger.warning("image_banks: ignoring unreadable search cache %s (%s)", self.path, exc)
+
+    @staticmethod
+    def _key(bank: str, query: str, orientation: str | None) -> str:
+        return f"{bank}|{orientation or ''}|{query.strip().lower()}"
+
+    def get(self, bank: str, query: str, orientation: str | None) -> list[Photo] | None:
+        with self._lock:
+            entry = self._entries.get(self._key(bank, query, orientation))
+        if entry is None or time.time() - entry.get("at", 0) > self.max_age:
+            return None
+        try:
+            return [Photo(**hit) for hit in entry["hits"]]
+        except (KeyError, TypeError):
+            return None
+
+    def put(self, bank: str, query: str, orientation: str | None, hits: list[Photo]):
+        entry = {"at": time.time(), "hits": [asdict(photo) for photo in hits]}
+        with self._lock:
+            self._entries[self._key(bank, query, orientation)] = entry
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries, indent=1, sort_keys=True))
+            tmp.replace(self.path)
+            self._dirty = False
+
+
+def bank_hits(
+    bank: str,
+    query: str,
+    *,
+    orientation: str | None = None,
+    cache: SearchCache | None = None,
+) -> list[Photo]:
+    """One bank's hits for `query`, from `cache` when it has them; [] on failure.
+
+    A bank that is down, rate-limited or unconfigured must not fail the whole
+    seed - the next one, and ultimately the placeholder pool, still produce a
+    complete site - so its failure is logged and reads as "no hits".
+    """
+    if cache is not None:
+        hits = cache.get(bank, query, orientation)
+        if hits is not None:
+            return hits
+    try:
+        hits = _BANKS[bank](query, orientation)
+    except (requests.RequestException, ImageBankError, ValueError) as exc:
+        logger.warning("image_banks: %s failed for %r (%s)", bank, query, exc)
+        return []
+    if cache is not None:
+        cache.put(bank, query, orientation, hits)
+    return hits
+
+
 def search_photo(
     query: str,
     *,
     orientation: str | None = None,
     exclude: set[str] | None = None,
     banks: list[str] | None = None,
+    cache: SearchCache | None = None,
 ) -> Photo | None:
     """The best unused photo for `query`, or None if no bank had one.
 
@@ -243,15 +439,7 @@ def search_photo(
     """
     spent = exclude or set()
     for name in banks or configured_banks():
-        try:
-            hits = _BANKS[name](query, orientation)
-        except (requests.RequestException, ImageBankError, ValueError) as exc:
-            # A bank that is down, rate-limited or unconfigured must not fail the
-            # whole seed - the next one, and ultimately the placeholder pool,
-            # still produce a complete site.
-            logger.warning("image_banks: %s failed for %r (%s)", name, query, exc)
-            continue
-        for photo in hits:
+        for photo in bank_hits(name, query, orientation=orientation, cache=cache):
             if photo.key not in spent:
                 return photo
     return None
@@ -277,12 +465,7 @@ def search_photos(
     for name in banks or configured_banks():
         if len(results) >= limit:
             break
-        try:
-            hits = _BANKS[name](query, orientation)
-        except (requests.RequestException, ImageBankError, ValueError) as exc:
-            logger.warning("image_banks: %s failed for %r (%s)", name, query, exc)
-            continue
-        for photo in hits:
+        for photo in bank_hits(name, query, orientation=orientation):
             if photo.key in seen:
                 continue
             seen.add(photo.key)
@@ -313,7 +496,7 @@ def download_bytes(photo: Photo) -> tuple[bytes, str]:
     photo to a browser has to name the format in the data URL, and the banks
     serve JPEG, PNG and WebP from the same field.
     """
-    resp = requests.get(photo.download_url, timeout=_DOWNLOAD_TIMEOUT)
+    resp = _session().get(photo.download_url, timeout=_DOWNLOAD_TIMEOUT)
     resp.raise_for_status()
     content_type = (resp.headers.get("Content-Type") or "image/jpeg").split(";")[0]
     return resp.content, content_type.strip()
@@ -321,7 +504,7 @@ def download_bytes(photo: Photo) -> tuple[bytes, str]:
 
 def download(photo: Photo, dest) -> None:
     """Stream a hit to `dest` (a Path). Raises on any HTTP failure."""
-    with requests.get(
+    with _session().get(
         photo.download_url, timeout=_DOWNLOAD_TIMEOUT, stream=True
     ) as resp:
         resp.raise_for_status()
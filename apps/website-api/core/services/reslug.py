@@ -26,9 +26,12 @@ import re
 import unicodedata
 
 from django.apps import apps as django_apps
-from django.db import transaction
+from django.db import router, transaction
+from django.db.models import Case, Q, Value, When
+from django.db.models.signals import post_save
 
-from core.cache import invalidate_pattern
+from catalog.cache import invalidate_family
+from core.cache import bump_content_version, invalidate_pattern
 
 
 def slug_base(name: str) -> str:
@@ -108,27 +111,32 @@ _LINKED_PATTERNS = ("users:cart*", "users:favorites*", "orders:list:*")
 #: TTL while the new ones were already live - so a customer following a cached
 #: link got a 404 on a page that exists.
 #:
-#: Patterns, not `cache.delete()` of a single key: the by-pk detail keys are
-#: swept by their glob (`catalog:menu_category:*`), and the by-slug ones
+#: The catalog's share is not a pattern at all: its list, detail and sub-list
+#: payloads are stamped with a per-tenant generation (`catalog/cache.py`), so
+#: `SLUG_CATALOG_FAMILIES` names the families to bump. The rest are patterns,
+#: not `cache.delete()` of a single key: the by-slug keys
 #: (`core:event:slug:<host>:<slug>`) are namespaced by the *old* slug, so
 #: nothing but a sweep could ever reach them again.
+SLUG_CATALOG_FAMILIES = {
+    "product": ("product",),
+    "product-category": ("product_category",),
+    "service": ("service",),
+    "service-category": ("service_category",),
+    "menu-item": ("menu_item",),
+    "menu-category": ("menu_category",),
+    # A dish embeds its ingredients, so the menu family goes too - the same
+    # bump `IngredientDetailView.patch` makes, which also covers each dish's
+    # ingredient sub-list.
+    "ingredient": ("ingredient", "menu_item"),
+}
+
 SLUG_CACHE_PATTERNS = {
-    "product": ("catalog:product:*", "catalog:products:*") + _LINKED_PATTERNS,
-    "product-category": (
-        "catalog:product_category:*", "catalog:product_categories:*",
-    ) + _LINKED_PATTERNS,
-    "service": ("catalog:service:*", "catalog:services:*") + _LINKED_PATTERNS,
-    "service-category": (
-        "catalog:service_category:*", "catalog:service_categories:*",
-    ) + _LINKED_PATTERNS,
-    "menu-item": ("catalog:menu_item:*", "catalog:menu_items:*") + _LINKED_PATTERNS,
-    "menu-category": (
-        "catalog:menu_category:*", "catalog:menu_categories:*",
-    ) + _LINKED_PATTERNS,
-    # A dish embeds its ingredients, so the menu namespaces go too - the same
-    # sweep `IngredientDetailView.patch` makes, and `catalog:menu_item*`
-    # (no colon) is what also catches `catalog:menu_item_ingredients:*`.
-    "ingredient": ("catalog:ingredient:*", "catalog:ingredients:*", "catalog:menu_item*"),
+    "product": _LINKED_PATTERNS,
+    "product-category": _LINKED_PATTERNS,
+    "service": _LINKED_PATTERNS,
+    "service-category": _LINKED_PATTERNS,
+    "menu-item": _LINKED_PATTERNS,
+    "menu-category": _LINKED_PATTERNS,
     "brand": ("core:brand:*", "core:brands:*"),
     "success-story": ("core:success_story:*", "core:success_stories:*"),
     "highlight": ("core:highlight:*", "core:highlights:*"),
@@ -136,19 +144,46 @@ SLUG_CACHE_PATTERNS = {
 }
 
 
-def _reserved_slugs(Model, system_id):
-    """Every slug of `Model` held by a row belonging to some *other* tenant.
+#: Rows per UPDATE when writing the new slugs (and parking the old ones).
+BULK_BATCH = 500
+
+#: Candidate bases asked about per query in `_reserved_slugs`. Each one is a
+#: `slug LIKE 'base-%'` arm of the WHERE clause; a few hundred keep the statement
+#: well inside every backend's parameter limit.
+RESERVED_CHUNK = 200
+
+
+def _reserved_slugs(Model, system_id, bases):
+    """The slugs some *other* tenant holds that this pass could land on.
 
     `slug` is unique across the whole table, not per system, so a rebuild has to
-    dodge the other tenants' rows as well as its own. Read once per model rather
-    than queried per row: a catalog of a few hundred items would otherwise cost
-    a few hundred round trips to answer the same question.
+    dodge the other tenants' rows as well as its own. It used to read every one
+    of them into memory; on a platform with a few hundred tenants that is the
+    whole table, re-read per model on every press of the button, to answer a
+    question about a handful of names.
+
+    A candidate is always a base (`build_slug`) or that base plus ``-<n>``, so
+    only slugs equal to a base or starting with ``<base>-`` can ever be in the
+    way. That is what is asked for, a chunk of bases per query. `slug` is
+    unique, so each arm is an index range scan (on PostgreSQL Django gives a
+    unique `CharField` a second, `varchar_pattern_ops` index for exactly this
+    `LIKE 'x%'` shape). A sibling base that merely shares the prefix
+    ("acme-latte-art" for "acme-latte") comes back too; reserving it is
+    harmless, since it is only ever a collision if it is also a candidate.
     """
-    return set(
-        Model.objects.exclude(system_id=system_id)
-        .exclude(slug__isnull=True)
-        .values_list("slug", flat=True)
-    )
+    bases = sorted(bases)
+    taken = set()
+    for start in range(0, len(bases), RESERVED_CHUNK):
+        chunk = bases[start:start + RESERVED_CHUNK]
+        match = Q(slug__in=chunk)
+        for base in chunk:
+            match |= Q(slug__startswith=f"{base}-")
+        taken.update(
+            Model.objects.exclude(system_id=system_id)
+            .filter(match)
+            .values_list("slug", flat=True)
+        )
+    return taken
 
 
 @transaction.atomic
@@ -162,12 +197,14 @@ def rebuild_slugs(system, keys=None):
 
     Four things worth knowing about how it writes:
 
-    * **Rows are saved one at a time, through `save()`** - not `bulk_update`.
-      These models' `post_save` receivers clear the namespaces of the *other*
-      models that embed them (`catalog.signals`, `core.signals`), and a bulk
-      write fires none of them, so a dish would go on serving its category's
-      old slug out of cache until the TTL lapsed.
-    * **Their own namespaces are cleared here, from `SLUG_CACHE_PATTERNS`** -
+    * **Rows are written with `bulk_update`, and `post_save` is replayed
+      once per model.** These models' receivers clear the namespaces of the
+      *other* models that embed them (`catalog.signals`, `core.signals`), and a
+      bulk write fires none of them - so a dish would go on serving its
+      category's old slug out of cache until the TTL lapsed. See
+      `_replay_post_save` for why once per model is the same as once per row.
+    * **Their own namespaces are cleared here, from `SLUG_CATALOG_FAMILIES`
+      and `SLUG_CACHE_PATTERNS`** -
       no receiver does it, because ordinarily a model's own caches are cleared
       by the viewset that wrote the row, and this pass goes through none. The
       sweep runs `on_commit`, so a read racing the transaction cannot re-prime
@@ -195,12 +232,12 @@ def rebuild_slugs(system, keys=None):
         Model = django_apps.get_model(app_label, model_name)
         report[key] = _rebuild_one(Model, system, prefix)
 
-    _schedule_invalidation(key for key, r in report.items() if r["changed"])
+    _schedule_invalidation(system, [key for key, r in report.items() if r["changed"]])
 
     return report
 
 
-def _schedule_invalidation(keys):
+def _schedule_invalidation(system, keys):
     """Sweep the cache namespaces of every model this pass actually moved.
 
     Deferred to `on_commit` rather than run inline: everything above happens in
@@ -210,32 +247,59 @@ def _schedule_invalidation(keys):
     right: nothing moved.
     """
     patterns = sorted({p for key in keys for p in SLUG_CACHE_PATTERNS.get(key, ())})
-    if not patterns:
+    families = sorted({f for key in keys for f in SLUG_CATALOG_FAMILIES.get(key, ())})
+    if not (patterns or families):
         return
 
     def _sweep():
+        invalidate_family(system.pk, *families)
         for pattern in patterns:
             invalidate_pattern(pattern)
+        # The slugs moved in bulk: no receiver told `core.conditional`.
+        bump_content_version(system.pk)
 
     transaction.on_commit(_sweep)
 
 
+def _replay_post_save(Model, row):
+    """Fire `Model`'s `post_save` receivers for a bulk write, once.
+
+    Every receiver registered for a `SLUG_MODELS` model keys what it clears on
+    the row's **tenant** alone - a family generation, the System payload, every
+    cart - never on the row itself. One send per model and pass therefore
+    clears exactly what a `save()` per row did, without the per-row
+    `users:cart*` SCAN a dish-by-dish save cost on a large menu.
+
+    ⚠ A receiver added later that reads anything off `instance` beyond
+    `system_id` (its category, its old slug) would see only one row here. Such
+    a receiver would have to be taught about `update_fields={"slug"}`, or this
+    would have to go back to sending per row.
+
+    Deferred to `on_commit`, like `_schedule_invalidation`, and for the same
+    reason: a read landing before the commit would re-prime the caches it clears.
+    """
+    using = router.db_for_write(Model, instance=row)
+    transaction.on_commit(lambda: post_save.send(
+        sender=Model, instance=row, created=False, raw=False,
+        using=using, update_fields=frozenset({"slug"}),
+    ))
+
+
 def _rebuild_one(Model, system, prefix):
     """One model's share of `rebuild_slugs`."""
     # Only the *other* tenants' slugs start out reserved. This site's own are
     # not: they are precisely what is being replaced, and treating them as taken
     # would push every record onto a "-2" of itself.
-    taken = _reserved_slugs(Model, system.pk)
-
     # Ordered by pk so two runs over the same data resolve a name collision
     # ("Latte" twice) the same way round - the older row keeps the bare slug and
     # the newer one takes the "-2".
     rows = list(Model.objects.filter(system_id=system.pk).order_by("pk"))
+    bases = {row.pk: build_slug(getattr(row, "name", "") or "", prefix) for row in rows}
+    taken = _reserved_slugs(Model, system.pk, set(bases.values()))
 
     final = {}
     for row in rows:
-        candidate = build_slug(getattr(row, "name", "") or "", prefix)
-        base = candidate
+        candidate = base = bases[row.pk]
         suffix = 2
         while candidate in taken:
             candidate = f"{base}-{suffix}"
@@ -248,7 +312,9 @@ def _rebuild_one(Model, system, prefix):
 
     for row in changing:
         row.slug = final[row.pk]
-        row.save(update_fields=["slug"])
+    Model.objects.bulk_update(changing, ["slug"], batch_size=BULK_BATCH)
+    if changing:
+        _replay_post_save(Model, changing[0])
 
     return {
         "changed": len(changing),
@@ -272,16 +338,20 @@ def _park_conflicts(Model, system, changing, final):
     throwaway slug first if the slug it currently holds is one some *other*
     changing row wants. The park uses `queryset.update()` rather than `save()` on
     purpose - it writes no signal, because the transient value is not a state any
-    cache should ever be primed with. The real value that follows is saved
-    normally and fires the invalidation.
+    cache should ever be primed with. The real value that follows fires the
+    invalidation, through `_replay_post_save`.
+
+    The parked rows go in one UPDATE: each gets its own throwaway, so it is a
+    `CASE` on pk rather than one statement per row.
 
     The throwaway is `__reslug-<system>-<pk>`, which no real slug can collide
     with: `build_slug` strips everything outside `[a-z0-9-]`, so nothing it
     produces can begin with an underscore.
     """
     targets = {final[row.pk] for row in changing}
-    for row in changing:
-        if row.slug and row.slug in targets:
-            Model.objects.filter(pk=row.pk).update(
-                slug=f"__reslug-{system.pk}-{row.pk}",
-            )
+    parked = [row.pk for row in changing if row.slug and row.slug in targets]
+    for start in range(0, len(parked), BULK_BATCH):
+        chunk = parked[start:start + BULK_BATCH]
+        Model.objects.filter(pk__in=chunk).update(slug=Case(
+            *[When(pk=pk, then=Value(f"__reslug-{system.pk}-{pk}")) for pk in chunk],
+        ))
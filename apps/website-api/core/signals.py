@@ -6,7 +6,8 @@ A Product/Service/MenuItem serializer embeds ``brand_name`` (source
 used it, and renaming a Brand changes the embedded name - either way the cached
 catalog payloads keep serving the old brand until their TTL. Brand's own
 admin/view only invalidate ``core:brand*``, so the catalog namespaces are cleared
-here instead. A signal (rather than a line in each delete path) covers every
+here instead - by bumping the brand's own tenant's generations, so no other
+storefront loses its warm catalog. A signal (rather than a line in each delete path) covers every
 route uniformly: admin single + bulk delete, the API view, and any cascade.
 """
 
@@ -14,24 +15,24 @@ from django.core.cache import cache
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .cache import invalidate_pattern, invalidate_system_payload
-from .models import Branch, BranchHours, Brand, Event, SiteBackup, System
+from catalog.cache import invalidate_family
+
+from . import renditions
+from .backup import MODEL_SPECS
+from .cache import bump_content_version, invalidate_pattern
+from .counters import COUNTS, count_write
+from .models import Branch, BranchHours, Brand, Event, SiteBackup, SiteJob, System, SystemCounters
 from .stock_images import attributed_specs
 from .storage import forget_system
-
-
-def _invalidate_catalog_for_brand():
-    # Brand lives on the Buyable base, so all three families can embed it.
-    for family in ("products", "services", "menu_items"):
-        invalidate_pattern(f"catalog:{family}:*")  # list endpoints
-    for family in ("product", "service", "menu_item"):
-        invalidate_pattern(f"catalog:{family}:*")  # detail endpoints (per-pk)
+from .tenancy import forget_hosts
+from .tenant_paths import system_id_for
 
 
 @receiver(post_save, sender=Brand)
 @receiver(post_delete, sender=Brand)
 def invalidate_catalog_on_brand_change(sender, instance, **kwargs):
-    _invalidate_catalog_for_brand()
+    # Brand lives on the Buyable base, so all three families can embed it.
+    invalidate_family(instance.system_id, "product", "service", "menu_item")
 
 
 @receiver(post_save, sender=Branch)
@@ -40,8 +41,8 @@ def invalidate_system_on_branch_change(sender, instance, **kwargs):
     """``branch_count`` rides along in the cached System payload, and it is what
     decides whether the public Contact link is rendered at all. Same reasoning as
     the catalog counts in ``catalog/signals.py`` - the count changes while the
-    System row itself does not, so nothing else would clear it."""
-    invalidate_system_payload()
+    System row itself does not, so nothing else would recount or clear it."""
+    count_write(sender, instance.system_id)
 
 
 @receiver(post_save, sender=BranchHours)
@@ -72,8 +73,10 @@ def invalidate_system_on_event_change(sender, instance, **kwargs):
     for an **hour**: without this, a tenant's first event would sit on the site
     with no way to navigate to it for up to that long, which reads as a lost
     write rather than as a stale cache.
+
+    An event is a picture model too; recounting it covers its stock-image share.
     """
-    invalidate_system_payload()
+    count_write(sender, instance.system_id)
 
 
 def _invalidate_system_on_attribution_change(sender, instance, **kwargs):
@@ -87,13 +90,16 @@ def _invalidate_system_on_attribution_change(sender, instance, **kwargs):
     leaving the footer crediting a bank whose last photo was replaced an hour
     ago - or, worse, dropping the credit while a photo is still on the page.
 
-    The three Buyable models are already covered by ``catalog/signals.py``; the
-    duplicate delete is free and this is what covers the other nine.
+    Each write recounts that model's share alone (``core.counters``). The
+    models with a count of their own - the three Buyables, Event - are left to
+    their own receivers, which recount the share with it.
     """
-    invalidate_system_payload()
+    count_write(sender, system_id_for(instance))
 
 
 for _spec in attributed_specs():
+    if _spec.model._meta.label_lower in COUNTS:
+        continue
     post_save.connect(
         _invalidate_system_on_attribution_change,
         sender=_spec.model,
@@ -106,6 +112,31 @@ for _spec in attributed_specs():
     )
 
 
+def _bump_content_version(sender, instance, **kwargs):
+    """Move the tenant's content version on any write to what its site shows.
+
+    That version is what ``core.conditional`` checks before answering a poll
+    with 304 instead of running the view, so a write it misses is a storefront
+    told "unchanged" about a page that did change. Hence one receiver on every
+    storefront model in ``MODEL_SPECS`` - the same list the backup engine keeps
+    complete - rather than a line in each of the invalidation paths above, which
+    clear their own keys one way each (a generation, a key, a pattern) and
+    between them miss the admin's single-key deletes.
+
+    ⚠ ``ContactMessage`` is left out: it is written by the public contact form,
+    shown nowhere public, and would otherwise revalidate the whole site on
+    every enquiry.
+    """
+    bump_content_version(system_id_for(instance))
+
+
+for _spec in MODEL_SPECS:
+    if _spec.label.split(".")[0] not in ("core", "catalog") or _spec.label == "core.ContactMessage":
+        continue
+    post_save.connect(_bump_content_version, sender=_spec.model, dispatch_uid=f"content:{_spec.label}")
+    post_delete.connect(_bump_content_version, sender=_spec.model, dispatch_uid=f"content:{_spec.label}:delete")
+
+
 @receiver(post_save, sender=System)
 def invalidate_carts_on_system_change(sender, instance, **kwargs):
     """Drop every cached cart when the tenant's own settings are written.
@@ -126,6 +157,18 @@ def invalidate_carts_on_system_change(sender, instance, **kwargs):
     invalidate_pattern("users:cart*")
 
 
+@receiver(post_save, sender=System)
+def create_counters(sender, instance, created, raw=False, **kwargs):
+    """Start a new System's stored counts at zero, which is what they are.
+
+    Without it the first payload build of every new site would count all of
+    them from scratch (`core.counters.counters_for`), and every item written
+    before that build would store nothing, there being no row to store it in.
+    """
+    if created and not raw:
+        SystemCounters.objects.get_or_create(system=instance)
+
+
 @receiver(post_save, sender=System)
 def forget_storage_config(sender, instance, **kwargs):
     """Drop this worker's memoised R2 config so the next upload re-reads it.
@@ -140,6 +183,34 @@ def forget_storage_config(sender, instance, **kwargs):
     forget_system(instance.pk)
 
 
+@receiver(post_save, sender=System)
+@receiver(post_delete, sender=System)
+def forget_host_resolutions(sender, instance, **kwargs):
+    """Re-resolve hosts after a System write: its host, or whether it is enabled,
+    may be what changed. Same reach as the storage memo above - the shared cache
+    and this worker now, the other workers within ``HOST_MEMO_TTL``."""
+    forget_hosts()
+
+
+def _forget_renditions(sender, instance, **kwargs):
+    """A picture's rendered set goes with the photo it was rendered from.
+
+    Like a backup's archive below, its files would otherwise outlive their row,
+    or the upload that replaced the photo, for good (`core.renditions`).
+    """
+    renditions.forget(instance)
+
+
+def _forget_stale_renditions(sender, instance, raw=False, **kwargs):
+    if not raw:
+        renditions.forget_stale(instance)
+
+
+for _model in renditions.picture_models():
+    post_delete.connect(_forget_renditions, sender=_model, dispatch_uid=f"renditions:{_model._meta.label}:delete")
+    post_save.connect(_forget_stale_renditions, sender=_model, dispatch_uid=f"renditions:{_model._meta.label}")
+
+
 @receiver(post_delete, sender=SiteBackup)
 def delete_backup_file(sender, instance, **kwargs):
     """Remove the archive from disk when its history row goes.
@@ -152,3 +223,14 @@ def delete_backup_file(sender, instance, **kwargs):
     """
     if instance.file:
         instance.file.delete(save=False)
+
+
+@receiver(post_delete, sender=SiteJob)
+def delete_job_upload(sender, instance, **kwargs):
+    """Same as above for a restore upload a job never got to apply.
+
+    The worker deletes the upload as soon as it has read it; this covers the
+    job that is deleted (or cascaded away with its System) while still queued.
+    """
+    if instance.upload:
+        instance.upload.delete(save=False)
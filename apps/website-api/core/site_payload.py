@@ -605,10 +605,102 @@ def _reset(system: System) -> None:
     system.menu_categories.all().delete()
 
 
-def _upsert(counts: dict, was_created: bool, obj=None, item=None) -> None:
-    counts["created" if was_created else "updated"] += 1
-    if obj is not None and item is not None:
-        attach_image(obj, item)
+# ── Bulk upsert ──────────────────────────────────────────────────────────────
+#
+# A publish used to be one `update_or_create` per record - two round trips each,
+# plus a delete and an insert per choice-group option - so a 300-dish menu was
+# thousands of queries inside one transaction on the production database. Each
+# applier below now collects its records first and hands them to `_bulk_upsert`,
+# which costs one SELECT for the rows that already exist, one `bulk_create` for
+# the new ones and one `bulk_update` for the rest, per model.
+#
+# It keeps `update_or_create`'s contract record for record:
+#
+# * a record is matched on its `lookup` (a slug, or an owner + `sort_order` for
+#   the rows that have no slug) and **only the fields in its defaults** are
+#   written - which is what keeps images on an existing record intact;
+# * a key repeated in one payload is applied in order, the later occurrence
+#   updating what the earlier one created, and counted the same way;
+# * `created` / `updated` come out as they always did.
+#
+# ⚠ Neither bulk call runs `save()` or sends `post_save`. No model written here
+# overrides `save()` except `MenuSize`, whose derived `system` is set by
+# `_apply_sizes` directly; and `PublishSiteView._invalidate` clears everything
+# the per-row signals used to, once, after the transaction.
+
+BULK_BATCH = 500
+
+
+def _key(lookup: dict) -> tuple:
+    """A hashable identity for `lookup`, comparable with `_row_key` of a row."""
+    return tuple(
+        (name, getattr(value, "pk", value)) for name, value in sorted(lookup.items())
+    )
+
+
+def _row_key(model, obj, names) -> tuple:
+    return tuple(
+        (name, getattr(obj, model._meta.get_field(name).attname)) for name in names
+    )
+
+
+def _bulk_upsert(model, entries, existing) -> list:
+    """Upsert `entries` - `(lookup, defaults, item)` triples - into `model`.
+
+    `existing` is a queryset holding at least every current row a lookup could
+    match (`slug__in=...`, or the owners' rows). Returns `(obj, created, items)`
+    per distinct key in payload order, where `items` are the payload records
+    that landed on `obj` (more than one only when a key was repeated).
+    """
+    merged: dict = {}
+    for lookup, defaults, item in entries:
+        key = _key(lookup)
+        if key in merged:
+            merged[key][1].update(defaults)
+            merged[key][2].append(item)
+        else:
+            merged[key] = (lookup, dict(defaults), [item])
+    if not merged:
+        return []
+
+    names = sorted(next(iter(merged.values()))[0])
+    found = {_row_key(model, row, names): row for row in existing}
+    stamp = django_timezone.now()
+    timed = any(f.name == "modified" for f in model._meta.concrete_fields)
+
+    results, fresh, stale, fields = [], [], [], set()
+    for key, (lookup, defaults, items) in merged.items():
+        obj = found.get(key)
+        created = obj is None
+        if created:
+            obj = model(**lookup, **defaults)
+            fresh.append(obj)
+        else:
+            for name, value in defaults.items():
+                setattr(obj, name, value)
+            fields.update(defaults)
+            if timed:
+                # `auto_now` is applied by `pre_save`, which `bulk_update` skips.
+                obj.modified = stamp
+            stale.append(obj)
+        results.append((obj, created, items))
+
+    model.objects.bulk_create(fresh, batch_size=BULK_BATCH)
+    if stale and fields:
+        model.objects.bulk_update(
+            stale, sorted(fields | ({"modified"} if timed else set())), batch_size=BULK_BATCH,
+        )
+    return results
+
+
+def _settle(results, counts: dict | None = None) -> None:
+    """Give each upserted record its photo and, for a section that reports
+    them, fold its results into the created/updated counts."""
+    for obj, created, items in results:
+        for n, item in enumerate(items):
+            if counts is not None:
+                counts["created" if created and n == 0 else "updated"] += 1
+            attach_image(obj, item)
 
 
 # The image archive for the publish currently being applied, if one was sent.
@@ -700,14 +792,13 @@ def media_names(payload: dict) -> set[str]:
 
 def _apply_stories(system, items) -> dict:
     counts = {"created": 0, "updated": 0}
-    for it in items:
-        slug = _slug_of(it)
-        if not slug:
-            continue
-        obj, created = SuccessStory.objects.update_or_create(
-            slug=slug, defaults=_defaults(system, it, STORY_FIELDS)
-        )
-        _upsert(counts, created, obj, it)
+    entries = [
+        ({"slug": slug}, _defaults(system, it, STORY_FIELDS), it)
+        for it in items
+        if (slug := _slug_of(it))
+    ]
+    existing = SuccessStory.objects.filter(slug__in=[e[0]["slug"] for e in entries])
+    _settle(_bulk_upsert(SuccessStory, entries, existing), counts)
     return counts
 
 
@@ -719,6 +810,7 @@ def _apply_events(system, items) -> dict:
     publish a fabricated announcement onto a customer's live site.
     """
     counts = {"created": 0, "updated": 0}
+    entries = []
     for it in items:
         slug = _slug_of(it)
         if not slug:
@@ -739,13 +831,15 @@ def _apply_events(system, items) -> dict:
         for coord in ("latitude", "longitude"):
             if it.get(coord) is not None:
                 defaults[coord] = _decimal(it[coord])
-        obj, created = Event.objects.update_or_create(slug=slug, defaults=defaults)
-        _upsert(counts, created, obj, it)
+        entries.append(({"slug": slug}, defaults, it))
+    existing = Event.objects.filter(slug__in=[e[0]["slug"] for e in entries])
+    _settle(_bulk_upsert(Event, entries, existing), counts)
     return counts
 
 
 def _apply_highlights(system, items) -> dict:
     counts = {"created": 0, "updated": 0}
+    entries = []
     for it in items:
         slug = _slug_of(it)
         if not slug:
@@ -755,39 +849,57 @@ def _apply_highlights(system, items) -> dict:
             defaults["size"] = it["size"]
         if it.get("sort_order") is not None:
             defaults["sort_order"] = it["sort_order"]
-        hl, created = CompanyHighlight.objects.update_or_create(
-            slug=slug, defaults=defaults
-        )
-        _upsert(counts, created, hl, it)
-        # Sub-items have no global slug; key them by (highlight, sort_order) so a
-        # re-publish updates in place rather than duplicating.
-        for j, sub in enumerate(it.get("items") or []):
-            item_defaults = {}
-            for f in HIGHLIGHT_ITEM_FIELDS:
-                if sub.get(f) is not None:
-                    item_defaults[f] = sub[f]
-            sub_obj, _ = CompanyHighlightItem.objects.update_or_create(
-                highlight=hl,
-                sort_order=sub.get("sort_order", j),
-                defaults=item_defaults,
-            )
-            attach_image(sub_obj, sub)
+        entries.append(({"slug": slug}, defaults, it))
+    existing = CompanyHighlight.objects.filter(slug__in=[e[0]["slug"] for e in entries])
+    highlights = _bulk_upsert(CompanyHighlight, entries, existing)
+    _settle(highlights, counts)
+
+    # Sub-items have no global slug; key them by (highlight, sort_order) so a
+    # re-publish updates in place rather than duplicating.
+    sub_entries = []
+    for hl, _, its in highlights:
+        for it in its:
+            for j, sub in enumerate(it.get("items") or []):
+                item_defaults = {}
+                for f in HIGHLIGHT_ITEM_FIELDS:
+                    if sub.get(f) is not None:
+                        item_defaults[f] = sub[f]
+                sub_entries.append((
+                    {"highlight": hl, "sort_order": sub.get("sort_order", j)},
+                    item_defaults,
+                    sub,
+                ))
+    existing = CompanyHighlightItem.objects.filter(highlight__in=[hl for hl, _, _ in highlights])
+    _settle(_bulk_upsert(CompanyHighlightItem, sub_entries, existing))
     return counts
 
 
-def _apply_products(system, categories) -> dict:
-    counts = {"created": 0, "updated": 0, "categories": 0}
-    for c in categories:
-        cslug = _slug_of(c)
-        if not cslug:
-            continue
-        cat, _ = ProductCategory.objects.update_or_create(
-            slug=cslug, defaults=_defaults(system, c, CATEGORY_FIELDS)
-        )
-        attach_image(cat, c)
-        _apply_sizes("category", cat, c.get("sizes"))
-        counts["categories"] += 1
-        for p in c.get("products") or []:
+def _apply_categories(model, system, categories) -> list:
+    """Upsert one family's categories by slug, with their photos and sizes."""
+    entries = [
+        ({"slug": cslug}, _defaults(system, c, CATEGORY_FIELDS), c)
+        for c in categories
+        if (cslug := _slug_of(c))
+    ]
+    existing = model.objects.filter(slug__in=[e[0]["slug"] for e in entries])
+    results = _bulk_upsert(model, entries, existing)
+    _settle(results)
+    _apply_sizes("category", system, [
+        (cat, c.get("sizes")) for cat, _, cs in results for c in cs
+    ])
+    return results
+
+
+def _apply_buyables(model, system, categories, key, defaults_for):
+    """Upsert the items nested under each category, by slug.
+
+    Returns the section's counts and the `_bulk_upsert` results, which a menu
+    needs to hang sizes and ingredients off.
+    """
+    counts = {"created": 0, "updated": 0, "categories": len(categories)}
+    entries = []
+    for cat, c in categories:
+        for p in c.get(key) or []:
             pslug = _slug_of(p)
             if not pslug:
                 continue
@@ -799,54 +911,52 @@ def _apply_products(system, categories) -> dict:
             )
             defaults["currency"] = p.get("currency") or "USD"
             defaults["is_featured"] = p.get("is_featured", True)
-            defaults["in_stock"] = p.get("in_stock", True)
-            if p.get("stock_count") is not None:
-                defaults["stock_count"] = p["stock_count"]
-            obj, created = Product.objects.update_or_create(
-                slug=pslug, defaults=defaults
-            )
-            _upsert(counts, created, obj, p)
+            defaults.update(defaults_for(p))
+            entries.append(({"slug": pslug}, defaults, p))
+    existing = model.objects.filter(slug__in=[e[0]["slug"] for e in entries])
+    results = _bulk_upsert(model, entries, existing)
+    _settle(results, counts)
+    return counts, results
+
+
+def _category_pairs(results) -> list:
+    # Every payload occurrence of a category, in order - a category listed twice
+    # contributes both item lists, as it did when each was applied in turn.
+    return [(cat, c) for cat, _, cs in results for c in cs]
+
+
+def _product_defaults(p) -> dict:
+    defaults = {"in_stock": p.get("in_stock", True)}
+    if p.get("stock_count") is not None:
+        defaults["stock_count"] = p["stock_count"]
+    return defaults
+
+
+def _service_defaults(s) -> dict:
+    defaults = {}
+    if s.get("duration") is not None:
+        defaults["duration"] = s["duration"]
+    if s.get("modality"):
+        defaults["modality"] = s["modality"]
+    return defaults
+
+
+def _apply_products(system, categories) -> dict:
+    cats = _category_pairs(_apply_categories(ProductCategory, system, categories))
+    counts, _ = _apply_buyables(Product, system, cats, "products", _product_defaults)
     return counts
 
 
 def _apply_services(system, categories) -> dict:
-    counts = {"created": 0, "updated": 0, "categories": 0}
-    for c in categories:
-        cslug = _slug_of(c)
-        if not cslug:
-            continue
-        cat, _ = ServiceCategory.objects.update_or_create(
-            slug=cslug, defaults=_defaults(system, c, CATEGORY_FIELDS)
-        )
-        attach_image(cat, c)
-        _apply_sizes("category", cat, c.get("sizes"))
-        counts["categories"] += 1
-        for s in c.get("services") or []:
-            sslug = _slug_of(s)
-            if not sslug:
-                continue
-            defaults = _defaults(system, s, BUYABLE_TEXT_FIELDS)
-            defaults["category"] = cat
-            defaults["price"] = _decimal(s.get("price"))
-            defaults["compare_price"] = (
-                _decimal(s["compare_price"]) if s.get("compare_price") else None
-            )
-            defaults["currency"] = s.get("currency") or "USD"
-            defaults["is_featured"] = s.get("is_featured", True)
-            if s.get("duration") is not None:
-                defaults["duration"] = s["duration"]
-            if s.get("modality"):
-                defaults["modality"] = s["modality"]
-            obj, created = Service.objects.update_or_create(
-                slug=sslug, defaults=defaults
-            )
-            _upsert(counts, created, obj, s)
+    cats = _category_pairs(_apply_categories(ServiceCategory, system, categories))
+    counts, _ = _apply_buyables(Service, system, cats, "services", _service_defaults)
     return counts
 
 
 def _apply_ingredients(system, items) -> dict:
     """Upsert the reusable Ingredient catalog (keyed by global slug)."""
     counts = {"created": 0, "updated": 0}
+    entries = []
     for ing in items:
         slug = _slug_of(ing)
         if not slug:
@@ -859,85 +969,80 @@ def _apply_ingredients(system, items) -> dict:
         for f in INGREDIENT_NUTRIENT_FIELDS:
             if ing.get(f) is not None:
                 defaults[f] = _decimal(ing[f])
-        obj, created = Ingredient.objects.update_or_create(
-            slug=slug, defaults=defaults
-        )
-        _upsert(counts, created, obj, ing)
+        entries.append(({"slug": slug}, defaults, ing))
+    existing = Ingredient.objects.filter(slug__in=[e[0]["slug"] for e in entries])
+    _settle(_bulk_upsert(Ingredient, entries, existing), counts)
     return counts
 
 
-def _apply_sizes(owner_field, owner, sizes) -> None:
-    """Upsert one owner's size rows, keyed by (owner, sort_order).
+def _apply_sizes(owner_field, system, owned) -> None:
+    """Upsert size rows, keyed by (owner, sort_order), for `(owner, sizes)` pairs.
 
     Same shape as a menu-item ingredient, and for the same reason: a size has no
     slug, so position is the only identity a second database can match on. A
     re-publish therefore updates in place rather than duplicating the list.
+
+    `system` is written here because `MenuSize.save` - which derives it from the
+    owner - does not run under `bulk_create`; every owner here is `system`'s.
     """
-    for index, entry in enumerate(sizes or []):
-        name = entry.get("name")
-        if not name:
-            continue
-        defaults = {
-            f: entry[f]
-            for f in MENU_SIZE_TEXT_FIELDS
-            if entry.get(f) is not None
-        }
-        defaults["portion"] = (
-            _decimal(entry["portion"]) if entry.get("portion") is not None else None
-        )
-        defaults["unit"] = entry.get("unit") or None
-        defaults["price_delta"] = _decimal(entry.get("price_delta", 0))
-        defaults["is_default"] = entry.get("is_default", False)
-        row, _ = MenuSize.objects.update_or_create(
-            **{owner_field: owner},
-            sort_order=entry.get("sort_order", index),
-            defaults=defaults,
-        )
-        attach_image(row, entry)
+    entries = []
+    for owner, sizes in owned:
+        for index, entry in enumerate(sizes or []):
+            name = entry.get("name")
+            if not name:
+                continue
+            defaults = {
+                f: entry[f]
+                for f in MENU_SIZE_TEXT_FIELDS
+                if entry.get(f) is not None
+            }
+            defaults["portion"] = (
+                _decimal(entry["portion"]) if entry.get("portion") is not None else None
+            )
+            defaults["unit"] = entry.get("unit") or None
+            defaults["price_delta"] = _decimal(entry.get("price_delta", 0))
+            defaults["is_default"] = entry.get("is_default", False)
+            defaults["system"] = system
+            entries.append((
+                {owner_field: owner, "sort_order": entry.get("sort_order", index)},
+                defaults,
+                entry,
+            ))
+    if not entries:
+        return
+    owners = {e[0][owner_field].pk for e in entries}
+    existing = MenuSize.objects.filter(**{f"{owner_field}__in": owners})
+    _settle(_bulk_upsert(MenuSize, entries, existing))
+
+
+def _menu_item_defaults(m) -> dict:
+    defaults = {
+        "is_available": m.get("is_available", True),
+        "sizes_enabled": m.get("sizes_enabled", True),
+    }
+    for f in MENU_ITEM_FLAG_FIELDS:
+        if m.get(f) is not None:
+            defaults[f] = m[f]
+    return defaults
 
 
 def _apply_menu(system, categories) -> dict:
-    counts = {"created": 0, "updated": 0, "categories": 0}
+    cats = _category_pairs(_apply_categories(MenuCategory, system, categories))
+    counts, items = _apply_buyables(MenuItem, system, cats, "menu_items", _menu_item_defaults)
+    _apply_sizes("menu_item", system, [(item, m.get("sizes")) for item, _, ms in items for m in ms])
+
     # Menu-item ingredients link to reusable Ingredients by slug (applied just
     # before this in apply_payload), so resolve them once up front.
     ingredient_by_slug = {i.slug: i for i in system.ingredients.all()}
-    for c in categories:
-        cslug = _slug_of(c)
-        if not cslug:
-            continue
-        cat, _ = MenuCategory.objects.update_or_create(
-            slug=cslug, defaults=_defaults(system, c, CATEGORY_FIELDS)
-        )
-        attach_image(cat, c)
-        _apply_sizes("category", cat, c.get("sizes"))
-        counts["categories"] += 1
-        for m in c.get("menu_items") or []:
-            mslug = _slug_of(m)
-            if not mslug:
-                continue
-            defaults = _defaults(system, m, BUYABLE_TEXT_FIELDS)
-            defaults["category"] = cat
-            defaults["price"] = _decimal(m.get("price"))
-            defaults["compare_price"] = (
-                _decimal(m["compare_price"]) if m.get("compare_price") else None
-            )
-            defaults["currency"] = m.get("currency") or "USD"
-            defaults["is_featured"] = m.get("is_featured", True)
-            defaults["is_available"] = m.get("is_available", True)
-            defaults["sizes_enabled"] = m.get("sizes_enabled", True)
-            for f in MENU_ITEM_FLAG_FIELDS:
-                if m.get(f) is not None:
-                    defaults[f] = m[f]
-            item, created = MenuItem.objects.update_or_create(
-                slug=mslug, defaults=defaults
-            )
-            _upsert(counts, created, item, m)
-            _apply_sizes("menu_item", item, m.get("sizes"))
-            # Menu-item ingredients reference a reusable Ingredient by slug and
-            # have no global slug themselves; key them by (menu_item, sort_order)
-            # so a re-publish updates in place rather than duplicating - the same
-            # pattern used for highlight sub-items above. A row whose referenced
-            # ingredient is unknown (catalog not imported) is skipped.
+
+    # Menu-item ingredients reference a reusable Ingredient by slug and have no
+    # global slug themselves; key them by (menu_item, sort_order) so a
+    # re-publish updates in place rather than duplicating - the same pattern
+    # used for highlight sub-items above. A row whose referenced ingredient is
+    # unknown (catalog not imported) is skipped.
+    entries = []
+    for item, _, ms in items:
+        for m in ms:
             for k, ing in enumerate(m.get("ingredients") or []):
                 ingredient = ingredient_by_slug.get(ing.get("ingredient"))
                 if ingredient is None:
@@ -954,30 +1059,36 @@ def _apply_menu(system, categories) -> dict:
                 ing_defaults["default_quantity"] = ing.get("default_quantity", 0)
                 ing_defaults["group_name"] = ing.get("group_name") or None
                 ing_defaults["group_en_name"] = ing.get("group_en_name") or None
-                row, _ = MenuItemIngredient.objects.update_or_create(
-                    menu_item=item,
-                    sort_order=ing.get("sort_order", k),
-                    defaults=ing_defaults,
-                )
-                # A choice group's options are replaced wholesale, not upserted:
-                # unlike the group itself they carry no identity of their own
-                # (an option *is* its ingredient reference), so replacing is
-                # indistinguishable from editing - and nothing points at an
-                # option row the way `Booking.resource` points at a resource.
-                # An option whose ingredient is unknown is skipped, like the
-                # group's own reference above.
-                options = ing.get("options") or []
-                row.options.all().delete()
-                for oi, opt in enumerate(options):
-                    opt_ingredient = ingredient_by_slug.get(opt.get("ingredient"))
-                    if opt_ingredient is None:
-                        continue
-                    MenuItemIngredientOption.objects.create(
-                        menu_item_ingredient=row,
-                        ingredient=opt_ingredient,
-                        price=_decimal(opt.get("price", 0)),
-                        sort_order=opt.get("sort_order", oi),
-                    )
+                entries.append((
+                    {"menu_item": item, "sort_order": ing.get("sort_order", k)},
+                    ing_defaults,
+                    ing,
+                ))
+    existing = MenuItemIngredient.objects.filter(menu_item__in=[item for item, _, _ in items])
+    rows = _bulk_upsert(MenuItemIngredient, entries, existing)
+
+    # A choice group's options are replaced wholesale, not upserted: unlike the
+    # group itself they carry no identity of their own (an option *is* its
+    # ingredient reference), so replacing is indistinguishable from editing -
+    # and nothing points at an option row the way `Booking.resource` points at a
+    # resource. An option whose ingredient is unknown is skipped, like the
+    # group's own reference above. A group listed twice keeps its last list.
+    MenuItemIngredientOption.objects.filter(
+        menu_item_ingredient__in=[row for row, _, _ in rows]
+    ).delete()
+    options = []
+    for row, _, ings in rows:
+        for oi, opt in enumerate(ings[-1].get("options") or []):
+            opt_ingredient = ingredient_by_slug.get(opt.get("ingredient"))
+            if opt_ingredient is None:
+                continue
+            options.append(MenuItemIngredientOption(
+                menu_item_ingredient=row,
+                ingredient=opt_ingredient,
+                price=_decimal(opt.get("price", 0)),
+                sort_order=opt.get("sort_order", oi),
+            ))
+    MenuItemIngredientOption.objects.bulk_create(options, batch_size=BULK_BATCH)
     return counts
 
 
@@ -47,24 +47,38 @@ def attributed_specs() -> list:
     ]
 
 
-def stock_image_count(system) -> int:
-    """How many of this system's images are still credited to a stock bank.
-
-    Counts `System`'s own hero/about pair plus every attributed row across the
-    catalog and content models. One COUNT per model is a lot of queries to run
-    on a page render, which is why the only caller is `SystemSerializer` - a
-    payload cached for `SYSTEM_CACHE_TTL` (one hour) and invalidated by the
-    receivers in `core/signals.py`. Do not call it in a loop.
-    """
-    total = sum(
+def system_stock_images(system) -> int:
+    """How many of `System`'s own hero/about pair are bank photos - no query."""
+    return sum(
         1
         for field in SYSTEM_ATTRIBUTION_FIELDS
         if (getattr(system, field, "") or "").strip()
     )
-    for spec in attributed_specs():
-        total += (
-            spec.model.objects.filter(**{spec.scope: system})
+
+
+def stock_image_shares(system_id, specs=None) -> dict:
+    """``{model label: attributed rows}`` for this system, one COUNT per model.
+
+    Every attributed model by default, or just ``specs``. This is what
+    `core.counters` keeps per tenant, refreshing one model's share when one of
+    its rows is written.
+    """
+    return {
+        spec.label: (
+            spec.model.objects.filter(**{spec.scope: system_id})
             .exclude(**{ATTRIBUTION_FIELD: ""})
             .count()
         )
-    return total
+        for spec in (attributed_specs() if specs is None else specs)
+    }
+
+
+def stock_image_count(system) -> int:
+    """How many of this system's images are still credited to a stock bank.
+
+    Counts `System`'s own hero/about pair plus every attributed row across the
+    catalog and content models - one COUNT per model, so not for a page render.
+    `SystemSerializer` reads the stored shares instead (`core.counters`); this
+    is the recount they are checked against.
+    """
+    return system_stock_images(system) + sum(stock_image_shares(system.pk).values())
@@ -2,8 +2,45 @@
 
 Lives here rather than in any one app because users, orders and anything else
 user-scoped must agree on the answer - and must all take it from the same place.
+
+**Host resolution is cached in three layers**, because every public request
+makes it and it used to be a query every time (in each app's own copy of it):
+
+1. on the request - resolved once, on first use, and kept there;
+2. in this process, an LRU of ``HOST_MEMO_SIZE`` hosts kept for
+   ``HOST_MEMO_TTL`` seconds - the hot path, a dictionary hit;
+3. in the shared cache, under ``tenant:host:<host>``, for ``HOST_CACHE_TTL`` -
+   so a fresh worker or an expired memo costs a cache read, not a query.
+
+A host with no enabled System is cached too (as ``_NO_SYSTEM``), or every
+request for a parked or mistyped domain would reach the database.
+
+A System write clears layer 3 and this worker's layer 2 (`forget_hosts`, from
+``core.signals``); the other workers catch up within ``HOST_MEMO_TTL``, the
+same bargain ``core.storage`` makes for a tenant's storage config.
+
+⚠ Nothing is resolved up front. ``/healthz/`` must not touch the cache or the
+database (see ``core.health``), so the System is attached to the request when
+something asks for it, the way Django attaches ``request.user``.
 """
 
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+HOST_MEMO_TTL = 30
+HOST_MEMO_SIZE = 512
+HOST_CACHE_TTL = 300
+
+_NO_SYSTEM = 0
+
+# host -> (expires_at, System | None), least recently used first.
+_host_memo: OrderedDict = OrderedDict()
+_host_memo_lock = threading.Lock()
+
 
 def profile_system(user):
     """The tenant this user account belongs to, or None.
@@ -27,6 +64,62 @@ def user_system(request):
     return profile_system(getattr(request, "user", None))
 
 
+def request_host(request):
+    """The host a request was addressed to: `X-Website-Host`, else Host, sans port."""
+    return (
+        request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
+    ).split(":")[0]
+
+
+def _host_key(host):
+    return f"tenant:host:{host}"
+
+
+def system_for_host(host):
+    """The enabled System serving ``host``, or None - through the layers above.
+
+    Every call returns its own copy: the memoised instance is shared by every
+    thread of the worker, and a caller reading a relation off it would
+    otherwise cache that relation for all of them.
+    """
+    now = time.monotonic()
+    with _host_memo_lock:
+        hit = _host_memo.get(host)
+        if hit is not None and hit[0] > now:
+            _host_memo.move_to_end(host)
+            return copy.copy(hit[1])
+
+    cached = cache.get(_host_key(host))
+    if cached is None:
+        from .models import System
+
+        system = System.objects.filter(host=host, enabled=True).first()
+        cache.set(_host_key(host), system or _NO_SYSTEM, HOST_CACHE_TTL)
+    else:
+        system = cached or None
+
+    with _host_memo_lock:
+        _host_memo[host] = (now + HOST_MEMO_TTL, system)
+        _host_memo.move_to_end(host)
+        while len(_host_memo) > HOST_MEMO_SIZE:
+            _host_memo.popitem(last=False)
+    return copy.copy(system)
+
+
+def forget_hosts():
+    """Drop every cached host resolution: the shared entries, and this worker's.
+
+    Every host rather than the written System's own: a rename moves it off a
+    host it no longer knows, and a new System has to clear a cached "nobody".
+    System writes are a CMS save or a publish, never a hot path.
+    """
+    from .cache import invalidate_pattern
+
+    invalidate_pattern("tenant:host:*")
+    with _host_memo_lock:
+        _host_memo.clear()
+
+
 def host_system(request):
     """The tenant this *request* was addressed to, or None.
 
@@ -40,13 +133,18 @@ def host_system(request):
     already public: it picks which tenant's published catalog to read. Never use
     it for anything the browser must not choose - redirect targets
     (`_site_base_url`) and a signed-in user's tenancy both stay on `user_system`.
-    """
-    from .models import System
 
-    host = (
-        request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-    ).split(":")[0]
-    return System.objects.filter(host=host, enabled=True).first()
+    Resolved once per request and kept on it (see the module docstring).
+    """
+    try:
+        return request._host_system
+    except AttributeError:
+        pass
+    system = system_for_host(request_host(request))
+    # On the HttpRequest even when handed DRF's wrapper, which reads through to
+    # it: middleware only ever sees the former.
+    getattr(request, "_request", request)._host_system = system
+    return system
 
 
 def request_system(request):
@@ -14,6 +14,7 @@ import os
 import pathlib
 import shutil
 import tempfile
+import time
 import zipfile
 from datetime import datetime, timedelta
 from unittest import mock
@@ -27,7 +28,9 @@ from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from PIL import Image
 
@@ -39,19 +42,24 @@ from catalog.models import (
     MenuSize,
     Product,
     ProductCategory,
+    Service,
 )
 from core import storage as storage_module
+from core.services import email_badges
 from core.backup import BackupError, restore_archive, write_archive
+from core.cache import invalidate_pattern, read_through
 from core.models import (
     CATALOG_KINDS,
     KIND_LABEL_FIELDS,
     BookingResource,
     Branch,
+    CompanyHighlight,
     ContactMessage,
     Event,
     HomepageFlyer,
     ResourcePool,
     SiteBackup,
+    SiteJob,
     SuccessStory,
     SuccessStoryImage,
     System,
@@ -59,6 +67,7 @@ from core.models import (
     picture,
 )
 from core.services.contact import send_contact_message_reply
+from core.services.reslug import rebuild_slugs
 from core.services.email_badges import (
     BRANDMARK_CID,
     LOGO_CID,
@@ -68,8 +77,11 @@ from core.services.email_badges import (
 from core.tenant_paths import system_id_for, system_id_from_name
 from core.serializers import BranchWriteSerializer, SystemWriteSerializer
 from core.site_payload import serialize_system, apply_payload
+from core.views import invalidate_after_restore
+from catalog.cache import invalidate_family
 from catalog.test_helpers import a_product_category, a_service_category
-from orders.models import Booking, Order
+from orders.cache import availability_stamps
+from orders.models import AvailabilitySummary, Booking, Order
 
 
 class IsolatedMediaTestCase(TestCase):
@@ -213,6 +225,69 @@ class SitePayloadTests(TestCase):
         self.assertTrue(event.is_featured)
 
 
+    def test_a_publish_costs_the_same_queries_for_any_menu_size(self):
+        """Upserted per model in bulk, not per record: a re-publish reports what
+        `update_or_create` did and costs what a three-dish menu costs."""
+
+        def payload(host, dishes):
+            return {
+                "system": {"host": host, "site_name": host},
+                "ingredients": [
+                    {"slug": f"{host}-cheese", "name": "Cheese", "unit": "g"},
+                    {"slug": f"{host}-vegan", "name": "Vegan cheese", "unit": "g"},
+                ],
+                "product_categories": [{
+                    "slug": f"{host}-merch", "name": "Merch",
+                    "products": [
+                        {"slug": f"{host}-mug-{n}", "name": f"Mug {n}", "price": "5.00"}
+                        for n in range(dishes)
+                    ],
+                }],
+                "menu_categories": [{
+                    "slug": f"{host}-pizzas", "name": "Pizzas",
+                    "sizes": [{"name": "Chica"}, {"name": "Grande", "price_delta": "40"}],
+                    "menu_items": [
+                        {
+                            "slug": f"{host}-pizza-{n}", "name": f"Pizza {n}", "price": "100",
+                            "ingredients": [{
+                                "ingredient": f"{host}-cheese", "price": "10",
+                                "options": [{"ingredient": f"{host}-vegan", "price": "15"}],
+                            }],
+                        }
+                        for n in range(dishes)
+                    ],
+                }],
+            }
+
+        def publish(data):
+            with CaptureQueriesContext(connection) as queries:
+                summary = apply_payload(data)
+            return len(queries), summary
+
+        small, _ = publish(payload("small.test", 3))
+        # 20, not 200: SQLite caps the parameters of one statement, and a bulk
+        # insert of a forty-column model splits past ~24 rows there.
+        large, first = publish(payload("large.test", 20))
+        self.assertEqual(small, large)
+        self.assertEqual(first["menu_categories"], {"created": 20, "updated": 0, "categories": 1})
+
+        data = payload("large.test", 20)
+        data["menu_categories"][0]["menu_items"][0]["price"] = "120"
+        data["menu_categories"][0]["menu_items"][0]["ingredients"][0]["options"] = []
+        _, second = publish(data)
+        self.assertEqual(second["menu_categories"], {"created": 0, "updated": 20, "categories": 1})
+        self.assertEqual(second["product_categories"]["updated"], 20)
+
+        pizza = MenuItem.objects.get(slug="large.test-pizza-0")
+        self.assertEqual(pizza.price, Decimal("120"))
+        self.assertEqual(pizza.ingredients.count(), 1)
+        self.assertFalse(pizza.ingredients.get().options.exists())
+        self.assertEqual(
+            MenuItem.objects.get(slug="large.test-pizza-1").ingredients.get().options.count(), 1,
+        )
+        self.assertEqual(MenuSize.objects.filter(category__slug="large.test-pizzas").count(), 2)
+
+
 # --------------------------------------------------------------------------- #
 # Backup & restore
 # --------------------------------------------------------------------------- #
@@ -314,6 +389,65 @@ class SiteBackupTests(IsolatedMediaTestCase):
         self.assertEqual(booking.resource.capacity, 10)
         self.assertEqual(booking.resource.pool.unit_label, "boat")
 
+    def test_media_is_streamed_in_order_stored_as_is_and_missing_files_skipped(self):
+        """Photos are already compressed, so they go in stored rather than
+        deflated, byte for byte; a row whose file is gone costs a warning and
+        its member, never the backup."""
+        system = self._system()
+        cat, product = self._seed(system)
+        ghost = Product.objects.create(
+            system=system, category=cat, name="Saw", slug="saw", price=Decimal("9.00"),
+        )
+        ghost.image.save("saw.png", ContentFile(b"gone"), save=True)
+        ghost.image.storage.delete(ghost.image.name)
+
+        with self.assertLogs("core.backup", level="WARNING"):
+            path, manifest = self._archive(system)
+
+        self.assertEqual(manifest["media_files"], 1)
+        with zipfile.ZipFile(path) as archive:
+            member = archive.getinfo(f"media/{product.image.name}")
+            self.assertEqual(member.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(archive.read(member), b"not-a-real-png")
+            self.assertEqual(archive.getinfo("data.json").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertNotIn(f"media/{ghost.image.name}", archive.namelist())
+
+    def test_a_bulk_restore_reports_the_same_counts_as_the_per_row_path(self):
+        """New rows go in `bulk_create` chunks; a row whose `sku` another tenant
+        took after the backup is deferred by the pre-check and skipped, and the
+        restored timestamps survive the insert."""
+        system = self._system()
+        cat = ProductCategory.objects.create(system=system, name="Tools", slug="tools")
+        for n in range(9):
+            Product.objects.create(
+                system=system, category=cat, name=f"Tool {n}", slug=f"tool-{n}",
+                sku=f"T-{n}", price=Decimal("5.00"),
+            )
+        placed = timezone.now() - timedelta(days=90)
+        Product.objects.filter(system=system).update(created=placed)
+        path, _ = self._archive(system, sections=("system", "products"))
+
+        Product.objects.all().delete()
+        other = self._system(host="other.test", name="Other")
+        Product.objects.create(
+            system=other, category=a_product_category(other), name="Thief",
+            slug="thief", sku="T-4", price=Decimal("1.00"),
+        )
+
+        with mock.patch("core.backup.RESTORE_CHUNK", 4), CaptureQueriesContext(connection) as queries:
+            result = restore_archive(system, path, ["system", "products"], mode="replace")
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "catalog_product"')]
+        # One per chunk of four, plus the deferred row's own failed attempt.
+        self.assertEqual(len(inserts), 4)
+
+        self.assertEqual(
+            result["results"]["catalog.product"], {"created": 8, "updated": 0, "skipped": 1},
+        )
+        restored = Product.objects.filter(system=system)
+        self.assertEqual(restored.count(), 8)
+        self.assertFalse(restored.filter(sku="T-4").exists())
+        self.assertEqual(set(restored.values_list("created", flat=True)), {placed})
+
     def test_replace_and_merge_differ_on_rows_written_after_the_backup(self):
         system = self._system()
         cat, product = self._seed(system)
@@ -400,6 +534,7 @@ class SiteBackupApiTests(IsolatedMediaTestCase):
             "/api/backups/",
             data=json.dumps({"name": "Nightly", "sections": list(sections)}),
             content_type="application/json",
+            HTTP_PREFER="wait=600",
         )
 
     def test_create_list_download_restore_and_delete(self):
@@ -428,6 +563,7 @@ class SiteBackupApiTests(IsolatedMediaTestCase):
                 "sections": "system,products,images",
                 "mode": "replace",
             },
+            HTTP_PREFER="wait=600",
         )
         self.assertEqual(restored.status_code, 200, restored.content)
         self.assertTrue(Product.objects.filter(slug="hammer").exists())
@@ -436,6 +572,86 @@ class SiteBackupApiTests(IsolatedMediaTestCase):
         self.assertEqual(self.client.delete(f"/api/backups/{body['id']}/").status_code, 204)
         self.assertFalse(os.path.exists(path))
 
+    def test_async_jobs_run_on_the_worker_report_progress_and_cancel(self):
+        """Unless the client sends `Prefer: wait`, nothing heavy runs in the
+        request: the job is queued, the worker runs it, and the status endpoint (JSON or SSE)
+        is how the CMS follows it. A cancelled job is never picked up."""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        queued = self.client.post(
+            "/api/backups/",
+            data=json.dumps({"name": "Nightly", "sections": ["system", "products"]}),
+            content_type="application/json",
+        )
+        self.assertEqual(queued.status_code, 202, queued.content)
+        job_url = queued["Location"]
+        self.assertEqual(queued.json()["status"], "queued")
+        self.assertFalse(SiteBackup.objects.exists())
+
+        call_command("run_site_jobs", "--once", stdout=StringIO())
+
+        job = self.client.get(job_url).json()
+        self.assertEqual(job["status"], "succeeded", job)
+        self.assertEqual(job["progress"]["products"], {"done": 2, "total": 2})
+        backup = SiteBackup.objects.get(pk=job["backup_id"])
+
+        stream = self.client.get(job_url, HTTP_ACCEPT="text/event-stream")
+        frames = b"".join(stream.streaming_content).decode()
+        self.assertIn('"status": "succeeded"', frames)
+        self.assertTrue(frames.endswith("data: [DONE]\n\n"))
+
+        restore = self.client.post(
+            "/api/backups/restore/",
+            data={"backup_id": backup.pk, "sections": "system,products", "mode": "replace"},
+            HTTP_PREFER="respond-async",
+        )
+        self.assertEqual(restore.status_code, 202, restore.content)
+        Product.objects.all().delete()
+        cancelled = self.client.post(f"{restore['Location']}cancel/").json()
+        self.assertEqual(cancelled["status"], "cancelled")
+
+        call_command("run_site_jobs", "--once", stdout=StringIO())
+        # The restore never ran, so the deletion above stands.
+        self.assertFalse(Product.objects.exists())
+        self.assertEqual(self.client.post(f"{restore['Location']}cancel/").status_code, 409)
+
+    def test_only_a_job_whose_lease_ran_out_is_failed_as_abandoned(self):
+        """A restore that runs for hours keeps renewing its lease; only one
+        whose worker stopped renewing it is given up on."""
+        from core.jobs import LEASE, enqueue_backup, fail_stale_jobs
+
+        long_ago = timezone.now() - timedelta(hours=5)
+        alive = enqueue_backup(self.system, name="Long", sections=["system"], start=True)
+        dead = enqueue_backup(self.system, name="Dead", sections=["system"], start=True)
+        SiteJob.objects.filter(pk=alive.pk).update(started_at=long_ago)
+        SiteJob.objects.filter(pk=dead.pk).update(lease_until=timezone.now() - LEASE)
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        self.assertEqual(SiteJob.objects.get(pk=alive.pk).status, SiteJob.STATUS_RUNNING)
+        self.assertEqual(SiteJob.objects.get(pk=dead.pk).status, SiteJob.STATUS_FAILED)
+
+    def test_a_restore_drops_the_stored_month_grid_with_or_without_a_branch(self):
+        """Restored bookings are bulk-inserted, so no receiver drops the rows
+        they make wrong; the restore has to, branchless scope included."""
+        service = Service.objects.create(
+            category=a_service_category(self.system), system=self.system,
+            name="Haircut", slug="haircut", price=Decimal("100.00"), booking_enabled=True,
+        )
+        branch = Branch.objects.create(system=self.system, name="Downtown")
+        day = timezone.localdate() + timedelta(days=3)
+        for scope in (branch, None):
+            AvailabilitySummary.objects.create(
+                service=service, branch=scope, branch_scope=scope.pk if scope else 0,
+                date=day, seats_left=1, computed_at=timezone.now(),
+            )
+        branchless = availability_stamps(None, [day])
+
+        invalidate_after_restore(self.system)
+        self.assertFalse(AvailabilitySummary.objects.exists())
+        self.assertNotEqual(availability_stamps(None, [day]), branchless)
+
     def test_only_this_tenants_admin_can_reach_a_backup(self):
         """A missed `.filter(system=...)` here hands one customer another's
         entire database."""
@@ -933,6 +1149,41 @@ class SitePrefixTests(TestCase):
             )
         self.assertEqual(callbacks, [])
 
+    def test_a_rebuild_costs_the_same_queries_for_any_catalog_and_still_reaches_the_dishes(self):
+        """Bulk writes and a prefix-scoped collision read, without losing the
+        cross-model sweep a per-row `save()` used to fire: re-slugging a
+        category must still clear the dishes that embed its `category_slug`."""
+        def rebuild(count):
+            for n in range(count):
+                MenuCategory.objects.create(system=self.system, name=f"Cat {n}", slug=f"old-{count}-{n}")
+            with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+                report = rebuild_slugs(self.system, ["menu-category"])
+            self.assertEqual(report["menu-category"]["changed"], count)
+            # Dodges the neighbour's row on its own prefix.
+            self.assertEqual(
+                MenuCategory.objects.get(system=self.system, name="Cat 0").slug, "piccolo-cat-0-2",
+            )
+            MenuCategory.objects.filter(system=self.system).delete()
+            return len(ctx)
+
+        # The neighbour's rows are what the old pass read in full; only the
+        # one on a candidate's prefix is in the way now.
+        for n in range(30):
+            MenuCategory.objects.create(system=self.other, name=f"X {n}", slug=f"javastop-x-{n}")
+        MenuCategory.objects.create(system=self.other, name="Taken", slug="piccolo-cat-0")
+
+        self.assertEqual(rebuild(3), rebuild(40))
+
+        category = MenuCategory.objects.create(system=self.system, name="Pizzas", slug="old-pizzas")
+        MenuItem.objects.create(
+            system=self.system, category=category, name="Napoli", slug="piccolo-napoli", price=Decimal("10.00"),
+        )
+        url = f"/api/catalog/menu-items/?system={self.system.pk}"
+        self.assertEqual(self.client.get(url).json()[0]["category_slug"], "old-pizzas")
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_slugs(self.system, ["menu-category"])
+        self.assertEqual(self.client.get(url).json()[0]["category_slug"], "piccolo-pizzas")
+
 
 class SystemSettingsTests(TestCase):
     """The basemap a tenant picks, and what it calls the families it sells.
@@ -1159,6 +1410,8 @@ class EmailBadgeTests(IsolatedMediaTestCase):
 
     def setUp(self):
         cache.clear()
+        # Every test's media root starts empty, so file names repeat across them.
+        email_badges._memo.clear()
         self.system = System.objects.create(site_name="Acme", host="acme.test")
 
     @staticmethod
@@ -1282,20 +1535,23 @@ class StockImageTests(IsolatedMediaTestCase):
         # receiver is what stops a site crediting a bank whose last photo was
         # replaced fifty minutes ago.
         cache.set(f"system:host:{self.system.host}", {"stale": True}, 3600)
-        SuccessStory.objects.create(
-            system=self.system, slug="s1", name="One",
-            attribution="Photo by B on Pexels",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            SuccessStory.objects.create(
+                system=self.system, slug="s1", name="One",
+                attribution="Photo by B on Pexels",
+            )
         self.assertIsNone(cache.get(f"system:host:{self.system.host}"))
 
         # An uncredited row is our own placeholder and must not be counted.
-        SuccessStory.objects.create(system=self.system, slug="s2", name="Two")
+        with self.captureOnCommitCallbacks(execute=True):
+            SuccessStory.objects.create(system=self.system, slug="s2", name="Two")
         self.assertEqual(stock_image_count(self.system), 2)
 
         other = System.objects.create(site_name="Other", host="other.test")
-        SuccessStory.objects.create(
-            system=other, slug="o1", name="Theirs", attribution="Photo by C on Pexels",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            SuccessStory.objects.create(
+                system=other, slug="o1", name="Theirs", attribution="Photo by C on Pexels",
+            )
         self.assertEqual(stock_image_count(self.system), 2)
         self.assertEqual(stock_image_count(other), 1)
 
@@ -1399,16 +1655,17 @@ class StockImageTests(IsolatedMediaTestCase):
 
         seen = []
 
-        def fake_search(query, **kwargs):
+        def fake_hits(bank, query, **kwargs):
+            # Searches run on a pool: the id comes from the query, not the order.
             seen.append(query)
-            n = len(seen)
-            return Photo(
+            n = query.replace(" ", "-")
+            return [Photo(
                 bank="pexels", bank_id=str(n),
                 download_url=f"https://example.test/{n}.jpg",
                 attribution=f"Photo by P{n} on Pexels",
                 attribution_url=f"https://www.pexels.com/photo/{n}/",
                 alt="a sandwich",
-            )
+            )]
 
         def fake_download(photo, dest):
             out = BytesIO()
@@ -1416,7 +1673,7 @@ class StockImageTests(IsolatedMediaTestCase):
             pathlib.Path(dest).write_bytes(out.getvalue())
 
         with mock.patch(
-            "core.management.commands.fetch_seed_images.search_photo", fake_search
+            "core.management.commands.fetch_seed_images.bank_hits", fake_hits
         ), mock.patch(
             "core.management.commands.fetch_seed_images.download", fake_download
         ), mock.patch(
@@ -1486,6 +1743,129 @@ class StockImageTests(IsolatedMediaTestCase):
         self.assertTrue(fallback.image)   # the pool filled it
         self.assertEqual(fallback.attribution, "")
 
+    def test_a_concurrent_fetch_picks_as_a_serial_one_and_a_rerun_reads_the_cache(self):
+        """`fetch_seed_images` on a pool: brief order decides who gets a photo,
+        the fallback bank serves what the first ran out of, and the answers are
+        kept on disk so running the brief again asks nobody."""
+        from django.core.management import call_command
+        from core.services import image_banks
+        from core.services.image_banks import Photo
+
+        assets = tempfile.mkdtemp(prefix="seed-assets-")
+        self.addCleanup(shutil.rmtree, assets, ignore_errors=True)
+        brief = pathlib.Path(assets) / "brief.json"
+        brief.write_text(json.dumps({
+            "system": {"host": "pizza.test", "site_name": "Pizza"},
+            "menu_categories": [{
+                "name": "Pizzas",
+                "image_query": "pizza oven",
+                "menu_items": [
+                    {"name": f"Pizza {n}", "image_query": "pizza", "price": "99.00"}
+                    for n in range(1, 4)
+                ],
+            }],
+        }))
+
+        asked = []
+
+        def bank(name, ids):
+            def search(query, orientation):
+                asked.append((name, query))
+                return [
+                    Photo(
+                        bank=name, bank_id=f"{query}-{i}",
+                        download_url=f"https://example.test/{name}/{i}.jpg",
+                        attribution=f"Photo by {name} {i}", attribution_url="", alt=query,
+                    )
+                    for i in ids
+                ]
+            return search
+
+        def fake_download(photo, dest):
+            pathlib.Path(dest).write_bytes(b"jpeg")
+
+        def run(**opts):
+            call_command(
+                "fetch_seed_images", brief=str(brief), assets_dir=assets,
+                bank=None, dry_run=False, workers=4,
+                stdout=StringIO(), stderr=StringIO(), **opts,
+            )
+
+        # The first bank has two pizzas for three dishes.
+        with mock.patch.dict(image_banks._BANKS, {
+            "pexels": bank("pexels", [1, 2]), "pixabay": bank("pixabay", [1]),
+        }), mock.patch(
+            "core.management.commands.fetch_seed_images.download", fake_download
+        ), mock.patch(
+            "core.management.commands.fetch_seed_images.configured_banks",
+            lambda: ["pexels", "pixabay"],
+        ):
+            run(force=False)
+            # One search per distinct query and bank, however many dishes ask it.
+            self.assertEqual(
+                sorted(asked),
+                [("pexels", "pizza"), ("pexels", "pizza oven"), ("pixabay", "pizza")],
+            )
+            credits = json.loads(
+                (pathlib.Path(assets) / "fetched/pizza.test/credits.json").read_text()
+            )
+            dishes = json.loads(brief.read_text())["menu_categories"][0]["menu_items"]
+            self.assertEqual(
+                [credits[dish["image"]]["attribution"] for dish in dishes],
+                ["Photo by pexels 1", "Photo by pexels 2", "Photo by pixabay 1"],
+            )
+
+            asked.clear()
+            run(force=True)
+            self.assertEqual(asked, [])
+
+    def test_the_worker_renders_a_srcset_and_a_new_photo_retires_it(self):
+        """`core.renditions`: stale by source name, never served stale, and the
+        set of a replaced photo or a deleted row removed rather than left in
+        the bucket."""
+        from django.core.management import call_command
+
+        from catalog.serializers import ProductCardSerializer
+        from core import renditions
+
+        category = ProductCategory.objects.create(system=self.system, name="Tools", slug="tools")
+        product = Product.objects.create(
+            system=self.system, category=category, name="Hammer", slug="hammer", price=Decimal("10"),
+        )
+        buffer = BytesIO()
+        Image.new("RGB", (1000, 500), "red").save(buffer, format="JPEG")
+        product.image.save("hammer.jpg", ContentFile(buffer.getvalue()), save=True)
+
+        # A picture no payload offers a srcset for has nowhere to keep one.
+        self.assertNotIn(SuccessStory, renditions.picture_models())
+        self.assertFalse(hasattr(SuccessStory(), "renditions"))
+
+        self.assertIsNone(ProductCardSerializer(product).data["image_srcset"])
+        call_command("run_site_jobs", "--once", stdout=StringIO())
+
+        product.refresh_from_db()
+        webp = ProductCardSerializer(product).data["image_srcset"]["webp"]
+        self.assertEqual([part.rsplit(" ", 1)[1] for part in webp.split(", ")],
+                         ["256w", "512w", "900w", "1000w"])
+        old = [name for files in product.renditions["files"].values() for name in files.values()]
+        self.assertTrue(all(default_storage.exists(name) for name in old))
+        self.assertEqual(renditions.render_pending(), 0)
+
+        # A new upload is stale at once - the card falls back to `image` alone
+        # - and the old photo's set is deleted with the save.
+        product.image.save("hammer-2.jpg", self._jpeg(), save=True)
+        self.assertIsNone(ProductCardSerializer(product).data["image_srcset"])
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+        self.assertEqual(renditions.render_pending(), 1)
+        product.refresh_from_db()
+        self.assertEqual(list(product.renditions["files"]["webp"]), ["4"])
+
+        # And the current set goes with its row.
+        new = [name for files in product.renditions["files"].values() for name in files.values()]
+        self.assertTrue(all(default_storage.exists(name) for name in new))
+        product.delete()
+        self.assertFalse(any(default_storage.exists(name) for name in new))
+
 
 # --------------------------------------------------------------------------- #
 # The CMS image picker
@@ -1625,3 +2005,295 @@ class HealthProbeTests(TestCase):
 
             # The whole point: the same outage must NOT restart the process.
             self.assertEqual(self.client.get("/healthz/").status_code, 200)
+
+
+class RequestMetricsTests(TestCase):
+    """`core.metrics`: what a request cost, in its header, and a budget that bites."""
+
+    def setUp(self):
+        cache.clear()
+        self.system = System.objects.create(site_name="Acme", host="acme.test")
+
+    @override_settings(REQUEST_METRICS_HEADER=True)
+    def test_every_response_says_what_it_cost_and_a_budget_fails_the_test(self):
+        from core.metrics import BudgetExceeded
+        from core.views import SystemView
+
+        def timing(response):
+            return dict(
+                part.split(";", 1) for part in response["Server-Timing"].split(", ")
+            )
+
+        cold = timing(self.client.get("/api/system/", HTTP_X_WEBSITE_HOST="acme.test"))
+        warm = timing(self.client.get("/api/system/", HTTP_X_WEBSITE_HOST="acme.test"))
+        self.assertNotIn('desc="0 queries"', cold["db"])
+        self.assertIn("miss", cold["cache"])
+        # The payload is cached: the second read is served from it.
+        self.assertIn('desc="0 queries"', warm["db"])
+        self.assertIn("/ 0 miss", warm["cache"])
+        self.assertTrue(cold["ser"].startswith("dur="))
+
+        # Over budget is an error under test, not a log line nobody reads.
+        cache.clear()
+        with self.assertLogs("core.metrics", "WARNING") as logged:
+            with mock.patch.object(SystemView, "request_budget", {"queries": 0}, create=True):
+                with self.assertRaisesMessage(BudgetExceeded, "core.views.SystemView over budget"):
+                    self.client.get("/api/system/", HTTP_X_WEBSITE_HOST="acme.test")
+            # ...and a slow request only ever logs.
+            with mock.patch.object(SystemView, "request_budget", {"ms": 0}, create=True):
+                self.assertEqual(
+                    self.client.get("/api/system/", HTTP_X_WEBSITE_HOST="acme.test").status_code, 200,
+                )
+        self.assertIn("ms (budget 0)", logged.output[-1])
+
+
+@override_settings(REQUEST_METRICS_HEADER=True)
+class StorefrontBundleTests(TestCase):
+    """`GET /api/storefront/`: the landing page's eight reads in one."""
+
+    def setUp(self):
+        cache.clear()
+        self.system = System.objects.create(site_name="Acme", host="acme.test")
+        CompanyHighlight.objects.create(system=self.system, name="Since 1990", slug="acme-since-1990")
+        self.product = Product.objects.create(
+            system=self.system, category=a_product_category(self.system),
+            name="Hammer", slug="acme-hammer", price=Decimal("19.99"), is_featured=True,
+        )
+
+    def test_one_read_of_every_fragment_shared_with_the_endpoints_and_a_304(self):
+        def bundle(**headers):
+            return self.client.get("/api/storefront/", HTTP_X_WEBSITE_HOST="acme.test", **headers)
+
+        cold = bundle()
+        self.assertEqual(cold.status_code, 200)
+        body = cold.json()
+        self.assertEqual(body["system"]["id"], self.system.pk)
+        self.assertEqual([h["name"] for h in body["highlights"]], ["Since 1990"])
+        # The very entry the list endpoint reads, not a second copy of it.
+        listed = self.client.get(
+            "/api/catalog/products/?featured=true", HTTP_X_WEBSITE_HOST="acme.test",
+        )
+        self.assertEqual(body["featured_products"], listed.json())
+        # Nothing built, and the host already resolved by the bundle.
+        self.assertIn('desc="0 queries"', listed["Server-Timing"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            warm = bundle()
+        # Every fragment out of one get_many, and no System lookup either.
+        self.assertEqual(len(ctx), 0)
+        self.assertIn("0 miss", warm["Server-Timing"])
+        self.assertEqual(warm["ETag"], cold["ETag"])
+
+        self.assertEqual(bundle(HTTP_IF_NONE_MATCH=cold["ETag"]).status_code, 304)
+
+        # A write clears the fragment through its usual invalidation, and the
+        # bundle's tag moves with it.
+        self.product.name = "Claw hammer"
+        self.product.save()
+        invalidate_family(self.system.pk, "product")
+        fresh = bundle(HTTP_IF_NONE_MATCH=cold["ETag"])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.json()["featured_products"][0]["name"], "Claw hammer")
+
+
+class HostResolutionTests(TestCase):
+    """`core.tenancy.system_for_host`: a query the first time, a dictionary hit after."""
+
+    def setUp(self):
+        cache.clear()
+        self.system = System.objects.create(site_name="Acme", host="acme.test")
+
+    def test_a_host_is_queried_once_shared_across_workers_and_forgotten_on_a_system_write(self):
+        from core import tenancy
+
+        self.assertEqual(tenancy.system_for_host("acme.test").pk, self.system.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            first = tenancy.system_for_host("acme.test")
+            # Another worker: its own memo is empty, the shared entry is not.
+            tenancy._host_memo.clear()
+            second = tenancy.system_for_host("acme.test")
+            self.assertIsNone(tenancy.system_for_host("new.test"))
+            self.assertIsNone(tenancy.system_for_host("new.test"))
+        self.assertEqual(len(ctx), 1)
+        self.assertIsNot(first, second)
+
+        # A System write clears the cached answers, "nobody" included.
+        System.objects.create(site_name="New", host="new.test")
+        self.assertEqual(tenancy.system_for_host("new.test").site_name, "New")
+        self.system.enabled = False
+        self.system.save()
+        self.assertIsNone(tenancy.system_for_host("acme.test"))
+
+
+class ConditionalGetTests(TestCase):
+    """`core.conditional`: a poll of unchanged content is a 304, and usually no view at all."""
+
+    def setUp(self):
+        cache.clear()
+        self.system = System.objects.create(site_name="Acme", host="acme.test")
+        self.highlight = CompanyHighlight.objects.create(
+            system=self.system, name="Since 1990", slug="acme-since-1990",
+        )
+
+    def get(self, url, **headers):
+        return self.client.get(url, HTTP_X_WEBSITE_HOST="acme.test", **headers)
+
+    def test_a_remembered_tag_is_answered_before_the_view_until_the_tenant_writes(self):
+        first = self.get("/api/highlights/")
+        etag = first["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            unchanged = self.get("/api/highlights/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.content, b"")
+        self.assertEqual(len(ctx), 0)
+
+        # Another tenant's write does not cost this one its 304s...
+        other = System.objects.create(site_name="Other", host="other.test")
+        CompanyHighlight.objects.create(system=other, name="Elsewhere", slug="other-elsewhere")
+        self.assertEqual(self.get("/api/highlights/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Nor do the sweeps that ride along with every catalog save and every
+        # enquiry: nothing public is answered from a cart or the inbox.
+        invalidate_pattern("users:cart*")
+        invalidate_pattern("core:contact_messages:*")
+        self.assertEqual(self.get("/api/highlights/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # ...its own does. The list key is cleared the way the CMS would.
+        self.highlight.name = "Since 1991"
+        self.highlight.save()
+        cache.delete("core:highlights:acme.test")
+        changed = self.get("/api/highlights/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+        # A bump that changed nothing falls through to the view, whose body
+        # hashes to the same tag.
+        invalidate_family(self.system.pk, "product")
+        self.assertEqual(self.get("/api/highlights/", HTTP_IF_NONE_MATCH=changed["ETag"]).status_code, 304)
+        self.assertFalse(self.get("/api/highlights/?include_disabled=true").has_header("ETag"))
+
+
+class ReadThroughCacheTests(TestCase):
+    """One rebuild per expired key, not one per request that happens to land on it."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_a_stale_entry_is_served_while_another_worker_rebuilds_it(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {"n": len(builds)}
+
+        self.assertEqual(read_through("test:rt", build, 60), {"n": 1})
+        self.assertEqual(read_through("test:rt", build, 60), {"n": 1})
+
+        # Past the soft expiry, with the rebuild lock held elsewhere: the old
+        # payload is answered straight away and nothing is rebuilt.
+        # 70s is past any jittered soft TTL of 60 but inside the hard one.
+        later = time.time() + 70
+        with mock.patch("core.cache.time.time", return_value=later):
+            cache.add("lock:test:rt", 1, 10)
+            self.assertEqual(read_through("test:rt", build, 60), {"n": 1})
+            self.assertEqual(len(builds), 1)
+
+            # Once the lock is free, the next request refreshes it.
+            cache.delete("lock:test:rt")
+            self.assertEqual(read_through("test:rt", build, 60), {"n": 2})
+
+
+@override_settings(EMAIL_OUTBOX_SEND_INLINE=False)
+class OutboxTests(TestCase):
+    """Transactional email is queued by the request and sent by the worker in
+    batches over one connection, a refused message retried on a backoff."""
+
+    def test_a_batch_shares_one_connection_and_a_refusal_is_retried_later(self):
+        from django.core.mail import EmailMessage, get_connection
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.core.management import call_command
+
+        from core import outbox
+        from core.models import OutboundEmail
+
+        system = System.objects.create(site_name="Acme", host="acme.test")
+        for to in ("ana@example.com", "bounce@example.com", "luis@example.com"):
+            outbox.enqueue(EmailMessage("Hola", "body", "shop@acme.test", [to]), label="test", system=system)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.STATUS_QUEUED).count(), 3)
+
+        send = EmailBackend.send_messages
+
+        def refuse_bounce(backend, messages):
+            if "bounce@example.com" in messages[0].to:
+                raise OSError("550 mailbox unavailable")
+            return send(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", autospec=True, side_effect=refuse_bounce), \
+                mock.patch("core.outbox.get_connection", wraps=get_connection) as connect:
+            call_command("send_queued_email", "--once", stdout=StringIO())
+
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["ana@example.com", "luis@example.com"])
+        bounced = OutboundEmail.objects.get(recipients=["bounce@example.com"])
+        self.assertEqual((bounced.status, bounced.attempts), (OutboundEmail.STATUS_QUEUED, 1))
+        self.assertIn("550", bounced.error)
+        self.assertGreater(bounced.next_attempt_at, timezone.now())
+
+        # Not due yet: the worker leaves it alone until the backoff has passed.
+        self.assertEqual(outbox.send_due(), 0)
+        OutboundEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.send_due(), 1)
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(len(mail.outbox), 3)
+
+        # A claim is the worker's until its lease runs out, and then anyone's:
+        # a worker that died mid-batch does not strand its messages.
+        outbox.enqueue(EmailMessage("Hola", "body", "shop@acme.test", ["eva@example.com"]), label="test")
+        (claimed,) = outbox.claim()
+        self.assertEqual(OutboundEmail.objects.get(pk=claimed.pk).status, OutboundEmail.STATUS_SENDING)
+        self.assertEqual(outbox.send_due(), 0)
+        OutboundEmail.objects.filter(pk=claimed.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.send_due(), 1)
+        self.assertEqual(OutboundEmail.objects.get(pk=claimed.pk).status, OutboundEmail.STATUS_SENT)
+
+
+class SystemCounterTests(TestCase):
+    """The System payload's counts are stored and kept by the write receivers,
+    and `reconcile_counters` repairs what a signal-less write left behind."""
+
+    def test_a_write_moves_the_stored_count_and_reconcile_fixes_a_drift(self):
+        from django.core.management import call_command
+
+        from core.models import SystemCounters
+
+        cache.clear()
+        system = System.objects.create(site_name="Acme", host="acme.test")
+        category = a_product_category(system)
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(system=system, category=category, name="Hammer", slug="acme-hammer", price=Decimal("1"))
+
+        def payload():
+            return self.client.get("/api/system/", HTTP_X_WEBSITE_HOST="acme.test").json()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(payload()["product_count"], 1)
+        self.assertFalse([q for q in ctx.captured_queries if "COUNT(" in q["sql"]])
+
+        # The receiver stores the new count once the write commits, and drops
+        # the payload that had the old one.
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(system=system, category=category, name="Saw", slug="acme-saw", price=Decimal("1"))
+        self.assertEqual(payload()["product_count"], 2)
+
+        # `.update()` sends no signal: the stored count is left behind until reconciled.
+        Product.objects.filter(system=system).update(enabled=False)
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out, stderr=StringIO())
+        self.assertIn("1 row(s) drifted", out.getvalue())
+        self.assertEqual(SystemCounters.objects.get(system=system).product_count, 2)
+
+        call_command("reconcile_counters", "--fix", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(payload()["product_count"], 0)
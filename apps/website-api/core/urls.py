@@ -26,11 +26,15 @@ from .views import (
     SiteBackupDetailView,
     SiteBackupDownloadView,
     SiteBackupListCreateView,
+    SiteJobCancelView,
+    SiteJobDetailView,
+    SiteJobListView,
     SiteRestoreView,
     SlugCheckView,
     SocialPostDetailView,
     SocialPostListCreateView,
     StockImageFetchView,
+    StorefrontView,
     StockImageSearchView,
     SuccessStoryBySlugView,
     SuccessStoryDetailView,
@@ -48,6 +52,7 @@ urlpatterns = [
     path("publish-site/", PublishSiteView.as_view(), name="publish-site"),
     path("system/", SystemView.as_view(), name="system-detail"),
     path("system/<int:pk>/", SystemView.as_view(), name="system-update"),
+    path("storefront/", StorefrontView.as_view(), name="storefront"),
     # Read-and-test only; the config is *written* through the System PATCH
     # above like every other CMS field. Separate from the System payload because
     # that one is AllowAny and this is not.
@@ -105,6 +110,9 @@ urlpatterns = [
     path("backups/restore/", SiteRestoreView.as_view(), name="backup-restore"),
     path("backups/<int:pk>/", SiteBackupDetailView.as_view(), name="backup-detail"),
     path("backups/<int:pk>/download/", SiteBackupDownloadView.as_view(), name="backup-download"),
+    path("backups/jobs/", SiteJobListView.as_view(), name="backup-job-list"),
+    path("backups/jobs/<int:pk>/", SiteJobDetailView.as_view(), name="backup-job-detail"),
+    path("backups/jobs/<int:pk>/cancel/", SiteJobCancelView.as_view(), name="backup-job-cancel"),
 
     path("check-slug/", SlugCheckView.as_view(), name="check-slug"),
 
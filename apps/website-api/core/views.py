@@ -3,11 +3,11 @@ import json
 import logging
 import os
 import tempfile
+import time
 import zipfile
 
 from django.conf import settings
 from django.core.cache import cache
-from django.core.files import File
 from django.db.models import Q
 from django.db.models.functions import Coalesce
 from django.http import FileResponse, StreamingHttpResponse
@@ -18,23 +18,29 @@ from rest_framework import status
 from rest_framework.authentication import BasicAuthentication
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from catalog.cache import invalidate_catalog, payload_fragment
+from catalog.search import rebuild_index as rebuild_search_index
+from catalog.views import public_list_fragment
 from core.permissions import IsSystemAdmin, show_disabled
-from core.tenancy import user_system
+from core.rendered import RenderedJSON, json_object, rendered_response
+from core.tenancy import host_system, request_host, user_system
 from .backup import (
     MODE_REPLACE,
-    SECTION_IMAGES,
-    BackupError,
+    RESTORE_MODES,
+    check_archive,
     normalize_sections,
-    restore_archive,
-    write_archive,
 )
-from .cache import invalidate_pattern as _invalidate_pattern
+from .cache import invalidate_pattern as _invalidate_pattern, invalidate_system_payload, read_many, read_through
+from .counters import recount as recount_system
+from .jobs import backups_key as _backups_key, cancel_job, enqueue_backup, enqueue_restore, run_job
 from .services import image_banks
 from .storage import test_credentials
-from .models import ALL_DAY_GRACE, Branch, Brand, CompanyHighlight, CompanyHighlightItem, ContactMessage, Event, EventImage, HomepageFlyer, SiteBackup, SocialPost, SuccessStory, SuccessStoryImage, System
+from .models import ALL_DAY_GRACE, Branch, Brand, CompanyHighlight, CompanyHighlightItem, ContactMessage, Event, EventImage, HomepageFlyer, SiteBackup, SiteJob, SocialPost, SuccessStory, SuccessStoryImage, System
 from .serializers import (
     AiChatSerializer,
     BranchSerializer,
@@ -54,6 +60,7 @@ from .serializers import (
     HomepageFlyerSerializer,
     HomepageFlyerWriteSerializer,
     SiteBackupSerializer,
+    SiteJobSerializer,
     SocialPostSerializer,
     SocialPostWriteSerializer,
     SuccessStoryImageSerializer,
@@ -67,6 +74,9 @@ from core.services.contact import send_contact_message_notification, send_contac
 from core.services.llm import stream_chat
 from core.services.reslug import SLUG_MODELS, rebuild_slugs
 from core.site_payload import ImageArchive, apply_payload
+from orders.cache import invalidate_branch_availability
+from orders.services.availability_summary import forget_system as forget_availability_summaries
+from orders.services.rewards import reset_balances
 
 logger = logging.getLogger(__name__)
 
@@ -195,16 +205,24 @@ class PublishSiteView(APIView):
             "core:events:*",
             "core:event:*",
             "core:event_images:*",
-            "catalog:product_categories*",
-            "catalog:products*",
-            "catalog:service_categories*",
-            "catalog:services*",
-            "catalog:menu_categories*",
-            "catalog:menu_category*",
-            "catalog:menu_items*",
-            "catalog:menu_item*",
+            # A cart line embeds its item's price. `apply_payload` writes in
+            # bulk, so the per-item receivers that used to clear these are
+            # never sent.
+            "users:cart*",
         ):
             _invalidate_pattern(pattern)
+        # The catalog is stamped per tenant (`catalog/cache.py`), so only the
+        # published site's families are bumped - no sweep, no other tenant.
+        system_id = System.objects.filter(host=host).values_list("pk", flat=True).first()
+        if system_id is not None:
+            invalidate_catalog(system_id)
+            # Written in bulk too, so no signal rewrote the search entries or
+            # the stored counts.
+            rebuild_search_index(system_id)
+            recount_system(system_id)
+            # Again, now the counts are current: a request between the delete
+            # above and the recount could have cached the old ones for an hour.
+            invalidate_system_payload(system_id)
 
 
 class SystemView(APIView):
@@ -213,6 +231,8 @@ class SystemView(APIView):
     PATCH /api/system/<pk>/   - partial update of a System record (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -221,35 +241,36 @@ class SystemView(APIView):
     def get(self, request, pk=None):
         if pk is not None:
             cache_key = f"system:pk:{pk}"
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return Response(cached)
-            try:
-                instance = System.objects.get(pk=pk)
-            except System.DoesNotExist:
+
+            def build():
+                try:
+                    instance = System.objects.get(pk=pk)
+                except System.DoesNotExist:
+                    return None
+                return SystemSerializer(instance, context={"request": request}).data
+
+            data = read_through(cache_key, build, SYSTEM_CACHE_TTL)
+            if data is None:
                 return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-            data = SystemSerializer(instance, context={"request": request}).data
-            cache.set(cache_key, data, SYSTEM_CACHE_TTL)
             return Response(data)
 
         # X-Website-Host is forwarded by the Next.js SSR layer so that
         # server-side fetches (which originate from the Next.js process)
         # carry the original browser host for correct System record lookup.
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
+        host = request_host(request)
 
         cache_key = f"system:host:{host}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        instance = System.objects.filter(host=host, enabled=True).first()
-        if instance is None:
-            return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
+        def build():
+            instance = host_system(request)
+            if instance is None:
+                return None
+
+            return SystemSerializer(instance, context={"request": request}).data
 
-        data = SystemSerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, SYSTEM_CACHE_TTL)
+        data = read_through(cache_key, build, SYSTEM_CACHE_TTL)
+        if data is None:
+            return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
         return Response(data)
 
     def patch(self, request, pk):
@@ -268,6 +289,85 @@ class SystemView(APIView):
         return Response(SystemSerializer(instance, context={"request": request}).data)
 
 
+# What the landing page's two event sliders show (`components/events.tsx` in the
+# website). The bundle asks for the same lists, so it shares their cache entries.
+STOREFRONT_UPCOMING_EVENTS = 12
+STOREFRONT_PAST_EVENTS = 3
+
+
+class StorefrontView(APIView):
+    """
+    GET /api/storefront/   - everything a storefront landing page paints, in one response (public).
+
+    The landing page used to make eight requests for this - the System, success
+    stories, highlights, flyers, two event sliders and the featured products,
+    services and dishes - and each one resolved the host to a System with its
+    own query and read its own cache entry. This resolves the System once and
+    reads every fragment with a single `get_many` (`core.cache.read_many`);
+    only a fragment that is missing or stale is built, by the same code and
+    under the same key as its own endpoint, so the bundle and the endpoints
+    keep warming each other's entries and are cleared by the same invalidation.
+
+    Answered conditionally (`core.conditional`): a visitor navigating back to
+    the landing page downloads nothing when nothing changed, and while the
+    tenant's content version stands the revalidation runs no query at all.
+
+    ⚠ Public payloads only, never the `include_disabled` variants: this has no
+    admin mode, and the CMS keeps reading the endpoints it always did.
+    """
+
+    permission_classes = (AllowAny,)
+    conditional_get = True
+    # A cold bundle: nine fragments built from scratch. Warm, it runs none.
+    request_budget = {"queries": 40, "ms": 500}
+
+    def get(self, request):
+        system = host_system(request)
+        if system is None:
+            return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # The catalog fragments are cached already rendered (`core.rendered`):
+        # spliced in as bytes, not parsed back into lists to be rendered again.
+        fragments = read_many(self._fragments(request, system))
+        return rendered_response(request, RenderedJSON(json_object(fragments), compress=False))
+
+    def _fragments(self, request, system):
+        """The bundle's fragments, keyed exactly as each one's own endpoint keys it."""
+        host = system.host
+        suffix = _disabled_suffix(False)
+
+        def content(key, payload):
+            return key, lambda: payload(request, system.pk), CACHE_TTL, None, None
+
+        def events(scope, limit):
+            def build():
+                qs = _event_queryset(system.pk, scope=scope, disabled_visible=False, limit=limit)
+                return EventSerializer(qs, many=True, context={"request": request}).data
+
+            return f"core:events:{host}:{scope}:{limit}{suffix}", build, _event_ttl(scope), None, None
+
+        fragments = {
+            "system": (
+                f"system:host:{host}",
+                lambda: SystemSerializer(system, context={"request": request}).data,
+                SYSTEM_CACHE_TTL, None, None,
+            ),
+            "success_stories": content(f"core:success_stories:{host}{suffix}", _success_stories_payload),
+            "highlights": content(f"core:highlights:{host}{suffix}", _highlights_payload),
+            "homepage_flyers": content(f"core:homepage_flyers:{host}{suffix}", _homepage_flyers_payload),
+            "upcoming_events": events(EVENT_SCOPE_UPCOMING, STOREFRONT_UPCOMING_EVENTS),
+            "past_events": events(EVENT_SCOPE_PAST, STOREFRONT_PAST_EVENTS),
+        }
+        for family, name in (
+            ("product", "featured_products"),
+            ("service", "featured_services"),
+            ("menu_item", "featured_menu_items"),
+        ):
+            key, build = public_list_fragment(family, request, system.pk, {"featured": "true"})
+            fragments[name] = payload_fragment(key, family, build, system.pk)
+        return fragments
+
+
 class SystemStorageView(APIView):
     """
     GET  /api/system/<pk>/storage/  - this tenant's R2 config, secret omitted.
@@ -350,6 +450,13 @@ def _disabled_suffix(disabled_visible):
     return ":include_disabled" if disabled_visible else ""
 
 
+def _success_stories_payload(request, system_id, disabled_visible=False):
+    qs = SuccessStory.objects.filter(system_id=system_id).prefetch_related("images")
+    if not disabled_visible:
+        qs = qs.filter(enabled=True)
+    return SuccessStorySerializer(qs, many=True, context={"request": request}).data
+
+
 class SuccessStoryListView(APIView):
     """
     GET  /api/success-stories/   - list stories for the current system (public).
@@ -361,17 +468,13 @@ class SuccessStoryListView(APIView):
                          only; ignored for everyone else)
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
         return [IsSystemAdmin()]
 
-    def _resolve_system(self, request):
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
-        return System.objects.filter(host=host, enabled=True).first()
-
     def get(self, request):
         disabled_visible = show_disabled(request)
         suffix = _disabled_suffix(disabled_visible)
@@ -380,20 +483,16 @@ class SuccessStoryListView(APIView):
             cache_key = f"core:success_stories:system:{system_id}{suffix}"
         else:
             # Existing host-based resolution
-            system = self._resolve_system(request)
+            system = host_system(request)
             if system is None:
                 return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
             system_id = system.id
             cache_key = f"core:success_stories:{system.host}{suffix}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        qs = SuccessStory.objects.filter(system_id=system_id).prefetch_related("images")
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-        data = SuccessStorySerializer(qs, many=True, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        def build():
+            return _success_stories_payload(request, system_id, disabled_visible)
+
+        data = read_through(cache_key, build, CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -416,6 +515,8 @@ class SuccessStoryDetailView(APIView):
     DELETE /api/success-stories/<pk>/   - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -429,14 +530,16 @@ class SuccessStoryDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:success_story:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        instance = self._get_object(pk)
-        if instance is None:
+
+        def build():
+            instance = self._get_object(pk)
+            if instance is None:
+                return None
+            return SuccessStorySerializer(instance, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = SuccessStorySerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -469,6 +572,8 @@ class SuccessStoryImagesView(APIView):
     POST /api/success-stories/<pk>/images/ - add an image (admin only, base64).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -482,16 +587,18 @@ class SuccessStoryImagesView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:success_story_images:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        story = self._get_story(pk)
-        if story is None:
+
+        def build():
+            story = self._get_story(pk)
+            if story is None:
+                return None
+            return SuccessStoryImageSerializer(
+                story.images.all(), many=True, context={"request": request}
+            ).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = SuccessStoryImageSerializer(
-            story.images.all(), many=True, context={"request": request}
-        ).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def post(self, request, pk):
@@ -557,53 +664,53 @@ class SuccessStoryImageDetailView(APIView):
 class SuccessStoryBySlugView(APIView):
     """GET /api/success-stories/slug/<slug>/ - retrieve a story by slug for the current system (public)."""
 
-    permission_classes = [AllowAny]
+    conditional_get = True
 
-    def _resolve_system(self, request):
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
-        return System.objects.filter(host=host, enabled=True).first()
+    permission_classes = [AllowAny]
 
     def get(self, request, slug):
-        system = self._resolve_system(request)
+        system = host_system(request)
         if system is None:
             return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
 
         cache_key = f"core:success_story:slug:{system.host}:{slug}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        try:
-            instance = SuccessStory.objects.prefetch_related("images").get(
-                system=system, slug=slug, enabled=True
-            )
-        except SuccessStory.DoesNotExist:
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        def build():
+            try:
+                instance = SuccessStory.objects.prefetch_related("images").get(
+                    system=system, slug=slug, enabled=True
+                )
+            except SuccessStory.DoesNotExist:
+                return None
+
+            return SuccessStorySerializer(instance, context={"request": request}).data
 
-        data = SuccessStorySerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
         return Response(data)
 
 
+def _highlights_payload(request, system_id, disabled_visible=False):
+    qs = CompanyHighlight.objects.filter(system_id=system_id).prefetch_related("items")
+    if not disabled_visible:
+        qs = qs.filter(enabled=True)
+    return CompanyHighlightSerializer(qs, many=True, context={"request": request}).data
+
+
 class CompanyHighlightListView(APIView):
     """
     GET  /api/highlights/   - list highlights for the current system (public).
     POST /api/highlights/   - create a new highlight (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
         return [IsSystemAdmin()]
 
-    def _resolve_system(self, request):
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
-        return System.objects.filter(host=host, enabled=True).first()
-
     def get(self, request):
         disabled_visible = show_disabled(request)
         suffix = _disabled_suffix(disabled_visible)
@@ -612,20 +719,16 @@ class CompanyHighlightListView(APIView):
             cache_key = f"core:highlights:system:{system_id}{suffix}"
         else:
             # Existing host-based resolution
-            system = self._resolve_system(request)
+            system = host_system(request)
             if system is None:
                 return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
             system_id = system.id
             cache_key = f"core:highlights:{system.host}{suffix}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        qs = CompanyHighlight.objects.filter(system_id=system_id).prefetch_related("items")
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-        data = CompanyHighlightSerializer(qs, many=True, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        def build():
+            return _highlights_payload(request, system_id, disabled_visible)
+
+        data = read_through(cache_key, build, CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -648,6 +751,8 @@ class CompanyHighlightDetailView(APIView):
     DELETE /api/highlights/<pk>/   - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -661,14 +766,16 @@ class CompanyHighlightDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:highlight:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        instance = self._get_object(pk)
-        if instance is None:
+
+        def build():
+            instance = self._get_object(pk)
+            if instance is None:
+                return None
+            return CompanyHighlightSerializer(instance, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = CompanyHighlightSerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -693,6 +800,13 @@ class CompanyHighlightDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _homepage_flyers_payload(request, system_id, disabled_visible=False):
+    qs = HomepageFlyer.objects.filter(system_id=system_id)
+    if not disabled_visible:
+        qs = qs.filter(enabled=True)
+    return HomepageFlyerSerializer(qs, many=True, context={"request": request}).data
+
+
 class HomepageFlyerListView(APIView):
     """
     GET  /api/homepage-flyers/   - list this system's flyers (public).
@@ -703,17 +817,13 @@ class HomepageFlyerListView(APIView):
     only from the CMS.
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
         return [IsSystemAdmin()]
 
-    def _resolve_system(self, request):
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
-        return System.objects.filter(host=host, enabled=True).first()
-
     def get(self, request):
         disabled_visible = show_disabled(request)
         suffix = _disabled_suffix(disabled_visible)
@@ -721,20 +831,16 @@ class HomepageFlyerListView(APIView):
         if system_id:
             cache_key = f"core:homepage_flyers:system:{system_id}{suffix}"
         else:
-            system = self._resolve_system(request)
+            system = host_system(request)
             if system is None:
                 return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
             system_id = system.id
             cache_key = f"core:homepage_flyers:{system.host}{suffix}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        qs = HomepageFlyer.objects.filter(system_id=system_id)
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-        data = HomepageFlyerSerializer(qs, many=True, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        def build():
+            return _homepage_flyers_payload(request, system_id, disabled_visible)
+
+        data = read_through(cache_key, build, CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -757,6 +863,8 @@ class HomepageFlyerDetailView(APIView):
     DELETE /api/homepage-flyers/<pk>/   - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -770,14 +878,16 @@ class HomepageFlyerDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:homepage_flyer:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        instance = self._get_object(pk)
-        if instance is None:
+
+        def build():
+            instance = self._get_object(pk)
+            if instance is None:
+                return None
+            return HomepageFlyerSerializer(instance, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = HomepageFlyerSerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -804,33 +914,30 @@ class HomepageFlyerDetailView(APIView):
 class CompanyHighlightBySlugView(APIView):
     """GET /api/highlights/slug/<slug>/ - retrieve a highlight by slug for the current system (public)."""
 
-    permission_classes = [AllowAny]
+    conditional_get = True
 
-    def _resolve_system(self, request):
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
-        return System.objects.filter(host=host, enabled=True).first()
+    permission_classes = [AllowAny]
 
     def get(self, request, slug):
-        system = self._resolve_system(request)
+        system = host_system(request)
         if system is None:
             return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
 
         cache_key = f"core:highlight:slug:{system.host}:{slug}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        try:
-            instance = CompanyHighlight.objects.prefetch_related("items").get(
-                system=system, slug=slug, enabled=True
-            )
-        except CompanyHighlight.DoesNotExist:
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        def build():
+            try:
+                instance = CompanyHighlight.objects.prefetch_related("items").get(
+                    system=system, slug=slug, enabled=True
+                )
+            except CompanyHighlight.DoesNotExist:
+                return None
+
+            return CompanyHighlightSerializer(instance, context={"request": request}).data
 
-        data = CompanyHighlightSerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
         return Response(data)
 
 
@@ -840,6 +947,8 @@ class CompanyHighlightItemsView(APIView):
     POST /api/highlights/<pk>/items/   - create a new item (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -853,16 +962,18 @@ class CompanyHighlightItemsView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:highlight_items:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        highlight = self._get_highlight(pk)
-        if highlight is None:
+
+        def build():
+            highlight = self._get_highlight(pk)
+            if highlight is None:
+                return None
+            return CompanyHighlightItemSerializer(
+                highlight.items.all(), many=True, context={"request": request}
+            ).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = CompanyHighlightItemSerializer(
-            highlight.items.all(), many=True, context={"request": request}
-        ).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def post(self, request, pk):
@@ -890,6 +1001,8 @@ class CompanyHighlightItemDetailView(APIView):
     DELETE /api/highlights/<pk>/items/<item_pk>/   - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -903,14 +1016,16 @@ class CompanyHighlightItemDetailView(APIView):
 
     def get(self, request, pk, item_pk):
         cache_key = f"core:highlight_item:{item_pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        item = self._get_item(pk, item_pk)
-        if item is None:
+
+        def build():
+            item = self._get_item(pk, item_pk)
+            if item is None:
+                return None
+            return CompanyHighlightItemSerializer(item, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = CompanyHighlightItemSerializer(item, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk, item_pk):
@@ -1007,6 +1122,14 @@ def _event_queryset(system_id, *, scope, disabled_visible, limit=None):
     return qs
 
 
+def _event_ttl(scope):
+    # ⚠ Deliberately shorter than CACHE_TTL for the scoped reads: their contents
+    # depend on the clock, so an event that has just finished must not keep
+    # claiming to be upcoming for five minutes. The unscoped list is
+    # time-independent and keeps the normal TTL.
+    return CACHE_TTL if scope == EVENT_SCOPE_ALL else EVENT_SCOPED_CACHE_TTL
+
+
 def _event_scope(request):
     scope = (request.query_params.get("scope") or EVENT_SCOPE_ALL).lower()
     return scope if scope in (EVENT_SCOPE_UPCOMING, EVENT_SCOPE_PAST) else EVENT_SCOPE_ALL
@@ -1036,17 +1159,13 @@ class EventListView(APIView):
                          only; ignored for everyone else)
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
         return [IsSystemAdmin()]
 
-    def _resolve_system(self, request):
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
-        return System.objects.filter(host=host, enabled=True).first()
-
     def get(self, request):
         disabled_visible = show_disabled(request)
         suffix = _disabled_suffix(disabled_visible)
@@ -1056,27 +1175,20 @@ class EventListView(APIView):
         if system_id:
             base = f"core:events:system:{system_id}"
         else:
-            system = self._resolve_system(request)
+            system = host_system(request)
             if system is None:
                 return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
             system_id = system.id
             base = f"core:events:{system.host}"
         cache_key = f"{base}:{scope}:{limit or 'all'}{suffix}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        def build():
+            qs = _event_queryset(
+                system_id, scope=scope, disabled_visible=disabled_visible, limit=limit
+            )
+            return EventSerializer(qs, many=True, context={"request": request}).data
 
-        qs = _event_queryset(
-            system_id, scope=scope, disabled_visible=disabled_visible, limit=limit
-        )
-        data = EventSerializer(qs, many=True, context={"request": request}).data
-        # ⚠ Deliberately shorter than CACHE_TTL for the scoped reads: their
-        # contents depend on the clock, so an event that has just finished must
-        # not keep claiming to be upcoming for five minutes. The unscoped list is
-        # time-independent and keeps the normal TTL.
-        ttl = CACHE_TTL if scope == EVENT_SCOPE_ALL else EVENT_SCOPED_CACHE_TTL
-        cache.set(cache_key, data, ttl)
+        data = read_through(cache_key, build, _event_ttl(scope))
         return Response(data)
 
     def post(self, request):
@@ -1107,6 +1219,8 @@ class EventDetailView(APIView):
     DELETE /api/events/<pk>/   - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -1124,15 +1238,18 @@ class EventDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:event:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        instance = self._get_object(pk)
-        if instance is None:
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = EventSerializer(instance, context={"request": request}).data
+
+        def build():
+            instance = self._get_object(pk)
+            if instance is None:
+                return None
+            return EventSerializer(instance, context={"request": request}).data
+
         # `is_past` rides in this payload, so it ages like the scoped lists do.
-        cache.set(cache_key, data, EVENT_SCOPED_CACHE_TTL)
+
+        data = read_through(cache_key, build, EVENT_SCOPED_CACHE_TTL)
+        if data is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
         return Response(data)
 
     def patch(self, request, pk):
@@ -1157,35 +1274,32 @@ class EventDetailView(APIView):
 class EventBySlugView(APIView):
     """GET /api/events/slug/<slug>/ - retrieve an event by slug for the current system (public)."""
 
-    permission_classes = [AllowAny]
+    conditional_get = True
 
-    def _resolve_system(self, request):
-        host = (
-            request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()
-        ).split(":")[0]
-        return System.objects.filter(host=host, enabled=True).first()
+    permission_classes = [AllowAny]
 
     def get(self, request, slug):
-        system = self._resolve_system(request)
+        system = host_system(request)
         if system is None:
             return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
 
         cache_key = f"core:event:slug:{system.host}:{slug}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        try:
-            instance = (
-                Event.objects.select_related("branch")
-                .prefetch_related("images")
-                .get(system=system, slug=slug, enabled=True)
-            )
-        except Event.DoesNotExist:
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        def build():
+            try:
+                instance = (
+                    Event.objects.select_related("branch")
+                    .prefetch_related("images")
+                    .get(system=system, slug=slug, enabled=True)
+                )
+            except Event.DoesNotExist:
+                return None
+
+            return EventSerializer(instance, context={"request": request}).data
 
-        data = EventSerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, EVENT_SCOPED_CACHE_TTL)
+        data = read_through(cache_key, build, EVENT_SCOPED_CACHE_TTL)
+        if data is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
         return Response(data)
 
 
@@ -1195,6 +1309,8 @@ class EventImagesView(APIView):
     POST /api/events/<pk>/images/ - add an image (admin only, base64).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -1208,16 +1324,18 @@ class EventImagesView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:event_images:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        event = self._get_event(pk)
-        if event is None:
+
+        def build():
+            event = self._get_event(pk)
+            if event is None:
+                return None
+            return EventImageSerializer(
+                event.images.all(), many=True, context={"request": request}
+            ).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = EventImageSerializer(
-            event.images.all(), many=True, context={"request": request}
-        ).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def post(self, request, pk):
@@ -1285,6 +1403,8 @@ class BrandListCreateView(APIView):
     POST /api/brands/   - create a brand (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -1297,21 +1417,19 @@ class BrandListCreateView(APIView):
         if system_id:
             cache_key = f"core:brands:system:{system_id}{suffix}"
         else:
-            host = (request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()).split(":")[0]
-            system = System.objects.filter(host=host, enabled=True).first()
+            system = host_system(request)
             if system is None:
                 return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
             system_id = system.id
             cache_key = f"core:brands:{system.host}{suffix}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        qs = Brand.objects.filter(system_id=system_id)
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-        data = BrandSerializer(qs, many=True, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        def build():
+            qs = Brand.objects.filter(system_id=system_id)
+            if not disabled_visible:
+                qs = qs.filter(enabled=True)
+            return BrandSerializer(qs, many=True, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -1337,6 +1455,8 @@ class BrandDetailView(APIView):
     DELETE /api/brands/<pk>/   - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -1350,14 +1470,16 @@ class BrandDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:brand:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        instance = self._get_object(pk)
-        if instance is None:
+
+        def build():
+            instance = self._get_object(pk)
+            if instance is None:
+                return None
+            return BrandSerializer(instance, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = BrandSerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -1393,6 +1515,8 @@ class BranchListCreateView(APIView):
     POST /api/branches/   - create a branch (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -1405,23 +1529,21 @@ class BranchListCreateView(APIView):
         if system_id:
             cache_key = f"core:branches:system:{system_id}{suffix}"
         else:
-            host = (request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()).split(":")[0]
-            system = System.objects.filter(host=host, enabled=True).first()
+            system = host_system(request)
             if system is None:
                 return Response({"detail": "No system configuration found."}, status=status.HTTP_404_NOT_FOUND)
             system_id = system.id
             cache_key = f"core:branches:{system.host}{suffix}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        # `hours` is nested in the payload, so prefetch it - otherwise a tenant
-        # with six locations costs seven queries to render its contact page.
-        qs = Branch.objects.filter(system_id=system_id).prefetch_related("hours", "resource_pools__resources")
-        if not disabled_visible:
-            qs = qs.filter(enabled=True)
-        data = BranchSerializer(qs, many=True, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+        def build():
+            # `hours` is nested in the payload, so prefetch it - otherwise a tenant
+            # with six locations costs seven queries to render its contact page.
+            qs = Branch.objects.filter(system_id=system_id).prefetch_related("hours", "resource_pools__resources")
+            if not disabled_visible:
+                qs = qs.filter(enabled=True)
+            return BranchSerializer(qs, many=True, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -1447,6 +1569,8 @@ class BranchDetailView(APIView):
     DELETE /api/branches/<pk>/   - delete (admin only).
     """
 
+    conditional_get = True
+
     def get_permissions(self):
         if self.request.method == "GET":
             return [AllowAny()]
@@ -1460,14 +1584,16 @@ class BranchDetailView(APIView):
 
     def get(self, request, pk):
         cache_key = f"core:branch:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        instance = self._get_object(pk)
-        if instance is None:
+
+        def build():
+            instance = self._get_object(pk)
+            if instance is None:
+                return None
+            return BranchSerializer(instance, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
+        if data is None:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-        data = BranchSerializer(instance, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
         return Response(data)
 
     def patch(self, request, pk):
@@ -1524,8 +1650,7 @@ class ContactMessageCreateView(APIView):
             name = (f"{user.first_name} {user.last_name}".strip() or user.username)
             email = user.email
         else:
-            host = (request.META.get("HTTP_X_WEBSITE_HOST") or request.get_host()).split(":")[0]
-            system = System.objects.filter(host=host, enabled=True).first()
+            system = host_system(request)
             name = (data.get("name") or "").strip()
             email = (data.get("email") or "").strip()
 
@@ -1597,12 +1722,12 @@ class AdminContactMessageListView(APIView):
     def get(self, request):
         system_id = _get_admin_system_id(request)
         cache_key = f"core:contact_messages:system:{system_id}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        qs = ContactMessage.objects.filter(system_id=system_id)
-        data = ContactMessageSerializer(qs, many=True, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+
+        def build():
+            qs = ContactMessage.objects.filter(system_id=system_id)
+            return ContactMessageSerializer(qs, many=True, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
         return Response(data)
 
 
@@ -1753,12 +1878,12 @@ class SocialPostListCreateView(APIView):
     def get(self, request):
         system_id = _get_admin_system_id(request)
         cache_key = f"core:social_posts:system:{system_id}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-        qs = SocialPost.objects.filter(system_id=system_id)
-        data = SocialPostSerializer(qs, many=True, context={"request": request}).data
-        cache.set(cache_key, data, CACHE_TTL)
+
+        def build():
+            qs = SocialPost.objects.filter(system_id=system_id)
+            return SocialPostSerializer(qs, many=True, context={"request": request}).data
+
+        data = read_through(cache_key, build, CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -2156,21 +2281,72 @@ class StockImageFetchView(APIView):
 
 BACKUPS_CACHE_TTL = 300  # 5 minutes
 
+# How long one SSE connection follows a job before closing; EventSource
+# reconnects on its own, and a bounded stream cannot pin a gthread thread for
+# the length of a whole restore.
+JOB_STREAM_SECONDS = 120
+JOB_STREAM_INTERVAL = 1.0
+
+
+def _wants_inline(request):
+    """Whether the client asked to wait for the job: RFC 7240 `Prefer: wait=<s>`.
+
+    Backups and restores run as `SiteJob`s either way, and by default the
+    request only queues one: it answers 202 with the job and the client follows
+    it on `/api/backups/jobs/<pk>/` while `run_site_jobs` does the work. A whole
+    tenant's archive can take minutes, which a request thread - and the ingress
+    timeout in front of it - must not be held for.
+
+    `wait` is the explicit opt-in to the old behaviour, the job run in this
+    request and answered once it has finished, for scripts that cannot poll.
+    `respond-async` wins if a client sends both.
+    """
+    preferences = {
+        token.split("=", 1)[0].strip().lower()
+        for header in request.headers.get("Prefer", "").split(",")
+        for token in header.split(";")
+    }
+    return "wait" in preferences and "respond-async" not in preferences
 
-def _backups_key(system_id):
-    return f"core:backups:system:{system_id}"
 
+def _accepted(job, request):
+    response = Response(SiteJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    response["Location"] = f"/api/backups/jobs/{job.pk}/"
+    return response
 
-def invalidate_after_restore(host):
+
+def _job_failed(job):
+    return Response(
+        {"detail": job.error},
+        status=(
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+            if job.unexpected
+            else status.HTTP_400_BAD_REQUEST
+        ),
+    )
+
+
+def invalidate_after_restore(system):
     """Clear every cache namespace a restore can invalidate.
 
     A restore rewrites more than publishing does - it can touch the System row,
     the whole catalog, stories, highlights, brands, branches, the contact inbox,
     social posts, and per-user carts/favorites/orders - so this is deliberately
     the widest invalidation in the project. The per-user keys are wildcarded
-    because a restore does not know which accounts it moved.
+    because a restore does not know which accounts it moved. The catalog is
+    the exception: its payloads are stamped per tenant, so bumping this
+    System's generations drops all of them without touching anyone else's.
+
+    Availability is per branch for the same reason, and has to be bumped here
+    because the restore's bulk inserts send no `post_save` for the booking and
+    resource receivers to act on - the branchless scope included, and the
+    stored month grid (`AvailabilitySummary`) with it. The catalog's search entries and the
+    System's stored counts are rebuilt for the same reason.
+
+    Not a cache key but the same idea: the materialized points balances are
+    running totals of a ledger the restore may just have rewritten in place.
     """
-    cache.delete(f"system:host:{host}")
+    cache.delete(f"system:host:{system.host}")
     for pattern in (
         "system:pk:*",
         "core:success_stories:*", "core:success_story:*",
@@ -2179,11 +2355,20 @@ def invalidate_after_restore(host):
         "core:branches:*", "core:branch:*",
         "core:contact_messages:*",
         "core:social_posts:*",
-        "catalog:*",
         "orders:list:*",
         "users:favorites*", "users:cart*",
     ):
         _invalidate_pattern(pattern)
+    invalidate_catalog(system.pk)
+    rebuild_search_index(system.pk)
+    recount_system(system.pk)
+    # The payload was dropped above, before the counts were current.
+    invalidate_system_payload(system.pk)
+    for branch_id in Branch.objects.filter(system=system).values_list("pk", flat=True):
+        invalidate_branch_availability(branch_id)
+    invalidate_branch_availability(None)
+    forget_availability_summaries(system.pk)
+    reset_balances(system)
 
 
 class SiteBackupListCreateView(APIView):
@@ -2195,9 +2380,10 @@ class SiteBackupListCreateView(APIView):
     never from the request body: a backup is the most concentrated form a
     tenant's data takes, so the tenant boundary is enforced on every path.
 
-    The POST is synchronous - it serialises the database and copies every media
-    file into a zip before responding, which is why the CMS shows an
-    indeterminate progress bar rather than a percentage.
+    The POST queues a `SiteJob` (see `core.jobs`) and answers 202 straight
+    away; the archive is built by `run_site_jobs`, reporting progress per
+    section. Only with `Prefer: wait` (see `_wants_inline`) does the job run in
+    this request, answered with the new restore point.
     """
 
     permission_classes = [IsSystemAdmin]
@@ -2208,13 +2394,12 @@ class SiteBackupListCreateView(APIView):
             return Response({"detail": "No system for this user."}, status=status.HTTP_400_BAD_REQUEST)
 
         cache_key = _backups_key(system.pk)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        backups = SiteBackup.objects.filter(system=system).select_related("created_by")
-        data = SiteBackupSerializer(backups, many=True, context={"request": request}).data
-        cache.set(cache_key, data, BACKUPS_CACHE_TTL)
+        def build():
+            backups = SiteBackup.objects.filter(system=system).select_related("created_by")
+            return SiteBackupSerializer(backups, many=True, context={"request": request}).data
+
+        data = read_through(cache_key, build, BACKUPS_CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -2234,31 +2419,20 @@ class SiteBackupListCreateView(APIView):
         if not name:
             name = timezone.localtime().strftime("%Y-%m-%d %H:%M")
 
-        path, manifest = write_archive(
-            system, sections, include_images=SECTION_IMAGES in sections
+        background = not _wants_inline(request)
+        job = enqueue_backup(
+            system, name=name, sections=sections,
+            user=request.user if request.user.is_authenticated else None,
+            start=not background,
         )
-        try:
-            backup = SiteBackup(
-                system=system,
-                name=name,
-                sections=manifest["sections"],
-                include_images=manifest["include_images"],
-                size_bytes=os.path.getsize(path),
-                media_files=manifest["media_files"],
-                record_counts=manifest["counts"],
-                created_by=request.user if request.user.is_authenticated else None,
-            )
-            with open(path, "rb") as fh:
-                backup.file.save(f"{slugify(name) or 'backup'}.zip", File(fh), save=False)
-            backup.save()
-        finally:
-            # The archive now lives in storage; the working copy must not linger
-            # in /tmp, where a few full-catalog backups would fill the disk.
-            os.unlink(path)
+        if background:
+            return _accepted(job, request)
 
-        cache.delete(_backups_key(system.pk))
+        job = run_job(job)
+        if job.status != SiteJob.STATUS_SUCCEEDED:
+            return _job_failed(job)
         return Response(
-            SiteBackupSerializer(backup, context={"request": request}).data,
+            SiteBackupSerializer(job.backup, context={"request": request}).data,
             status=status.HTTP_201_CREATED,
         )
 
@@ -2319,6 +2493,12 @@ class SiteRestoreView(APIView):
     mis-picked file cannot overwrite one customer's site with another's; and the
     whole apply runs in a single transaction, so a restore that fails part-way
     leaves the site as it was rather than half-replaced.
+
+    Queued as a `SiteJob` and answered 202, like a backup (see
+    `SiteBackupListCreateView`); `Prefer: wait` runs it here and answers with
+    the restore's counts. An upload's manifest is checked before anything is
+    queued, so a foreign or malformed archive is still a 400 on the request
+    that sent it.
     """
 
     permission_classes = [IsSystemAdmin]
@@ -2337,41 +2517,51 @@ class SiteRestoreView(APIView):
         upload = request.FILES.get("file")
         backup_id = request.data.get("backup_id")
 
+        # The cheap checks happen now, whatever the source, so a typo is a 400
+        # rather than a job that fails a second later.
+        if mode not in RESTORE_MODES:
+            return Response({"detail": f"Unknown restore mode {mode!r}."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            sections = normalize_sections(sections)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        background = not _wants_inline(request)
+        user = request.user if request.user.is_authenticated else None
+
         if upload is not None:
             path = self._spool(upload)
-            cleanup = True
+            try:
+                check_archive(system, path, sections, mode=mode)
+                job = enqueue_restore(
+                    system, sections=sections, mode=mode, path=path, user=user,
+                    start=not background,
+                )
+            except ValueError as exc:  # BackupError is one
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            finally:
+                os.unlink(path)
         elif backup_id:
             backup = SiteBackup.objects.filter(pk=backup_id, system=system).first()
             if backup is None or not backup.file:
                 return Response({"detail": "Backup not found."}, status=status.HTTP_404_NOT_FOUND)
-            path = backup.file.path
-            cleanup = False
+            job = enqueue_restore(
+                system, sections=sections, mode=mode, backup=backup, user=user,
+                start=not background,
+            )
         else:
             return Response(
                 {"detail": "Upload a `file` or name a `backup_id`."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            result = restore_archive(system, path, sections, mode=mode)
-        except BackupError as exc:
-            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
-        except ValueError as exc:
-            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception:
-            # The restore is atomic, so the site is untouched - but the operator
-            # must not be shown a stack trace, and the detail belongs in the log.
-            logger.exception("restore failed for system %s", system.pk)
-            return Response(
-                {"detail": "The restore failed and nothing was changed."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-        finally:
-            if cleanup:
-                os.unlink(path)
+        if background:
+            return _accepted(job, request)
 
-        invalidate_after_restore(system.host)
-        return Response(result, status=status.HTTP_200_OK)
+        job = run_job(job)
+        if job.status != SiteJob.STATUS_SUCCEEDED:
+            return _job_failed(job)
+        return Response(job.result, status=status.HTTP_200_OK)
 
     @staticmethod
     def _spool(upload):
@@ -2388,3 +2578,105 @@ class SiteRestoreView(APIView):
         finally:
             handle.close()
         return handle.name
+
+
+class SiteJobListView(APIView):
+    """GET /api/backups/jobs/ - this tenant's recent backup and restore jobs.
+
+    What the CMS reads on load to pick a running job back up after a reload.
+    """
+
+    permission_classes = [IsSystemAdmin]
+
+    def get(self, request):
+        system = user_system(request)
+        if system is None:
+            return Response({"detail": "No system for this user."}, status=status.HTTP_400_BAD_REQUEST)
+        jobs = SiteJob.objects.filter(system=system)[:20]
+        return Response(SiteJobSerializer(jobs, many=True).data)
+
+
+class _EventStreamRenderer(BaseRenderer):
+    """Lets content negotiation accept `Accept: text/event-stream`.
+
+    Which is what a browser's EventSource sends, and DRF answers 406 to an
+    Accept no renderer claims. It never renders a stream - the view returns a
+    StreamingHttpResponse for that - only the odd error body, as text.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return "" if data is None else json.dumps(data)
+
+
+class SiteJobDetailView(APIView):
+    """
+    GET /api/backups/jobs/<pk>/ - one job's status and per-section progress.
+
+    Polled as JSON, or followed as Server-Sent Events with
+    `Accept: text/event-stream`: one frame per change, then `[DONE]` once the
+    job has finished. Scoped to the caller's own System like every backup path.
+    """
+
+    permission_classes = [IsSystemAdmin]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, _EventStreamRenderer]
+
+    def get(self, request, pk):
+        system = user_system(request)
+        job = SiteJob.objects.filter(pk=pk, system=system).first()
+        if job is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        if request.accepted_renderer.media_type != _EventStreamRenderer.media_type:
+            return Response(SiteJobSerializer(job).data)
+
+        response = StreamingHttpResponse(self._events(job), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Same reason as the AI chat stream: nginx would otherwise hold every
+        # frame back until the stream closed.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    def _events(job):
+        deadline = time.monotonic() + JOB_STREAM_SECONDS
+        last = None
+        while True:
+            frame = SiteJobSerializer(job).data
+            if frame != last:
+                yield _sse_data(frame)
+                last = frame
+            if job.finished:
+                yield "data: [DONE]\n\n"
+                return
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(JOB_STREAM_INTERVAL)
+            job.refresh_from_db()
+
+
+class SiteJobCancelView(APIView):
+    """POST /api/backups/jobs/<pk>/cancel/ - stop a queued or running job.
+
+    A queued job is cancelled on the spot. A running one is flagged, and the
+    worker abandons it at its next progress check - a backup leaves no restore
+    point behind, a restore rolls back whole. Answers with the job as it now
+    stands; a running one reports `cancel_requested` until the worker stops.
+    """
+
+    permission_classes = [IsSystemAdmin]
+
+    def post(self, request, pk):
+        system = user_system(request)
+        job = SiteJob.objects.filter(pk=pk, system=system).first()
+        if job is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if job.finished:
+            return Response(
+                {"detail": f"The job has already {job.status}."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(SiteJobSerializer(cancel_job(job)).data)
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils import timezone
 
-from .models import Booking, Coupon, Order, OrderLine, PointsTransaction, RewardTier
+from .models import Booking, Coupon, Order, OrderLine, PointsTransaction, RewardTier, StripeEvent
+from .services.stripe_events import replay
 
 
 @admin.register(Coupon)
@@ -217,3 +218,34 @@ class PointsTransactionAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    """The Stripe webhook's event log, read-only (see `orders.services.stripe_events`).
+
+    Where to look when a customer paid and the order still says pending: a
+    `failed` row carries the handler's last error. "Replay" queues the selected
+    events for the worker again - safe on a processed one too, since the
+    handlers check the order before touching it.
+    """
+
+    list_display = ("created_at", "system", "type", "event_id", "status", "attempts", "processed_at")
+    list_filter = ("status", "type", "system")
+    search_fields = ("event_id",)
+    date_hierarchy = "created_at"
+    readonly_fields = (
+        "system", "event_id", "type", "payload", "status", "attempts",
+        "next_attempt_at", "processed_at", "error", "created_at", "updated_at",
+    )
+    actions = ("replay_events",)
+
+    @admin.action(description="Replay selected events")
+    def replay_events(self, request, queryset):
+        self.message_user(request, f"Queued {replay(queryset)} event(s) to be processed again.")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -8,8 +8,13 @@ while the webhook is still in flight, so serving it from a cache would show the
 customer "pending" for the whole TTL after their payment had already landed.
 """
 
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.core.cache import cache
 
+from core.cache import bump_generation, current_generation, generation_key
+
 ORDERS_CACHE_TTL = 300  # 5 minutes
 
 
@@ -22,16 +27,48 @@ def invalidate_orders(user_id, system_id):
 
 
 # Availability is the most volatile payload in this app - every booking taken
-# invalidates it - so it is cached for a minute rather than the usual five, and
-# any write to a Booking clears the namespace outright (see orders/signals.py).
-# The short TTL is a floor under bursts, not a correctness mechanism: checkout
-# re-derives the slot before writing, so the worst a stale calendar can do is
-# offer a slot that is then honestly refused.
+# changes it - so it is cached for a minute rather than the usual five. The short
+# TTL is a floor under bursts, not a correctness mechanism: checkout re-derives
+# the slot before writing, so the worst a stale calendar can do is offer a slot
+# that is then honestly refused.
+#
+# It is cached **per (branch, local date) fragment**, not per requested range.
+# A calendar asks for thirty or sixty days at once, but a booking only ever
+# changes the handful it overlaps; with whole ranges cached, one reservation at a
+# busy restaurant threw away every tenant's calendar (the old namespace sweep),
+# and on LocMemCache - no pattern delete - threw away nothing at all. Now each
+# day of each branch has its own generation counter (see core/cache.py), and:
+#
+# * a booking write bumps the days it overlaps (`invalidate_booking_days`);
+# * a change to what a branch *offers* - hours, capacity, pools, resources -
+#   bumps the branch's epoch, which is part of every fragment key, so all of
+#   that branch's days go at once (`invalidate_branch_availability`);
+# * the view assembles a range from the fragments that are still current and
+#   computes only the missing days, in one occupancy query (`availability_days`).
+#
+# Fragments are still keyed on everything the slots vary on - the service,
+# party size and resource - under the same rule `availability_key` spells out.
 AVAILABILITY_CACHE_TTL = 60
 
+_AVAILABILITY = "orders:availability"
+
+# Long enough to outlive every fragment stamped with it, short enough that the
+# counters of days gone by do not pile up. An expired counter only reseeds.
+AVAILABILITY_GENERATION_TTL = 2 * 24 * 60 * 60
+
+
+def _branch_scope(branch_id):
+    # The single-location business books with `branch=None`; its bookings still
+    # contend with each other, so they share a scope of their own.
+    return branch_id or 0
+
+
+def _day_namespace(branch_id):
+    return f"{_AVAILABILITY}:{_branch_scope(branch_id)}"
+
 
-def availability_key(service_id, branch_id, start_date, days, party_size=1, resource_id=None):
-    """The cache key for one availability payload.
+def availability_key(service_id, branch_id, epoch, day, party_size=1, resource_id=None):
+    """The cache key for one day's slots at one branch.
 
     ⚠ **Every input the payload varies on must appear here.** Party size and the
     chosen resource both change which slots come back, so leaving either out
@@ -43,15 +80,91 @@ def availability_key(service_id, branch_id, start_date, days, party_size=1, reso
     of keys; do not "optimise" them back out of the key.
     """
     return (
-        f"orders:availability:{service_id}:{branch_id or 0}:{start_date}:{days}"
+        f"{_AVAILABILITY}:{_branch_scope(branch_id)}:{epoch}:{service_id}:{day}"
         f":{party_size}:{resource_id or 0}"
     )
 
 
-def invalidate_availability():
+def availability_days(service_id, branch_id, dates, build, party_size=1, resource_id=None):
+    """``{date: slots}`` for every date in ``dates``, computing only what is missing.
+
+    ``build(missing)`` is handed the dates with no current fragment, in order, and
+    returns ``{date: slots}`` for them (a date it leaves out has no slots). The
+    generations are read *before* it runs, so a booking landing mid-build bumps
+    past the stamp and its day is recomputed on the next read.
+    """
+    epoch = current_generation(_AVAILABILITY, _branch_scope(branch_id))
+    namespace = _day_namespace(branch_id)
+    keys = {day: availability_key(service_id, branch_id, epoch, day, party_size, resource_id) for day in dates}
+    gen_keys = {day: generation_key(namespace, day.isoformat()) for day in dates}
+    found = cache.get_many([*keys.values(), *gen_keys.values()])
+
+    result, stamps = {}, {}
+    for day in dates:
+        generation = found.get(gen_keys[day])
+        if generation is None:
+            generation = current_generation(namespace, day.isoformat(), AVAILABILITY_GENERATION_TTL)
+        entry = found.get(keys[day])
+        if isinstance(entry, tuple) and len(entry) == 2 and entry[0] == generation:
+            result[day] = entry[1]
+        else:
+            stamps[day] = generation
+
+    if stamps:
+        built = build(list(stamps))
+        fresh = {day: built.get(day, []) for day in stamps}
+        cache.set_many(
+            {keys[day]: (stamps[day], slots) for day, slots in fresh.items()},
+            AVAILABILITY_CACHE_TTL,
+        )
+        result.update(fresh)
+    return result
+
+
+def availability_stamps(branch_id, dates):
+    """``{date: stamp}`` - the branch's epoch and each day's generation.
+
+    What `availability_days` compares its fragments against, for a derived store
+    that is not a cache entry (`orders.services.availability_summary`): read
+    before a build and again after it, a stamp that moved means a booking or a
+    branch write landed in between, and what was built may predate it.
+    """
+    epoch = current_generation(_AVAILABILITY, _branch_scope(branch_id))
+    namespace = _day_namespace(branch_id)
+    gen_keys = {day: generation_key(namespace, day.isoformat()) for day in dates}
+    found = cache.get_many(list(gen_keys.values()))
+    stamps = {}
+    for day in dates:
+        generation = found.get(gen_keys[day])
+        if generation is None:
+            generation = current_generation(namespace, day.isoformat(), AVAILABILITY_GENERATION_TTL)
+        stamps[day] = (epoch, generation)
+    return stamps
+
+
+def invalidate_booking_days(branch_id, starts_at, ends_at, tzinfo):
+    """Drop the cached days one appointment overlaps, and nothing else.
+
+    From the local day *before* it starts: a slot offered late that evening runs
+    past midnight into this booking. ⚠ A service longer than a day can reach
+    further back than that; the one-minute TTL is what covers it.
+    """
+    namespace = _day_namespace(branch_id)
+    day = starts_at.astimezone(tzinfo).date() - timedelta(days=1)
+    last = ends_at.astimezone(tzinfo).date()
+    while day <= last:
+        bump_generation(namespace, day.isoformat(), AVAILABILITY_GENERATION_TTL)
+        day += timedelta(days=1)
+
+
+def invalidate_booking_availability(booking):
     try:
-        cache.delete_pattern("orders:availability:*")
-    except AttributeError:
-        # LocMemCache in development and tests has no pattern delete; the
-        # one-minute TTL covers it there.
-        pass
+        tzinfo = ZoneInfo(booking.timezone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        tzinfo = ZoneInfo("UTC")
+    invalidate_booking_days(booking.branch_id, booking.starts_at, booking.ends_at, tzinfo)
+
+
+def invalidate_branch_availability(branch_id):
+    """Drop every cached day at one branch - what it offers has changed."""
+    bump_generation(_AVAILABILITY, _branch_scope(branch_id))
@@ -1,11 +1,13 @@
 """Write the QR code for orders that do not have one.
 
-Order QR codes are generated at checkout (`orders.views._open_order`), so this
-exists for the two populations that route never covered:
+Order QR codes are written by a worker just after checkout (see
+`orders.services.qr`), so this exists for the two populations that never
+covered:
 
 * every order placed **before** the field existed, and
-* the occasional order whose write failed - `attach_order_qr` is best-effort by
-  design, because a slow bucket must never cost a sale.
+* the occasional order whose write kept failing - `attach_order_qr` is
+  best-effort by design, and the worker stops retrying an order once it is
+  older than `PENDING_WINDOW`.
 
 Safe to re-run: an order that already has a code is skipped unless `--force`.
 Scope it to one tenant with `--host` before running it against a database that
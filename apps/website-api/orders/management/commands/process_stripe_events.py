@@ -0,0 +1,63 @@
+"""Process recorded Stripe webhook events (`orders.models.StripeEvent`).
+
+The worker half of `orders.services.stripe_events`: claim a batch of due
+events, run each one's handler, repeat; sleep when nothing is due. Runs as its
+own container beside gunicorn (see helm/templates/deployment.yaml) - not inside
+`run_site_jobs`, which can spend an hour on one restore while a customer waits
+for their payment to show. The claim skips rows another worker holds, so one
+per pod is safe.
+
+SIGTERM is honoured between batches: the batch in hand is processed and
+recorded, never abandoned with its rows half-written.
+
+    python manage.py process_stripe_events
+    python manage.py process_stripe_events --once     # process everything due, then exit
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from orders.services.stripe_events import BATCH, process_due
+
+
+class Command(BaseCommand):
+    help = "Process recorded Stripe webhook events."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process every event that is due, then exit instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1.0,
+            help="Seconds between looks at an empty log (default 1).",
+        )
+
+    def handle(self, *args, **options):
+        poll = options["poll"]
+        if poll <= 0:
+            raise CommandError("--poll must be positive.")
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+
+        while not self._stopping:
+            close_old_connections()
+            claimed = process_due()
+            if claimed:
+                self.stdout.write(f"processed a batch of {claimed} event(s)")
+            if claimed >= BATCH:
+                # A full batch: more are probably due already.
+                continue
+            if options["once"]:
+                break
+            time.sleep(poll)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
@@ -0,0 +1,76 @@
+"""Check every materialized points balance against the ledger it summarises.
+
+`PointsBalance` is a running total of `PointsTransaction` up to a row id (see
+`orders.services.rewards`). A read adds the rows past that id, so a balance can
+only come out wrong if a row *at or below* it changed afterwards - an edit in a
+shell, a restore that bypassed `reset_balances`, a bug. This finds those rows,
+reports them, and with `--fix` rewrites them from the ledger.
+
+Read-only by default. Scope it to one tenant with `--host`.
+
+    python manage.py reconcile_points
+    python manage.py reconcile_points --host elpanbueno.com --fix
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import System
+from orders.models import PointsBalance
+from orders.services.rewards import ledger_through
+
+
+class Command(BaseCommand):
+    help = "Verify materialized points balances against the ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            help="Only balances of the System with this host (e.g. elpanbueno.com).",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Rewrite every drifted balance from the ledger.",
+        )
+
+    def handle(self, *args, **options):
+        balances = PointsBalance.objects.order_by("pk")
+
+        host = options.get("host")
+        if host:
+            system = System.objects.filter(host=host).first()
+            if system is None:
+                raise CommandError(f"No System with host {host!r}.")
+            balances = balances.filter(system=system)
+
+        fix = options["fix"]
+        checked = drifted = 0
+
+        for balance in balances.iterator():
+            checked += 1
+            expected = ledger_through(balance)
+            if balance.balance == expected:
+                continue
+            drifted += 1
+            self.stderr.write(self.style.WARNING(
+                f"user {balance.user_id} @ system {balance.system_id}: "
+                f"row says {balance.balance}, ledger says {expected} "
+                f"(through #{balance.through_id})"
+            ))
+            if fix:
+                # Under the same lock every points write takes, and re-summed
+                # inside it, so a checkout landing between the check and the
+                # write cannot be folded twice or lost.
+                with transaction.atomic():
+                    locked = PointsBalance.objects.select_for_update().get(pk=balance.pk)
+                    locked.balance = ledger_through(locked)
+                    locked.save(update_fields=["balance", "updated_at"])
+
+        self.stdout.write(f"checked {checked} balance(s)")
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("every balance matches the ledger"))
+        elif fix:
+            self.stdout.write(self.style.SUCCESS(f"rewrote {drifted} drifted balance(s)"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{drifted} balance(s) drifted - re-run with --fix"))
@@ -0,0 +1,76 @@
+"""Queue recorded Stripe webhook events to be processed again.
+
+An event the worker gave up on (`failed`, see `orders.services.stripe_events`)
+stays in the log with its payload and last error. Once whatever failed it is
+fixed, this puts it back in the queue with a fresh attempt count;
+`process_stripe_events` picks it up on its next look, or `--now` processes it
+here. Replaying an event that was already processed is safe - the handlers
+check the order's status before touching it - which is what `--event` is for.
+
+Read-only with `--dry-run`. Scope it to one tenant with `--host`.
+
+    python manage.py replay_stripe_events                       # every failed event
+    python manage.py replay_stripe_events --host elpanbueno.com --dry-run
+    python manage.py replay_stripe_events --event evt_1Q2w3E --now
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import System
+from orders.models import StripeEvent
+from orders.services.stripe_events import process, replay
+
+
+class Command(BaseCommand):
+    help = "Re-queue failed (or named) Stripe webhook events."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            help="Only events of the System with this host (e.g. elpanbueno.com).",
+        )
+        parser.add_argument(
+            "--event",
+            action="append",
+            default=[],
+            help="A Stripe event id to replay whatever its status; repeatable.",
+        )
+        parser.add_argument(
+            "--now",
+            action="store_true",
+            help="Process the replayed events here instead of leaving them to the worker.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List what would be replayed without changing anything.",
+        )
+
+    def handle(self, *args, **options):
+        events = StripeEvent.objects.order_by("pk")
+
+        host = options.get("host")
+        if host:
+            system = System.objects.filter(host=host).first()
+            if system is None:
+                raise CommandError(f"No System with host {host!r}.")
+            events = events.filter(system=system)
+
+        if options["event"]:
+            events = events.filter(event_id__in=options["event"])
+        else:
+            events = events.filter(status=StripeEvent.STATUS_FAILED)
+
+        pks = list(events.values_list("pk", flat=True))
+        for event in events:
+            self.stdout.write(f"{event.event_id} {event.type} system {event.system_id}: {event.status} {event.error}".rstrip())
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"would replay {len(pks)} event(s)"))
+            return
+
+        replay(StripeEvent.objects.filter(pk__in=pks))
+        if options["now"]:
+            for event in StripeEvent.objects.select_related("system").filter(pk__in=pks).order_by("pk"):
+                process(event)
+                self.stdout.write(f"{event.event_id}: {event.status}")
+        self.stdout.write(self.style.SUCCESS(f"replayed {len(pks)} event(s)"))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-18 09:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0074_companyhighlight_aspect_ratio_and_more'),
+        ('orders', '0017_order_linked_by_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.IntegerField(default=0)),
+                ('through_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Points Balance',
+                'verbose_name_plural': 'Points Balances',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='pointstransaction',
+            index=models.Index(fields=['system', 'user', 'id'], name='orders_poin_system__9ac863_idx'),
+        ),
+        migrations.AddField(
+            model_name='pointsbalance',
+            name='system',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_balances', to='core.system'),
+        ),
+        migrations.AddField(
+            model_name='pointsbalance',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_balances', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='pointsbalance',
+            constraint=models.UniqueConstraint(fields=('system', 'user'), name='points_balance_unique_owner'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.11 on 2026-10-18 09:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0044_picture_renditions'),
+        ('core', '0076_picture_renditions'),
+        ('orders', '0018_points_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilitySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot_count', models.PositiveSmallIntegerField(default=0)),
+                ('seats_left', models.PositiveIntegerField(default=0)),
+                ('first_slot', models.DateTimeField(blank=True, null=True)),
+                ('last_slot', models.DateTimeField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField()),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='availability_summaries', to='core.branch')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_summaries', to='catalog.service')),
+            ],
+            options={
+                'verbose_name': 'Availability Summary',
+                'verbose_name_plural': 'Availability Summaries',
+                'indexes': [models.Index(fields=['service', 'branch', 'date'], name='orders_avai_service_ed65da_idx'), models.Index(fields=['branch', 'date'], name='orders_avai_branch__69b0cd_idx')],
+            },
+        ),
+    ]
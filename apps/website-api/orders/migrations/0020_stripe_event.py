@@ -0,0 +1,39 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0078_system_counters'),
+        ('orders', '0019_availability_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255)),
+                ('type', models.CharField(max_length=100)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('received', 'Received'), ('processed', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='received', max_length=12)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('system', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stripe_events', to='core.system')),
+            ],
+            options={
+                'verbose_name': 'Stripe Event',
+                'verbose_name_plural': 'Stripe Events',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='stripe_event_claim')],
+                'constraints': [models.UniqueConstraint(fields=('system', 'event_id'), name='stripe_event_unique_id')],
+            },
+        ),
+    ]
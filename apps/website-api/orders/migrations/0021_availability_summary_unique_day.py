@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:46
+
+from django.db import migrations, models
+
+
+def drop_summaries(apps, schema_editor):
+    # Every existing row would take branch_scope 0 and collide; they are a
+    # cache, and the next calendar read rebuilds what it needs.
+    apps.get_model('orders', 'AvailabilitySummary').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0045_search_entry'),
+        ('core', '0079_outbound_email_sending'),
+        ('orders', '0020_stripe_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_summaries, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='availabilitysummary',
+            name='branch_scope',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='availabilitysummary',
+            constraint=models.UniqueConstraint(fields=('service', 'branch_scope', 'date'), name='availability_summary_unique_day'),
+        ),
+    ]
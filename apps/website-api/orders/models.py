@@ -6,6 +6,7 @@ from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from django.contrib.auth.models import User
 from django.db import models
 from django.db.models.functions import Upper
+from django.utils import timezone
 
 from core.models import CURRENCY_CHOICES, System
 from core.tenant_paths import tenant_path
@@ -863,6 +864,72 @@ class Booking(models.Model):
         return self.starts_at.astimezone(self.tzinfo)
 
 
+class AvailabilitySummary(models.Model):
+    """Whether one service can be booked on one local date at one branch.
+
+    What the booking calendar's month grid is painted from. The grid only needs
+    to know which dates can be selected, and deriving that from every slot of
+    sixty days (`availability_range`) is the most expensive thing the public
+    booking page does; a row per (service, branch, date) answers it in one
+    indexed read, and the slot walk runs for the one day the customer opens.
+
+    **Not a second authority.** Checkout re-derives the slot through
+    `orders.services.booking` as it always did, so the worst a stale row can do
+    is paint a date that then honestly offers nothing. Rows are dropped, never
+    patched, by the writes that make them wrong (`orders.signals`) and rebuilt
+    on the next read - see `orders.services.availability_summary`.
+
+    Counted at a party of one on any resource. `seats_left` is the largest free
+    block of any slot that day, so "can a party of four come on the 9th" is
+    `seats_left >= 4` - the same single-resource rule `Slot.seats_left` follows.
+
+    Safe to delete at any time; nothing reads it that cannot rebuild it.
+    """
+
+    service = models.ForeignKey(
+        "catalog.Service", on_delete=models.CASCADE, related_name="availability_summaries",
+    )
+    # Null for the single-location business, which books with no branch - the
+    # same scope `orders.services.booking._occupancy` counts.
+    branch = models.ForeignKey(
+        "core.Branch", null=True, blank=True, on_delete=models.CASCADE,
+        related_name="availability_summaries",
+    )
+    # `branch_id`, or 0 for the branchless scope: what the unique key below is
+    # declared on, since a null branch is not equal to itself there.
+    branch_scope = models.PositiveIntegerField(default=0)
+    # Local to the branch, like the calendar that reads it.
+    date = models.DateField()
+
+    slot_count = models.PositiveSmallIntegerField(default=0)
+    # 0 on a closed or fully booked day.
+    seats_left = models.PositiveIntegerField(default=0)
+    first_slot = models.DateTimeField(null=True, blank=True)
+    last_slot = models.DateTimeField(null=True, blank=True)
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Availability Summary"
+        verbose_name_plural = "Availability Summaries"
+        constraints = [
+            # One row per day, so two readers rebuilding it at once upsert the
+            # same row rather than leave a duplicate behind.
+            models.UniqueConstraint(
+                fields=["service", "branch_scope", "date"], name="availability_summary_unique_day",
+            ),
+        ]
+        indexes = [
+            # The month read: one service at one branch over a run of dates.
+            models.Index(fields=["service", "branch", "date"]),
+            # What a booking drops: every service's rows on its days at its branch.
+            models.Index(fields=["branch", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.service_id} @ {self.branch_id} on {self.date}: {self.seats_left} seats"
+
+
 class RewardTier(models.Model):
     """One rung of a tenant's rewards program - "Silver", "Gold", "Platinum".
 
@@ -966,6 +1033,9 @@ class PointsTransaction(models.Model):
     an address until someone verifies an account on it, at which point
     `claim_points_for_email` fills in `user` and the points appear. That is the
     same handle `claim_guest_orders` already uses, and the two run together.
+
+    `PointsBalance` below keeps the sum folded forward for reads. It is derived
+    from these rows and can always be rebuilt from them; never the other way.
     """
 
     KIND_EARN = "earn"
@@ -1033,6 +1103,8 @@ class PointsTransaction(models.Model):
             # the claim sweep over an address at verification.
             models.Index(fields=["system", "user", "-created_at"]),
             models.Index(fields=["system", "email"]),
+            # The tail `PointsBalance` has not folded in yet - normally empty.
+            models.Index(fields=["system", "user", "id"]),
         ]
         constraints = [
             # A row that moves nothing is noise in a statement the customer
@@ -1051,3 +1123,106 @@ class PointsTransaction(models.Model):
     def __str__(self):
         who = self.user.email if self.user_id else f"{self.email} (unclaimed)"
         return f"{self.points:+d} pts {who} [{self.kind}]"
+
+
+class PointsBalance(models.Model):
+    """A customer's balance on one tenant, folded forward from the ledger.
+
+    **Not a second authority.** `PointsTransaction` is still the balance; this
+    row is the ledger's running total up to `through_id`, kept so a cart render
+    does not re-`SUM` a customer's whole history. A read adds whatever rows sit
+    past `through_id` (see `orders.services.rewards.balance_for`) - normally none
+    - so a ledger row written by anything, including a restore or a shell,
+    is counted the moment it exists, and the row only has to be *advanced*
+    by the code that writes to the ledger, never kept exactly in step.
+
+    ⚠ **Raw, not floored.** The floor at zero is a display rule applied on read;
+    folding a floored value forward would silently forgive a negative total that
+    somebody has to unpick.
+
+    Safe to delete at any time - the next write rebuilds it from the ledger, and
+    `python manage.py reconcile_points` checks every row against it.
+    """
+
+    system = models.ForeignKey(
+        "core.System", on_delete=models.CASCADE, related_name="points_balances",
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="points_balances",
+    )
+    balance = models.IntegerField(default=0)
+    # The highest ledger id summed into `balance`.
+    through_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Points Balance"
+        verbose_name_plural = "Points Balances"
+        constraints = [
+            models.UniqueConstraint(fields=["system", "user"], name="points_balance_unique_owner"),
+        ]
+
+    def __str__(self):
+        return f"{self.balance} pts {self.user_id} @ {self.system_id}"
+
+
+class StripeEvent(models.Model):
+    """One Stripe webhook delivery, recorded on receipt and processed by a worker.
+
+    The webhook used to run its whole handler - mark the order paid, draw down
+    stock, award points, email the customer - before answering, and Stripe
+    retries anything slower than its timeout. A slow relay or bucket therefore
+    bought a second delivery of a payment being recorded. Now the view verifies
+    the signature, writes this row and answers 200; `manage.py
+    process_stripe_events` does the rest (see `orders.services.stripe_events`).
+
+    **Deduplicated at insert.** `event_id` is Stripe's own `evt_...`, unique per
+    System, so a redelivery of an event already recorded writes nothing and is
+    acknowledged again - the handlers' own idempotence is the second line, not
+    the first.
+
+    `payload` is the verified event as Stripe sent it; the worker reads only
+    this row, never the request. A failed event is retried on a backoff and, past
+    the last attempt, left `failed` for `manage.py replay_stripe_events`.
+    """
+
+    STATUS_RECEIVED = "received"
+    STATUS_PROCESSED = "processed"
+    STATUS_IGNORED = "ignored"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_RECEIVED, "Received"),
+        (STATUS_PROCESSED, "Processed"),
+        # Verified, but naming no order of this System: retrying cannot
+        # conjure one.
+        (STATUS_IGNORED, "Ignored"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    system = models.ForeignKey(
+        "core.System", on_delete=models.CASCADE, related_name="stripe_events",
+    )
+    event_id = models.CharField(max_length=255)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_RECEIVED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Stripe Event"
+        verbose_name_plural = "Stripe Events"
+        constraints = [
+            models.UniqueConstraint(fields=["system", "event_id"], name="stripe_event_unique_id"),
+        ]
+        indexes = [
+            # The worker's claim: due rows still to process, oldest first.
+            models.Index(fields=["status", "next_attempt_at"], name="stripe_event_claim"),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.event_id} ({self.status})"
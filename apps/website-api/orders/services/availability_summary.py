@@ -0,0 +1,197 @@
+"""The booking calendar's month grid, from `AvailabilitySummary` rows.
+
+`BookingAvailabilityView` used to answer every calendar with the slots of every
+day in the range - sixty days of `day_availability`, however fast the occupancy
+index made each one - when the grid only needs to know which dates can be
+picked. This module keeps one row per (service, branch, local date) saying so,
+and the view computes a full slot list only for the day the customer opens.
+
+**Maintained by dropping, not by patching.** A booking write deletes the rows of
+the days it overlaps at its branch, every service's (they share the seats); a
+change to what a branch offers deletes the branch's rows, and a change to a
+service deletes that service's (`orders.signals`). The next read finds those
+dates missing and rebuilds just them, through `availability_range` - the same
+engine checkout re-derives from, so a row can only ever say what the slot walk
+said when it was written. Patching a seat count in place would be a second
+implementation of the seat arithmetic, which is the one thing
+`orders.services.booking` exists not to have.
+
+Three kinds of day are never stored:
+
+* **Days the minimum notice reaches into** (today, usually). Which of their
+  slots are still offered changes by the minute, so they are computed live on
+  every read - a handful of days at most, in the same pass as any rebuild.
+* **Days past the horizon**, which are closed by definition and cost nothing to
+  answer. Storing them would leave a "closed" row behind when the horizon moves
+  forward at midnight.
+* **Past days.** A rebuild prunes the service's rows from before today.
+
+**A rebuild only writes what is still current.** A booking can commit between
+the read a rebuild is made from and the rows it writes, and its drop would then
+run before those rows exist. So a rebuild reads the slot cache's (branch, day)
+stamps (`orders.cache.availability_stamps`) before it reads a booking, skips
+any day whose stamp has moved by the time it writes, and checks once more after
+writing, dropping its own rows for a day that moved meanwhile. The receivers
+bump before they drop, so either the rebuild sees the bump or the drop comes
+after its rows.
+
+⚠ A row is also recomputed once it is older than `SUMMARY_MAX_AGE`. Every write
+the engine reads fires a signal, but a `queryset.update()` fires none. The slot
+cache (`orders.cache`) has its one-minute TTL as that net; a table that is never
+wrong for longer than a few hours is the equivalent here.
+"""
+
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone as dj_timezone
+
+from ..cache import availability_stamps
+from ..models import AvailabilitySummary
+from .booking import _branch_settings, availability_range, booking_window
+
+SUMMARY_MAX_AGE = timedelta(hours=6)
+
+
+def _scope(queryset, branch_id):
+    # The branchless business's rows carry a null branch, and `branch=None` in a
+    # filter matches nothing.
+    if branch_id is None:
+        return queryset.filter(branch__isnull=True)
+    return queryset.filter(branch_id=branch_id)
+
+
+def _entry(seats_left, first_slot, last_slot):
+    return {"seats_left": seats_left, "first_slot": first_slot, "last_slot": last_slot}
+
+
+def month_summary(service, branch, dates, *, now=None):
+    """``{date: {"seats_left", "first_slot", "last_slot"}}`` for every date in `dates`.
+
+    A closed or fully booked date is in the map with ``seats_left == 0``. One
+    indexed read when every row is current; otherwise one `availability_range`
+    over the span of the dates that are not, and the rows it produced written
+    back for the next visitor.
+    """
+    if not dates:
+        return {}
+    now = now or dj_timezone.now()
+    tzinfo = _branch_settings(branch)["tzinfo"]
+    today = now.astimezone(tzinfo).date()
+    earliest, last_date = booking_window(branch, now=now)
+    live_until = earliest.astimezone(tzinfo).date()
+    branch_id = branch.pk if branch is not None else None
+
+    result = {day: _entry(0, None, None) for day in dates if day < today or day > last_date}
+    stored = [day for day in dates if live_until < day <= last_date]
+    fresh_after = now - SUMMARY_MAX_AGE
+    if stored:
+        rows = _scope(AvailabilitySummary.objects.filter(service=service), branch_id).filter(
+            date__gte=stored[0], date__lte=stored[-1], computed_at__gt=fresh_after,
+        )
+        for row in rows:
+            if row.date in stored:
+                result[row.date] = _entry(row.seats_left, row.first_slot, row.last_slot)
+
+    missing = sorted(day for day in dates if day not in result)
+    if not missing:
+        return result
+
+    stamps = availability_stamps(branch_id, [day for day in missing if day > live_until])
+    computed = availability_range(
+        service, branch, missing[0], (missing[-1] - missing[0]).days + 1, now=now,
+    )
+    built = []
+    for day in missing:
+        slots = computed.get(day, [])
+        entry = _entry(
+            max((slot.seats_left for slot in slots), default=0),
+            slots[0].at if slots else None,
+            slots[-1].at if slots else None,
+        )
+        result[day] = entry
+        if day > live_until:
+            built.append(AvailabilitySummary(
+                service=service, branch_id=branch_id, branch_scope=branch_id or 0, date=day,
+                slot_count=len(slots), computed_at=now, **entry,
+            ))
+
+    if built:
+        _store(service, branch_id, built, stamps, today)
+    return result
+
+
+def _store(service, branch_id, built, stamps, today):
+    """Upsert the rows `built` whose day is still at the stamp it was built under."""
+    current = availability_stamps(branch_id, [row.date for row in built])
+    built = [row for row in built if current[row.date] == stamps[row.date]]
+    if built:
+        with transaction.atomic():
+            AvailabilitySummary.objects.bulk_create(
+                built,
+                update_conflicts=True,
+                unique_fields=["service", "branch_scope", "date"],
+                update_fields=["slot_count", "seats_left", "first_slot", "last_slot", "computed_at"],
+            )
+            _scope(AvailabilitySummary.objects.filter(service=service), branch_id).filter(
+                date__lt=today,
+            ).delete()
+    moved = [
+        day for day, stamp in availability_stamps(branch_id, [row.date for row in built]).items()
+        if stamp != stamps[day]
+    ]
+    if moved:
+        _scope(AvailabilitySummary.objects.filter(service=service), branch_id).filter(
+            date__in=moved,
+        ).delete()
+
+
+def forget_booking_days(branch_id, starts_at, ends_at, tzinfo):
+    """Drop the rows of the days one appointment overlaps, for every service.
+
+    Every service at a branch draws on the same seats, so a haircut booked at
+    10:00 can close the 10:00 of the colour treatment too. From the local day
+    before it starts, for the reason `orders.cache.invalidate_booking_days` gives.
+    """
+    first = starts_at.astimezone(tzinfo).date() - timedelta(days=1)
+    last = ends_at.astimezone(tzinfo).date()
+    _scope(AvailabilitySummary.objects, branch_id).filter(date__gte=first, date__lte=last).delete()
+
+
+def forget_booking(booking):
+    forget_booking_days(booking.branch_id, booking.starts_at, booking.ends_at, booking.tzinfo)
+
+
+def forget_branch(branch_id):
+    """Drop every row at one branch - what it offers has changed."""
+    _scope(AvailabilitySummary.objects, branch_id).delete()
+
+
+def forget_service(service_id):
+    """Drop every row of one service - its duration or its pools have changed."""
+    AvailabilitySummary.objects.filter(service_id=service_id).delete()
+
+
+def forget_system(system_id):
+    """Drop every row of one tenant's services, at any branch or none.
+
+    For a restore, whose bulk-inserted bookings send no signal to drop them by.
+    """
+    AvailabilitySummary.objects.filter(service__system_id=system_id).delete()
+
+
+def summary_from_slots(by_day, dates):
+    """The same map `month_summary` returns, from slots already computed.
+
+    For a calendar narrowed to one resource, which the stored rows (counted on
+    any resource) cannot answer.
+    """
+    result = {}
+    for day in dates:
+        slots = by_day.get(day) or []
+        result[day] = _entry(
+            max((slot["seats_left"] for slot in slots), default=0),
+            datetime.fromisoformat(slots[0]["at"]) if slots else None,
+            datetime.fromisoformat(slots[-1]["at"]) if slots else None,
+        )
+    return result
@@ -20,6 +20,14 @@ never bubble into the caller: an order must not fail to be placed, and - far
 worse - the Stripe webhook must not return non-2xx and be retried, because a
 missing confirmation email is a nuisance while a re-run payment handler is a
 correctness problem. A failure is logged and swallowed; the order stands.
+
+The message is not even built here. `send_order_email` queues a
+`core.outbox.Deferred` naming `build_order_email`, and the outbox worker builds
+it just before sending: rendering the receipt, the tenant's badges and - for an
+order placed moments ago - the order's QR code itself (`qr.ensure_order_qr`),
+none of which a checkout or a webhook should wait on. A relay that is down, or
+a build that fails, is retried there instead of costing this order its
+confirmation.
 """
 
 import logging
@@ -30,12 +38,13 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 
 from core.media import absolute_media_url
+from core.outbox import Deferred, enqueue
 from core.services.contact import _admin_emails, _tenant_brand
 from core.services.email_badges import attach_badges
 
-from ..models import Booking
+from ..models import Booking, Order
 from ..serializers import resolve_line_image
-from .qr import order_qr_bytes
+from .qr import ensure_order_qr, order_qr_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -200,6 +209,18 @@ def _order_items(order):
     return items
 
 
+def _subject(order, kind, status):
+    order_ref = str(order.public_id)[:8].upper()
+    status_es, status_en = _STATUS_LABELS.get(status, (status, status))
+    if kind == CONFIRMATION:
+        return f"Pedido {order_ref} recibido / Order {order_ref} received"
+    if kind == FULFILLED:
+        if (order.shipping_line1 or "").strip():
+            return f"Pedido {order_ref} en camino / Order {order_ref} on its way"
+        return f"Pedido {order_ref} listo / Order {order_ref} ready"
+    return f"Pedido {order_ref}: {status_es} / Order {order_ref}: {status_en}"
+
+
 def send_order_email(order, *, kind):
     """Email the customer about `order`. `kind` is CONFIRMATION, STATUS or FULFILLED.
 
@@ -211,139 +232,147 @@ def send_order_email(order, *, kind):
     A no-op with nothing sent when the order has no email (an anonymous online
     checkout that was abandoned before Stripe collected one, or a counter sale
     rung up without a receipt address). Never raises: see the module docstring.
+
+    Queues the email for `build_order_email` to build; the status is taken
+    *now*, so two quick moves still send two emails that each name their own.
     """
     email = (order.email or "").strip()
     if not email:
         return
 
     try:
-        system = order.system
-        brand = _tenant_brand(system)
-        status_es, status_en = _STATUS_LABELS.get(
-            order.status, (order.status, order.status),
-        )
-        order_ref = str(order.public_id)[:8].upper()
-        # A delivery order (online or pay-on-delivery) carries an address; a
-        # pickup / counter order does not. It decides the "on its way" vs "ready
-        # for pickup" wording of a fulfillment email.
-        is_delivery = bool((order.shipping_line1 or "").strip())
-
-        # Read once, up front: it decides both whether the template renders the
-        # QR block and whether there is an attachment to hang it on. None on an
-        # order that predates the field or whose write failed, and the email then
-        # simply goes out without a code.
-        qr_png = order_qr_bytes(order)
-
-        ctx = {
-            "order_ref": order_ref,
-            "kind": kind,
-            "is_delivery": is_delivery,
-            "status": order.status,
-            "status_label_es": status_es,
-            "status_label_en": status_en,
-            "created_at": order.created_at,
-            "customer_name": (order.shipping_name or "").strip(),
-            "items": _order_items(order),
-            "item_count": order.item_count,
-            "subtotal_display": _money(order.subtotal, order.currency),
-            "total_display": _money(order.total, order.currency),
-            # What this purchase earned and what it spent. Both are `0` on every
-            # order placed without the program on, which is what the template
-            # tests to skip the whole block - so nothing changed for a tenant not
-            # running rewards.
-            "points_earned": order.points_earned,
-            "points_spent": order.points_spent,
-            # ⚠ **Whether the points are actually in an account yet.** A guest's
-            # earning is held against their address until someone verifies an
-            # account on it (`PointsTransaction`, `claim_points_for_email`), so
-            # the email must invite them to create one rather than tell them to
-            # go and spend a balance they cannot reach. Judged on the order's
-            # owner, which is the same thing the ledger row was written with.
-            "points_claimable": order.points_earned > 0 and order.user_id is None,
-            # ⚠ **"You did not sign in, but we found you anyway."** True only for
-            # a guest checkout whose email already had an account on this tenant
-            # (`orders.claims.link_order_to_account`) - never for an order placed
-            # while signed in, which needs no explanation, and never for a plain
-            # guest order, which has no account to have gone anywhere. It is the
-            # counterpart of `points_claimable` above: that block invites a guest
-            # to create an account, and this one says why no invitation is coming.
-            "account_linked": order.linked_by_email,
-            # Where that invitation leads: the sign-in/sign-up form for a guest,
-            # the account page for a customer who already has one.
-            #
-            # ⚠ **No query string.** `/auth` renders the shared `AuthForm`, which
-            # takes no params - a `?mode=signup&email=` would look prefilled in
-            # the email and do nothing on arrival. The address is not needed
-            # anyway: the claim matches on whatever address the account verifies,
-            # which is the same handle `claim_guest_orders` uses.
-            "points_url": (
-                f"{brand['base_url']}/auth"
-                if order.user_id is None
-                else f"{brand['base_url']}/account"
-            ),
-            # The order detail page on the tenant's own domain. Unprefixed by
-            # locale on purpose - the storefront middleware redirects to the
-            # default locale, exactly as the account emails' links do - because
-            # an order carries no locale of its own (an online one is emailed
-            # from the webhook, which never saw the checkout request).
-            "action_url": f"{brand['base_url']}/orders/{order.public_id}",
-            # Where an appointment happens, when that is a place the customer
-            # travels to. None for everything else, and the whole block is then
-            # skipped - see `_booking_location`.
-            "location": _booking_location(order),
-            # `cid:` reference for the inline attachment below, or None so the
-            # template skips the whole block rather than rendering a broken image.
-            "qr_cid": _QR_CID if qr_png else None,
-            "preheader": (
-                f"Pedido {order_ref} · {status_es} / Order {order_ref} · {status_en}"
+        enqueue(
+            Deferred(
+                "orders.services.order_emails.build_order_email",
+                order.pk, kind, email, order.status,
+                to=[email], subject=_subject(order, kind, order.status),
             ),
-            **brand,
-        }
-
-        if kind == CONFIRMATION:
-            subject = f"Pedido {order_ref} recibido / Order {order_ref} received"
-        elif kind == FULFILLED:
-            if is_delivery:
-                subject = f"Pedido {order_ref} en camino / Order {order_ref} on its way"
-            else:
-                subject = f"Pedido {order_ref} listo / Order {order_ref} ready"
-        else:
-            subject = (
-                f"Pedido {order_ref}: {status_es} / Order {order_ref}: {status_en}"
-            )
-
-        text_body = render_to_string("orders/order_email.txt", ctx)
-        html_body = render_to_string("orders/order_email.html", ctx)
-
-        message = EmailMultiAlternatives(
-            subject,
-            text_body,
-            brand["from_email"],
-            [email],
-            # A reply about the order should reach the store, not the platform
-            # mailbox; fall back to the from-address if the tenant has no admins.
-            reply_to=_admin_emails(system) or [brand["from_email"]],
+            label=f"order:{kind}",
+            system=order.system,
         )
-        message.attach_alternative(html_body, "text/html")
-        attach_badges(message, system)
-
-        if qr_png:
-            image = MIMEImage(qr_png, "png")
-            image.add_header("Content-ID", f"<{_QR_CID}>")
-            # `inline`, so a client that understands the cid renders it in place
-            # instead of listing it as a download the reader has to go find.
-            image.add_header(
-                "Content-Disposition", "inline", filename=f"order-{order_ref}.png",
-            )
-            message.attach(image)
-            # Django nests the text/html alternatives inside a `multipart/mixed`
-            # by default, which leaves the image a sibling of the whole body and
-            # lets several clients (Outlook worst of all) refuse to resolve the
-            # cid. `related` is the subtype that says "this part belongs to that
-            # HTML" - without this line the block above renders as a broken image.
-            message.mixed_subtype = "related"
-
-        message.send(fail_silently=False)
     except Exception:
         # Best-effort: a mail failure must never fail the order or the webhook.
         logger.exception("Failed to send order email for order %s", order.pk)
+
+
+def build_order_email(order_id, kind, email, status):
+    """The message `send_order_email` queued, built by the outbox worker.
+
+    Writes the order's QR code first if nobody has yet, so the email carries
+    it. Raises on anything the worker should try again.
+    """
+    order = Order.objects.select_related("system").get(pk=order_id)
+    ensure_order_qr(order)
+
+    system = order.system
+    brand = _tenant_brand(system)
+    status_es, status_en = _STATUS_LABELS.get(status, (status, status))
+    order_ref = str(order.public_id)[:8].upper()
+    # A delivery order (online or pay-on-delivery) carries an address; a
+    # pickup / counter order does not. It decides the "on its way" vs "ready
+    # for pickup" wording of a fulfillment email.
+    is_delivery = bool((order.shipping_line1 or "").strip())
+
+    # Read once, up front: it decides both whether the template renders the
+    # QR block and whether there is an attachment to hang it on. None on an
+    # order that predates the field or whose write failed, and the email then
+    # simply goes out without a code.
+    qr_png = order_qr_bytes(order)
+
+    ctx = {
+        "order_ref": order_ref,
+        "kind": kind,
+        "is_delivery": is_delivery,
+        "status": status,
+        "status_label_es": status_es,
+        "status_label_en": status_en,
+        "created_at": order.created_at,
+        "customer_name": (order.shipping_name or "").strip(),
+        "items": _order_items(order),
+        "item_count": order.item_count,
+        "subtotal_display": _money(order.subtotal, order.currency),
+        "total_display": _money(order.total, order.currency),
+        # What this purchase earned and what it spent. Both are `0` on every
+        # order placed without the program on, which is what the template
+        # tests to skip the whole block - so nothing changed for a tenant not
+        # running rewards.
+        "points_earned": order.points_earned,
+        "points_spent": order.points_spent,
+        # ⚠ **Whether the points are actually in an account yet.** A guest's
+        # earning is held against their address until someone verifies an
+        # account on it (`PointsTransaction`, `claim_points_for_email`), so
+        # the email must invite them to create one rather than tell them to
+        # go and spend a balance they cannot reach. Judged on the order's
+        # owner, which is the same thing the ledger row was written with.
+        "points_claimable": order.points_earned > 0 and order.user_id is None,
+        # ⚠ **"You did not sign in, but we found you anyway."** True only for
+        # a guest checkout whose email already had an account on this tenant
+        # (`orders.claims.link_order_to_account`) - never for an order placed
+        # while signed in, which needs no explanation, and never for a plain
+        # guest order, which has no account to have gone anywhere. It is the
+        # counterpart of `points_claimable` above: that block invites a guest
+        # to create an account, and this one says why no invitation is coming.
+        "account_linked": order.linked_by_email,
+        # Where that invitation leads: the sign-in/sign-up form for a guest,
+        # the account page for a customer who already has one.
+        #
+        # ⚠ **No query string.** `/auth` renders the shared `AuthForm`, which
+        # takes no params - a `?mode=signup&email=` would look prefilled in
+        # the email and do nothing on arrival. The address is not needed
+        # anyway: the claim matches on whatever address the account verifies,
+        # which is the same handle `claim_guest_orders` uses.
+        "points_url": (
+            f"{brand['base_url']}/auth"
+            if order.user_id is None
+            else f"{brand['base_url']}/account"
+        ),
+        # The order detail page on the tenant's own domain. Unprefixed by
+        # locale on purpose - the storefront middleware redirects to the
+        # default locale, exactly as the account emails' links do - because
+        # an order carries no locale of its own (an online one is emailed
+        # from the webhook, which never saw the checkout request).
+        "action_url": f"{brand['base_url']}/orders/{order.public_id}",
+        # Where an appointment happens, when that is a place the customer
+        # travels to. None for everything else, and the whole block is then
+        # skipped - see `_booking_location`.
+        "location": _booking_location(order),
+        # `cid:` reference for the inline attachment below, or None so the
+        # template skips the whole block rather than rendering a broken image.
+        "qr_cid": _QR_CID if qr_png else None,
+        "preheader": (
+            f"Pedido {order_ref} · {status_es} / Order {order_ref} · {status_en}"
+        ),
+        **brand,
+    }
+
+    text_body = render_to_string("orders/order_email.txt", ctx)
+    html_body = render_to_string("orders/order_email.html", ctx)
+
+    message = EmailMultiAlternatives(
+        _subject(order, kind, status),
+        text_body,
+        brand["from_email"],
+        [email],
+        # A reply about the order should reach the store, not the platform
+        # mailbox; fall back to the from-address if the tenant has no admins.
+        reply_to=_admin_emails(system) or [brand["from_email"]],
+    )
+    message.attach_alternative(html_body, "text/html")
+    attach_badges(message, system)
+
+    if qr_png:
+        image = MIMEImage(qr_png, "png")
+        image.add_header("Content-ID", f"<{_QR_CID}>")
+        # `inline`, so a client that understands the cid renders it in place
+        # instead of listing it as a download the reader has to go find.
+        image.add_header(
+            "Content-Disposition", "inline", filename=f"order-{order_ref}.png",
+        )
+        message.attach(image)
+        # Django nests the text/html alternatives inside a `multipart/mixed`
+        # by default, which leaves the image a sibling of the whole body and
+        # lets several clients (Outlook worst of all) refuse to resolve the
+        # cid. `related` is the subtype that says "this part belongs to that
+        # HTML" - without this line the block above renders as a broken image.
+        message.mixed_subtype = "related"
+    return message
@@ -13,26 +13,58 @@ holds it. Admin validation is a *permission* on that page, not a second code -
 which is why `orders.views._may_read` lets a tenant's admin read any order of
 their own System.
 
-**Written once, at checkout** (`_open_order`), never regenerated per render. The
+**Written once, just after checkout**, never regenerated per render. The
 payload is derived only from `public_id` and the tenant's host, neither of which
 moves in an order's lifetime, and a printed code that regenerated differently
 would stop matching the receipt it is on.
 
+**Never in the checkout request.** Encoding the PNG and uploading it to the
+tenant's bucket used to be part of every checkout's response time. Now the
+order is placed without one and whichever worker gets to it first writes it
+(`ensure_order_qr`, which keeps the first code written):
+
+* the mail worker, building the order's confirmation email
+  (`services.order_emails`), which carries the code inline - so every emailed
+  receipt still has one;
+* otherwise `run_site_jobs`, which sweeps recent orders still without one
+  (`render_pending`) - an order with no email still gets its code for the
+  order page and the printed receipt. Checkout nudges it (`request_qr`), the
+  way an upload nudges the picture renditions.
+
+Until then the order page serialises ``qr_code`` as null, exactly as for an
+order whose write failed.
+
 **Best-effort, exactly like the order emails.** `attach_order_qr` swallows every
 failure: an order with no QR is a nuisance, while an order that failed to be
 placed because object storage was slow is a lost sale. Anything missed is filled
-in later by ``manage.py backfill_order_qr``.
+in later by ``manage.py backfill_order_qr``; the sweep above only looks back
+`PENDING_WINDOW`, so an order that keeps failing stops being retried.
 """
 
 import logging
+from datetime import timedelta
 from io import BytesIO
 
 import qrcode
 from django.conf import settings
 from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+
+from core.renditions import request_render
+
+from ..models import Order
 
 logger = logging.getLogger(__name__)
 
+#: How far back the sweep looks for an order without a code. Long enough to
+#: outlast a storage outage or a worker busy with a restore; anything older is
+#: left to `backfill_order_qr`.
+PENDING_WINDOW = timedelta(days=1)
+
+#: Orders written per sweep, so a backlog cannot hold up a queued backup.
+BATCH = 25
+
 # Error-correction level M recovers ~15% of the symbol. A receipt gets folded,
 # creased and photographed under a shop's lighting, so the cheapest level (L,
 # ~7%) is not enough; the highest (H, ~30%) buys robustness nobody needs at the
@@ -143,3 +175,59 @@ def order_qr_bytes(order) -> bytes | None:
     except Exception:
         logger.warning("QR code for order %s could not be read", order.pk, exc_info=True)
         return None
+
+
+def request_qr():
+    """Tell `run_site_jobs` an order is waiting for its code.
+
+    The same nudge a picture upload gives, since the same idle pass serves both.
+    """
+    request_render()
+
+
+def ensure_order_qr(order) -> bool:
+    """Write `order`'s code unless it already has one. Returns whether it has one now.
+
+    The PNG is rendered and uploaded holding nothing; the row is touched only by
+    the one UPDATE that claims it, and only if it is still without a code. The
+    mail worker and the sweep may both get this far, and whichever UPDATE comes
+    second deletes its own file and takes the first one's - a lock held across
+    the upload would have queued checkout, the Stripe worker and the admin
+    behind the bucket. Never raises, like `attach_order_qr`.
+    """
+    if order.qr_code:
+        return True
+    field = order.qr_code
+    try:
+        png = render_qr_png(order_detail_url(order))
+        name = field.storage.save(
+            field.field.generate_filename(order, f"{order.public_id}.png"),
+            ContentFile(png),
+            max_length=field.field.max_length,
+        )
+    except Exception:
+        logger.exception("Failed to write QR code for order %s", order.pk)
+        return False
+
+    if not Order.objects.filter(pk=order.pk).filter(Q(qr_code="") | Q(qr_code__isnull=True)).update(qr_code=name):
+        try:
+            field.storage.delete(name)
+        except Exception:
+            logger.warning("Could not delete a duplicate QR code %s", name, exc_info=True)
+        name = Order.objects.filter(pk=order.pk).values_list("qr_code", flat=True).first()
+    order.qr_code = name
+    return bool(order.qr_code)
+
+
+def render_pending(limit: int = BATCH) -> int:
+    """Write the codes of up to `limit` recent orders without one; returns how many were written.
+
+    Newest first: while storage is failing, the orders it failed on would
+    otherwise fill every batch ahead of the ones placed since.
+    """
+    since = timezone.now() - PENDING_WINDOW
+    orders = (
+        Order.objects.filter(qr_code__in=["", None], created_at__gte=since)
+        .order_by("-pk")[:limit]
+    )
+    return sum(1 for order in orders if ensure_order_qr(order))
@@ -10,20 +10,23 @@ promising an award the confirmation email did not pay out.
 Five things worth knowing before changing anything here:
 
 * **The ledger is the balance.** `PointsTransaction` rows are append-only and
-  signed; a balance is one `SUM`. Nothing anywhere increments a counter, because
-  a tier is defined as points *earned inside a trailing window* - a question only
-  timestamped rows can answer - and because a redemption has to be reversible
-  exactly once, which a counter can only manage by trusting its caller.
+  signed; a balance is their `SUM`. `PointsBalance` keeps that sum folded
+  forward so a cart render does not re-add a customer's whole history, but it is
+  a running total *of the ledger* up to a row id, never a counter anything
+  increments on its own - a read adds the rows past it, so the ledger stays the
+  authority. Tiers still read the ledger directly: a tier is points *earned
+  inside a trailing window*, a question only timestamped rows can answer.
 * **Spending is taken optimistically at checkout, exactly like a coupon
   redemption and a booking's slot**, so two tabs cannot spend the same balance
   twice; an order that dies hands it back. Earning is the opposite: it is paid
   out only when the order becomes real, because an abandoned Stripe page must
   never have paid.
-* **Spending is serialised by a row lock on the customer's own profile.** A
-  balance is a `SUM` over rows, so "check then insert" is a read-modify-write
-  with a window in it, and the window is exactly wide enough for two tabs to
-  spend the same 1200 points. `UserProfile` is the lock because it is the one row
-  per (user) that always exists.
+* **Every ledger write for an account is serialised by a row lock on its
+  `PointsBalance`.** "Check then insert" is a read-modify-write with a window in
+  it, exactly wide enough for two tabs to spend the same 1200 points; and the
+  fold that follows each write must see rows committed in id order, or it would
+  step past one that commits late. The row is per (user, system), so two
+  customers - or one customer on two tenants - never wait on each other.
 * **Tiers are judged on points earned, never on the balance.** Spending must not
   demote anyone - a program that takes a customer's status away for using the
   reward it gave them is one they stop using.
@@ -36,12 +39,10 @@ import logging
 from datetime import timedelta
 
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import Max, Q, Sum
 from django.utils import timezone
 
-from users.models import UserProfile
-
-from ..models import Order, PointsTransaction, RewardTier
+from ..models import Order, PointsBalance, PointsTransaction, RewardTier
 
 logger = logging.getLogger(__name__)
 
@@ -117,12 +118,43 @@ def can_redeem(system, target) -> bool:
 # ───────────────────────────────── Reading a balance ─────────────────────────
 
 
+def _ledger_tail(user, system, through_id):
+    """``(points, last_id)`` of the ledger rows past ``through_id``."""
+    tail = PointsTransaction.objects.filter(
+        user=user, system=system, id__gt=through_id,
+    ).aggregate(total=Sum("points"), last=Max("id"))
+    return int(tail["total"] or 0), tail["last"]
+
+
+def _locked_balance(user, system):
+    """This account's `PointsBalance`, locked for the rest of the transaction.
+
+    Taken *before* a ledger row is inserted, so inserts for one account commit in
+    id order and `_advance` can never fold past a row still in flight.
+    """
+    row, _ = PointsBalance.objects.select_for_update().get_or_create(user=user, system=system)
+    return row
+
+
+def _advance(row, *, credit=0):
+    """Fold the ledger rows past ``row.through_id`` into it, plus ``credit``."""
+    points, last = _ledger_tail(row.user_id, row.system_id, row.through_id)
+    if last is None and not credit:
+        return row
+    row.balance += points + credit
+    if last is not None:
+        row.through_id = last
+    row.save(update_fields=["balance", "through_id", "updated_at"])
+    return row
+
+
 def balance_for(user, system) -> int:
     """The customer's spendable points on this tenant.
 
-    A `SUM` over the ledger, and it is per **System**: the catalog is per-tenant,
-    so points earned on one customer's site can no more be spent on another's
-    than a coupon can cross between them.
+    The ledger's `SUM`, read as the `PointsBalance` running total plus the rows
+    past it - two indexed lookups however long the customer's history is. It is
+    per **System**: the catalog is per-tenant, so points earned on one customer's
+    site can no more be spent on another's than a coupon can cross between them.
 
     ⚠ Unclaimed guest rows (`user` NULL) are invisible here by construction -
     they belong to an address, not yet to an account. That is what makes
@@ -130,14 +162,17 @@ def balance_for(user, system) -> int:
     """
     if user is None or not getattr(user, "is_authenticated", False) or system is None:
         return 0
-    total = PointsTransaction.objects.filter(user=user, system=system).aggregate(
-        total=Sum("points"),
-    )["total"]
+    folded, through_id = (
+        PointsBalance.objects.filter(user=user, system=system)
+        .values_list("balance", "through_id")
+        .first()
+    ) or (0, 0)
+    total = folded + _ledger_tail(user, system, through_id)[0]
     # Floored at zero so a balance can never read negative to a customer. A
     # negative sum would mean a bug elsewhere (a double release, a bad manual
     # adjustment) and showing it as "-40 points" helps nobody; the ledger still
     # holds the truth for whoever has to unpick it.
-    return max(0, int(total or 0))
+    return max(0, total)
 
 
 def earned_since(user, system, since) -> int:
@@ -158,6 +193,59 @@ def earned_since(user, system, since) -> int:
     return max(0, int(total or 0))
 
 
+def _earned_in_windows(user, system, months):
+    """``{months: points earned in that trailing window}``, in one query.
+
+    One conditional `SUM` per distinct window over the widest of them, so a
+    ladder with a twelve-month entry rung and a six-month top one still costs
+    one round trip. Months are 30-day blocks - see `tier_standing`.
+    """
+    now = timezone.now()
+    since = {m: now - timedelta(days=30 * m) for m in months}
+    totals = PointsTransaction.objects.filter(
+        user=user,
+        system=system,
+        kind__in=(PointsTransaction.KIND_EARN, PointsTransaction.KIND_REVOKE),
+        created_at__gte=min(since.values()),
+    ).aggregate(**{
+        f"m{m}": Sum("points", filter=Q(created_at__gte=start)) for m, start in since.items()
+    })
+    return {m: max(0, int(totals[f"m{m}"] or 0)) for m in months}
+
+
+def tier_standing(user, system):
+    """``(tier, next_tier)`` for this customer: where they sit and the rung above.
+
+    One read of the ladder and one of the ledger for both answers, which is what
+    the account page and `award_points` both need - asking `tier_for` and then
+    `next_tier_for` separately walked the windows twice.
+    """
+    if not rewards_enabled(system) or user is None:
+        return None, None
+    if not getattr(user, "is_authenticated", False):
+        return None, None
+
+    tiers = sorted(
+        RewardTier.objects.filter(system=system, enabled=True),
+        key=lambda t: (t.threshold, t.id),
+    )
+    if not tiers:
+        return None, None
+
+    # Months as 30-day blocks. Deliberately approximate: a qualifying window is a
+    # marketing promise ("earn 500 points in six months"), not an accounting
+    # period, and a customer who misses their tier by the two days February is
+    # short would be right to be annoyed.
+    earned = _earned_in_windows(user, system, {tier.period_months or 12 for tier in tiers})
+
+    current = next(
+        (t for t in reversed(tiers) if earned[t.period_months or 12] >= t.threshold), None,
+    )
+    floor = current.threshold if current is not None else -1
+    upcoming = next((t for t in tiers if t.threshold > floor), None)
+    return current, upcoming
+
+
 def tier_for(user, system):
     """The highest `RewardTier` this customer currently qualifies for, or None.
 
@@ -171,33 +259,7 @@ def tier_for(user, system):
     non-zero threshold - a tenant who wants everyone to start somewhere gives the
     lowest rung a threshold of 0).
     """
-    if not rewards_enabled(system) or user is None:
-        return None
-    if not getattr(user, "is_authenticated", False):
-        return None
-
-    tiers = list(RewardTier.objects.filter(system=system, enabled=True))
-    if not tiers:
-        return None
-
-    now = timezone.now()
-    # One query per distinct window rather than one per tier: most tenants use a
-    # single period across every rung, so this is normally one query however many
-    # tiers there are.
-    windows = {}
-    for tier in tiers:
-        months = tier.period_months or 12
-        if months not in windows:
-            # Months as 30-day blocks. Deliberately approximate: a qualifying
-            # window is a marketing promise ("earn 500 points in six months"),
-            # not an accounting period, and a customer who misses their tier by
-            # the two days February is short would be right to be annoyed.
-            windows[months] = earned_since(user, system, now - timedelta(days=30 * months))
-
-    for tier in sorted(tiers, key=lambda t: (t.threshold, t.id), reverse=True):
-        if windows[tier.period_months or 12] >= tier.threshold:
-            return tier
-    return None
+    return tier_standing(user, system)[0]
 
 
 def earn_multiplier_for(user, system) -> int:
@@ -217,15 +279,7 @@ def next_tier_for(user, system):
     re-walking the ladder itself and reaching a different answer than
     `tier_for` did.
     """
-    if not rewards_enabled(system) or user is None:
-        return None
-    current = tier_for(user, system)
-    floor = current.threshold if current is not None else -1
-    return (
-        RewardTier.objects.filter(system=system, enabled=True, threshold__gt=floor)
-        .order_by("threshold", "id")
-        .first()
-    )
+    return tier_standing(user, system)[1]
 
 
 # ─────────────────────────────────── Spending ────────────────────────────────
@@ -244,13 +298,13 @@ def order_points_cost(order) -> int:
 def spend_points(order, user, system, points, *, note="") -> None:
     """Take `points` off the customer's balance for `order`, or raise.
 
-    ⚠ **The `select_for_update` is what makes this safe, and it must stay.** A
-    balance is a `SUM` over rows, so checking it and then inserting a spend is a
-    read-modify-write - and the gap between the two is exactly wide enough for a
-    customer with two tabs open to spend the same 1200 points on two orders. The
-    lock is taken on the customer's own `UserProfile`, the one row that always
-    exists per account, so two checkouts by the same customer serialise while two
-    different customers never wait on each other.
+    ⚠ **The `select_for_update` is what makes this safe, and it must stay.**
+    Checking a balance and then inserting a spend is a read-modify-write - and
+    the gap between the two is exactly wide enough for a customer with two tabs
+    open to spend the same 1200 points on two orders. The lock is taken on the
+    customer's own `PointsBalance` (created on first use), so two checkouts by
+    the same customer serialise while two different customers never wait on each
+    other.
 
     Raises `RewardsError("INSUFFICIENT_POINTS")` when the balance does not cover
     it. Callers discard the half-built order and say so, exactly as they do for
@@ -266,8 +320,8 @@ def spend_points(order, user, system, points, *, note="") -> None:
         # a silent no-op.
         raise RewardsError("POINTS_REQUIRE_ACCOUNT", "Points can only be used with an account.")
 
-    UserProfile.objects.select_for_update().filter(user=user).first()
-    if balance_for(user, system) < points:
+    balance = _advance(_locked_balance(user, system))
+    if max(0, balance.balance) < points:
         raise RewardsError("INSUFFICIENT_POINTS", "You do not have enough points for that.")
 
     PointsTransaction.objects.create(
@@ -279,10 +333,33 @@ def spend_points(order, user, system, points, *, note="") -> None:
         points=-points,
         note=note or f"Order #{str(order.public_id)[:8].upper()}",
     )
+    _advance(balance)
     order.points_spent = points
     order.save(update_fields=["points_spent", "updated_at"])
 
 
+def _record(order, kind, points, note):
+    """Write one ledger row for `order` and fold it into the owner's balance.
+
+    Every non-spend writer comes through here, so the lock-insert-fold order the
+    module docstring relies on is spelled out once. A guest's row has no balance
+    to fold into until it is claimed.
+    """
+    with transaction.atomic():
+        balance = _locked_balance(order.user, order.system) if order.user_id else None
+        PointsTransaction.objects.create(
+            system=order.system,
+            user=order.user,
+            email=(order.email or "").strip().lower(),
+            order=order,
+            kind=kind,
+            points=points,
+            note=note,
+        )
+        if balance is not None:
+            _advance(balance)
+
+
 def release_points(order) -> bool:
     """Give back the points a dead order took. Returns whether anything moved.
 
@@ -298,14 +375,11 @@ def release_points(order) -> bool:
     """
     if not order.points_spent:
         return False
-    PointsTransaction.objects.create(
-        system=order.system,
-        user=order.user,
-        email=(order.email or "").strip().lower(),
-        order=order,
-        kind=PointsTransaction.KIND_RELEASE,
-        points=order.points_spent,
-        note=f"Returned from order #{str(order.public_id)[:8].upper()}",
+    _record(
+        order,
+        PointsTransaction.KIND_RELEASE,
+        order.points_spent,
+        f"Returned from order #{str(order.public_id)[:8].upper()}",
     )
     order.points_spent = 0
     order.save(update_fields=["points_spent", "updated_at"])
@@ -364,14 +438,11 @@ def award_points(order) -> int:
         logger.info("Order %s earned %s points with no owner; skipped", order.pk, earned)
         return 0
 
-    PointsTransaction.objects.create(
-        system=order.system,
-        user=order.user,
-        email=email,
-        order=order,
-        kind=PointsTransaction.KIND_EARN,
-        points=earned,
-        note=f"Order #{str(order.public_id)[:8].upper()}",
+    _record(
+        order,
+        PointsTransaction.KIND_EARN,
+        earned,
+        f"Order #{str(order.public_id)[:8].upper()}",
     )
     order.points_earned = earned
     order.save(update_fields=["points_earned", "updated_at"])
@@ -388,14 +459,11 @@ def revoke_points(order) -> bool:
     """
     if not order.points_earned:
         return False
-    PointsTransaction.objects.create(
-        system=order.system,
-        user=order.user,
-        email=(order.email or "").strip().lower(),
-        order=order,
-        kind=PointsTransaction.KIND_REVOKE,
-        points=-order.points_earned,
-        note=f"Canceled order #{str(order.public_id)[:8].upper()}",
+    _record(
+        order,
+        PointsTransaction.KIND_REVOKE,
+        -order.points_earned,
+        f"Canceled order #{str(order.public_id)[:8].upper()}",
     )
     order.points_earned = 0
     order.save(update_fields=["points_earned", "updated_at"])
@@ -416,21 +484,54 @@ def claim_points_for_email(user, system, email) -> int:
     tenants' sites is two customers as far as the catalog is concerned, and
     sweeping both would move one tenant's liability onto the other's books.
 
+    ⚠ Claimed rows keep their old ids, which can sit below the account's
+    `through_id` where a fold would never look - so the part of the claim that
+    falls there is credited to the balance explicitly, under its lock.
+
     Returns how many points were claimed, so the caller can log it.
     """
     cleaned = (email or "").strip().lower()
     if not cleaned or user is None or system is None:
         return 0
-    rows = PointsTransaction.objects.filter(
-        system=system, user__isnull=True, email=cleaned,
-    )
-    claimed = rows.aggregate(total=Sum("points"))["total"] or 0
-    updated = rows.update(user=user)
+    with transaction.atomic():
+        balance = _locked_balance(user, system)
+        rows = PointsTransaction.objects.filter(
+            system=system, user__isnull=True, email=cleaned,
+        )
+        totals = rows.aggregate(
+            total=Sum("points"),
+            behind=Sum("points", filter=Q(id__lte=balance.through_id)),
+        )
+        claimed = totals["total"] or 0
+        updated = rows.update(user=user)
+        if updated:
+            _advance(balance, credit=int(totals["behind"] or 0))
     if updated:
         logger.info("Claimed %s points (%s rows) for %s", claimed, updated, user.pk)
     return int(claimed)
 
 
+# ──────────────────────────── Keeping the running totals honest ──────────────
+
+
+def reset_balances(system):
+    """Drop every `PointsBalance` of one tenant, to be rebuilt from the ledger.
+
+    For writes that rewrite ledger rows *in place* - a restore, above all -
+    which the forward fold cannot see. Always safe: an absent row reads as the
+    whole ledger and is recreated by the account's next points write.
+    """
+    PointsBalance.objects.filter(system=system).delete()
+
+
+def ledger_through(balance):
+    """The ledger's own `SUM` up to ``balance.through_id`` - what the row must hold."""
+    total = PointsTransaction.objects.filter(
+        user_id=balance.user_id, system_id=balance.system_id, id__lte=balance.through_id,
+    ).aggregate(total=Sum("points"))["total"]
+    return int(total or 0)
+
+
 def cart_points_summary(items, user, system):
     """What the cart page needs to draw its points UI, computed in one place.
 
@@ -8,47 +8,102 @@ cascading, a management command and a shell session all bypass them. A signal
 covers every route uniformly, which is the same reasoning `core/signals.py`
 records for the System payload.
 
-Deliberately coarse - it drops the whole `orders:availability:*` namespace rather
-than the keys covering this booking's own dates. Working out which cached ranges
-overlap one appointment would be more code than the query it saves, and the
-payload it protects is a minute old at most anyway.
+Scoped rather than swept (see orders/cache.py): a booking drops only the days
+of its own branch that it overlaps, and a change to what a branch offers drops
+that branch's days. Neither touches another tenant's warm calendar.
+
+The stored month grid (`AvailabilitySummary`) is derived from the same inputs
+and dropped by the same receivers, scoped the same way; a service's own rows go
+when the service is edited, since its duration and pools shape every slot.
+
+⚠ Only the booking's *current* dates are known here. A booking moved to another
+day (the Django admin is the one route that can) leaves its old day looking taken
+until the one-minute TTL expires - conservative, never an oversell.
 """
 
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
+from catalog.models import Service
 from core.models import BookingResource, Branch, BranchHours, ResourcePool
 
-from .cache import invalidate_availability
+from .cache import invalidate_booking_availability, invalidate_branch_availability
 from .models import Booking
+from .services.availability_summary import forget_booking, forget_branch, forget_service
+
+
+def _invalidate_branch(branch_id):
+    invalidate_branch_availability(branch_id)
+    forget_branch(branch_id)
 
 
 @receiver(post_save, sender=Booking)
 @receiver(post_delete, sender=Booking)
 def invalidate_availability_on_booking_change(sender, instance, **kwargs):
-    invalidate_availability()
+    def forget():
+        invalidate_booking_availability(instance)
+        forget_booking(instance)
+
+    forget()
+    # Once more when the write is visible: a calendar rebuilt between this
+    # signal and the commit read the bookings as they were, under the stamp
+    # just bumped (see `orders.services.availability_summary`).
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(forget)
 
 
 # The supply side of the same payload. Editing a boat from ten seats to eight
 # changes what every calendar at that branch may offer, and a tenant who does it
 # has to see the effect now - not whenever the next booking happens to clear the
-# namespace for them. Disabling a pool, or deleting a resource outright, is the
+# days for them. Disabling a pool, or deleting a resource outright, is the
 # same story in its sharpest form: those seats stop existing immediately.
 @receiver(post_save, sender=ResourcePool)
 @receiver(post_delete, sender=ResourcePool)
+def invalidate_availability_on_pool_change(sender, instance, **kwargs):
+    _invalidate_branch(instance.branch_id)
+
+
 @receiver(post_save, sender=BookingResource)
 @receiver(post_delete, sender=BookingResource)
 def invalidate_availability_on_resource_change(sender, instance, **kwargs):
-    invalidate_availability()
+    branch_id = ResourcePool.objects.filter(pk=instance.pool_id).values_list("branch_id", flat=True).first()
+    if branch_id is not None:
+        _invalidate_branch(branch_id)
 
 
 # Everything else the engine reads: the branch's own capacity, grid, notice and
 # horizon, and the weekday hours the slots are cut from. `BranchWriteSerializer`
 # rewrites the whole week on every save, so this fires as a burst - which is
-# fine, `invalidate_availability` is a namespace delete either way.
+# fine, each one is a single INCR on the branch's epoch.
 @receiver(post_save, sender=Branch)
 @receiver(post_delete, sender=Branch)
+def invalidate_availability_on_branch_change(sender, instance, **kwargs):
+    _invalidate_branch(instance.pk)
+
+
 @receiver(post_save, sender=BranchHours)
 @receiver(post_delete, sender=BranchHours)
-def invalidate_availability_on_branch_change(sender, instance, **kwargs):
-    invalidate_availability()
+def invalidate_availability_on_hours_change(sender, instance, **kwargs):
+    _invalidate_branch(instance.branch_id)
+
+
+# The service's side: its duration is the slot grid, and its pools are the
+# seats. The slot cache is keyed by service and lives a minute; the stored rows
+# have no such clock, so they go with the write.
+@receiver(post_save, sender=Service)
+def forget_availability_on_service_change(sender, instance, **kwargs):
+    if instance.booking_enabled:
+        forget_service(instance.pk)
+
+
+@receiver(m2m_changed, sender=Service.booking_pools.through)
+def forget_availability_on_service_pools_change(sender, instance, action, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, Service):
+        forget_service(instance.pk)
+    else:
+        # Edited from the pool's side; every service it was added to or
+        # removed from (all of them, on a clear) is affected.
+        forget_branch(instance.branch_id)
@@ -20,6 +20,7 @@ import json
 import shutil
 import tempfile
 import uuid
+from collections import namedtuple
 from datetime import date, datetime, time, timedelta
 from datetime import timezone as dt_timezone
 from decimal import Decimal
@@ -29,8 +30,9 @@ from zoneinfo import ZoneInfo
 from django.contrib.auth.models import User
 from django.core import mail
 from django.core.cache import cache
-from django.db import transaction
+from django.db import connection, transaction
 from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from catalog.models import (
@@ -49,15 +51,21 @@ from core.models import BookingResource, Branch, BranchHours, ResourcePool, Syst
 from users.models import CartItem
 
 from . import views as orders_views
+from .cache import invalidate_booking_days
 from .models import (
+    AvailabilitySummary,
     Booking,
     Coupon,
     Order,
     OrderLine,
+    PointsBalance,
     PointsTransaction,
     RewardTier,
 )
-from .services.booking import branches_for, is_slot_available, slots_for_day
+from .services.booking import (
+    OccupancyIndex, availability_range, branches_for, free_by_resource, is_slot_available, slots_for_day,
+)
+from .services.availability_summary import SUMMARY_MAX_AGE, month_summary
 from .services.coupons import (
     CouponError,
     attach_coupon_qr,
@@ -453,7 +461,9 @@ class WebhookTests(TestCase):
             },
         }
         payload.update(session)
-        return {"type": event_type, "data": {"object": payload}}
+        # A fresh event id per call: a real redelivery repeats its id, and is
+        # deduplicated before any handler runs (see the event-log test below).
+        return {"id": f"evt_{uuid.uuid4().hex}", "type": event_type, "data": {"object": payload}}
 
     def _post(self, event, token=None):
         url = f"/api/orders/stripe/webhook/{token or self.system.stripe_webhook_token}/"
@@ -549,6 +559,41 @@ class WebhookTests(TestCase):
         self.order.refresh_from_db()
         self.assertEqual(self.order.status, Order.STATUS_PAID)
 
+    @override_settings(STRIPE_EVENTS_PROCESS_INLINE=False)
+    def test_an_event_is_recorded_once_acknowledged_and_replayable(self):
+        """Recorded and answered at once; the worker applies it, all or nothing,
+        and one that keeps failing is kept for a replay."""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .models import StripeEvent
+
+        event = self._event()
+        for _ in range(2):
+            self.assertEqual(self._post(event).status_code, 200)
+        # The redelivery inserted nothing, and neither touched the order.
+        self.assertEqual(StripeEvent.objects.filter(event_id=event["id"]).count(), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_PENDING)
+
+        with patch("orders.views.award_points", side_effect=RuntimeError("ledger down")):
+            call_command("process_stripe_events", "--once", stdout=StringIO())
+        row = StripeEvent.objects.get(event_id=event["id"])
+        self.assertEqual((row.status, row.attempts), (StripeEvent.STATUS_RECEIVED, 1))
+        self.assertIn("ledger down", row.error)
+        # The whole event rolled back with it: no paid order without its stock.
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_PENDING)
+
+        StripeEvent.objects.filter(pk=row.pk).update(status=StripeEvent.STATUS_FAILED)
+        call_command("replay_stripe_events", "--now", stdout=StringIO())
+        row.refresh_from_db()
+        self.assertEqual(row.status, StripeEvent.STATUS_PROCESSED)
+        self.order.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual((self.order.status, self.product.stock_count), (Order.STATUS_PAID, 3))
+
 
 # --------------------------------------------------------------------------- #
 # Reading, deleting and guest orders
@@ -1299,7 +1344,7 @@ class OrderEmailTests(TestCase):
             stripe_session_id="cs_1",
             customization=[{"name": "Extra cheese", "quantity": 2, "removed": False}],
         )
-        event = {"type": "checkout.session.completed", "data": {"object": {
+        event = {"id": "evt_paid_1", "type": "checkout.session.completed", "data": {"object": {
             "id": "cs_1", "payment_status": "paid", "payment_intent": "pi_1",
             "customer_details": {"email": "buyer@acme.test"},
         }}}
@@ -1369,7 +1414,7 @@ class OrderEmailTests(TestCase):
         """An abandoned online checkout never had an address collected, so the
         expiry has no one to notify - and must not raise trying."""
         order = self._make_order(stripe_session_id="cs_2")  # no email
-        event = {"type": "checkout.session.expired", "data": {"object": {"id": "cs_2"}}}
+        event = {"id": "evt_expired_2", "type": "checkout.session.expired", "data": {"object": {"id": "cs_2"}}}
         with patch("orders.views.verify_webhook", return_value=event):
             self.client.post(
                 f"/api/orders/stripe/webhook/{self.system.stripe_webhook_token}/",
@@ -1479,7 +1524,8 @@ class OrderQrTests(TestCase):
         self.assertIsNone(self.client.get(f"/api/orders/{bare.public_id}/").json()["qr_code"])
 
         mail.outbox.clear()
-        send_order_email(bare, kind=CONFIRMATION)
+        with patch("orders.services.qr.render_qr_png", side_effect=OSError("bucket down")):
+            send_order_email(bare, kind=CONFIRMATION)
         message = mail.outbox[0]
         html = next(body for body, mime in message.alternatives if mime == "text/html")
         self.assertNotIn("cid:", html)
@@ -1505,6 +1551,28 @@ class OrderQrTests(TestCase):
         # Re-runnable: an order that already had one is left exactly as it was.
         self.assertEqual(existing.qr_code.name, original)
 
+    def test_two_writers_keep_the_first_code_and_drop_the_second_file(self):
+        """The sweep and the mail worker may both render an order's code; the
+        row is only touched by the UPDATE that claims it, and the loser's
+        upload must not stay in the bucket as an orphan."""
+        from .services.qr import ensure_order_qr
+
+        order = Order.objects.create(
+            system=self.system, user=self.user, currency="USD",
+            subtotal=Decimal("1.00"), total=Decimal("1.00"),
+        )
+        late = Order.objects.get(pk=order.pk)   # read before the first write
+
+        self.assertTrue(ensure_order_qr(order))
+        self.assertTrue(ensure_order_qr(late))
+
+        self.assertEqual(late.qr_code.name, order.qr_code.name)
+        order.refresh_from_db()
+        self.assertEqual(order.qr_code.name, late.qr_code.name)
+        folder, _, kept = order.qr_code.name.rpartition("/")
+        _, files = order.qr_code.storage.listdir(folder)
+        self.assertEqual([f for f in files if str(order.public_id) in f], [kept])
+
 
 # --------------------------------------------------------------------------- #
 # Bookings
@@ -1655,6 +1723,55 @@ class BookingAvailabilityTests(TestCase):
         self.assertEqual(branches_for(solo), [])
         self.assertTrue(slots_for_day(solo, None, self.day, now=self.now))
 
+    def test_a_month_summary_never_stores_a_day_a_booking_moved_mid_build(self):
+        """A booking that commits while the grid is being rebuilt drops its days
+        before the rebuild writes them; what the rebuild read must not land."""
+        days = [self.day, self.day + timedelta(days=1)]
+        zone = ZoneInfo(self.branch.timezone)
+
+        def booked_meanwhile(*args, **kwargs):
+            computed = availability_range(*args, **kwargs)
+            start = datetime.combine(self.day, time(9, 0), tzinfo=zone)
+            invalidate_booking_days(self.branch.pk, start, start + timedelta(hours=1), zone)
+            return computed
+
+        with patch("orders.services.availability_summary.availability_range", booked_meanwhile):
+            month_summary(self.service, self.branch, days, now=self.now)
+        # The 9th and the 8th before it moved; the 10th did not.
+        stored = AvailabilitySummary.objects.filter(service=self.service)
+        self.assertEqual([row.date for row in stored], [days[1]])
+
+        # Rebuilt rows upsert onto the one row per day.
+        month_summary(self.service, self.branch, days, now=self.now)
+        month_summary(self.service, self.branch, days, now=self.now + SUMMARY_MAX_AGE * 2)
+        self.assertEqual(sorted(stored.values_list("date", flat=True)), days)
+
+    def test_the_occupancy_index_agrees_with_the_linear_scan(self):
+        """`availability_range` answers slots from the index; the scan is the spec.
+
+        Edges are where bisection goes wrong, so the windows line up exactly with
+        booking starts and ends as well as falling strictly inside them.
+        """
+        Resource = namedtuple("Resource", ["pk", "capacity"])
+        resources = [Resource(pk=None, capacity=3), Resource(pk=1, capacity=4), Resource(pk=2, capacity=2)]
+        base = datetime(2026, 9, 9, 15, 0, tzinfo=dt_timezone.utc)
+        hour = timedelta(hours=1)
+        occupied = [
+            (base, base + hour, 1, 2),
+            (base + hour / 2, base + hour * 2, 1, 1),
+            (base, base + hour * 3, None, 1),
+            (base + hour, base + hour * 2, 2, None),
+        ]
+
+        index = OccupancyIndex(occupied)
+        for offset in range(-2, 8):
+            start = base + hour / 2 * offset
+            for length in (hour / 2, hour):
+                self.assertEqual(
+                    index.free(resources, start, start + length),
+                    free_by_resource(resources, occupied, start, start + length),
+                )
+
 
 class BookingCheckoutTests(_BookingFixture):
     """Booking a slot: what is accepted, what is refused, and what gets charged."""
@@ -1678,6 +1795,66 @@ class BookingCheckoutTests(_BookingFixture):
         # The service is snapshotted as an order line, like any other sale.
         self.assertEqual(booking.order.lines.get().name, "Haircut")
 
+    def test_a_booking_recomputes_only_the_days_it_overlaps(self):
+        slot = self._slot()
+        params = {"service": self.service.pk, "branch": self.branch.pk, "days": 7}
+
+        def availability():
+            return self.client.get(
+                "/api/bookings/availability/", params, HTTP_X_WEBSITE_HOST="acme.test",
+            ).json()["availability"]
+
+        self.assertIn(slot.isoformat(), str(availability()))  # warm every day
+
+        self.assertEqual(self._book(starts_at=slot.isoformat()).status_code, 201)
+        with patch("orders.views.availability_range", wraps=availability_range) as computed:
+            after = availability()
+
+        # No cache.clear(): the booked day was dropped by its own write, and the
+        # rebuild covered that day and the evening before it - not the week.
+        self.assertNotIn(slot.isoformat(), str(after))
+        (_, _, first, span), _ = computed.call_args
+        self.assertEqual((first, span), (slot.date() - timedelta(days=1), 2))
+
+    def test_the_month_grid_is_read_from_stored_days_and_a_booking_drops_only_its_own(self):
+        slot = self._slot()
+        today = timezone.now().date()
+        params = {"service": self.service.pk, "branch": self.branch.pk, "days": 30, "view": "month"}
+
+        def grid(**extra):
+            return self.client.get(
+                "/api/bookings/availability/", {**params, **extra}, HTTP_X_WEBSITE_HOST="acme.test",
+            ).json()
+
+        cold = grid()
+        self.assertNotIn("availability", cold)
+        self.assertEqual(len(cold["summary"]), 30)
+        day = cold["summary"][slot.date().isoformat()]
+        self.assertEqual((day["open"], day["seats_left"], day["first_slot"]), (True, 1, slot.isoformat()))
+
+        with patch("orders.services.availability_summary.availability_range", wraps=availability_range) as computed, \
+                CaptureQueriesContext(connection) as ctx:
+            warm = grid()
+        self.assertEqual(warm["summary"], cold["summary"])
+        # Only today is walked - the notice window moves under it by the minute -
+        # and the other 29 days are one read of the stored rows.
+        (_, _, first, span), _ = computed.call_args
+        self.assertEqual((first, span), (today, 1))
+        reads = [q for q in ctx.captured_queries if "orders_availabilitysummary" in q["sql"]]
+        self.assertEqual(len(reads), 1)
+
+        self.assertEqual(self._book(starts_at=slot.isoformat()).status_code, 201)
+        with patch("orders.services.availability_summary.availability_range", wraps=availability_range) as computed:
+            after = grid()
+        # The booked day (and the evening before it) were dropped by the write;
+        # the rest of the month was not rebuilt.
+        self.assertEqual(
+            after["summary"][slot.date().isoformat()]["first_slot"],
+            (slot + timedelta(hours=1)).isoformat(),
+        )
+        (_, _, first, span), _ = computed.call_args
+        self.assertEqual((first, span), (today, (slot.date() - today).days + 1))
+
     def test_the_body_is_revalidated_against_the_engine(self):
         """Checkout re-derives the slot rather than trusting the request: the
         calendar in front of the customer may be minutes old."""
@@ -2305,6 +2482,7 @@ class AbandonedBookingTests(_BookingFixture):
 
     def _post_event(self, event_type, session_id="cs_test_booking", **extra):
         event = {
+            "id": f"evt_{uuid.uuid4().hex}",
             "type": event_type,
             "data": {"object": {"id": session_id, "payment_status": "unpaid", **extra}},
         }
@@ -2745,7 +2923,7 @@ class BookingReassignTests(_BookingFixture):
 
 class BookingCheckoutAtomicityTests(TransactionTestCase):
     """The seat check and the booking write must be one transaction, and the QR
-    write must not be.
+    write must not be in the checkout at all.
 
     Un-serialised, two checkouts can both see the last four seats free and both
     take them. Real concurrency is not what is tested here - threads against
@@ -2800,30 +2978,36 @@ class BookingCheckoutAtomicityTests(TransactionTestCase):
             content_type="application/json", HTTP_X_WEBSITE_HOST="acme.test",
         )
 
-    def test_the_assignment_locks_and_the_qr_write_does_not(self):
+    @override_settings(EMAIL_OUTBOX_SEND_INLINE=False)
+    def test_the_assignment_locks_and_the_qr_is_left_to_the_worker(self):
         """A round-trip to object storage under a row lock would queue every
-        other checkout at this branch behind the network."""
-        seen = {}
+        other checkout at this branch behind the network - and outside it, it
+        would still be the customer's wait."""
+        from io import StringIO
 
-        def spy(name, real):
-            def wrapper(*args, **kwargs):
-                seen[name] = transaction.get_connection().in_atomic_block
-                return real(*args, **kwargs)
+        from django.core.management import call_command
 
-            return wrapper
+        from .services import qr
 
-        with patch.object(
-            orders_views, "assign_for_slot",
-            side_effect=spy("assign", orders_views.assign_for_slot),
-        ), patch.object(
-            orders_views, "attach_order_qr",
-            side_effect=spy("qr", orders_views.attach_order_qr),
-        ):
+        seen = {}
+
+        def spy(*args, **kwargs):
+            seen["assign"] = transaction.get_connection().in_atomic_block
+            return real_assign(*args, **kwargs)
+
+        real_assign = orders_views.assign_for_slot
+        with patch.object(orders_views, "assign_for_slot", side_effect=spy), \
+                patch.object(qr, "render_qr_png", wraps=qr.render_qr_png) as render:
             response = self._checkout(party_size=4)
+            self.assertEqual(response.status_code, 201)
+            self.assertTrue(seen["assign"])
+            self.assertEqual(render.call_count, 0)
 
-        self.assertEqual(response.status_code, 201)
-        self.assertTrue(seen["assign"])
-        self.assertFalse(seen["qr"])
+            call_command("run_site_jobs", "--once", stdout=StringIO())
+
+        order = Order.objects.get(public_id=response.json()["order_id"])
+        self.assertEqual(render.call_count, 1)
+        self.assertTrue(order.qr_code)
 
 
 # --------------------------------------------------------------------------- #
@@ -3783,6 +3967,31 @@ class RewardsTests(TestCase):
         self.assertEqual(claim_points_for_email(newcomer, self.system, newcomer.email), 50)
         self.assertEqual(balance_for(newcomer, self.system), 50)
 
+    def test_the_materialized_balance_follows_the_ledger_and_reconciles(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        self._grant(1500)  # a raw ledger write: nothing folds it in yet
+        self.assertEqual(balance_for(self.user, self.system), 1500)
+
+        order = self._order(redeemed=True, user=self.user)
+        spend_points(order, self.user, self.system, 1200)
+        row = PointsBalance.objects.get(user=self.user, system=self.system)
+        self.assertEqual((row.balance, row.through_id), (300, PointsTransaction.objects.latest("id").pk))
+
+        release_points(order)
+        self.assertEqual(balance_for(self.user, self.system), 1500)
+        self.assertEqual(PointsBalance.objects.get(pk=row.pk).balance, 1500)
+
+        # A row edited behind the fold's back is what the command exists for.
+        PointsTransaction.objects.filter(kind=PointsTransaction.KIND_EARN).update(points=1000)
+        out = StringIO()
+        call_command("reconcile_points", stdout=out, stderr=StringIO())
+        self.assertIn("1 balance(s) drifted", out.getvalue())
+        call_command("reconcile_points", fix=True, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(balance_for(self.user, self.system), 1000)
+
     # ── Tiers ────────────────────────────────────────────────────────────────
 
     def test_the_ladder_is_walked_on_earnings_not_on_the_balance(self):
@@ -3,6 +3,7 @@ from datetime import datetime, time, timedelta
 from datetime import timezone as dt_timezone
 from decimal import ROUND_HALF_UP, Decimal
 
+from django.conf import settings
 from django.core.cache import cache
 from django.db import IntegrityError, transaction
 from django.db.models import F, Value
@@ -26,10 +27,9 @@ from users.models import CartItem
 
 from .claims import link_order_to_account
 from .cache import (
-    AVAILABILITY_CACHE_TTL,
     ORDERS_CACHE_TTL,
-    availability_key,
-    invalidate_availability,
+    availability_days,
+    invalidate_booking_availability,
     invalidate_orders,
     orders_key,
 )
@@ -52,6 +52,7 @@ from .serializers import (
     RewardTierSerializer,
     RewardTierWriteSerializer,
 )
+from .services.availability_summary import month_summary, summary_from_slots
 from .services.booking import (
     assign_for_slot,
     availability_range,
@@ -67,6 +68,7 @@ from .services.order_emails import (
     send_order_email,
 )
 from .services.reorder import reorder_ref
+from .services.stripe_events import process as process_stripe_event, record as record_stripe_event
 from .services.coupons import (
     CouponError,
     apply_coupon_to_order,
@@ -76,13 +78,12 @@ from .services.coupons import (
     release_coupon,
     validate_coupon,
 )
-from .services.qr import attach_order_qr, site_base_url
+from .services.qr import request_qr, site_base_url
 from .services.rewards import (
     RewardsError,
     award_points,
     balance_for,
-    next_tier_for,
-    tier_for,
+    tier_standing,
     order_points_cost,
     points_award_for,
     points_price_for,
@@ -552,17 +553,14 @@ class CheckoutView(APIView):
         )
 
 
-def _open_order(system, user, items, *, order_status, payment_method, email, defer_qr=False):
+def _open_order(system, user, items, *, order_status, payment_method, email):
     """Validate a priced basket and write it as an Order plus snapshotted lines.
 
     Returns ``(order, lines, None)``, or ``(None, None, Response)`` carrying the
     4xx that explains the refusal.
 
-    `defer_qr` hands the QR write back to the caller. Booking checkout calls this
-    from *inside* a row lock it holds to serialise seat allocation, and the whole
-    point of writing the PNG outside a transaction is lost if it happens under
-    someone else's - so that caller takes the code on itself once the lock is
-    released.
+    The order's QR code is not written here, nor anywhere in the request: a
+    worker writes it once the order has committed (see `services.qr`).
 
     Shared by the customer checkout and the POS, which is the point: every rule
     that decides what an order *is* - one currency, nothing sold that the tenant
@@ -687,12 +685,10 @@ def _open_order(system, user, items, *, order_status, payment_method, email, def
         order.total = subtotal
         order.save(update_fields=["subtotal", "total"])
 
-    # Outside the transaction: writing the PNG is a round-trip to object storage,
-    # and holding a row lock open across it would put every checkout in a queue
-    # behind the network. Best-effort by construction - a failure here logs and
-    # leaves `qr_code` blank rather than costing the sale (see `services.qr`).
-    if not defer_qr:
-        attach_order_qr(order)
+    # Encoding the PNG and uploading it is a worker's job, not the checkout's;
+    # this only wakes the worker once the order is there for it to find. A
+    # confirmation email writes the code itself if it gets there first.
+    transaction.on_commit(request_qr)
 
     return order, lines, None
 
@@ -861,7 +857,7 @@ def _release_booking(order) -> bool:
     Canceled, not deleted: the order survives as a record of what was abandoned
     (the customer can read it, and delete it themselves), so its booking should
     survive with it. `post_save` on Booking drops the availability cache, which
-    is why nothing here calls `invalidate_availability` - see `orders/signals.py`.
+    is why nothing here calls `invalidate_booking_availability` - see `orders/signals.py`.
 
     Returns whether anything was released, so the caller can log it.
     """
@@ -1996,11 +1992,24 @@ class StripeWebhookView(APIView):
     Unauthenticated by necessity (Stripe has no session here); the signature *is*
     the authentication, and an unsigned or unverifiable request is rejected
     before anything is read out of it.
+
+    **Recorded, acknowledged, then processed.** A verified event this view acts
+    on is written to the event log (`services.stripe_events`) and answered at
+    once; `manage.py process_stripe_events` runs `handle_event` on it. Stripe
+    retries a slow answer, so the handler's SMTP and storage round trips used
+    to buy a second delivery of every payment they held up.
     """
 
     authentication_classes = []
     permission_classes = (AllowAny,)
 
+    def _handlers(self):
+        return {
+            "checkout.session.completed": self._handle_completed,
+            "checkout.session.expired": self._handle_expired,
+            "checkout.session.async_payment_failed": self._handle_failed,
+        }
+
     def post(self, request, token):
         system = System.objects.filter(stripe_webhook_token=token).first()
         if system is None:
@@ -2021,30 +2030,39 @@ class StripeWebhookView(APIView):
             logger.warning("Stripe webhook rejected for system %s: %s", system_id, exc)
             return Response({"detail": "Invalid signature."}, status=status.HTTP_400_BAD_REQUEST)
 
-        handler = {
-            "checkout.session.completed": self._handle_completed,
-            "checkout.session.expired": self._handle_expired,
-            "checkout.session.async_payment_failed": self._handle_failed,
-        }.get(event["type"])
-
-        if handler is None:
+        if event["type"] not in self._handlers():
             # 200, not 4xx: an event we do not act on is not an error, and telling
             # Stripe otherwise would make it retry the delivery for days.
             return Response({"received": True})
 
+        if not event.get("id"):
+            # Every real event has one; without it there is nothing to
+            # deduplicate a redelivery on.
+            return Response({"detail": "Event has no id."}, status=status.HTTP_400_BAD_REQUEST)
+
+        row = record_stripe_event(system, event)
+        if row is None:
+            logger.info("Stripe event %s for system %s already recorded", event["id"], system_id)
+        elif getattr(settings, "STRIPE_EVENTS_PROCESS_INLINE", False):
+            process_stripe_event(row)
+        # 200 whatever the handler makes of it: a failure is the event log's to
+        # retry, not Stripe's.
+        return Response({"received": True})
+
+    def handle_event(self, system, event) -> bool:
+        """Apply one verified event to its order; False when it names none of `system`'s."""
+        handler = self._handlers()[event["type"]]
         session = event["data"]["object"]
         order = self._order_for(system, session)
         if order is None:
+            # Not retried either: no later attempt can conjure the order.
             logger.error(
                 "Stripe event %s for system %s names no known order (session %s)",
-                event["type"], system_id, session.get("id"),
+                event["type"], system.pk, session.get("id"),
             )
-            # 200 as well: retrying cannot conjure the order, and a permanent 4xx
-            # here only fills the tenant's dashboard with failed deliveries.
-            return Response({"received": True})
-
+            return False
         handler(order, session)
-        return Response({"received": True})
+        return True
 
     def _order_for(self, system, session):
         """The order this session belongs to, scoped to the verified System.
@@ -2121,8 +2139,8 @@ class StripeWebhookView(APIView):
         # The customer's first email about this order: an online order is
         # `pending` with no address until now (the webhook just copied what
         # Stripe collected), so payment is the earliest point we can confirm it.
-        # Sent after commit and best-effort, so a mail failure can never make the
-        # handler return non-2xx and have Stripe retry a payment already recorded.
+        # Queued and best-effort, so a mail failure can never fail the event and
+        # have it retried against a payment already recorded.
         send_order_email(order, kind=CONFIRMATION)
 
     def _handle_expired(self, order, session):
@@ -2252,6 +2270,7 @@ class BookingAvailabilityView(APIView):
     """
     GET /api/bookings/availability/
         ?service=<id>&branch=<id>&start=<YYYY-MM-DD>&days=<n>&party=<n>&resource=<id>
+        &view=month
 
     The calendar's data source: which local dates have free slots, what those
     slots are, and how many seats each still has. Public, because a visitor picks
@@ -2262,7 +2281,17 @@ class BookingAvailabilityView(APIView):
     are expected to arrive rather than the hour on their own wall.
 
     `party` and `resource` both change the answer, so both are clamped/validated
-    here and both are part of the cache key.
+    here and both are part of the cache key. The slots are cached per branch and
+    local date (see `orders.cache.availability_days`), so a booking only costs
+    the days it touches; the envelope around them is cheap and built every time.
+
+    `view=month` answers the month grid instead: `summary` maps every date in
+    the range to whether it can be picked (`seats_left`, and the first and last
+    start), and no slot lists are built. It reads the stored
+    `AvailabilitySummary` rows (`orders.services.availability_summary`), so a
+    grid is one indexed read; the calendar then asks for `days=1` of the date
+    the customer opens. A `resource` pick is not what the rows are counted on,
+    so that one combination still walks the slots.
     """
 
     permission_classes = (AllowAny,)
@@ -2314,16 +2343,31 @@ class BookingAvailabilityView(APIView):
                 wanted = None
             resource_id = next((r.pk for r, _ in pickable if r.pk == wanted), None)
 
-        cache_key = availability_key(
-            service.pk, branch.pk if branch else None, start, days, party, resource_id,
-        )
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        dates = [start + timedelta(days=offset) for offset in range(days)]
+        month = request.query_params.get("view") == "month"
+
+        def build(missing):
+            # One occupancy query across the span of the days that need it, even
+            # when that span has still-current days inside it: two round trips
+            # cost more than recomputing a day we already had.
+            first = missing[0]
+            computed = availability_range(
+                service, branch, first, (missing[-1] - first).days + 1,
+                party_size=party, resource_id=resource_id,
+            )
+            return {
+                day: [{"at": slot.at.isoformat(), "seats_left": slot.seats_left} for slot in slots]
+                for day, slots in computed.items()
+            }
 
-        by_day = availability_range(
-            service, branch, start, days, party_size=party, resource_id=resource_id,
-        )
+        if month and resource_id is None:
+            by_day = None
+            summary = month_summary(service, branch, dates)
+        else:
+            by_day = availability_days(
+                service.pk, branch.pk if branch else None, dates, build, party, resource_id,
+            )
+            summary = summary_from_slots(by_day, dates) if month else None
         earliest, last_date = booking_window(branch, now=dj_timezone.now())
         party_min, party_max = service.booking_party_range
         payload = {
@@ -2334,19 +2378,6 @@ class BookingAvailabilityView(APIView):
             "start": start.isoformat(),
             "days": days,
             "last_bookable_date": last_date.isoformat(),
-            # A flat map of local date -> the day's slots. The frontend keys its
-            # calendar straight off it, so a date absent from the map is a date
-            # that cannot be selected.
-            #
-            # `seats_left` is the largest free block on a *single* resource, not
-            # the sum across them: it answers "can the six of us take the 10:00?",
-            # which two boats with three free seats each answer no.
-            "availability": {
-                day.isoformat(): [
-                    {"at": slot.at.isoformat(), "seats_left": slot.seats_left} for slot in slots
-                ]
-                for day, slots in sorted(by_day.items())
-            },
             "party": party,
             "party_min": party_min,
             "party_max": party_max,
@@ -2366,7 +2397,31 @@ class BookingAvailabilityView(APIView):
                 for r, pool in pickable
             ],
         }
-        cache.set(cache_key, payload, AVAILABILITY_CACHE_TTL)
+        if not month:
+            # A flat map of local date -> the day's slots. The frontend keys its
+            # calendar straight off it, so a date absent from the map is a date
+            # that cannot be selected.
+            #
+            # `seats_left` is the largest free block on a *single* resource, not
+            # the sum across them: it answers "can the six of us take the 10:00?",
+            # which two boats with three free seats each answer no.
+            payload["availability"] = {
+                day.isoformat(): slots for day, slots in sorted(by_day.items()) if slots
+            }
+        else:
+            # Every date of the range, selectable or not. The rows count a party
+            # of one, so the party asked about is applied here: a date with a
+            # free block of three is closed to four, and its first and last
+            # starts are those of the smallest party.
+            payload["summary"] = {
+                day.isoformat(): {
+                    "open": entry["seats_left"] >= party,
+                    "seats_left": entry["seats_left"],
+                    "first_slot": entry["first_slot"].isoformat() if entry["first_slot"] else None,
+                    "last_slot": entry["last_slot"].isoformat() if entry["last_slot"] else None,
+                }
+                for day, entry in sorted(summary.items())
+            }
         return Response(payload)
 
 
@@ -2546,8 +2601,6 @@ class BookingCheckoutView(APIView):
                     else Order.PAYMENT_ONLINE
                 ),
                 email=email,
-                # See `_open_order`: the QR is written after the lock is released.
-                defer_qr=True,
             )
             if order_error is not None:
                 return order_error
@@ -2583,13 +2636,8 @@ class BookingCheckoutView(APIView):
                 notes=(data.get("notes") or "").strip(),
             )
 
-        # Both deferred out of the critical section above: a round-trip to object
-        # storage under a row lock would queue every other checkout at this branch
-        # behind the network.
-        attach_order_qr(order)
-
-        # Deferred out of the critical section for the same reason the QR is: it
-        # is a query and a write that the branch's row lock has no reason to hold.
+        # Deferred out of the critical section above: it is a query and a write
+        # that the branch's row lock has no reason to hold.
         # A booking made by a guest whose address already has an account here goes
         # into it, exactly as a cart checkout's does.
         if user is None:
@@ -2599,7 +2647,7 @@ class BookingCheckoutView(APIView):
         order.shipping_name = (contact.get("name") or "").strip()
         order.save(update_fields=["phone", "shipping_name", "updated_at"])
 
-        invalidate_availability()
+        invalidate_booking_availability(booking)
         if user is not None:
             invalidate_orders(user.id, system.id)
 
@@ -2655,7 +2703,7 @@ class BookingCheckoutView(APIView):
             # booking with no way to be paid would otherwise hold a slot nobody
             # can take and nobody is coming to.
             order.delete()
-            invalidate_availability()
+            invalidate_booking_availability(booking)
             return Response(
                 {"detail": "Could not start checkout. Please try again.", "code": "STRIPE_ERROR"},
                 status=status.HTTP_502_BAD_GATEWAY,
@@ -2788,7 +2836,7 @@ class AdminBookingDetailView(APIView):
         # Cancelling hands the slot back, and confirming/completing changes what
         # the CMS shows - clear either way rather than reasoning about which
         # transitions free time.
-        invalidate_availability()
+        invalidate_booking_availability(booking)
         if booking.order.user_id:
             invalidate_orders(booking.order.user_id, booking.order.system_id)
 
@@ -2859,7 +2907,7 @@ class AdminBookingDetailView(APIView):
         booking.resource = resource
         booking.resource_name = resource.name if resource is not None else ""
         booking.save(update_fields=["resource", "resource_name", "updated_at"])
-        invalidate_availability()
+        invalidate_booking_availability(booking)
 
         return Response(AdminBookingSerializer(booking, context={"request": request}).data)
 
@@ -2899,8 +2947,7 @@ class RewardsSummaryView(APIView):
             return Response({"enabled": False, "balance": 0, "tier": None,
                              "next_tier": None, "tiers": [], "transactions": []})
 
-        tier = tier_for(request.user, system)
-        upcoming = next_tier_for(request.user, system)
+        tier, upcoming = tier_standing(request.user, system)
         transactions = PointsTransaction.objects.filter(
             user=request.user, system=system,
         ).select_related("order")[: self.STATEMENT_LIMIT]
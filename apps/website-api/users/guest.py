@@ -17,6 +17,12 @@ into showing different numbers for the same choice.
 Used by three callers, which is why it lives here rather than in a view:
 `GuestResolveView` (render the cart), `CheckoutView`'s guest branch (charge it),
 and `GuestMergeView` (turn it into rows at login).
+
+Every reference is read in one pass per buyable kind (`_load_targets`), with the
+ingredients, options and sizes a menu line is priced from prefetched alongside,
+and then priced in memory. The cost of a cart is a constant handful of queries
+however many lines it has - it used to be two or three per line, on an endpoint
+anyone can call with fifty of them.
 """
 
 from catalog.models import (
@@ -36,6 +42,54 @@ MAX_QUANTITY = 99
 
 _MODELS = {"product": Product, "service": Service, "menu_item": MenuItem}
 
+# What pricing and rendering a line reads, per kind - the relations the
+# catalog's own detail views prefetch, so no line costs a query of its own.
+_RELATED = {
+    "product": ("images", "variants", "variants__images"),
+    "service": ("images", "variants", "variants__images"),
+    "menu_item": (
+        "images", "variants", "variants__images",
+        "ingredients__ingredient", "ingredients__options__ingredient",
+        "own_sizes", "category__sizes",
+    ),
+}
+
+
+def _load_targets(system, refs):
+    """Every enabled buyable `refs` name, as `{kind: {pk: target}}`.
+
+    One query per kind that appears (plus its prefetches), scoped to `system`
+    so a crafted id cannot pull in another tenant's item. An id that is not an
+    integer simply matches nothing, like one that was deleted.
+    """
+    wanted = {}
+    for ref in refs:
+        kind = ref.get("kind")
+        if kind not in _MODELS:
+            continue
+        try:
+            wanted.setdefault(kind, set()).add(int(ref.get("id")))
+        except (TypeError, ValueError):
+            continue
+
+    loaded = {}
+    for kind, ids in wanted.items():
+        rows = (
+            _MODELS[kind].objects
+            .filter(pk__in=ids, system=system, enabled=True)
+            .select_related("brand", "category", "system")
+            .prefetch_related(*_RELATED[kind])
+        )
+        loaded[kind] = {row.pk: row for row in rows}
+    return loaded
+
+
+def _target(loaded, ref):
+    try:
+        return loaded.get(ref.get("kind"), {}).get(int(ref.get("id")))
+    except (TypeError, ValueError):
+        return None
+
 
 def _dedupe_key(kind, target_id, selection, size_id=None):
     """What makes two references the same line.
@@ -71,18 +125,14 @@ def resolve_guest_cart(system, refs):
     if system is None:
         return []
 
+    refs = refs[:MAX_GUEST_LINES]
+    loaded = _load_targets(system, refs)
     items = []
     seen = {}
 
-    for index, ref in enumerate(refs[:MAX_GUEST_LINES]):
+    for index, ref in enumerate(refs):
         kind = ref.get("kind")
-        model = _MODELS.get(kind)
-        if model is None:
-            continue
-
-        target = model.objects.filter(
-            pk=ref.get("id"), system=system, enabled=True,
-        ).first()
+        target = _target(loaded, ref)
         if target is None:
             continue
 
@@ -90,9 +140,9 @@ def resolve_guest_cart(system, refs):
         size = None
 
         if kind == "menu_item":
-            ingredients = list(
-                target.ingredients.filter(enabled=True).prefetch_related("options")
-            )
+            # Filtered in memory, not with `.filter()`, which would throw the
+            # prefetch away and query again for every line.
+            ingredients = [ing for ing in target.ingredients.all() if ing.enabled]
             selection = normalize_selection(ref.get("customization") or [], ingredients)
             # Resolved against what the dish offers, never trusted: a reference
             # can sit in localStorage for weeks, and a size that has since been
@@ -137,22 +187,18 @@ def resolve_guest_favorites(system, refs):
     if system is None:
         return []
 
+    refs = refs[:MAX_GUEST_LINES]
+    loaded = _load_targets(system, refs)
     out = []
     seen = set()
 
-    for ref in refs[:MAX_GUEST_LINES]:
+    for ref in refs:
         kind = ref.get("kind")
-        model = _MODELS.get(kind)
-        if model is None:
-            continue
-
         key = (kind, ref.get("id"))
         if key in seen:
             continue
 
-        target = model.objects.filter(
-            pk=ref.get("id"), system=system, enabled=True,
-        ).first()
+        target = _target(loaded, ref)
         if target is None:
             continue
 
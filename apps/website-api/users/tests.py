@@ -504,6 +504,66 @@ class CartMenuSizeTests(TestCase):
             {("Grande", 2, "240.00"), ("Mediana", 1, "200.00")},
         )
 
+    def test_a_guest_cart_costs_the_same_queries_at_any_length(self):
+        """Every reference is loaded in one read per kind and priced in memory,
+        so fifty lines from an anonymous caller cost what two do."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from .guest import resolve_guest_cart
+
+        cheese = Ingredient.objects.create(system=self.system, name="Queso", slug="q-queso", unit="g")
+        dishes = [self.item]
+        for n in range(4):
+            dish = MenuItem.objects.create(
+                system=self.system, category=self.category, name=f"Dish {n}",
+                slug=f"q-dish-{n}", price=Decimal("100.00"), currency="MXN",
+            )
+            group = MenuItemIngredient.objects.create(
+                menu_item=dish, ingredient=cheese, price=Decimal("10.00"),
+                is_removable=True, max_quantity=3,
+            )
+            MenuItemIngredientOption.objects.create(
+                menu_item_ingredient=group,
+                ingredient=Ingredient.objects.create(
+                    system=self.system, name=f"Vegan {n}", slug=f"q-vegan-{n}", unit="g",
+                ),
+                price=Decimal("20.00"),
+            )
+            dishes.append(dish)
+        products = [
+            Product.objects.create(
+                category=a_product_category(self.system), system=self.system,
+                name=f"Thing {n}", slug=f"q-thing-{n}", price=Decimal("5.00"),
+            )
+            for n in range(4)
+        ]
+
+        def priced(refs):
+            with CaptureQueriesContext(connection) as queries:
+                lines = resolve_guest_cart(self.system, refs)
+                totals = [line.line_total for line in lines]
+            return len(queries), totals
+
+        def refs(count):
+            out = []
+            for n in range(count):
+                dish = dishes[n % len(dishes)]
+                group = dish.ingredients.first()
+                out.append({
+                    "kind": "menu_item", "id": dish.id, "size": self.large.id,
+                    "customization": [{"ingredient": group.id, "quantity": 2}] if group else [],
+                })
+                out.append({"kind": "product", "id": products[n % len(products)].id})
+            return out
+
+        small, totals = priced(refs(2))
+        large, _ = priced(refs(20))
+        # Was two or three queries per line (16 -> 145 for these two carts).
+        self.assertEqual(small, large)
+        # And priced as before: +40 for the large size, 2 x 10 of cheese.
+        self.assertEqual(totals, [Decimal("240.00"), Decimal("5.00"), Decimal("160.00"), Decimal("5.00")])
+
     def test_a_saved_dish_lists_with_its_sizes(self):
         """A favorite is a *dish*, not a configured line: it carries no chosen
         size, but the dish it points at still serializes its size list. This had
@@ -33,8 +33,10 @@ from catalog.models import (
     Product, Service, MenuItem, normalize_selection,
 )
 from catalog.recommendations import cart_recommendations
+from core.cache import read_through
 from core.media import absolute_media_url
 from core.models import System
+from core.outbox import enqueue
 from core.permissions import IsSystemAdmin
 from core.services.email_badges import attach_badges, badge_context
 from core.tenancy import host_system, profile_system, user_system
@@ -130,6 +132,9 @@ def _send_branded_email(user, subject, template, path, expiry_hours):
 
     `path` is appended to the tenant's own base URL to form the action link, so
     the recipient always lands on their own domain.
+
+    Queued (`core.outbox`): signing up or asking for a reset answers without
+    waiting on SMTP. Raises only if the message cannot be built or queued.
     """
     brand = _email_brand(user)
     ctx = {
@@ -142,8 +147,9 @@ def _send_branded_email(user, subject, template, path, expiry_hours):
     html_body = render_to_string(f'users/{template}.html', ctx)
     message = EmailMultiAlternatives(subject, text_body, brand['from_email'], [user.email])
     message.attach_alternative(html_body, 'text/html')
-    attach_badges(message, profile_system(user))
-    message.send(fail_silently=False)
+    system = profile_system(user)
+    attach_badges(message, system)
+    enqueue(message, label=f"users:{template}", system=system)
 
 
 def _send_password_reset_email(user, token_obj):
@@ -811,13 +817,12 @@ class FavoriteListView(APIView):
     def get(self, request):
         system = _user_system(request)
         cache_key = favorites_key(request.user.id, system.id if system else 0)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        favorites = _favorites_qs(request, system)
-        data = FavoriteSerializer(favorites, many=True, context={"request": request}).data
-        cache.set(cache_key, data, FAVORITES_CACHE_TTL)
+        def build():
+            favorites = _favorites_qs(request, system)
+            return FavoriteSerializer(favorites, many=True, context={"request": request}).data
+
+        data = read_through(cache_key, build, FAVORITES_CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -884,19 +889,18 @@ class FavoriteIdsView(APIView):
     def get(self, request):
         system = _user_system(request)
         cache_key = favorites_ids_key(request.user.id, system.id if system else 0)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        rows = Favorite.objects.filter(user=request.user, system=system).values_list(
-            "product_id", "service_id", "menu_item_id",
-        )
-        data = {
-            "products": [p for p, _, _ in rows if p is not None],
-            "services": [s for _, s, _ in rows if s is not None],
-            "menu_items": [m for _, _, m in rows if m is not None],
-        }
-        cache.set(cache_key, data, FAVORITES_CACHE_TTL)
+        def build():
+            rows = Favorite.objects.filter(user=request.user, system=system).values_list(
+                "product_id", "service_id", "menu_item_id",
+            )
+            return {
+                "products": [p for p, _, _ in rows if p is not None],
+                "services": [s for _, s, _ in rows if s is not None],
+                "menu_items": [m for _, _, m in rows if m is not None],
+            }
+
+        data = read_through(cache_key, build, FAVORITES_CACHE_TTL)
         return Response(data)
 
 
@@ -1121,12 +1125,11 @@ class CartListView(APIView):
     def get(self, request):
         system = _user_system(request)
         cache_key = cart_key(request.user.id, system.id if system else 0)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
 
-        data = _cart_payload(request, system)
-        cache.set(cache_key, data, CART_CACHE_TTL)
+        def build():
+            return _cart_payload(request, system)
+
+        data = read_through(cache_key, build, CART_CACHE_TTL)
         return Response(data)
 
     def post(self, request):
@@ -1277,15 +1280,14 @@ class CartCountView(APIView):
     def get(self, request):
         system = _user_system(request)
         cache_key = cart_count_key(request.user.id, system.id if system else 0)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-
-        total = CartItem.objects.filter(user=request.user, system=system).aggregate(
-            total=models.Sum("quantity"),
-        )["total"]
-        data = {"count": total or 0}
-        cache.set(cache_key, data, CART_CACHE_TTL)
+
+        def build():
+            total = CartItem.objects.filter(user=request.user, system=system).aggregate(
+                total=models.Sum("quantity"),
+            )["total"]
+            return {"count": total or 0}
+
+        data = read_through(cache_key, build, CART_CACHE_TTL)
         return Response(data)
 
 
@@ -1306,41 +1308,41 @@ class CartIdsView(APIView):
     def get(self, request):
         system = _user_system(request)
         cache_key = cart_ids_key(request.user.id, system.id if system else 0)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-
-        rows = CartItem.objects.filter(user=request.user, system=system).values_list(
-            "id", "product_id", "service_id", "menu_item_id", "menu_size_id", "customization",
-        )
 
-        def _kind(product_id, service_id):
-            if product_id:
-                return "product"
-            if service_id:
-                return "service"
-            return "menu_item"
+        def build():
+            rows = CartItem.objects.filter(user=request.user, system=system).values_list(
+                "id", "product_id", "service_id", "menu_item_id", "menu_size_id", "customization",
+            )
 
-        data = {
-            "lines": [
-                {
-                    "line_id": line_id,
-                    "kind": _kind(product_id, service_id),
-                    "id": product_id or service_id or menu_item_id,
-                    # A menu line's ingredient selection AND its size are both
-                    # part of its identity, but the catalog card only ever
-                    # adds/removes the base line; this flag lets it match that
-                    # one and ignore customised siblings. A sized line always
-                    # counts as customised - with a small and a large of the same
-                    # dish in the cart, a card that offered "remove" could not say
-                    # which one it would take away. Always false for
-                    # product/service.
-                    "customized": bool(customization) or menu_size_id is not None,
-                }
-                for line_id, product_id, service_id, menu_item_id, menu_size_id, customization in rows
-            ],
-        }
-        cache.set(cache_key, data, CART_CACHE_TTL)
+            def _kind(product_id, service_id):
+                if product_id:
+                    return "product"
+                if service_id:
+                    return "service"
+                return "menu_item"
+
+            data = {
+                "lines": [
+                    {
+                        "line_id": line_id,
+                        "kind": _kind(product_id, service_id),
+                        "id": product_id or service_id or menu_item_id,
+                        # A menu line's ingredient selection AND its size are both
+                        # part of its identity, but the catalog card only ever
+                        # adds/removes the base line; this flag lets it match that
+                        # one and ignore customised siblings. A sized line always
+                        # counts as customised - with a small and a large of the same
+                        # dish in the cart, a card that offered "remove" could not say
+                        # which one it would take away. Always false for
+                        # product/service.
+                        "customized": bool(customization) or menu_size_id is not None,
+                    }
+                    for line_id, product_id, service_id, menu_item_id, menu_size_id, customization in rows
+                ],
+            }
+            return data
+
+        data = read_through(cache_key, build, CART_CACHE_TTL)
         return Response(data)
 
 
@@ -1371,6 +1373,10 @@ class GuestResolveView(APIView):
 
     authentication_classes = []
     permission_classes = (AllowAny,)
+    # Unauthenticated and sized by the caller, so what it costs must not grow
+    # with the cart: every reference is loaded in one read per kind (see
+    # users/guest.py). A line-count-dependent regression fails the tests.
+    request_budget = {"queries": 15, "ms": 500}
 
     def post(self, request):
         serializer = GuestStateSerializer(data=request.data)
@@ -69,6 +69,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its numbers include every middleware below (see core/metrics.py).
+    'core.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -78,6 +80,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so a 304 it answers before the view still passed through the rest.
+    'core.conditional.ConditionalGetMiddleware',
 ]
 
 ROOT_URLCONF = 'website_api.urls'
@@ -99,6 +103,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'website_api.wsgi.application'
 
+# Applies the settings every test runs under (the outbox and the Stripe events
+# processed inline, query budgets enforced) - see the module.
+TEST_RUNNER = 'website_api.test_runner.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -298,7 +306,9 @@ if _REDIS_URL:
 
     CACHES = {
         'default': {
-            'BACKEND': 'django_redis.cache.RedisCache',
+            # django-redis' RedisCache, counting hits and misses per request
+            # for the Server-Timing header (core/metrics.py).
+            'BACKEND': 'core.metrics.RedisCache',
             'LOCATION': _REDIS_URL,
             'OPTIONS': _redis_options,
         }
@@ -306,12 +316,54 @@ if _REDIS_URL:
 
     SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
     SESSION_CACHE_ALIAS = 'default'
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.metrics.LocMemCache',
+        }
+    }
+
+# Request metrics
+#
+# `core.metrics.RequestMetricsMiddleware` times every request's queries, cache
+# reads and serialization, logs one JSON line per request on `core.metrics` and,
+# with REQUEST_METRICS_HEADER, answers with a `Server-Timing` header. Under test
+# a view that runs more queries than its `request_budget` raises instead of
+# logging, and the per-request lines are silenced so they do not bury the test
+# output - both set by `website_api.test_runner`, like every test-only setting.
+
+# ⚠ The header tells anyone who asks how many queries a page ran and which cache
+# keys it missed, so it is a development aid: on with DEBUG, off otherwise.
+REQUEST_METRICS_HEADER = os.environ.get('REQUEST_METRICS_HEADER', 'True' if DEBUG else 'False') == 'True'
+REQUEST_BUDGETS_ENFORCE = os.environ.get('REQUEST_BUDGETS_ENFORCE', 'False') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.metrics': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
 
 # Email
 # https://docs.djangoproject.com/en/5.2/topics/email/
 #
 # Uses SMTP via IONOS when EMAIL_HOST_USER is set.
-# Falls back to the console backend for local development.
+# Falls back to the file backend for local development: every message lands as
+# one .log file under EMAIL_FILE_PATH, where it can be opened and read whole -
+# the console backend printed multipart bodies base64'd into the runserver log.
+#
+# Transactional email goes through the outbox (core/outbox.py): the request
+# queues it, `manage.py send_queued_email` sends it. EMAIL_OUTBOX_SEND_INLINE
+# sends each message as it is queued instead - on by default without SMTP, where
+# no worker is usually running, and always under test (`website_api.test_runner`).
 
 _EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 
@@ -324,15 +376,21 @@ if _EMAIL_HOST_USER:
     EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
     DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
     # ⚠ Django passes this straight to smtplib, and its default is None - i.e. a
-    # socket with no deadline. Registration sends its verification mail
-    # synchronously inside the request (users/views.py), so an SMTP host that
-    # accepts the connection and then stalls would pin a worker thread until
-    # gunicorn's 600s timeout. Bound it well under the probe budget instead.
+    # socket with no deadline. An admin's reply to a contact message is still
+    # sent inside the request (core/services/contact.py), and a stalled SMTP
+    # host would pin that worker thread until gunicorn's 600s timeout - or the
+    # outbox worker, with a whole batch behind it. Bound it well under the
+    # probe budget instead.
     EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '10'))
 else:
-    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+    EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+    EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', str(BASE_DIR / 'sent_emails'))
     DEFAULT_FROM_EMAIL = 'noreply@localhost'
 
+EMAIL_OUTBOX_SEND_INLINE = os.environ.get(
+    'EMAIL_OUTBOX_SEND_INLINE', 'False' if _EMAIL_HOST_USER else 'True',
+) == 'True'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -406,3 +464,12 @@ STRIPE_CREDENTIALS_ENCRYPTION_KEY = os.environ.get('STRIPE_CREDENTIALS_ENCRYPTIO
 # minutes; a pending Order whose session lapses is left for the customer to
 # re-checkout rather than being resurrected.
 STRIPE_CHECKOUT_SESSION_TTL = int(os.environ.get('STRIPE_CHECKOUT_SESSION_TTL', 30 * 60))
+
+# Webhook events are recorded by the view and processed by
+# `manage.py process_stripe_events` (orders/services/stripe_events.py).
+# STRIPE_EVENTS_PROCESS_INLINE processes each as it is recorded instead - on by
+# default with DEBUG, where no worker is usually running, and always under test
+# (`website_api.test_runner`).
+STRIPE_EVENTS_PROCESS_INLINE = os.environ.get(
+    'STRIPE_EVENTS_PROCESS_INLINE', 'True' if DEBUG else 'False',
+) == 'True'
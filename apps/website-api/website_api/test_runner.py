@@ -0,0 +1,53 @@
+"""The test runner: the stock one, plus the settings every test runs under.
+
+These used to be switched on in settings.py by reading `sys.argv` for
+``manage.py test``, which a test started any other way (``python -m django
+test``, an IDE) silently ran without. `TEST_RUNNER` is what every Django test
+command goes through, so they live here instead, applied with
+`override_settings` for the whole run - and a test that needs one off still
+says so with its own `override_settings`:
+
+* ``EMAIL_OUTBOX_SEND_INLINE`` - queued email is sent as it is queued, so
+  ``mail.outbox`` fills and the suite still exercises the worker's send path
+  (`core.outbox`).
+* ``STRIPE_EVENTS_PROCESS_INLINE`` - a recorded webhook event is processed
+  before the view answers (`orders.services.stripe_events`).
+* ``REQUEST_BUDGETS_ENFORCE`` - a view over its query budget fails the test
+  that rendered it (`core.metrics`), whose per-request log lines are quietened
+  to warnings so they do not bury the output.
+
+⚠ A runner that bypasses Django's (pytest-django) has to apply `TEST_SETTINGS`
+itself.
+"""
+
+import logging
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+TEST_SETTINGS = {
+    "EMAIL_OUTBOX_SEND_INLINE": True,
+    "STRIPE_EVENTS_PROCESS_INLINE": True,
+    "REQUEST_BUDGETS_ENFORCE": True,
+}
+
+# Logging is configured once, at setup; a LOGGING override would not reach it.
+_QUIET_LOGGERS = ("core.metrics",)
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+        self._log_levels = {}
+        for name in _QUIET_LOGGERS:
+            logger = logging.getLogger(name)
+            self._log_levels[name] = logger.level
+            logger.setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        for name, level in self._log_levels.items():
+            logging.getLogger(name).setLevel(level)
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
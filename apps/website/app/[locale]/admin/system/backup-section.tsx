@@ -54,10 +54,10 @@ function defaultBackupName(): string {
  * a zip - which is also kept as a restore point so the tenant has a history to
  * download or restore from later.
  *
- * The progress bar is deliberately indeterminate. Building the archive is one
- * synchronous request that serialises the database and copies every media file,
- * and the server has no way to report a percentage back mid-request; an animated
- * bar says "working" honestly, where a fake percentage would not.
+ * The progress bar is deliberately indeterminate. The archive is built by the
+ * API's job worker, which `createBackup` polls until it finishes; the job's
+ * counters are per section and of very different sizes, so an animated bar says
+ * "working" honestly, where a percentage made from them would not.
  */
 export function BackupSection() {
   const t = useTranslations("Admin");
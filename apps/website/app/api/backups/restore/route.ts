@@ -14,6 +14,10 @@ import { apiFetch } from "@/lib/api-fetch";
  * token that expired mid-upload), and a `ReadableStream` body can only be
  * consumed once - streaming would turn every expired-token restore into an
  * unexplained failure after the whole archive had already been sent.
+ *
+ * Django answers 202 with the queued job, which the CMS then polls through the
+ * admin proxy (`/api/admin/backups/jobs/<id>/`); the status is passed through
+ * untouched so it can tell a queued restore from a rejected one.
  */
 export async function POST(request: NextRequest) {
   const contentType = request.headers.get("content-type") ?? "";
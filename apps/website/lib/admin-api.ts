@@ -1578,6 +1578,49 @@ export interface RestoreResult {
   >;
 }
 
+/**
+ * A queued backup or restore (website-api's `SiteJob`). Both endpoints answer
+ * 202 with one of these and leave the work to the API's job worker, because a
+ * whole tenant's archive can outlast any request timeout in between.
+ */
+export interface SiteJob {
+  id: number;
+  kind: "backup" | "restore";
+  status: "queued" | "running" | "succeeded" | "failed" | "cancelled";
+  params: Record<string, unknown>;
+  /** Per-section counters, keyed by section. */
+  progress: Record<string, { done: number; total: number }>;
+  result: Record<string, unknown> | null;
+  error: string;
+  cancel_requested: boolean;
+  backup_id: number | null;
+  created: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+const JOB_POLL_MS = 2000;
+
+/**
+ * Poll a job until it finishes; resolve with it if it succeeded.
+ *
+ * A failed or cancelled job throws an `AdminApiError` carrying the job's own
+ * message as `detail`, the same shape a 400 from the endpoint would have had,
+ * so the sections' error handling does not care which one it got.
+ */
+async function followJob(job: SiteJob): Promise<SiteJob> {
+  while (job.status === "queued" || job.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+    const res = await adminFetch(`/api/backups/jobs/${job.id}/`);
+    job = await parseResponse<SiteJob>(res);
+  }
+  if (job.status !== "succeeded")
+    throw new AdminApiError(job.status === "cancelled" ? 409 : 400, {
+      detail: job.error || undefined,
+    });
+  return job;
+}
+
 export async function listBackups() {
   const res = await adminFetch(`/api/backups/`);
   return parseResponse<SiteBackup[]>(res);
@@ -1588,7 +1631,11 @@ export async function createBackup(name: string, sections: BackupSection[]) {
     method: "POST",
     body: JSON.stringify({ name, sections }),
   });
-  return parseResponse<SiteBackup>(res);
+  const job = await followJob(await parseResponse<SiteJob>(res));
+  // The job only names the restore point; the list is where its row is served.
+  const created = (await listBackups()).find((b) => b.id === job.backup_id);
+  if (!created) throw new AdminApiError(404, {});
+  return created;
 }
 
 export async function deleteBackup(pk: number) {
@@ -1602,7 +1649,7 @@ export async function deleteBackup(pk: number) {
  * Posts straight to `/api/backups/restore/` rather than through `adminFetch`'s
  * `/api/admin/*` proxy: that proxy is JSON-only and would strip the multipart
  * boundary the file depends on. The route handler there attaches the bearer
- * token exactly the same way.
+ * token exactly the same way. The job it queues is followed like a backup's.
  */
 export async function restoreBackup(options: {
   file?: File;
@@ -1623,7 +1670,8 @@ export async function restoreBackup(options: {
     method: "POST",
     body: form,
   });
-  return parseResponse<RestoreResult>(res);
+  const job = await followJob(await parseResponse<SiteJob>(res));
+  return job.result as unknown as RestoreResult;
 }
 
 // ---- Storage (per-tenant Cloudflare R2) ----